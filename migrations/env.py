@@ -17,6 +17,8 @@ from src.db.models import (
     ChatThread,
     ChatMessage,
     LangGraphCheckpoint,
+    EmbeddingCacheEntry,
+    CatalogVersion,
 )
 
 config = context.config
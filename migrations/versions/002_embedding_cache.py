@@ -0,0 +1,31 @@
+"""Persistent query embedding cache
+
+Revision ID: 002
+Revises: 001
+Create Date: 2026-10-16
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from pgvector.sqlalchemy import Vector
+
+revision: str = '002'
+down_revision: Union[str, None] = '001'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'embedding_cache',
+        sa.Column('model', sa.String(100), primary_key=True),
+        sa.Column('dimensions', sa.Integer(), primary_key=True),
+        sa.Column('text_hash', sa.String(64), primary_key=True),
+        sa.Column('embedding', Vector(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), server_default=sa.func.now()),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('embedding_cache')
@@ -0,0 +1,47 @@
+"""Configurable embedding storage (reduced dimensions / halfvec)
+
+Schema-wise a no-op: catalog embeddings stay vector(1536) as created by 001.
+The column type selected by EMBEDDING_STORAGE and EMBEDDING_DIMENSIONS is
+applied at runtime with `make sync-vectors` (src/db/vector_index.py), so
+this revision produces the same schema on every host.
+
+The downgrade restores the baseline vector(1536) column and HNSW index in
+case the storage was converted. Dimensions dropped by a conversion cannot
+be recovered; shortened rows are set to NULL and need a re-seed.
+
+Revision ID: 003
+Revises: 002
+Create Date: 2026-10-16
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+revision: str = '003'
+down_revision: Union[str, None] = '002'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+CATALOG_INDEXES = {
+    'clinical_organizations': 'idx_org_embedding',
+    'clinical_tools': 'idx_tool_embedding',
+}
+
+
+def upgrade() -> None:
+    pass
+
+
+def downgrade() -> None:
+    for table, index in CATALOG_INDEXES.items():
+        op.execute(f'DROP INDEX IF EXISTS {index}')
+        op.execute(
+            f'ALTER TABLE {table} ALTER COLUMN embedding TYPE vector(1536) '
+            f'USING CASE WHEN vector_dims(embedding::vector) = 1536 '
+            f'THEN embedding::vector(1536) END'
+        )
+        op.create_index(
+            index, table, ['embedding'],
+            postgresql_using='hnsw',
+            postgresql_ops={'embedding': 'vector_cosine_ops'},
+        )
@@ -0,0 +1,34 @@
+"""Binary-quantized HNSW expression indexes for two-stage search
+
+Schema-wise a no-op: idx_org_embedding_bq / idx_tool_embedding_bq are only
+useful with VECTOR_SEARCH_MODE=binary and their bit(n) cast depends on
+EMBEDDING_DIMENSIONS, so they are created by `make sync-vectors` and
+init_schema (src/db/vector_index.py) when binary mode is on. The downgrade
+drops them if present.
+
+Revision ID: 004
+Revises: 003
+Create Date: 2026-10-16
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+revision: str = '004'
+down_revision: Union[str, None] = '003'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BQ_INDEXES = {
+    'clinical_organizations': 'idx_org_embedding_bq',
+    'clinical_tools': 'idx_tool_embedding_bq',
+}
+
+
+def upgrade() -> None:
+    pass
+
+
+def downgrade() -> None:
+    for index in BQ_INDEXES.values():
+        op.execute(f'DROP INDEX IF EXISTS {index}')
@@ -0,0 +1,37 @@
+"""Catalog version counters for retrieval cache invalidation
+
+The trigger DDL is shared with init_schema (src/db/catalog_version.py).
+
+Revision ID: 005
+Revises: 004
+Create Date: 2026-10-16
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from src.db.catalog_version import CATALOG_TABLES, catalog_trigger_sql
+
+revision: str = '005'
+down_revision: Union[str, None] = '004'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'catalog_versions',
+        sa.Column('table_name', sa.String(100), primary_key=True),
+        sa.Column('version', sa.BigInteger(), nullable=False, server_default='0'),
+        sa.Column('updated_at', sa.DateTime(), server_default=sa.func.now()),
+    )
+    for statement in catalog_trigger_sql(CATALOG_TABLES):
+        op.execute(statement)
+
+
+def downgrade() -> None:
+    for table in CATALOG_TABLES:
+        op.execute(f'DROP TRIGGER IF EXISTS {table}_catalog_version ON {table}')
+    op.execute('DROP FUNCTION IF EXISTS bump_catalog_version()')
+    op.drop_table('catalog_versions')
@@ -0,0 +1,47 @@
+"""Metadata filter indexes; services as JSONB
+
+Revision ID: 006
+Revises: 005
+Create Date: 2026-10-16
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+revision: str = '006'
+down_revision: Union[str, None] = '005'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BTREE_INDEXES = {
+    'idx_tool_category': ('clinical_tools', 'category'),
+    'idx_org_org_type': ('clinical_organizations', 'org_type'),
+    'idx_org_state': ('clinical_organizations', 'state'),
+    'idx_org_specialty': ('clinical_organizations', 'specialty'),
+}
+
+GIN_INDEXES = {
+    'idx_tool_target_users': ('clinical_tools', 'target_users'),
+    'idx_org_ai_use_cases': ('clinical_organizations', 'ai_use_cases'),
+    'idx_org_services': ('clinical_organizations', 'services jsonb_path_ops'),
+}
+
+
+def upgrade() -> None:
+    op.execute(
+        'ALTER TABLE clinical_organizations '
+        'ALTER COLUMN services TYPE jsonb USING services::jsonb'
+    )
+    for index, (table, column) in BTREE_INDEXES.items():
+        op.execute(f'CREATE INDEX IF NOT EXISTS {index} ON {table} ({column})')
+    for index, (table, column) in GIN_INDEXES.items():
+        op.execute(f'CREATE INDEX IF NOT EXISTS {index} ON {table} USING gin ({column})')
+
+
+def downgrade() -> None:
+    for index in (*BTREE_INDEXES, *GIN_INDEXES):
+        op.execute(f'DROP INDEX IF EXISTS {index}')
+    op.execute(
+        'ALTER TABLE clinical_organizations '
+        'ALTER COLUMN services TYPE json USING services::json'
+    )
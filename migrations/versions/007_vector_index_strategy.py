@@ -0,0 +1,27 @@
+"""Configurable catalog vector index (HNSW parameters, IVFFlat or none)
+
+Schema-wise a no-op: migrations keep the default HNSW (m=16,
+ef_construction=64) idx_org_embedding / idx_tool_embedding from 001.
+VECTOR_INDEX_TYPE, HNSW_M, HNSW_EF_CONSTRUCTION and IVFFLAT_LISTS are
+applied at runtime with `make sync-vectors` (src/db/vector_index.py), which
+rebuilds an index whose type or build parameters differ, so this revision
+produces the same schema on every host.
+
+Revision ID: 007
+Revises: 006
+Create Date: 2026-10-16
+"""
+from typing import Sequence, Union
+
+revision: str = '007'
+down_revision: Union[str, None] = '006'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    pass
+
+
+def downgrade() -> None:
+    pass
@@ -0,0 +1,41 @@
+"""Per-request token usage and cost records
+
+Revision ID: 008
+Revises: 007
+Create Date: 2026-10-16
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import UUID, JSONB
+
+revision: str = '008'
+down_revision: Union[str, None] = '007'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'usage_records',
+        sa.Column('id', UUID(as_uuid=True), primary_key=True, server_default=sa.text('gen_random_uuid()')),
+        sa.Column('thread_id', UUID(as_uuid=True), sa.ForeignKey('chat_threads.id', ondelete='CASCADE')),
+        sa.Column('message_id', UUID(as_uuid=True), sa.ForeignKey('chat_messages.id', ondelete='CASCADE')),
+        sa.Column('endpoint', sa.String(50), nullable=False),
+        sa.Column('route', sa.String(50)),
+        sa.Column('prompt_tokens', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('completion_tokens', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('embedding_tokens', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('cost_usd', sa.Float(), nullable=False, server_default='0'),
+        sa.Column('models', JSONB(), nullable=False, server_default='{}'),
+        sa.Column('created_at', sa.DateTime(), server_default=sa.func.now()),
+    )
+    op.create_index('idx_usage_route', 'usage_records', ['route', 'created_at'])
+    op.create_index('idx_usage_thread', 'usage_records', ['thread_id'])
+
+
+def downgrade() -> None:
+    op.drop_index('idx_usage_thread', table_name='usage_records')
+    op.drop_index('idx_usage_route', table_name='usage_records')
+    op.drop_table('usage_records')
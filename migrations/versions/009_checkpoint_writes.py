@@ -0,0 +1,35 @@
+"""Pending checkpoint writes (PostgresCheckpointer.put_writes)
+
+Revision ID: 009
+Revises: 008
+Create Date: 2026-10-16
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import UUID
+
+revision: str = '009'
+down_revision: Union[str, None] = '008'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'langgraph_checkpoint_writes',
+        sa.Column('thread_id', UUID(as_uuid=True), sa.ForeignKey('chat_threads.id', ondelete='CASCADE'), primary_key=True),
+        sa.Column('checkpoint_id', sa.String(255), primary_key=True),
+        sa.Column('task_id', sa.String(255), primary_key=True),
+        sa.Column('idx', sa.Integer(), primary_key=True),
+        sa.Column('channel', sa.String(255), nullable=False),
+        sa.Column('type', sa.String(50)),
+        sa.Column('value', sa.LargeBinary()),
+        sa.Column('task_path', sa.String(1024), nullable=False, server_default=''),
+        sa.Column('created_at', sa.DateTime(), server_default=sa.func.now()),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('langgraph_checkpoint_writes')
@@ -0,0 +1,30 @@
+"""Notify listeners from the catalog version trigger
+
+Re-creates bump_catalog_version() from catalog_trigger_sql so databases
+migrated before it gained pg_notify() get the NOTIFY the retrieval caches
+LISTEN for. The downgrade keeps the function: a NOTIFY nobody listens to is
+harmless.
+
+Revision ID: 010
+Revises: 009
+Create Date: 2026-10-16
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+from src.db.catalog_version import CATALOG_TABLES, catalog_trigger_sql
+
+revision: str = '010'
+down_revision: Union[str, None] = '009'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    for statement in catalog_trigger_sql(CATALOG_TABLES):
+        op.execute(statement)
+
+
+def downgrade() -> None:
+    pass
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""Benchmark binary-quantized two-stage search against exact cosine search.
+
+Uses stored catalog embeddings as query vectors, so no OpenAI calls are made.
+Run `VECTOR_SEARCH_MODE=binary make sync-vectors` first so the Hamming
+prefilter uses the binary-quantized indexes.
+
+Usage: python scripts/benchmark_binary_search.py --queries 200 --k 5 10
+"""
+
+import argparse
+import statistics
+import sys
+import time
+sys.path.insert(0, ".")
+
+from sqlalchemy import text
+
+from src.db.models.base import engine
+from src.retrievers.sql import similarity_search_sql
+from src.retrievers.tools_retriever import ToolsRetriever
+from src.retrievers.orgs_retriever import OrgsRetriever
+
+
+def sample_query_vectors(table: str, n: int) -> list[list[float]]:
+    """Pick random stored embeddings to use as queries."""
+    with engine.connect() as conn:
+        rows = conn.execute(text(f"""
+            SELECT embedding::text AS embedding FROM {table} ORDER BY random() LIMIT :n
+        """), {"n": n})
+        return [[float(v) for v in row.embedding[1:-1].split(",")] for row in rows]
+
+
+def exact_top_k(table: str, vec: list[float], k: int) -> list[int]:
+    """Ground truth: sequential scan with index scans disabled."""
+    with engine.connect() as conn:
+        conn.execute(text("SELECT set_config('enable_indexscan', 'off', true)"))
+        rows = conn.execute(
+            text(similarity_search_sql(table, ["id"], "full")), {"vec": vec, "limit": k}
+        )
+        return [row.id for row in rows]
+
+
+def timed_ids(retriever, vec: list[float], k: int) -> tuple[list[int], float]:
+    """Run a retriever search and return result ids and latency in ms."""
+    start = time.perf_counter()
+    results = retriever.search_by_vector(vec, limit=k)
+    return [r["id"] for r in results], (time.perf_counter() - start) * 1000
+
+
+def benchmark(retriever_cls, queries: int, ks: list[int]):
+    """Print recall@k and latency for full HNSW vs binary + re-rank."""
+    table = retriever_cls.table
+    vectors = sample_query_vectors(table, queries)
+    if not vectors:
+        print(f"\n{table}: no rows, skipping")
+        return
+
+    modes = {mode: retriever_cls(embed_fn=None, mode=mode) for mode in ("full", "binary")}
+
+    print(f"\n{'='*60}")
+    print(f"{table} ({len(vectors)} queries)")
+    print("="*60)
+    print(f"{'k':>4} {'mode':>8} {'recall@k':>10} {'p50 ms':>8} {'p99 ms':>8}")
+
+    for k in ks:
+        truth = [set(exact_top_k(table, vec, k)) for vec in vectors]
+        for mode, retriever in modes.items():
+            recalls, latencies = [], []
+            for vec, expected in zip(vectors, truth):
+                ids, ms = timed_ids(retriever, vec, k)
+                recalls.append(len(expected & set(ids)) / max(len(expected), 1))
+                latencies.append(ms)
+            latencies.sort()
+            p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]
+            print(
+                f"{k:>4} {mode:>8} {statistics.mean(recalls):>10.3f} "
+                f"{statistics.median(latencies):>8.2f} {p99:>8.2f}"
+            )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--queries", type=int, default=100)
+    parser.add_argument("--k", type=int, nargs="+", default=[5, 10])
+    args = parser.parse_args()
+
+    for retriever_cls in (ToolsRetriever, OrgsRetriever):
+        benchmark(retriever_cls, args.queries, args.k)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""Benchmark selective metadata filters: iterative HNSW scan vs post-filtering.
+
+For the rarest value of a filter column, compares:
+  iterative  - filter pushed into SQL with hnsw.iterative_scan enabled
+  no-iter    - filter pushed into SQL, plain HNSW scan (may return < k rows)
+  postfilter - unfiltered search over-fetching k * overfetch rows, filtered in Python
+
+and reports latency, rows returned and recall@k against an exact filtered scan.
+Uses stored catalog embeddings as query vectors, so no OpenAI calls are made.
+Differences only become visible on catalogs much larger than the seed data.
+
+Usage: python scripts/benchmark_filtered_search.py --queries 100 --k 5
+"""
+
+import argparse
+import statistics
+import sys
+import time
+sys.path.insert(0, ".")
+
+from sqlalchemy import text
+
+import src.retrievers.pgvector_retriever as pgvector_retriever
+from src.db.models.base import engine
+from src.retrievers.sql import similarity_search_sql, filter_sql
+from src.retrievers.tools_retriever import ToolsRetriever
+from src.retrievers.orgs_retriever import OrgsRetriever
+
+FILTER_COLUMNS = {ToolsRetriever: "category", OrgsRetriever: "state"}
+
+
+def rarest_value(table: str, column: str) -> tuple[str, int]:
+    """Least common non-null value of a scalar column, with its row count."""
+    with engine.connect() as conn:
+        row = conn.execute(text(f"""
+            SELECT {column} AS value, count(*) AS n FROM {table}
+            WHERE {column} IS NOT NULL GROUP BY {column} ORDER BY n, {column} LIMIT 1
+        """)).fetchone()
+    if not row:
+        raise SystemExit(f"{table} is empty; run make seed-db first")
+    return row.value, row.n
+
+
+def sample_query_vectors(table: str, n: int) -> list[list[float]]:
+    """Pick random stored embeddings to use as queries."""
+    with engine.connect() as conn:
+        rows = conn.execute(text(f"""
+            SELECT embedding::text AS embedding FROM {table} ORDER BY random() LIMIT :n
+        """), {"n": n})
+        return [[float(v) for v in row.embedding[1:-1].split(",")] for row in rows]
+
+
+def exact_filtered_top_k(retriever, vec: list[float], k: int, filters: dict) -> list[int]:
+    """Ground truth: filtered sequential scan with index scans disabled."""
+    where, params = filter_sql(filters, retriever.filter_columns)
+    with engine.connect() as conn:
+        conn.execute(text("SELECT set_config('enable_indexscan', 'off', true)"))
+        rows = conn.execute(
+            text(similarity_search_sql(retriever.table, ["id"], "full", where=where)),
+            {"vec": vec, "limit": k, **params},
+        )
+        return [row.id for row in rows]
+
+
+def postfilter_search(retriever, vec: list[float], k: int, filters: dict, overfetch: int) -> list[dict]:
+    """The pre-filter-support approach: over-fetch, then filter in Python."""
+    column, value = next(iter(filters.items()))
+    rows = retriever.query_by_vector(vec, limit=k * overfetch)
+    return [r for r in rows if r[column] == value][:k]
+
+
+def run_path(search, vectors, truth, k: int) -> tuple[list[float], list[float], list[int]]:
+    """Latencies (ms), recall@k and returned row counts for one search path."""
+    latencies, recalls, counts = [], [], []
+    for vec, expected in zip(vectors, truth):
+        start = time.perf_counter()
+        results = search(vec)
+        latencies.append((time.perf_counter() - start) * 1000)
+        ids = {r["id"] for r in results}
+        recalls.append(len(ids & set(expected)) / max(min(len(expected), k), 1))
+        counts.append(len(results))
+    return sorted(latencies), recalls, counts
+
+
+def benchmark(retriever_cls, queries: int, k: int, overfetch: int):
+    """Print latency, recall and row counts for each filtered search path."""
+    retriever = retriever_cls(embed_fn=None, mode="full")
+    column = FILTER_COLUMNS[retriever_cls]
+    value, matching = rarest_value(retriever.table, column)
+    filters = {column: value}
+    vectors = sample_query_vectors(retriever.table, queries)
+    truth = [exact_filtered_top_k(retriever, vec, k, filters) for vec in vectors]
+
+    print(f"\n{'='*72}")
+    print(f"{retriever.table}: {column} = '{value}' ({matching} rows), {len(vectors)} queries, k={k}")
+    print("="*72)
+    print(f"{'path':>11} {'p50 ms':>8} {'p99 ms':>8} {'recall@k':>10} {'avg rows':>9}")
+
+    original = pgvector_retriever.HNSW_ITERATIVE_SCAN
+    paths = {
+        "iterative": lambda vec: retriever.query_by_vector(vec, k, filters),
+        "no-iter": lambda vec: retriever.query_by_vector(vec, k, filters),
+        "postfilter": lambda vec: postfilter_search(retriever, vec, k, filters, overfetch),
+    }
+    for name, search in paths.items():
+        pgvector_retriever.HNSW_ITERATIVE_SCAN = (
+            "off" if name == "no-iter" else original if original != "off" else "relaxed_order"
+        )
+        latencies, recalls, counts = run_path(search, vectors, truth, k)
+        p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]
+        print(
+            f"{name:>11} {statistics.median(latencies):>8.2f} {p99:>8.2f} "
+            f"{statistics.mean(recalls):>10.3f} {statistics.mean(counts):>9.2f}"
+        )
+    pgvector_retriever.HNSW_ITERATIVE_SCAN = original
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--queries", type=int, default=100)
+    parser.add_argument("--k", type=int, default=5)
+    parser.add_argument("--overfetch", type=int, default=10, help="Post-filter over-fetch factor")
+    args = parser.parse_args()
+
+    for retriever_cls in FILTER_COLUMNS:
+        benchmark(retriever_cls, args.queries, args.k, args.overfetch)
+
+
+if __name__ == "__main__":
+    main()
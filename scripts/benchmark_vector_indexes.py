@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+"""Compare vector index strategies on a synthetic catalog.
+
+Loads a clustered synthetic catalog of --rows vectors (using the configured
+EMBEDDING_STORAGE / EMBEDDING_DIMENSIONS) into a scratch table, then for each
+index variant reports build time, index size, and p50/p99 latency plus
+recall@k against exact (brute-force) results at each search-effort setting.
+
+Variants:
+  exact               no index, sequential scan (the recall baseline)
+  hnsw m:ef_construction   e.g. --hnsw 16:64 32:128, swept over --ef-search
+  ivfflat lists            e.g. --ivfflat 100 1000, swept over --probes
+
+Usage: python scripts/benchmark_vector_indexes.py --rows 100000 --queries 200 --k 10 \\
+           --hnsw 16:64 32:128 --ef-search 40 100 200 --ivfflat 316 --probes 1 10 32
+"""
+
+import argparse
+import statistics
+import sys
+import time
+sys.path.insert(0, ".")
+
+import numpy as np
+from sqlalchemy import text
+
+from src.config import EMBEDDING_DIMENSIONS
+from src.db.models.base import engine, init_extensions, EMBEDDING_SQL_TYPE
+from src.db.vector_index import vector_index_sql
+from src.retrievers.pgvector_retriever import PgVectorRetriever
+
+TABLE = "bench_vectors"
+INDEX = "idx_bench_vectors_embedding"
+
+
+class BenchRetriever(PgVectorRetriever):
+    """Retriever over the scratch benchmark table."""
+
+    table = TABLE
+    columns = ["id"]
+    label = "vectors"
+
+
+def synthetic_vectors(n: int, dims: int, clusters: int, rng: np.random.Generator) -> np.ndarray:
+    """Unit vectors drawn around random cluster centers (closer to real embeddings than uniform noise)."""
+    centers = rng.standard_normal((clusters, dims)).astype(np.float32)
+    assignments = rng.integers(0, clusters, size=n)
+    vectors = centers[assignments] + 0.5 * rng.standard_normal((n, dims)).astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def load_catalog(vectors: np.ndarray):
+    """Recreate the scratch table and bulk-load vectors with binary COPY."""
+    with engine.connect() as conn:
+        conn.execute(text(f"DROP TABLE IF EXISTS {TABLE}"))
+        conn.execute(text(f"CREATE TABLE {TABLE} (id integer PRIMARY KEY, embedding {EMBEDDING_SQL_TYPE})"))
+        conn.commit()
+
+    raw = engine.raw_connection()
+    try:
+        with raw.driver_connection.cursor() as cur:
+            with cur.copy(f"COPY {TABLE} (id, embedding) FROM STDIN WITH (FORMAT BINARY)") as copy:
+                copy.set_types(["int4", EMBEDDING_SQL_TYPE.split("(")[0]])
+                for i, vec in enumerate(vectors, start=1):
+                    copy.write_row([i, vec])
+        raw.driver_connection.commit()
+    finally:
+        raw.close()
+
+    with engine.connect() as conn:
+        conn.execute(text(f"ANALYZE {TABLE}"))
+        conn.commit()
+
+
+def exact_top_k(vectors: np.ndarray, queries: np.ndarray, k: int) -> list[set[int]]:
+    """Ground-truth ids (1-based, matching the table) by brute-force cosine similarity."""
+    truth = []
+    for start in range(0, len(queries), 256):
+        scores = queries[start:start + 256] @ vectors.T
+        top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        truth.extend({int(i) + 1 for i in row} for row in top)
+    return truth
+
+
+def build_index(index_type: str, **params) -> tuple[float, int]:
+    """Drop the previous index, build a new one; return (seconds, bytes)."""
+    with engine.connect() as conn:
+        conn.execute(text(f"DROP INDEX IF EXISTS {INDEX}"))
+        conn.commit()
+        index_sql = vector_index_sql(INDEX, TABLE, index_type=index_type, **params)
+        if index_sql is None:
+            return 0.0, 0
+        conn.execute(text("SET maintenance_work_mem = '1GB'"))
+        start = time.perf_counter()
+        conn.execute(text(index_sql))
+        conn.commit()
+        seconds = time.perf_counter() - start
+        size = conn.execute(text("SELECT pg_relation_size(:index)"), {"index": INDEX}).scalar_one()
+        return seconds, size
+
+
+def measure(retriever, queries: np.ndarray, truth: list[set[int]], k: int) -> tuple[float, float, float]:
+    """(p50 ms, p99 ms, mean recall@k) for one index/effort combination."""
+    for vec in queries[:5]:
+        retriever.query_by_vector(vec, k)
+    latencies, recalls = [], []
+    for vec, expected in zip(queries, truth):
+        start = time.perf_counter()
+        results = retriever.query_by_vector(vec, k)
+        latencies.append((time.perf_counter() - start) * 1000)
+        recalls.append(len(expected & {r["id"] for r in results}) / k)
+    latencies.sort()
+    p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]
+    return statistics.median(latencies), p99, statistics.mean(recalls)
+
+
+def report(variant: str, effort: str, build: tuple[float, int], stats: tuple[float, float, float]):
+    """Print one result row."""
+    seconds, size = build
+    p50, p99, recall = stats
+    print(
+        f"{variant:<22} {effort:<14} {seconds:>8.2f} {size / 1024 / 1024:>9.1f} "
+        f"{p50:>8.2f} {p99:>8.2f} {recall:>9.3f}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=50000)
+    parser.add_argument("--clusters", type=int, default=100)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--hnsw", nargs="*", default=["16:64", "32:128"], help="m:ef_construction pairs")
+    parser.add_argument("--ef-search", type=int, nargs="+", default=[40, 100, 200])
+    parser.add_argument("--ivfflat", type=int, nargs="*", default=None, help="lists values (default: rows/1000)")
+    parser.add_argument("--probes", type=int, nargs="+", default=[1, 10, 32])
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--keep", action="store_true", help="Keep the scratch table afterwards")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    init_extensions()
+
+    print(f"Generating {args.rows} x {EMBEDDING_DIMENSIONS} synthetic vectors ({EMBEDDING_SQL_TYPE})...")
+    vectors = synthetic_vectors(args.rows, EMBEDDING_DIMENSIONS, args.clusters, rng)
+    queries = synthetic_vectors(args.queries, EMBEDDING_DIMENSIONS, args.clusters, rng)
+    load_catalog(vectors)
+    truth = exact_top_k(vectors, queries, args.k)
+
+    print(f"\n{'variant':<22} {'effort':<14} {'build s':>8} {'size MB':>9} {'p50 ms':>8} {'p99 ms':>8} {'recall@k':>9}")
+    print("-" * 84)
+
+    try:
+        build = build_index("none")
+        report("exact", "-", build, measure(BenchRetriever(None, mode="full", index_type="none"), queries, truth, args.k))
+
+        for pair in args.hnsw:
+            m, ef_construction = (int(v) for v in pair.split(":"))
+            build = build_index("hnsw", m=m, ef_construction=ef_construction)
+            for ef_search in args.ef_search:
+                retriever = BenchRetriever(None, mode="full", index_type="hnsw", ef_search=ef_search)
+                report(f"hnsw m={m} efc={ef_construction}", f"ef_search={ef_search}", build,
+                       measure(retriever, queries, truth, args.k))
+
+        for lists in args.ivfflat or [max(1, args.rows // 1000)]:
+            build = build_index("ivfflat", lists=lists)
+            for probes in args.probes:
+                retriever = BenchRetriever(None, mode="full", index_type="ivfflat", probes=probes)
+                report(f"ivfflat lists={lists}", f"probes={probes}", build,
+                       measure(retriever, queries, truth, args.k))
+    finally:
+        if not args.keep:
+            with engine.connect() as conn:
+                conn.execute(text(f"DROP TABLE IF EXISTS {TABLE}"))
+                conn.commit()
+
+
+if __name__ == "__main__":
+    main()
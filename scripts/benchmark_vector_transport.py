@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""Micro-benchmark: text-cast vector parameters vs binary pgvector transport.
+
+Compares the original retriever query (list[float] parameter, CAST to vector
+twice per query) with the current path (float32 NumPy array sent in binary
+format, distance computed once, server-side prepared statement).
+
+Usage: python scripts/benchmark_vector_transport.py --iterations 500
+"""
+
+import argparse
+import statistics
+import sys
+import time
+sys.path.insert(0, ".")
+
+from sqlalchemy import text
+
+from src.db.models.base import engine
+from src.retrievers.tools_retriever import ToolsRetriever
+from src.retrievers.orgs_retriever import OrgsRetriever
+
+LEGACY_SQL = """
+    SELECT {columns},
+        1 - (embedding <=> CAST(:vec AS vector)) AS similarity
+    FROM {table}
+    ORDER BY embedding <=> CAST(:vec AS vector)
+    LIMIT :limit
+"""
+
+
+def sample_query_vector(table: str) -> list[float]:
+    """Use a stored embedding as the query so no OpenAI call is needed."""
+    with engine.connect() as conn:
+        row = conn.execute(text(f"SELECT embedding::text AS embedding FROM {table} LIMIT 1")).fetchone()
+    if not row:
+        raise SystemExit(f"{table} is empty; run make seed-db first")
+    return [float(v) for v in row.embedding[1:-1].split(",")]
+
+
+def legacy_search(retriever, vec: list[float], limit: int) -> list[dict]:
+    """The pre-binary-transport query path."""
+    sql = LEGACY_SQL.format(columns=", ".join(retriever.columns), table=retriever.table)
+    with engine.connect() as conn:
+        result = conn.execute(text(sql), {"vec": vec, "limit": limit})
+        return [dict(row._mapping) for row in result]
+
+
+def time_path(fn, iterations: int) -> list[float]:
+    """Run fn repeatedly and return latencies in ms (after a short warm-up)."""
+    for _ in range(10):
+        fn()
+    latencies = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        fn()
+        latencies.append((time.perf_counter() - start) * 1000)
+    return sorted(latencies)
+
+
+def report(label: str, latencies: list[float]):
+    """Print p50/p99/mean latency for one path."""
+    p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]
+    print(
+        f"  {label:<8} p50={statistics.median(latencies):.3f}ms "
+        f"p99={p99:.3f}ms mean={statistics.mean(latencies):.3f}ms"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=500)
+    parser.add_argument("--limit", type=int, default=5)
+    args = parser.parse_args()
+
+    for retriever_cls in (ToolsRetriever, OrgsRetriever):
+        retriever = retriever_cls(embed_fn=None, mode="full")
+        vec = sample_query_vector(retriever.table)
+
+        print(f"\n{retriever.table} ({args.iterations} iterations, limit={args.limit})")
+        report("legacy", time_path(lambda: legacy_search(retriever, vec, args.limit), args.iterations))
+        report("binary", time_path(lambda: retriever.search_by_vector(vec, limit=args.limit), args.iterations))
+
+
+if __name__ == "__main__":
+    main()
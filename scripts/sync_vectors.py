@@ -0,0 +1,14 @@
+#!/usr/bin/env python3
+"""Apply the configured embedding storage and vector indexes to the catalog tables."""
+
+import sys
+sys.path.insert(0, ".")
+
+from src.db.vector_index import sync_vector_layout
+
+if __name__ == "__main__":
+    print("Syncing catalog vector layout...")
+    changes = sync_vector_layout()
+    for change in changes:
+        print(f"  {change}")
+    print("Done." if changes else "Already in sync.")
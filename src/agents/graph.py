@@ -1,20 +1,65 @@
+import asyncio
+import contextvars
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from typing import Literal
+from langchain_core.runnables import RunnableLambda
 from langgraph.graph import StateGraph, END
 from langchain_openai import ChatOpenAI
 
-from src.config import OPENAI_API_KEY
+from src.config import (
+    OPENAI_API_KEY,
+    RETRIEVER_BACKEND,
+    RETRIEVAL_CACHE_ENABLED,
+    ROUTER_FAST_PATH,
+    SPECULATIVE_RETRIEVAL,
+    LLM_POLICIES,
+    LLM_TIMEOUT_SECONDS,
+)
 from src.logger import get_logger
-from src.embeddings.openai_embed import get_embedding
-from src.retrievers import ToolsRetriever, OrgsRetriever
+from src.metrics import graph_node_seconds, graph_node_errors
+from src.tracing import span
+from src.embeddings.cache import embedding_cache
+from src.retrievers import (
+    BaseRetriever, ToolsRetriever, OrgsRetriever, InMemoryRetriever, retrieval_cache
+)
 
 from src.agents.state import AgentState, GraphState, default_confidence
 from src.agents.supervisor import SupervisorAgent
+from src.agents.router import EmbeddingRouter, embedding_router
+from src.agents.hedged_llm import hedged_llm
 from src.agents.tool_finder import ToolFinderAgent
 from src.agents.org_matcher import OrgMatcherAgent
 from src.agents.workflow_advisor import WorkflowAdvisorAgent
 
 logger = get_logger(__name__)
 
+PREFETCH_WORKERS = 8
+
+_prefetch_executor: ThreadPoolExecutor | None = None
+_prefetch_lock = threading.Lock()
+
+
+def prefetch_executor() -> ThreadPoolExecutor:
+    """Thread pool shared by every compiled graph for sync speculative retrieval."""
+    global _prefetch_executor
+    with _prefetch_lock:
+        if _prefetch_executor is None:
+            _prefetch_executor = ThreadPoolExecutor(
+                max_workers=PREFETCH_WORKERS, thread_name_prefix="speculative-retrieval"
+            )
+        return _prefetch_executor
+
+
+def shutdown_prefetch_executor() -> None:
+    """Stop the speculative retrieval threads (app shutdown); a later search starts a new pool."""
+    global _prefetch_executor
+    with _prefetch_lock:
+        executor, _prefetch_executor = _prefetch_executor, None
+    if executor is not None:
+        executor.shutdown(wait=True, cancel_futures=True)
+
 
 def calc_overall_confidence(confidence: dict) -> float:
     """Calculate weighted overall confidence."""
@@ -23,79 +68,288 @@ def calc_overall_confidence(confidence: dict) -> float:
     return round(total, 3)
 
 
-def create_clinical_graph(llm=None, checkpointer=None):
-    """Create the clinical decision support multi-agent graph."""
+def elapsed_ms(start: float) -> float:
+    """Milliseconds since a time.perf_counter() start."""
+    return round((time.perf_counter() - start) * 1000, 1)
+
+
+def node_span_attributes(update: dict) -> dict:
+    """Trace attributes summarizing a node's state update."""
+    attributes = {}
+    if update.get("route"):
+        attributes["route"] = update["route"]
+    for key in ("tools_results", "orgs_results"):
+        if update.get(key) is not None:
+            attributes[key] = len(update[key])
+    return attributes
+
+
+def instrumented_node(name: str, func, afunc) -> RunnableLambda:
+    """Graph node recording every run's duration, and failures, in the node metrics and a trace span."""
+    def node(state: GraphState) -> dict:
+        try:
+            with span(f"node.{name}") as node_span, graph_node_seconds.time(node=name):
+                update = func(state)
+                node_span.set_attributes(**node_span_attributes(update))
+                return update
+        except Exception:
+            graph_node_errors.inc(node=name)
+            raise
+    
+    async def anode(state: GraphState) -> dict:
+        try:
+            with span(f"node.{name}") as node_span, graph_node_seconds.time(node=name):
+                update = await afunc(state)
+                node_span.set_attributes(**node_span_attributes(update))
+                return update
+        except Exception:
+            graph_node_errors.inc(node=name)
+            raise
+    
+    return RunnableLambda(node, afunc=anode, name=name)
+
+
+def create_retrievers() -> tuple[BaseRetriever, BaseRetriever]:
+    """Build the tools/orgs retrievers for the configured RETRIEVER_BACKEND."""
+    result_cache = retrieval_cache if RETRIEVAL_CACHE_ENABLED else None
+    tools_retriever = ToolsRetriever(embed_fn=embedding_cache, result_cache=result_cache)
+    orgs_retriever = OrgsRetriever(embed_fn=embedding_cache, result_cache=result_cache)
+    
+    if RETRIEVER_BACKEND == "memory":
+        logger.info("Using in-memory retrievers with pgvector fallback")
+        return InMemoryRetriever(tools_retriever), InMemoryRetriever(orgs_retriever)
+    
+    return tools_retriever, orgs_retriever
+
+
+def prefetch_limits() -> dict:
+    """Result counts per table that cover every specialist's needs."""
+    return {
+        "tools_limit": max(ToolFinderAgent.result_limit, WorkflowAdvisorAgent.tools_limit),
+        "orgs_limit": max(OrgMatcherAgent.result_limit, WorkflowAdvisorAgent.orgs_limit),
+    }
+
+
+def prefetch_batch(
+    queries: list[str], tools_retriever: BaseRetriever, orgs_retriever: BaseRetriever
+) -> list[dict]:
+    """
+    Retrieve for many queries at once, as `prefetched` state values.
+    
+    All queries are embedded in one batch and each table is searched with
+    one set-based query, instead of one embedding and search per graph run.
+    """
+    return prefetch_batch_by_vectors(tools_retriever.embed_batch(queries), tools_retriever, orgs_retriever)
+
+
+def prefetch_batch_by_vectors(
+    embeddings: list[list[float]], tools_retriever: BaseRetriever, orgs_retriever: BaseRetriever
+) -> list[dict]:
+    """prefetch_batch for queries that are already embedded."""
+    limits = prefetch_limits()
+    tools = tools_retriever.search_batch_by_vectors(embeddings, limit=limits["tools_limit"])
+    orgs = orgs_retriever.search_batch_by_vectors(embeddings, limit=limits["orgs_limit"])
+    return [{"tools": t, "orgs": o} for t, o in zip(tools, orgs)]
+
+
+def create_clinical_graph(
+    llm=None,
+    checkpointer=None,
+    tools_retriever=None,
+    orgs_retriever=None,
+    router: EmbeddingRouter | None = None,
+    speculative_retrieval: bool | None = None,
+    llm_policies: dict[str, dict] | None = None,
+):
+    """
+    Create the clinical decision support multi-agent graph.
+    
+    `router` enables the embedding fast path in front of the supervisor LLM;
+    when omitted, the shared router is used if ROUTER_FAST_PATH is set.
+    
+    With `speculative_retrieval` (default: SPECULATIVE_RETRIEVAL), both
+    catalog tables are searched while the supervisor is routing, and the
+    chosen specialist reuses those results instead of searching again.
+    Results can also be supplied up front in the `prefetched` input key
+    (see prefetch_batch), in which case no search runs at all.
+    Per-node timings (ms) are recorded in the `timings` state key.
+    
+    Each agent calls the LLM through a HedgedLLM configured by its entry in
+    `llm_policies` (default: LLM_POLICIES): timeout, retries and hedging.
+    
+    Every node has a sync and an async implementation, so the compiled graph
+    supports both invoke/stream and ainvoke/astream.
+    """
+    
+    if llm_policies is None:
+        llm_policies = LLM_POLICIES
     
     if llm is None:
+        # HedgedLLM owns timeouts and retries; the client's own retries would multiply them
+        timeouts = [policy.get("timeout_seconds", LLM_TIMEOUT_SECONDS) for policy in llm_policies.values()]
         llm = ChatOpenAI(
             model="gpt-4o-mini",
             api_key=OPENAI_API_KEY,
-            temperature=0
+            temperature=0,
+            stream_usage=True,
+            max_retries=0,
+            timeout=max(timeouts, default=0) or None,
         )
     
-    tools_retriever = ToolsRetriever(embed_fn=get_embedding)
-    orgs_retriever = OrgsRetriever(embed_fn=get_embedding)
+    if tools_retriever is None or orgs_retriever is None:
+        default_tools, default_orgs = create_retrievers()
+        tools_retriever = tools_retriever or default_tools
+        orgs_retriever = orgs_retriever or default_orgs
+    
+    if router is None and ROUTER_FAST_PATH:
+        router = embedding_router
+    
+    if speculative_retrieval is None:
+        speculative_retrieval = SPECULATIVE_RETRIEVAL
     
-    supervisor = SupervisorAgent(llm=llm)
-    tool_finder = ToolFinderAgent(retriever=tools_retriever, llm=llm)
-    org_matcher = OrgMatcherAgent(retriever=orgs_retriever, llm=llm)
+    def agent_llm(name: str):
+        return hedged_llm(llm, name, **llm_policies.get(name, {}))
+    
+    supervisor = SupervisorAgent(llm=agent_llm("supervisor"), router=router)
+    tool_finder = ToolFinderAgent(retriever=tools_retriever, llm=agent_llm("tool_finder"))
+    org_matcher = OrgMatcherAgent(retriever=orgs_retriever, llm=agent_llm("org_matcher"))
     workflow_advisor = WorkflowAdvisorAgent(
         tools_retriever=tools_retriever,
         orgs_retriever=orgs_retriever,
-        llm=llm
+        llm=agent_llm("workflow_advisor")
     )
     
-    def supervisor_node(state: GraphState) -> dict:
-        agent_state = AgentState.from_graph_state(state)
-        result = supervisor.route(agent_state)
+    def prefetch(query: str) -> tuple[list[dict], list[dict], float]:
+        """Search both tables with enough results for any specialist."""
+        start = time.perf_counter()
+        with span("speculative_retrieval"):
+            tools_results, orgs_results = workflow_advisor.catalog_search.search(query, **prefetch_limits())
+        return tools_results, orgs_results, elapsed_ms(start)
+    
+    async def aprefetch(query: str) -> tuple[list[dict], list[dict], float]:
+        """Async prefetch."""
+        start = time.perf_counter()
+        with span("speculative_retrieval"):
+            tools_results, orgs_results = await workflow_advisor.catalog_search.asearch(query, **prefetch_limits())
+        return tools_results, orgs_results, elapsed_ms(start)
+    
+    def supervisor_update(
+        state: GraphState, result: AgentState, start: float, routing_ms: float, prefetch_result
+    ) -> dict:
+        timings = {"supervisor_ms": routing_ms}
+        prefetched = state.get("prefetched")
+        
+        if prefetch_result is not None:
+            tools_results, orgs_results, retrieval_ms = prefetch_result
+            prefetched = {"tools": tools_results, "orgs": orgs_results}
+            node_ms = elapsed_ms(start)
+            timings.update({
+                "supervisor_ms": node_ms,
+                "speculative_retrieval_ms": retrieval_ms,
+                "speculative_saved_ms": round(max(routing_ms + retrieval_ms - node_ms, 0.0), 1),
+            })
+            logger.info(
+                f"Speculative retrieval: routing {routing_ms}ms, retrieval {retrieval_ms}ms, "
+                f"saved {timings['speculative_saved_ms']}ms"
+            )
+        
         return {
             "route": result.route,
-            "confidence": result.confidence
+            "confidence": result.confidence,
+            "prefetched": prefetched,
+            "timings": timings,
         }
     
-    def tool_finder_node(state: GraphState) -> dict:
+    def supervisor_node(state: GraphState) -> dict:
+        start = time.perf_counter()
         agent_state = AgentState.from_graph_state(state)
-        result = tool_finder.run(agent_state)
-        conf = {**state.get("confidence", default_confidence()), **result.confidence}
-        conf["overall"] = calc_overall_confidence(conf)
-        return {
-            "tools_results": result.tools_results,
-            "response": result.response,
-            "confidence": conf
-        }
+        speculate = speculative_retrieval and not state.get("prefetched")
+        future = (
+            prefetch_executor().submit(contextvars.copy_context().run, prefetch, agent_state.query)
+            if speculate else None
+        )
+        result = supervisor.route(agent_state)
+        routing_ms = elapsed_ms(start)
+        
+        prefetch_result = None
+        if future is not None:
+            try:
+                prefetch_result = future.result()
+            except Exception as e:
+                logger.warning(f"Speculative retrieval failed, specialist will search: {e}")
+        return supervisor_update(state, result, start, routing_ms, prefetch_result)
     
-    def org_matcher_node(state: GraphState) -> dict:
+    async def asupervisor_node(state: GraphState) -> dict:
+        start = time.perf_counter()
         agent_state = AgentState.from_graph_state(state)
-        result = org_matcher.run(agent_state)
-        conf = {**state.get("confidence", default_confidence()), **result.confidence}
-        conf["overall"] = calc_overall_confidence(conf)
-        return {
-            "orgs_results": result.orgs_results,
-            "response": result.response,
-            "confidence": conf
-        }
+        speculate = speculative_retrieval and not state.get("prefetched")
+        task = asyncio.create_task(aprefetch(agent_state.query)) if speculate else None
+        try:
+            result = await supervisor.aroute(agent_state)
+        except BaseException:
+            if task is not None:
+                task.cancel()
+            raise
+        routing_ms = elapsed_ms(start)
+        
+        prefetch_result = None
+        if task is not None:
+            try:
+                prefetch_result = await task
+            except Exception as e:
+                logger.warning(f"Speculative retrieval failed, specialist will search: {e}")
+        return supervisor_update(state, result, start, routing_ms, prefetch_result)
     
-    def workflow_advisor_node(state: GraphState) -> dict:
-        agent_state = AgentState.from_graph_state(state)
-        result = workflow_advisor.run(agent_state)
+    specialists = {
+        "tool_finder": (tool_finder, lambda prefetched: prefetched["tools"]),
+        "org_matcher": (org_matcher, lambda prefetched: prefetched["orgs"]),
+        "workflow_advisor": (workflow_advisor, lambda prefetched: (prefetched["tools"], prefetched["orgs"])),
+    }
+    
+    def specialist_update(state: GraphState, result: AgentState, name: str, start: float) -> dict:
         conf = {**state.get("confidence", default_confidence()), **result.confidence}
         conf["overall"] = calc_overall_confidence(conf)
         return {
             "tools_results": result.tools_results,
             "orgs_results": result.orgs_results,
             "response": result.response,
-            "confidence": conf
+            "confidence": conf,
+            "prefetched": None,
+            "timings": {**(state.get("timings") or {}), f"{name}_ms": elapsed_ms(start)},
         }
     
+    def specialist_node(name: str) -> RunnableLambda:
+        """Node running a specialist agent, with sync (invoke/stream) and async (ainvoke/astream) paths."""
+        agent, select_prefetched = specialists[name]
+        
+        def node(state: GraphState) -> dict:
+            start = time.perf_counter()
+            prefetched = state.get("prefetched")
+            result = agent.run(
+                AgentState.from_graph_state(state),
+                prefetched=select_prefetched(prefetched) if prefetched else None,
+            )
+            return specialist_update(state, result, name, start)
+        
+        async def anode(state: GraphState) -> dict:
+            start = time.perf_counter()
+            prefetched = state.get("prefetched")
+            result = await agent.arun(
+                AgentState.from_graph_state(state),
+                prefetched=select_prefetched(prefetched) if prefetched else None,
+            )
+            return specialist_update(state, result, name, start)
+        
+        return instrumented_node(name, node, anode)
+    
     def route_decision(state: GraphState) -> Literal["tool_finder", "org_matcher", "workflow_advisor"]:
         return state.get("route", "workflow_advisor")
     
     graph = StateGraph(GraphState)
     
-    graph.add_node("supervisor", supervisor_node)
-    graph.add_node("tool_finder", tool_finder_node)
-    graph.add_node("org_matcher", org_matcher_node)
-    graph.add_node("workflow_advisor", workflow_advisor_node)
+    graph.add_node("supervisor", instrumented_node("supervisor", supervisor_node, asupervisor_node))
+    for name in specialists:
+        graph.add_node(name, specialist_node(name))
     
     graph.set_entry_point("supervisor")
     
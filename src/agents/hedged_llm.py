@@ -0,0 +1,386 @@
+"""Chat model wrapper with per-call timeouts, retries and request hedging."""
+
+import asyncio
+import contextvars
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Optional
+
+import openai
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.language_models import BaseChatModel
+from langchain_core.runnables.config import ensure_config, merge_configs, var_child_runnable_config
+from langchain_core.tracers._streaming import _StreamingCallbackHandler
+
+from src.config import (
+    LLM_TIMEOUT_SECONDS,
+    LLM_MAX_RETRIES,
+    LLM_HEDGING,
+    LLM_HEDGE_QUANTILE,
+    LLM_HEDGE_MIN_SAMPLES,
+)
+from src.metrics import llm_seconds
+from src.tracing import current_span, span
+from src.usage import record_llm_usage
+from src.logger import get_logger
+
+logger = get_logger(__name__)
+
+LATENCY_WINDOW = 200
+RETRY_BACKOFF_SECONDS = 0.25
+RETRYABLE_STATUS_CODES = {408, 409, 429}
+
+LLM_WORKERS = 32
+# Sync attempts that were given up on (timed out, or lost to a hedge) keep
+# their worker until the request returns. Past this many, no new hedges are
+# sent, so abandoned calls cannot crowd out new ones.
+MAX_ABANDONED = LLM_WORKERS // 2
+
+_executor = ThreadPoolExecutor(max_workers=LLM_WORKERS, thread_name_prefix="llm-call")
+_abandoned = 0
+_abandoned_lock = threading.Lock()
+
+
+def is_retryable(error: BaseException) -> bool:
+    """Timeouts, connection errors, rate limits and 5xx responses; not other 4xx request errors."""
+    if isinstance(error, (TimeoutError, ConnectionError, openai.APIConnectionError)):
+        return True
+    status = getattr(error, "status_code", None)
+    return isinstance(status, int) and (status in RETRYABLE_STATUS_CODES or status >= 500)
+
+
+def abandoned_workers() -> int:
+    """Sync attempts given up on whose worker thread is still busy (all agents)."""
+    with _abandoned_lock:
+        return _abandoned
+
+
+def _abandon(future) -> None:
+    """Count future's worker as abandoned until the request it runs returns."""
+    global _abandoned
+    with _abandoned_lock:
+        _abandoned += 1
+    future.add_done_callback(_release)
+
+
+def _release(future) -> None:
+    global _abandoned
+    with _abandoned_lock:
+        _abandoned -= 1
+
+
+def is_streaming() -> bool:
+    """Whether the current run streams LLM tokens to the caller (e.g. stream_mode="messages")."""
+    callbacks = ensure_config().get("callbacks")
+    handlers = callbacks if isinstance(callbacks, list) else getattr(callbacks, "handlers", None)
+    return any(isinstance(handler, _StreamingCallbackHandler) for handler in handlers or [])
+
+
+class TokenWatch(BaseCallbackHandler):
+    """Callback noting whether an attempt has streamed any token to the caller."""
+
+    def __init__(self):
+        self.streamed = False
+
+    def on_llm_new_token(self, token: str, **kwargs) -> None:
+        if token:
+            self.streamed = True
+
+
+class HedgedLLM:
+    """
+    Call a chat model with a timeout per attempt, retries and hedged requests.
+
+    With `hedging`, once `hedge_min_samples` latencies have been observed, a
+    call still running after the `hedge_quantile` latency (p95 by default)
+    gets a duplicate request and whichever finishes first is used. Sync
+    hedges are not sent while MAX_ABANDONED given-up attempts still occupy
+    workers. An attempt that exceeds `timeout_seconds` (0 = no timeout) or
+    fails with a transient error (see is_retryable) is retried up to
+    `max_retries` times; other errors are raised at once. In the sync path
+    the timeout runs from when the attempt starts, not from when it was
+    queued for a worker thread. The wrapped model should not retry on its
+    own (ChatOpenAI(max_retries=0)), or retries multiply.
+
+    Calls whose tokens are streamed to the caller (see is_streaming) are
+    never hedged, and once an attempt has streamed a token it is neither
+    timed out nor retried, so the caller never sees tokens twice; the
+    timeout then only bounds the wait for the first token.
+
+    Token usage (src.usage) is recorded for the response that is returned;
+    abandoned attempts and losing hedges are not counted.
+
+    Only `invoke` and `ainvoke` are provided, which is all the agents use.
+    """
+
+    def __init__(
+        self,
+        llm: BaseChatModel,
+        name: str,
+        timeout_seconds: float = LLM_TIMEOUT_SECONDS,
+        max_retries: int = LLM_MAX_RETRIES,
+        hedging: bool = LLM_HEDGING,
+        hedge_quantile: float = LLM_HEDGE_QUANTILE,
+        hedge_min_samples: int = LLM_HEDGE_MIN_SAMPLES,
+    ):
+        self.llm = llm
+        self.name = name
+        self.timeout_seconds = timeout_seconds
+        self.max_retries = max_retries
+        self.hedging = hedging
+        self.hedge_quantile = hedge_quantile
+        self.hedge_min_samples = hedge_min_samples
+
+        self._latencies: deque[float] = deque(maxlen=LATENCY_WINDOW)
+        self._lock = threading.Lock()
+        self._counts = {
+            "calls": 0,
+            "failed": 0,
+            "retries": 0,
+            "timeouts": 0,
+            "hedges_fired": 0,
+            "hedges_won": 0,
+            "hedges_skipped": 0,
+        }
+
+    def invoke(self, messages):
+        """Call the model, retrying failed or timed-out attempts."""
+        with span(f"llm.{self.name}") as llm_span, llm_seconds.time(agent=self.name):
+            result = self._invoke(messages)
+            self._record_usage(result, llm_span)
+            return result
+
+    async def ainvoke(self, messages):
+        """Async invoke; losing or timed-out requests are cancelled."""
+        with span(f"llm.{self.name}") as llm_span, llm_seconds.time(agent=self.name):
+            result = await self._ainvoke(messages)
+            self._record_usage(result, llm_span)
+            return result
+
+    def _record_usage(self, result, llm_span) -> None:
+        """Count the response's tokens for the request and add them to the call's span."""
+        usage = record_llm_usage(result, getattr(self.llm, "model_name", None))
+        if usage is not None:
+            model, input_tokens, output_tokens = usage
+            llm_span.set_attributes(model=model, input_tokens=input_tokens, output_tokens=output_tokens)
+
+    def _invoke(self, messages):
+        """Attempts with retries and backoff."""
+        self._count("calls")
+        streaming = is_streaming()
+        for attempt in range(self.max_retries + 1):
+            watch = TokenWatch() if streaming else None
+            try:
+                return self._invoke_once(messages, watch)
+            except Exception as e:
+                if attempt == self.max_retries or not is_retryable(e) or (watch and watch.streamed):
+                    self._count("failed")
+                    raise
+                self._count("retries")
+                current_span().set_attribute("retries", attempt + 1)
+                logger.warning(f"{self.name} LLM call failed ({e}), retrying")
+                time.sleep(RETRY_BACKOFF_SECONDS * 2 ** attempt)
+
+    async def _ainvoke(self, messages):
+        """Async _invoke."""
+        self._count("calls")
+        streaming = is_streaming()
+        for attempt in range(self.max_retries + 1):
+            watch = TokenWatch() if streaming else None
+            try:
+                return await self._ainvoke_once(messages, watch)
+            except Exception as e:
+                if attempt == self.max_retries or not is_retryable(e) or (watch and watch.streamed):
+                    self._count("failed")
+                    raise
+                self._count("retries")
+                current_span().set_attribute("retries", attempt + 1)
+                logger.warning(f"{self.name} LLM call failed ({e}), retrying")
+                await asyncio.sleep(RETRY_BACKOFF_SECONDS * 2 ** attempt)
+
+    def hedge_delay(self) -> Optional[float]:
+        """Seconds to wait before hedging, or None while hedging is off or not warmed up."""
+        if not self.hedging:
+            return None
+        with self._lock:
+            if len(self._latencies) < self.hedge_min_samples:
+                return None
+            latencies = sorted(self._latencies)
+        return latencies[min(int(len(latencies) * self.hedge_quantile), len(latencies) - 1)]
+
+    def stats(self) -> dict:
+        """Call, retry, timeout and hedge counters plus recent latency percentiles."""
+        with self._lock:
+            counts = dict(self._counts)
+            latencies = sorted(self._latencies)
+
+        def percentile(q: float) -> Optional[float]:
+            if not latencies:
+                return None
+            return round(latencies[min(int(len(latencies) * q), len(latencies) - 1)] * 1000, 1)
+
+        def rate(part: int, whole: int) -> float:
+            return round(part / whole, 4) if whole else 0.0
+
+        delay = self.hedge_delay()
+        return {
+            **counts,
+            "hedge_rate": rate(counts["hedges_fired"], counts["calls"]),
+            "hedge_win_rate": rate(counts["hedges_won"], counts["hedges_fired"]),
+            "latency_p50_ms": percentile(0.5),
+            "latency_p95_ms": percentile(0.95),
+            "hedge_delay_ms": round(delay * 1000, 1) if delay is not None else None,
+            "abandoned_workers": abandoned_workers(),
+            "timeout_seconds": self.timeout_seconds,
+            "max_retries": self.max_retries,
+            "hedging": self.hedging,
+        }
+
+    def _invoke_once(self, messages, watch: Optional[TokenWatch] = None):
+        """One attempt: the request, plus a hedge if it runs past the hedge delay."""
+        delay = None if watch else self.hedge_delay()
+        if not self.timeout_seconds and delay is None:
+            return self._context(watch).run(self._timed, messages)
+
+        start = time.monotonic()
+        deadline = start + self.timeout_seconds if self.timeout_seconds else None
+        hedge_at = start + delay if delay is not None else None
+        started: list[float] = []
+        primary = _executor.submit(self._context(watch).run, self._timed, messages, started)
+        pending = {primary: False}
+        error: Optional[BaseException] = None
+
+        try:
+            while pending:
+                wake = [t for t in (deadline, hedge_at) if t is not None]
+                timeout = max(min(wake) - time.monotonic(), 0) if wake else None
+                done, _ = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+                for future in done:
+                    is_hedge = pending.pop(future)
+                    if future.exception() is None:
+                        return self._won(future.result(), is_hedge)
+                    error = future.exception()
+
+                now = time.monotonic()
+                if hedge_at is not None and now >= hedge_at and pending:
+                    hedge_at = None
+                    if abandoned_workers() >= MAX_ABANDONED:
+                        self._count("hedges_skipped")
+                        continue
+                    self._count("hedges_fired")
+                    pending[_executor.submit(contextvars.copy_context().run, self._timed, messages)] = True
+                elif deadline is not None and now >= deadline and pending:
+                    if watch and watch.streamed:
+                        # Tokens already reached the caller; let the response finish
+                        deadline = None
+                        continue
+                    # Time spent waiting for a free worker does not count against the timeout
+                    queued_until = started[0] if started else now
+                    if queued_until + self.timeout_seconds > now:
+                        deadline = queued_until + self.timeout_seconds
+                        continue
+                    raise self._timeout()
+            raise error
+        finally:
+            for future in pending:
+                _abandon(future)
+
+    async def _ainvoke_once(self, messages, watch: Optional[TokenWatch] = None):
+        """Async _invoke_once."""
+        delay = None if watch else self.hedge_delay()
+        if not self.timeout_seconds and delay is None:
+            return await self._context(watch).run(asyncio.ensure_future, self._atimed(messages))
+
+        start = time.monotonic()
+        deadline = start + self.timeout_seconds if self.timeout_seconds else None
+        hedge_at = start + delay if delay is not None else None
+        pending = {self._context(watch).run(asyncio.ensure_future, self._atimed(messages)): False}
+        error: Optional[BaseException] = None
+
+        try:
+            while pending:
+                wake = [t for t in (deadline, hedge_at) if t is not None]
+                timeout = max(min(wake) - time.monotonic(), 0) if wake else None
+                done, _ = await asyncio.wait(pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    is_hedge = pending.pop(task)
+                    if task.exception() is None:
+                        return self._won(task.result(), is_hedge)
+                    error = task.exception()
+
+                now = time.monotonic()
+                if hedge_at is not None and now >= hedge_at and pending:
+                    hedge_at = None
+                    self._count("hedges_fired")
+                    pending[asyncio.ensure_future(self._atimed(messages))] = True
+                elif deadline is not None and now >= deadline and pending:
+                    if watch and watch.streamed:
+                        # Tokens already reached the caller; let the response finish
+                        deadline = None
+                        continue
+                    raise self._timeout()
+            raise error
+        finally:
+            for task in pending:
+                task.cancel()
+
+    def _timed(self, messages, started: Optional[list] = None):
+        """Run one request and record its latency; its start time is appended to `started`."""
+        start = time.monotonic()
+        if started is not None:
+            started.append(start)
+        result = self.llm.invoke(messages)
+        self._record(time.monotonic() - start)
+        return result
+
+    async def _atimed(self, messages):
+        """Async _timed."""
+        start = time.monotonic()
+        result = await self.llm.ainvoke(messages)
+        self._record(time.monotonic() - start)
+        return result
+
+    @staticmethod
+    def _context(watch: Optional[TokenWatch]) -> contextvars.Context:
+        """Copy of the caller's context for one attempt; with watch, its callbacks also include watch."""
+        context = contextvars.copy_context()
+        if watch is not None:
+            config = merge_configs(ensure_config(), {"callbacks": [watch]})
+            context.run(var_child_runnable_config.set, config)
+        return context
+
+    def _won(self, result, is_hedge: bool):
+        if is_hedge:
+            self._count("hedges_won")
+            current_span().set_attribute("hedge_won", True)
+            logger.info(f"{self.name} LLM hedge won")
+        return result
+
+    def _timeout(self) -> TimeoutError:
+        self._count("timeouts")
+        return TimeoutError(f"{self.name} LLM call timed out after {self.timeout_seconds}s")
+
+    def _record(self, seconds: float) -> None:
+        with self._lock:
+            self._latencies.append(seconds)
+
+    def _count(self, key: str) -> None:
+        with self._lock:
+            self._counts[key] += 1
+
+
+hedged_llms: dict[str, HedgedLLM] = {}
+
+
+def hedged_llm(llm: BaseChatModel, name: str, **policy) -> HedgedLLM:
+    """Wrap llm for one agent and register it for stats reporting (latest graph wins)."""
+    wrapped = HedgedLLM(llm, name, **policy)
+    hedged_llms[name] = wrapped
+    return wrapped
+
+
+def llm_stats() -> dict:
+    """Per-agent HedgedLLM stats."""
+    return {name: wrapped.stats() for name, wrapped in hedged_llms.items()}
@@ -33,14 +33,36 @@ Confidence reflects how well the retrieved organizations match the query:
 class OrgMatcherAgent:
     """Finds relevant healthcare organizations with AI implementations."""
     
+    result_limit = 5
+    
     def __init__(self, retriever: BaseRetriever, llm: BaseChatModel):
         self.retriever = retriever
         self.llm = llm
     
-    def run(self, state: AgentState) -> AgentState:
-        """Search for organizations and generate response."""
+    def run(self, state: AgentState, prefetched: list[dict] | None = None) -> AgentState:
+        """Search for organizations (unless prefetched results are given) and generate response."""
         logger.info(f"OrgMatcher processing: '{state.query[:50]}...'")
-        results = self.retriever.search(state.query, limit=5)
+        if prefetched is None:
+            results = self.retriever.search(state.query, limit=self.result_limit)
+        else:
+            results = prefetched[:self.result_limit]
+        
+        response = self.llm.invoke(self._build_messages(state, results))
+        return self._apply_response(state, response.content)
+    
+    async def arun(self, state: AgentState, prefetched: list[dict] | None = None) -> AgentState:
+        """Async run: retrieval and LLM call without blocking the event loop."""
+        logger.info(f"OrgMatcher processing (async): '{state.query[:50]}...'")
+        if prefetched is None:
+            results = await self.retriever.asearch(state.query, limit=self.result_limit)
+        else:
+            results = prefetched[:self.result_limit]
+        
+        response = await self.llm.ainvoke(self._build_messages(state, results))
+        return self._apply_response(state, response.content)
+    
+    def _build_messages(self, state: AgentState, results: list[dict]) -> list:
+        """Record results and retrieval confidence on state; return the LLM prompt."""
         state.orgs_results = results
         logger.info(f"Retrieved {len(results)} organizations")
         
@@ -48,14 +70,13 @@ class OrgMatcherAgent:
         
         orgs_text = self._format_results(results)
         
-        messages = [
+        return [
             SystemMessage(content=ORG_MATCHER_PROMPT.format(orgs=orgs_text)),
             HumanMessage(content=state.query)
         ]
-        
-        response = self.llm.invoke(messages)
-        content = response.content
-        
+    
+    def _apply_response(self, state: AgentState, content: str) -> AgentState:
+        """Store the parsed LLM response and its confidence on state."""
         state.response, response_conf = self._parse_response(content)
         state.confidence["response"] = response_conf
         
@@ -0,0 +1,164 @@
+"""Embedding-centroid router used as a fast path in front of the supervisor LLM."""
+
+import random
+import threading
+from typing import Optional
+
+import numpy as np
+
+from src.config import ROUTER_MARGIN_THRESHOLD, ROUTER_SHADOW_RATE
+from src.embeddings.cache import embedding_cache
+from src.retrievers.base import EmbeddingFunction
+from src.logger import get_logger
+
+logger = get_logger(__name__)
+
+ROUTE_EXEMPLARS = {
+    "tool_finder": [
+        "What tools help with clinical documentation?",
+        "Which software can check drug interactions?",
+        "Recommend a clinical decision support tool for sepsis alerts",
+        "Is there an AI scribe for physicians?",
+        "What drug reference databases do pharmacists use?",
+        "Find an app that automates prior authorization",
+    ],
+    "org_matcher": [
+        "Which hospitals use AI for sepsis detection?",
+        "What health systems have implemented ambient documentation?",
+        "Show me academic medical centers using AI in radiology",
+        "Which organizations in Ohio use AI for cardiology?",
+        "Case studies of hospitals deploying predictive analytics",
+        "Who has implemented AI for clinical trial matching?",
+    ],
+    "workflow_advisor": [
+        "How should we implement AI to reduce physician burnout?",
+        "What is the best workflow for rolling out clinical decision support?",
+        "Recommend tools and example organizations to improve our ED throughput",
+        "How can we optimize our oncology care pathway with AI?",
+        "Plan an end-to-end strategy to reduce documentation burden",
+        "What tools and implementation lessons should we consider for telehealth?",
+    ],
+}
+
+
+class EmbeddingRouter:
+    """
+    Route a query by cosine similarity to per-route exemplar centroids.
+
+    Centroids are the normalized mean embeddings of each route's exemplar
+    queries, computed on first use (through the embedding cache, so they are
+    reused across restarts). `route` marks a decision as untrusted when the
+    best route does not beat the runner-up by `margin_threshold`; the caller
+    then asks the LLM and reports its decision via `record_comparison` so
+    agreement between the two routers can be tracked.
+    """
+
+    temperature = 0.05
+
+    def __init__(
+        self,
+        embed_fn: EmbeddingFunction,
+        exemplars: dict[str, list[str]] = ROUTE_EXEMPLARS,
+        margin_threshold: float = ROUTER_MARGIN_THRESHOLD,
+        shadow_rate: float = ROUTER_SHADOW_RATE,
+    ):
+        self.embed_fn = embed_fn
+        self.exemplars = exemplars
+        self.margin_threshold = margin_threshold
+        self.shadow_rate = shadow_rate
+
+        self._routes = list(exemplars)
+        self._centroids: Optional[np.ndarray] = None
+        self._lock = threading.Lock()
+        self._counts = {
+            "fast_path": 0,
+            "fallbacks": 0,
+            "shadow_checks": 0,
+            "shadow_agreed": 0,
+            "fallback_checks": 0,
+            "fallback_agreed": 0,
+        }
+
+    def classify(self, query_embedding: list[float]) -> tuple[str, float, float]:
+        """Return (best route, confidence, margin over the runner-up) for an embedding."""
+        centroids = self._get_centroids()
+        query = np.asarray(query_embedding, dtype=np.float32)
+        norm = np.linalg.norm(query)
+        if norm > 0:
+            query = query / norm
+
+        scores = centroids @ query
+        order = np.argsort(-scores)
+        best = int(order[0])
+        margin = float(scores[best] - scores[order[1]]) if len(order) > 1 else 1.0
+
+        weights = np.exp((scores - scores[best]) / self.temperature)
+        confidence = float(weights[best] / weights.sum())
+        return self._routes[best], round(confidence, 3), margin
+
+    def route(self, query: str) -> tuple[str, float, bool]:
+        """Return (route, confidence, trusted); untrusted decisions should go to the LLM."""
+        route, confidence, margin = self.classify(self.embed_fn(query))
+        trusted = margin >= self.margin_threshold
+        with self._lock:
+            self._counts["fast_path" if trusted else "fallbacks"] += 1
+        if trusted:
+            logger.info(f"Fast router: {route} (confidence: {confidence:.2f}, margin={margin:.3f})")
+        else:
+            logger.info(f"Fast router unsure ({route}, margin={margin:.3f}), falling back to LLM")
+        return route, confidence, trusted
+
+    def should_shadow(self) -> bool:
+        """Sample fast-path decisions to double-check against the LLM."""
+        return self.shadow_rate > 0 and random.random() < self.shadow_rate
+
+    def record_comparison(self, fast_route: str, llm_route: str, kind: str) -> None:
+        """Record whether the LLM agreed with the fast router ('shadow' or 'fallback')."""
+        with self._lock:
+            self._counts[f"{kind}_checks"] += 1
+            if fast_route == llm_route:
+                self._counts[f"{kind}_agreed"] += 1
+        if fast_route != llm_route:
+            logger.info(f"Router disagreement ({kind}): fast={fast_route}, llm={llm_route}")
+
+    def stats(self) -> dict:
+        """Fast-path hit rate and agreement with the LLM router."""
+        with self._lock:
+            counts = dict(self._counts)
+        decisions = counts["fast_path"] + counts["fallbacks"]
+
+        def rate(part: int, whole: int) -> float:
+            return round(part / whole, 4) if whole else 0.0
+
+        return {
+            **counts,
+            "hit_rate": rate(counts["fast_path"], decisions),
+            "shadow_agreement": rate(counts["shadow_agreed"], counts["shadow_checks"]),
+            "fallback_agreement": rate(counts["fallback_agreed"], counts["fallback_checks"]),
+            "margin_threshold": self.margin_threshold,
+        }
+
+    def _get_centroids(self) -> np.ndarray:
+        """Embed the exemplars once and stack normalized per-route centroids."""
+        if self._centroids is not None:
+            return self._centroids
+        with self._lock:
+            if self._centroids is None:
+                texts = [text for route in self._routes for text in self.exemplars[route]]
+                embed_batch = getattr(self.embed_fn, "embed_batch", None)
+                vectors = embed_batch(texts) if embed_batch else [self.embed_fn(t) for t in texts]
+                matrix = np.asarray(vectors, dtype=np.float32)
+                matrix /= np.maximum(np.linalg.norm(matrix, axis=1, keepdims=True), 1e-12)
+
+                centroids, offset = [], 0
+                for route in self._routes:
+                    n = len(self.exemplars[route])
+                    centroid = matrix[offset:offset + n].mean(axis=0)
+                    centroids.append(centroid / max(np.linalg.norm(centroid), 1e-12))
+                    offset += n
+                self._centroids = np.vstack(centroids)
+                logger.info(f"Router centroids built from {len(texts)} exemplars")
+        return self._centroids
+
+
+embedding_router = EmbeddingRouter(embedding_cache)
@@ -21,6 +21,8 @@ class GraphState(TypedDict, total=False):
     response: str
     error: str | None
     confidence: dict
+    prefetched: dict | None
+    timings: dict
 
 
 @dataclass
@@ -1,10 +1,14 @@
+import asyncio
 import json
 import re
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
 
 from langchain_core.language_models import BaseChatModel
 from langchain_core.messages import SystemMessage, HumanMessage
 
 from src.agents.state import AgentState
+from src.agents.router import EmbeddingRouter
 from src.logger import get_logger
 
 logger = get_logger(__name__)
@@ -28,29 +32,95 @@ Confidence reflects how clearly the query matches your chosen route:
 
 
 class SupervisorAgent:
-    """Routes queries to appropriate specialist agents."""
+    """
+    Routes queries to appropriate specialist agents.
     
-    def __init__(self, llm: BaseChatModel):
+    With an EmbeddingRouter, confident embedding decisions skip the LLM call
+    entirely; a sample of them is re-checked against the LLM in the
+    background to measure agreement.
+    """
+    
+    def __init__(self, llm: BaseChatModel, router: Optional[EmbeddingRouter] = None):
         self.llm = llm
+        self.router = router
+        self._shadow_executor: ThreadPoolExecutor | None = None
     
     def route(self, state: AgentState) -> AgentState:
         """Determine which agent should handle the query."""
         logger.info(f"Routing query: '{state.query[:50]}...'")
-        messages = [
-            SystemMessage(content=ROUTING_PROMPT),
-            HumanMessage(content=state.query)
-        ]
         
-        response = self.llm.invoke(messages)
-        content = response.content.strip()
+        if self.router is not None:
+            fast_route, fast_confidence, trusted = self.router.route(state.query)
+            if trusted:
+                return self._apply_fast_route(state, fast_route, fast_confidence)
+        
+        route, confidence = self._route_with_llm(state.query)
+        if self.router is not None:
+            self.router.record_comparison(fast_route, route, "fallback")
+        return self._apply_route(state, route, confidence)
+    
+    async def aroute(self, state: AgentState) -> AgentState:
+        """Async route: the fast path embeds in a worker thread, the LLM call is awaited."""
+        logger.info(f"Routing query (async): '{state.query[:50]}...'")
         
-        route, confidence = self._parse_response(content)
+        if self.router is not None:
+            fast_route, fast_confidence, trusted = await asyncio.to_thread(self.router.route, state.query)
+            if trusted:
+                return self._apply_fast_route(state, fast_route, fast_confidence)
         
+        route, confidence = await self._aroute_with_llm(state.query)
+        if self.router is not None:
+            self.router.record_comparison(fast_route, route, "fallback")
+        return self._apply_route(state, route, confidence)
+    
+    def _apply_fast_route(self, state: AgentState, route: str, confidence: float) -> AgentState:
+        """Accept a trusted fast-path decision, sampling it for a background LLM check."""
+        if self.router.should_shadow():
+            self._submit_shadow_check(state.query, route)
+        state.route = route
+        state.confidence["routing"] = confidence
+        return state
+    
+    def _apply_route(self, state: AgentState, route: str, confidence: float) -> AgentState:
+        """Record an LLM routing decision on state."""
         logger.info(f"Routed to: {route} (confidence: {confidence:.2f})")
         state.route = route
         state.confidence["routing"] = confidence
         return state
     
+    def _routing_messages(self, query: str) -> list:
+        """Prompt asking the LLM to route query."""
+        return [
+            SystemMessage(content=ROUTING_PROMPT),
+            HumanMessage(content=query)
+        ]
+    
+    def _route_with_llm(self, query: str) -> tuple[str, float]:
+        """Ask the LLM for a route and confidence."""
+        response = self.llm.invoke(self._routing_messages(query))
+        content = response.content.strip()
+        return self._parse_response(content)
+    
+    async def _aroute_with_llm(self, query: str) -> tuple[str, float]:
+        """Async _route_with_llm."""
+        response = await self.llm.ainvoke(self._routing_messages(query))
+        content = response.content.strip()
+        return self._parse_response(content)
+    
+    def _submit_shadow_check(self, query: str, fast_route: str) -> None:
+        """Compare a fast-path decision with the LLM off the request path."""
+        if self._shadow_executor is None:
+            self._shadow_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="router-shadow")
+        
+        def check():
+            try:
+                llm_route, _ = self._route_with_llm(query)
+                self.router.record_comparison(fast_route, llm_route, "shadow")
+            except Exception as e:
+                logger.warning(f"Router shadow check failed: {e}")
+        
+        self._shadow_executor.submit(check)
+    
     def _parse_response(self, content: str) -> tuple[str, float]:
         """Parse JSON response with route and confidence."""
         try:
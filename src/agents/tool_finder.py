@@ -34,14 +34,36 @@ Confidence reflects how well the retrieved tools match the query:
 class ToolFinderAgent:
     """Finds relevant clinical decision support tools."""
     
+    result_limit = 5
+    
     def __init__(self, retriever: BaseRetriever, llm: BaseChatModel):
         self.retriever = retriever
         self.llm = llm
     
-    def run(self, state: AgentState) -> AgentState:
-        """Search for tools and generate response."""
+    def run(self, state: AgentState, prefetched: list[dict] | None = None) -> AgentState:
+        """Search for tools (unless prefetched results are given) and generate response."""
         logger.info(f"ToolFinder processing: '{state.query[:50]}...'")
-        results = self.retriever.search(state.query, limit=5)
+        if prefetched is None:
+            results = self.retriever.search(state.query, limit=self.result_limit)
+        else:
+            results = prefetched[:self.result_limit]
+        
+        response = self.llm.invoke(self._build_messages(state, results))
+        return self._apply_response(state, response.content)
+    
+    async def arun(self, state: AgentState, prefetched: list[dict] | None = None) -> AgentState:
+        """Async run: retrieval and LLM call without blocking the event loop."""
+        logger.info(f"ToolFinder processing (async): '{state.query[:50]}...'")
+        if prefetched is None:
+            results = await self.retriever.asearch(state.query, limit=self.result_limit)
+        else:
+            results = prefetched[:self.result_limit]
+        
+        response = await self.llm.ainvoke(self._build_messages(state, results))
+        return self._apply_response(state, response.content)
+    
+    def _build_messages(self, state: AgentState, results: list[dict]) -> list:
+        """Record results and retrieval confidence on state; return the LLM prompt."""
         state.tools_results = results
         logger.info(f"Retrieved {len(results)} tools")
         
@@ -49,14 +71,13 @@ class ToolFinderAgent:
         
         tools_text = self._format_results(results)
         
-        messages = [
+        return [
             SystemMessage(content=TOOL_FINDER_PROMPT.format(tools=tools_text)),
             HumanMessage(content=state.query)
         ]
-        
-        response = self.llm.invoke(messages)
-        content = response.content
-        
+    
+    def _apply_response(self, state: AgentState, content: str) -> AgentState:
+        """Store the parsed LLM response and its confidence on state."""
         state.response, response_conf = self._parse_response(content)
         state.confidence["response"] = response_conf
         
@@ -1,23 +1,34 @@
+from typing import Optional
+
 from langchain_core.tools import tool
 from pydantic import BaseModel, Field
 
-from src.embeddings.openai_embed import get_embedding
-from src.retrievers import ToolsRetriever, OrgsRetriever
+from src.config import RETRIEVAL_CACHE_ENABLED
+from src.embeddings.cache import embedding_cache
+from src.retrievers import ToolsRetriever, OrgsRetriever, CatalogSearch, retrieval_cache
 from src.logger import get_logger
 
 logger = get_logger(__name__)
 
+result_cache = retrieval_cache if RETRIEVAL_CACHE_ENABLED else None
+
 
 class ToolSearchInput(BaseModel):
     """Input schema for searching clinical tools."""
     query: str = Field(description="Search query for finding clinical decision support tools")
     limit: int = Field(default=5, description="Maximum number of results to return")
+    category: Optional[str] = Field(default=None, description="Only return tools in this category")
+    target_users: Optional[list[str]] = Field(default=None, description="Only return tools for any of these users")
 
 
 class OrgSearchInput(BaseModel):
     """Input schema for searching healthcare organizations."""
     query: str = Field(description="Search query for finding healthcare organizations with AI implementations")
     limit: int = Field(default=5, description="Maximum number of results to return")
+    org_type: Optional[str] = Field(default=None, description="Only return organizations of this type")
+    state: Optional[str] = Field(default=None, description="Only return organizations in this state")
+    specialty: Optional[str] = Field(default=None, description="Only return organizations with this specialty")
+    ai_use_cases: Optional[list[str]] = Field(default=None, description="Only return organizations with any of these AI use cases")
 
 
 class CombinedSearchInput(BaseModel):
@@ -28,7 +39,12 @@ class CombinedSearchInput(BaseModel):
 
 
 @tool(args_schema=ToolSearchInput)
-def search_clinical_tools(query: str, limit: int = 5) -> list[dict]:
+def search_clinical_tools(
+    query: str,
+    limit: int = 5,
+    category: Optional[str] = None,
+    target_users: Optional[list[str]] = None,
+) -> list[dict]:
     """
     Search for clinical decision support tools by semantic similarity.
     
@@ -41,8 +57,10 @@ def search_clinical_tools(query: str, limit: int = 5) -> list[dict]:
     """
     logger.info(f"Tool 'search_clinical_tools' called: query='{query[:50]}...', limit={limit}")
     
-    retriever = ToolsRetriever(embed_fn=get_embedding)
-    results = retriever.search(query, limit=limit)
+    retriever = ToolsRetriever(embed_fn=embedding_cache, result_cache=result_cache)
+    results = retriever.search(
+        query, limit=limit, filters={"category": category, "target_users": target_users}
+    )
     return [
         {
             "name": r["name"],
@@ -57,7 +75,14 @@ def search_clinical_tools(query: str, limit: int = 5) -> list[dict]:
 
 
 @tool(args_schema=OrgSearchInput)
-def search_healthcare_orgs(query: str, limit: int = 5) -> list[dict]:
+def search_healthcare_orgs(
+    query: str,
+    limit: int = 5,
+    org_type: Optional[str] = None,
+    state: Optional[str] = None,
+    specialty: Optional[str] = None,
+    ai_use_cases: Optional[list[str]] = None,
+) -> list[dict]:
     """
     Search for healthcare organizations with AI implementations by semantic similarity.
     
@@ -68,8 +93,13 @@ def search_healthcare_orgs(query: str, limit: int = 5) -> list[dict]:
     - Real-world examples of clinical AI
     """
     logger.info(f"Tool 'search_healthcare_orgs' called: query='{query[:50]}...', limit={limit}")
-    retriever = OrgsRetriever(embed_fn=get_embedding)
-    results = retriever.search(query, limit=limit)
+    retriever = OrgsRetriever(embed_fn=embedding_cache, result_cache=result_cache)
+    results = retriever.search(query, limit=limit, filters={
+        "org_type": org_type,
+        "state": state,
+        "specialty": specialty,
+        "ai_use_cases": ai_use_cases,
+    })
     return [
         {
             "name": r["name"],
@@ -96,11 +126,13 @@ def search_clinical_workflow(query: str, tools_limit: int = 3, orgs_limit: int =
     - End-to-end clinical AI solutions
     """
     logger.info(f"Tool 'search_clinical_workflow' called: query='{query[:50]}...'")
-    tools_retriever = ToolsRetriever(embed_fn=get_embedding)
-    orgs_retriever = OrgsRetriever(embed_fn=get_embedding)
-    
-    tools_results = tools_retriever.search(query, limit=tools_limit)
-    orgs_results = orgs_retriever.search(query, limit=orgs_limit)
+    catalog_search = CatalogSearch(
+        ToolsRetriever(embed_fn=embedding_cache, result_cache=result_cache),
+        OrgsRetriever(embed_fn=embedding_cache, result_cache=result_cache)
+    )
+    tools_results, orgs_results = catalog_search.search(
+        query, tools_limit=tools_limit, orgs_limit=orgs_limit
+    )
     
     return {
         "tools": [
@@ -6,6 +6,7 @@ from langchain_core.messages import SystemMessage, HumanMessage
 
 from src.agents.state import AgentState
 from src.retrievers.base import BaseRetriever
+from src.retrievers.catalog_search import CatalogSearch
 from src.logger import get_logger
 
 logger = get_logger(__name__)
@@ -36,6 +37,9 @@ Confidence reflects how well you could synthesize a comprehensive answer:
 class WorkflowAdvisorAgent:
     """Synthesizes recommendations from both tools and organizations."""
     
+    tools_limit = 3
+    orgs_limit = 3
+    
     def __init__(
         self, 
         tools_retriever: BaseRetriever, 
@@ -44,14 +48,49 @@ class WorkflowAdvisorAgent:
     ):
         self.tools_retriever = tools_retriever
         self.orgs_retriever = orgs_retriever
+        self.catalog_search = CatalogSearch(tools_retriever, orgs_retriever)
         self.llm = llm
     
-    def run(self, state: AgentState) -> AgentState:
-        """Search both tables and generate comprehensive response."""
+    def run(
+        self,
+        state: AgentState,
+        prefetched: tuple[list[dict], list[dict]] | None = None,
+    ) -> AgentState:
+        """Search both tables (unless prefetched results are given) and generate comprehensive response."""
         logger.info(f"WorkflowAdvisor processing: '{state.query[:50]}...'")
-        tools_results = self.tools_retriever.search(state.query, limit=3)
-        orgs_results = self.orgs_retriever.search(state.query, limit=3)
+        if prefetched is None:
+            tools_results, orgs_results = self.catalog_search.search(
+                state.query, tools_limit=self.tools_limit, orgs_limit=self.orgs_limit
+            )
+        else:
+            tools_results = prefetched[0][:self.tools_limit]
+            orgs_results = prefetched[1][:self.orgs_limit]
+        
+        response = self.llm.invoke(self._build_messages(state, tools_results, orgs_results))
+        return self._apply_response(state, response.content)
+    
+    async def arun(
+        self,
+        state: AgentState,
+        prefetched: tuple[list[dict], list[dict]] | None = None,
+    ) -> AgentState:
+        """Async run: retrieval and LLM call without blocking the event loop."""
+        logger.info(f"WorkflowAdvisor processing (async): '{state.query[:50]}...'")
+        if prefetched is None:
+            tools_results, orgs_results = await self.catalog_search.asearch(
+                state.query, tools_limit=self.tools_limit, orgs_limit=self.orgs_limit
+            )
+        else:
+            tools_results = prefetched[0][:self.tools_limit]
+            orgs_results = prefetched[1][:self.orgs_limit]
         
+        response = await self.llm.ainvoke(self._build_messages(state, tools_results, orgs_results))
+        return self._apply_response(state, response.content)
+    
+    def _build_messages(
+        self, state: AgentState, tools_results: list[dict], orgs_results: list[dict]
+    ) -> list:
+        """Record results and retrieval confidence on state; return the LLM prompt."""
         state.tools_results = tools_results
         state.orgs_results = orgs_results
         logger.info(f"Retrieved {len(tools_results)} tools, {len(orgs_results)} orgs")
@@ -63,17 +102,16 @@ class WorkflowAdvisorAgent:
         tools_text = self._format_tools(tools_results)
         orgs_text = self._format_orgs(orgs_results)
         
-        messages = [
+        return [
             SystemMessage(content=WORKFLOW_ADVISOR_PROMPT.format(
                 tools=tools_text, 
                 orgs=orgs_text
             )),
             HumanMessage(content=state.query)
         ]
-        
-        response = self.llm.invoke(messages)
-        content = response.content
-        
+    
+    def _apply_response(self, state: AgentState, content: str) -> AgentState:
+        """Store the parsed LLM response and its confidence on state."""
         state.response, response_conf = self._parse_response(content)
         state.confidence["response"] = response_conf
         
@@ -0,0 +1,243 @@
+"""Semantic cache of complete query responses, keyed by query embedding similarity."""
+
+import asyncio
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Optional
+
+import numpy as np
+
+from src.config import (
+    ANSWER_CACHE_ENABLED,
+    ANSWER_CACHE_THRESHOLD,
+    ANSWER_CACHE_TTL_SECONDS,
+    ANSWER_CACHE_SIZE,
+)
+from src.db.catalog_version import catalog_version
+from src.embeddings.cache import embedding_cache, hash_text
+from src.retrievers.base import EmbeddingFunction
+from src.tracing import span
+from src.logger import get_logger
+
+logger = get_logger(__name__)
+
+CACHE_NODE = "answer_cache"
+RESPONSE_FIELDS = ("route", "response", "tools_results", "orgs_results", "confidence")
+
+
+def wants_bypass(cache_control: Optional[str], answer_cache_header: Optional[str]) -> bool:
+    """True if the request asked to skip the cache (Cache-Control: no-cache or X-Answer-Cache: bypass)."""
+    if cache_control and "no-cache" in cache_control.lower():
+        return True
+    return bool(answer_cache_header) and answer_cache_header.strip().lower() == "bypass"
+
+
+class SemanticAnswerCache:
+    """
+    Return a stored response when a new query is semantically close to a cached one.
+
+    Entries hold a normalized query embedding and the full response payload
+    (route, response, results, confidence). A lookup is one matrix-vector
+    product over all entries; the best match is served if its cosine
+    similarity is at least `threshold` and it is younger than `ttl_seconds`.
+    The whole cache is dropped when the catalog version changes, and the
+    least recently used entry is evicted beyond `max_entries`.
+    """
+
+    def __init__(
+        self,
+        embed_fn: EmbeddingFunction,
+        threshold: float = ANSWER_CACHE_THRESHOLD,
+        ttl_seconds: float = ANSWER_CACHE_TTL_SECONDS,
+        max_entries: int = ANSWER_CACHE_SIZE,
+        version_fn: Callable[[], int] = catalog_version.current,
+    ):
+        self.embed_fn = embed_fn
+        self.threshold = threshold
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.version_fn = version_fn
+
+        self._entries: OrderedDict[str, tuple[float, np.ndarray, dict]] = OrderedDict()
+        self._matrix: Optional[np.ndarray] = None
+        self._keys: list[str] = []
+        self._version: Optional[int] = None
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._invalidations = 0
+
+    def get(self, query: str) -> Optional[dict]:
+        """Return the cached response for the closest matching query, if close enough."""
+        return self.get_by_vector(query, self.embed_fn(query))
+
+    def get_by_vector(self, query: str, embedding: list[float]) -> Optional[dict]:
+        """get() for a query whose embedding was already computed."""
+        vector = self._normalize(embedding)
+        version = self.version_fn()
+        with self._lock:
+            self._check_version(version)
+            self._expire()
+            match = self._best_match(vector)
+            if match is None:
+                self._misses += 1
+                return None
+
+            key, similarity = match
+            self._entries.move_to_end(key)
+            self._hits += 1
+            response = self._entries[key][2]
+        logger.info(f"Answer cache hit (similarity={similarity:.3f}) for '{query[:50]}...'")
+        return dict(response)
+
+    def put(self, query: str, response: dict) -> None:
+        """Store a complete response for query."""
+        if self.max_entries <= 0:
+            return
+        vector = self._embed(query)
+        version = self.version_fn()
+        with self._lock:
+            self._check_version(version)
+            key = hash_text(query)
+            self._entries[key] = (time.monotonic(), vector, dict(response))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            self._matrix = None
+
+    def stats(self) -> dict:
+        """Hit/miss counters and current size."""
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_rate": round(self._hits / lookups, 4) if lookups else 0.0,
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "invalidations": self._invalidations,
+                "threshold": self.threshold,
+            }
+
+    def clear(self) -> None:
+        """Drop all entries and reset counters."""
+        with self._lock:
+            self._entries.clear()
+            self._matrix = None
+            self._hits = 0
+            self._misses = 0
+            self._invalidations = 0
+
+    def _embed(self, query: str) -> np.ndarray:
+        """Normalized float32 query embedding."""
+        return self._normalize(self.embed_fn(query))
+
+    @staticmethod
+    def _normalize(embedding: list[float]) -> np.ndarray:
+        """Embedding as a unit-length float32 vector."""
+        vector = np.asarray(embedding, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm > 0 else vector
+
+    def _check_version(self, version: int) -> None:
+        """Drop everything when the catalog changed (caller holds the lock)."""
+        if version != self._version:
+            if self._entries:
+                logger.info(f"Catalog version changed, dropping {len(self._entries)} cached answers")
+                self._invalidations += 1
+            self._entries.clear()
+            self._matrix = None
+            self._version = version
+
+    def _expire(self) -> None:
+        """Remove entries older than the TTL (caller holds the lock)."""
+        cutoff = time.monotonic() - self.ttl_seconds
+        expired = [key for key, (stored_at, _, _) in self._entries.items() if stored_at < cutoff]
+        for key in expired:
+            del self._entries[key]
+        if expired:
+            self._matrix = None
+
+    def _best_match(self, vector: np.ndarray) -> Optional[tuple[str, float]]:
+        """Closest entry at or above the threshold (caller holds the lock)."""
+        if not self._entries:
+            return None
+        if self._matrix is None:
+            self._keys = list(self._entries)
+            self._matrix = np.vstack([self._entries[key][1] for key in self._keys])
+        scores = self._matrix @ vector
+        best = int(np.argmax(scores))
+        if scores[best] < self.threshold:
+            return None
+        return self._keys[best], float(scores[best])
+
+
+answer_cache: Optional[SemanticAnswerCache] = (
+    SemanticAnswerCache(embedding_cache) if ANSWER_CACHE_ENABLED else None
+)
+
+
+def lookup_answer(query: str, bypass: bool = False) -> Optional[dict]:
+    """Cached response payload for query, or None (cache disabled, bypassed, miss or lookup error)."""
+    if answer_cache is None or bypass:
+        return None
+    with span("answer_cache.lookup") as lookup_span:
+        try:
+            cached = answer_cache.get(query)
+        except Exception as e:
+            logger.warning(f"Answer cache lookup failed: {e}")
+            return None
+        lookup_span.set_attribute("hit", cached is not None)
+        return cached
+
+
+def lookup_answers(
+    queries: list[str], embeddings: list[list[float]], bypass: bool = False
+) -> list[Optional[dict]]:
+    """lookup_answer for many already-embedded queries, e.g. a batch request."""
+    if answer_cache is None or bypass:
+        return [None] * len(queries)
+    with span("answer_cache.lookup_batch", queries=len(queries)) as lookup_span:
+        answers: list[Optional[dict]] = []
+        for query, embedding in zip(queries, embeddings):
+            try:
+                answers.append(answer_cache.get_by_vector(query, embedding))
+            except Exception as e:
+                logger.warning(f"Answer cache lookup failed: {e}")
+                answers.append(None)
+        lookup_span.set_attribute("hits", sum(1 for answer in answers if answer is not None))
+        return answers
+
+
+def store_answer(query: str, result: dict) -> None:
+    """Cache the response fields of a final graph state; errors and empty responses are skipped."""
+    if answer_cache is None or result.get("error") or not result.get("response"):
+        return
+    try:
+        answer_cache.put(query, {field: result.get(field) for field in RESPONSE_FIELDS})
+    except Exception as e:
+        logger.warning(f"Answer cache store failed: {e}")
+
+
+async def alookup_answer(query: str, bypass: bool = False) -> Optional[dict]:
+    """lookup_answer off the event loop (the query may need embedding)."""
+    if answer_cache is None or bypass:
+        return None
+    return await asyncio.to_thread(lookup_answer, query, bypass)
+
+
+async def alookup_answers(
+    queries: list[str], embeddings: list[list[float]], bypass: bool = False
+) -> list[Optional[dict]]:
+    """lookup_answers off the event loop, in one worker thread."""
+    if answer_cache is None or bypass:
+        return [None] * len(queries)
+    return await asyncio.to_thread(lookup_answers, queries, embeddings, bypass)
+
+
+async def astore_answer(query: str, result: dict) -> None:
+    """store_answer off the event loop."""
+    if answer_cache is None:
+        return
+    await asyncio.to_thread(store_answer, query, result)
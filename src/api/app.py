@@ -5,6 +5,7 @@ from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
 from src.logger import get_logger
+from src.tracing import TracingMiddleware, tracer
 
 logger = get_logger(__name__)
 
@@ -27,6 +28,13 @@ async def lifespan(app: FastAPI):
     logger.info("FastAPI app started")
     yield
     logger.info("FastAPI app shutting down")
+    from src.api.routes.threads import close_checkpointer
+    close_checkpointer()
+    from src.agents.graph import shutdown_prefetch_executor
+    shutdown_prefetch_executor()
+    from src.db.catalog_version import catalog_version
+    catalog_version.close()
+    tracer.shutdown()
 
 
 app = FastAPI(
@@ -43,13 +51,26 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+app.add_middleware(TracingMiddleware)
 
 from src.api.routes.health import router as health_router
+from src.api.routes.metrics import router as metrics_router
 from src.api.routes.agent import router as agent_router
+from src.api.routes.batch import router as batch_router
 from src.api.routes.threads import router as threads_router
+from src.api.routes.cache import router as cache_router
+from src.api.routes.routing import router as routing_router
+from src.api.routes.llm import router as llm_router
+from src.api.routes.usage import router as usage_router
 
 app.include_router(health_router)
+app.include_router(metrics_router)
 app.include_router(agent_router, prefix="/api")
+app.include_router(batch_router, prefix="/api")
 app.include_router(threads_router, prefix="/api")
+app.include_router(cache_router, prefix="/api")
+app.include_router(routing_router, prefix="/api")
+app.include_router(llm_router, prefix="/api")
+app.include_router(usage_router, prefix="/api")
 
-logger.info("FastAPI app configured with routes: /health, /api/query, /api/threads")
+logger.info("FastAPI app configured with routes: /health, /metrics, /api/query, /api/query/batch, /api/threads, /api/cache/stats, /api/router/stats, /api/llm/stats, /api/usage/summary")
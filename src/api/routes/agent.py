@@ -1,9 +1,15 @@
 import json
+from typing import Optional
 
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Header, Response
 from sse_starlette.sse import EventSourceResponse
 
 from src.api.schemas import QueryRequest, QueryResponse, ConfidenceScore
+from src.api.answer_cache import CACHE_NODE, wants_bypass, alookup_answer, astore_answer
+from src.api.streaming import agraph_sse_events, timings_event, usage_event
+from src.api.routes.usage import persist_usage
+from src.metrics import start_request_timings
+from src.usage import start_request_usage
 from src.logger import get_logger
 from src.agents.graph import create_clinical_graph
 
@@ -37,20 +43,58 @@ def get_initial_state(query_text: str) -> dict:
     }
 
 
+def build_query_response(
+    result: dict, timings: Optional[dict] = None, usage: Optional[dict] = None
+) -> QueryResponse:
+    """QueryResponse from a final graph state (or cached response payload)."""
+    return QueryResponse(
+        route=result.get("route"),
+        response=result.get("response", ""),
+        tools_results=result.get("tools_results", []),
+        orgs_results=result.get("orgs_results", []),
+        confidence=ConfidenceScore(**result.get("confidence", {})),
+        timings=timings,
+        usage=usage,
+    )
+
+
 @router.post("/query", response_model=QueryResponse)
-def query(request: QueryRequest):
+async def query(
+    request: QueryRequest,
+    response: Response,
+    cache_control: Optional[str] = Header(default=None),
+    x_answer_cache: Optional[str] = Header(default=None),
+):
     """
     Standard query endpoint - returns complete response as JSON.
     
     NOTE: This endpoint is stateless. It does not use LangGraph checkpoints 
     and does not persist conversation history. For stateful chat with memory, 
     use the /api/threads/{thread_id}/query endpoints in threads.py.
+
+    Semantically similar repeat queries are served from the answer cache;
+    send `Cache-Control: no-cache` or `X-Answer-Cache: bypass` to force a fresh run.
+
+    The per-phase latency breakdown is returned in `timings` and the
+    `Server-Timing` header; tokens and estimated cost in `usage` (also
+    persisted, see /api/usage/summary).
     """
     logger.info(f"API query received: '{request.query[:50]}...'")
+    timings = start_request_timings()
+    usage = start_request_usage()
 
     try:
+        bypass = wants_bypass(cache_control, x_answer_cache)
+        cached = await alookup_answer(request.query, bypass)
+        response.headers["X-Answer-Cache"] = "hit" if cached else "bypass" if bypass else "miss"
+        if cached:
+            await persist_usage(usage, "query", CACHE_NODE)
+            response.headers["Server-Timing"] = timings.server_timing()
+            return build_query_response(cached, timings.as_dict(), usage.as_dict())
+
         graph = get_graph()
-        result = graph.invoke(get_initial_state(request.query))
+        result = await graph.ainvoke(get_initial_state(request.query))
+        await astore_answer(request.query, result)
 
         confidence = result.get("confidence", {})
         logger.info(
@@ -58,13 +102,9 @@ def query(request: QueryRequest):
             f"confidence={confidence.get('overall', 0):.2f}"
         )
 
-        return QueryResponse(
-            route=result.get("route"),
-            response=result.get("response", ""),
-            tools_results=result.get("tools_results", []),
-            orgs_results=result.get("orgs_results", []),
-            confidence=ConfidenceScore(**confidence),
-        )
+        await persist_usage(usage, "query", result.get("route"))
+        response.headers["Server-Timing"] = timings.server_timing()
+        return build_query_response(result, timings.as_dict(), usage.as_dict())
 
     except Exception as e:
         logger.exception(f"Error processing query: {e}")
@@ -72,29 +112,50 @@ def query(request: QueryRequest):
 
 
 @router.post("/query/stream")
-def query_stream(request: QueryRequest):
+async def query_stream(
+    request: QueryRequest,
+    cache_control: Optional[str] = Header(default=None),
+    x_answer_cache: Optional[str] = Header(default=None),
+):
     """
     Streaming query endpoint - returns Server-Sent Events (SSE).
     
     NOTE: This endpoint is stateless. It does not use LangGraph checkpoints 
     and does not persist conversation history. For stateful chat with memory, 
     use the /api/threads/{thread_id}/query/stream endpoints in threads.py.
+
+    Specialist agents' LLM output is streamed as `token` events before each
+    node's `message` event. A cache hit is sent as a single `answer_cache`
+    node event. A `usage` event (tokens and estimated cost) and a `timings`
+    event with the per-phase latency breakdown precede `[DONE]`.
     """
     logger.info(f"API stream query received: '{request.query[:50]}...'")
+    bypass = wants_bypass(cache_control, x_answer_cache)
 
-    def generate():
+    async def generate():
+        timings = start_request_timings()
+        usage = start_request_usage()
         try:
-            graph = get_graph()
+            cached = await alookup_answer(request.query, bypass)
+            if cached:
+                yield {"event": "message", "data": json.dumps({"node": CACHE_NODE, "data": cached})}
+                await persist_usage(usage, "query/stream", CACHE_NODE)
+                yield usage_event(usage)
+                yield timings_event(timings)
+                yield {"event": "message", "data": "[DONE]"}
+                return
 
-            for event in graph.stream(get_initial_state(request.query)):
-                node_name = list(event.keys())[0]
-                node_output = event[node_name]
-
-                logger.info(f"Stream event: {node_name}")
+            graph = get_graph()
+            final_state = get_initial_state(request.query)
 
-                yield {"event": "message", "data": json.dumps({"node": node_name, "data": node_output})}
+            async for event in agraph_sse_events(graph, get_initial_state(request.query), final_state):
+                yield event
 
+            await astore_answer(request.query, final_state)
+            await persist_usage(usage, "query/stream", final_state.get("route"))
             logger.info("Stream completed")
+            yield usage_event(usage)
+            yield timings_event(timings)
             yield {"event": "message", "data": "[DONE]"}
 
         except Exception as e:
@@ -0,0 +1,213 @@
+import asyncio
+import json
+from typing import AsyncIterator, Optional
+
+from fastapi import APIRouter, HTTPException, Header
+from fastapi.responses import StreamingResponse
+from pydantic import ValidationError
+
+from src.api.schemas import BatchQueryRequest, BatchQueryItem, BatchQueryResponse, QueryRequest
+from src.api.answer_cache import wants_bypass, alookup_answers, astore_answer
+from src.api.routes.agent import get_graph, get_initial_state, build_query_response
+from src.api.routes.usage import persist_usage
+from src.agents.graph import create_retrievers, prefetch_batch_by_vectors
+from src.config import BATCH_MAX_CONCURRENCY
+from src.usage import start_request_usage
+from src.logger import get_logger
+
+logger = get_logger(__name__)
+
+router = APIRouter()
+
+# Usage route label of batch requests, whose items may take different routes
+BATCH_ROUTE = "batch"
+
+_retrievers = None
+
+
+def get_retrievers():
+    """Lazy initialization of the retrievers used for batch-wide prefetching."""
+    global _retrievers
+    if _retrievers is None:
+        _retrievers = create_retrievers()
+    return _retrievers
+
+
+async def plan_batch(
+    queries: list[str], bypass: bool = False, retrievers=None
+) -> tuple[dict[int, BatchQueryItem], dict[int, dict]]:
+    """
+    Split a batch into items that are already finished and graph inputs.
+
+    Invalid queries become error items. The valid queries are embedded in
+    one call, and those vectors are used both for the answer cache lookup
+    (hits become result items) and to search each table with one statement
+    for the remaining queries; each one's initial state carries its results
+    as `prefetched`, so no graph run embeds or searches on its own. If the
+    shared embedding or retrieval fails, the graph runs retrieve per query
+    instead.
+    """
+    finished: dict[int, BatchQueryItem] = {}
+    valid: list[int] = []
+    for index, query in enumerate(queries):
+        try:
+            QueryRequest(query=query)
+            valid.append(index)
+        except ValidationError as e:
+            finished[index] = BatchQueryItem(index=index, query=query, error=e.errors()[0]["msg"])
+
+    embeddings: dict[int, list[float]] = {}
+    if valid:
+        try:
+            tools_retriever, orgs_retriever = retrievers or get_retrievers()
+            vectors = await asyncio.to_thread(tools_retriever.embed_batch, [queries[i] for i in valid])
+            embeddings = dict(zip(valid, vectors))
+        except Exception as e:
+            logger.warning(f"Batch embedding failed, queries will retrieve individually: {e}")
+
+    misses = valid
+    if embeddings:
+        cached = await alookup_answers([queries[i] for i in valid], [embeddings[i] for i in valid], bypass)
+        misses = []
+        for index, answer in zip(valid, cached):
+            if answer:
+                finished[index] = BatchQueryItem(index=index, query=queries[index], result=answer)
+            else:
+                misses.append(index)
+
+    prefetched: list[Optional[dict]] = [None] * len(misses)
+    if misses and embeddings:
+        try:
+            prefetched = await asyncio.to_thread(
+                prefetch_batch_by_vectors, [embeddings[i] for i in misses], tools_retriever, orgs_retriever
+            )
+        except Exception as e:
+            logger.warning(f"Batch retrieval failed, queries will retrieve individually: {e}")
+
+    pending: dict[int, dict] = {
+        index: {**get_initial_state(queries[index]), "prefetched": results}
+        for index, results in zip(misses, prefetched)
+    }
+
+    invalid = len(queries) - len(valid)
+    logger.info(
+        f"Batch of {len(queries)}: {len(pending)} to run, "
+        f"{len(finished) - invalid} cached, {invalid} invalid"
+    )
+    return finished, pending
+
+
+async def complete_item(index: int, query: str, output) -> BatchQueryItem:
+    """BatchQueryItem for one graph run's output, which may be an exception."""
+    if isinstance(output, Exception):
+        logger.warning(f"Batch item {index} failed: {output}")
+        return BatchQueryItem(index=index, query=query, error=str(output))
+    try:
+        item = BatchQueryItem(index=index, query=query, result=build_query_response(output))
+    except Exception as e:
+        logger.warning(f"Batch item {index} returned an invalid result: {e}")
+        return BatchQueryItem(index=index, query=query, error=str(e))
+    await astore_answer(query, output)
+    return item
+
+
+async def run_batch(
+    graph, queries: list[str], max_concurrency: int, bypass: bool = False, retrievers=None
+) -> list[BatchQueryItem]:
+    """Run a batch with graph.abatch; items are returned in request order."""
+    items, pending = await plan_batch(queries, bypass, retrievers)
+    indexes = list(pending)
+    outputs = await graph.abatch(
+        [pending[i] for i in indexes],
+        config={"max_concurrency": max_concurrency},
+        return_exceptions=True,
+    )
+    for index, output in zip(indexes, outputs):
+        items[index] = await complete_item(index, queries[index], output)
+    return [items[i] for i in range(len(queries))]
+
+
+async def stream_batch(
+    graph, queries: list[str], max_concurrency: int, bypass: bool = False, retrievers=None
+) -> AsyncIterator[BatchQueryItem]:
+    """Run a batch with graph.abatch_as_completed, yielding each item as soon as it is done."""
+    items, pending = await plan_batch(queries, bypass, retrievers)
+    for index in sorted(items):
+        yield items[index]
+
+    indexes = list(pending)
+    async for position, output in graph.abatch_as_completed(
+        [pending[i] for i in indexes],
+        config={"max_concurrency": max_concurrency},
+        return_exceptions=True,
+    ):
+        index = indexes[position]
+        yield await complete_item(index, queries[index], output)
+
+
+@router.post("/query/batch", response_model=BatchQueryResponse)
+async def query_batch(
+    request: BatchQueryRequest,
+    cache_control: Optional[str] = Header(default=None),
+    x_answer_cache: Optional[str] = Header(default=None),
+):
+    """
+    Batch query endpoint - runs many stateless queries, returns all results as JSON.
+
+    At most `max_concurrency` (default BATCH_MAX_CONCURRENCY) graph runs are
+    in flight at once. Embedding and retrieval are done once for the whole
+    batch. A failing query is reported in its item's `error` field and does
+    not fail the others. Tokens and estimated cost of the whole batch are
+    returned in `usage` and persisted as one record with route BATCH_ROUTE.
+    """
+    logger.info(f"API batch query received: {len(request.queries)} queries")
+    bypass = wants_bypass(cache_control, x_answer_cache)
+    usage = start_request_usage()
+
+    try:
+        items = await run_batch(
+            get_graph(), request.queries, request.max_concurrency or BATCH_MAX_CONCURRENCY, bypass
+        )
+    except Exception as e:
+        logger.exception(f"Error processing batch: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+    failed = sum(1 for item in items if item.error)
+    logger.info(f"Batch completed: {len(items) - failed} succeeded, {failed} failed")
+    await persist_usage(usage, "query/batch", BATCH_ROUTE)
+    return BatchQueryResponse(
+        results=items, succeeded=len(items) - failed, failed=failed, usage=usage.as_dict()
+    )
+
+
+@router.post("/query/batch/stream")
+async def query_batch_stream(
+    request: BatchQueryRequest,
+    cache_control: Optional[str] = Header(default=None),
+    x_answer_cache: Optional[str] = Header(default=None),
+):
+    """
+    Streaming batch query endpoint - returns newline-delimited JSON (NDJSON).
+
+    Each line is one BatchQueryItem, written as soon as its query finishes,
+    so lines arrive in completion order; use `index` to match them to the
+    request. An error that stops the whole batch is sent as a final
+    `{"error": ...}` line. The batch's usage is persisted as with /query/batch.
+    """
+    logger.info(f"API batch stream received: {len(request.queries)} queries")
+    bypass = wants_bypass(cache_control, x_answer_cache)
+
+    async def generate():
+        usage = start_request_usage()
+        try:
+            async for item in stream_batch(
+                get_graph(), request.queries, request.max_concurrency or BATCH_MAX_CONCURRENCY, bypass
+            ):
+                yield item.model_dump_json() + "\n"
+            await persist_usage(usage, "query/batch/stream", BATCH_ROUTE)
+            logger.info("Batch stream completed")
+        except Exception as e:
+            logger.exception(f"Batch stream error: {e}")
+            yield json.dumps({"error": str(e)}) + "\n"
+
+    return StreamingResponse(generate(), media_type="application/x-ndjson")
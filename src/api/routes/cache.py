@@ -0,0 +1,21 @@
+from fastapi import APIRouter
+
+from src.api.answer_cache import answer_cache
+from src.embeddings.cache import embedding_cache
+from src.retrievers import retrieval_cache
+from src.logger import get_logger
+
+logger = get_logger(__name__)
+
+router = APIRouter()
+
+
+@router.get("/cache/stats")
+def cache_stats():
+    """Hit rates and memory use of the embedding, retrieval and answer caches."""
+    logger.info("Cache stats requested")
+    return {
+        "embeddings": embedding_cache.stats(),
+        "retrieval": retrieval_cache.stats(),
+        "answers": answer_cache.stats() if answer_cache else None,
+    }
@@ -0,0 +1,15 @@
+from fastapi import APIRouter
+
+from src.agents.hedged_llm import llm_stats as collect_llm_stats
+from src.logger import get_logger
+
+logger = get_logger(__name__)
+
+router = APIRouter()
+
+
+@router.get("/llm/stats")
+def llm_stats():
+    """Per-agent LLM call latency, retries, timeouts and how often hedges fired and won."""
+    logger.info("LLM stats requested")
+    return collect_llm_stats()
@@ -0,0 +1,17 @@
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+import src.db.models.base  # noqa: F401  registers the connection pool gauges
+from src.metrics import registry
+from src.logger import get_logger
+
+logger = get_logger(__name__)
+
+router = APIRouter()
+
+
+@router.get("/metrics", response_class=PlainTextResponse)
+def metrics():
+    """Latency histograms, counters and connection pool gauges in the Prometheus text format."""
+    logger.debug("Metrics scraped")
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
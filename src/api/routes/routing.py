@@ -0,0 +1,15 @@
+from fastapi import APIRouter
+
+from src.agents.router import embedding_router
+from src.logger import get_logger
+
+logger = get_logger(__name__)
+
+router = APIRouter()
+
+
+@router.get("/router/stats")
+def router_stats():
+    """Embedding fast-path hit rate and agreement with the LLM router."""
+    logger.info("Router stats requested")
+    return embedding_router.stats()
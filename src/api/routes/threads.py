@@ -1,8 +1,9 @@
 """Thread management API endpoints."""
 
 import json
+from typing import Optional
 
-from fastapi import APIRouter, HTTPException, status
+from fastapi import APIRouter, HTTPException, Header, Response, status
 from sse_starlette.sse import EventSourceResponse
 
 from src.api.schemas import (
@@ -16,15 +17,20 @@ from src.api.schemas import (
     MessageResponse,
     SuccessResponse,
 )
+from src.api.answer_cache import CACHE_NODE, wants_bypass, alookup_answer, astore_answer
+from src.api.streaming import agraph_sse_events, timings_event, usage_event
+from src.api.routes.usage import persist_usage
+from src.metrics import start_request_timings
+from src.usage import start_request_usage
 from src.logger import get_logger
 from src.db.threads import (
-    create_thread,
-    get_thread,
-    list_threads,
-    update_thread_title,
-    delete_thread,
-    add_message,
-    get_messages,
+    acreate_thread,
+    aget_thread,
+    alist_threads,
+    aupdate_thread_title,
+    adelete_thread,
+    aadd_message,
+    aget_messages,
 )
 from src.db.checkpointer import PostgresCheckpointer
 from src.agents.graph import create_clinical_graph
@@ -52,6 +58,12 @@ def get_graph_with_checkpointer():
     return _graph
 
 
+def close_checkpointer() -> None:
+    """Flush checkpoints still buffered by write-behind mode (called at shutdown)."""
+    if _checkpointer is not None:
+        _checkpointer.close()
+
+
 def get_initial_state(query_text: str) -> dict:
     """Create initial state for graph invocation."""
     return {
@@ -66,37 +78,37 @@ def get_initial_state(query_text: str) -> dict:
 
 
 @router.get("/threads", response_model=list[ThreadResponse])
-def list_all_threads():
+async def list_all_threads():
     """List all chat threads."""
     logger.info("Listing all threads")
     try:
-        return list_threads()
+        return await alist_threads()
     except Exception as e:
         logger.exception(f"Failed to list threads: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @router.post("/threads", response_model=ThreadResponse, status_code=status.HTTP_201_CREATED)
-def create_new_thread(request: ThreadCreate):
+async def create_new_thread(request: ThreadCreate):
     """Create a new chat thread."""
     logger.info(f"Creating new thread: {request.title}")
     try:
-        return create_thread(request.title)
+        return await acreate_thread(request.title)
     except Exception as e:
         logger.exception(f"Failed to create thread: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @router.get("/threads/{thread_id}", response_model=ThreadDetailResponse)
-def get_thread_detail(thread_id: str):
+async def get_thread_detail(thread_id: str):
     """Get thread with messages."""
     logger.info(f"Getting thread {thread_id}")
     try:
-        thread = get_thread(thread_id)
+        thread = await aget_thread(thread_id)
         if not thread:
             raise HTTPException(status_code=404, detail="Thread not found")
 
-        messages = get_messages(thread_id)
+        messages = await aget_messages(thread_id)
         thread["messages"] = messages
         return thread
     except HTTPException:
@@ -107,11 +119,11 @@ def get_thread_detail(thread_id: str):
 
 
 @router.patch("/threads/{thread_id}", response_model=ThreadResponse)
-def update_thread(thread_id: str, request: ThreadUpdate):
+async def update_thread(thread_id: str, request: ThreadUpdate):
     """Update thread title."""
     logger.info(f"Updating thread {thread_id}")
     try:
-        thread = update_thread_title(thread_id, request.title)
+        thread = await aupdate_thread_title(thread_id, request.title)
         if not thread:
             raise HTTPException(status_code=404, detail="Thread not found")
         return thread
@@ -123,11 +135,11 @@ def update_thread(thread_id: str, request: ThreadUpdate):
 
 
 @router.delete("/threads/{thread_id}", response_model=SuccessResponse)
-def delete_thread_endpoint(thread_id: str):
+async def delete_thread_endpoint(thread_id: str):
     """Delete a thread."""
     logger.info(f"Deleting thread {thread_id}")
     try:
-        deleted = delete_thread(thread_id)
+        deleted = await adelete_thread(thread_id)
         if not deleted:
             raise HTTPException(status_code=404, detail="Thread not found")
         return {"success": True}
@@ -139,45 +151,67 @@ def delete_thread_endpoint(thread_id: str):
 
 
 @router.post("/threads/{thread_id}/query", response_model=QueryResponse)
-def query_thread(thread_id: str, request: QueryRequest):
+async def query_thread(
+    thread_id: str,
+    request: QueryRequest,
+    response: Response,
+    cache_control: Optional[str] = Header(default=None),
+    x_answer_cache: Optional[str] = Header(default=None),
+):
     """
     Query with thread context.
     
     NOTE: This endpoint is stateful. It uses LangGraph checkpoints (PostgreSQL)
     to persist conversation history and agent state for the given thread_id.
+    Answer cache hits are still recorded as thread messages, but do not
+    write a checkpoint. The per-phase latency breakdown is returned in
+    `timings` and the `Server-Timing` header; tokens and estimated cost are
+    returned in `usage` and stored with the assistant message.
     """
     logger.info(f"Query in thread {thread_id}: '{request.query[:50]}...'")
+    timings = start_request_timings()
+    usage = start_request_usage()
 
     try:
-        thread = get_thread(thread_id)
+        thread = await aget_thread(thread_id)
         if not thread:
             raise HTTPException(status_code=404, detail="Thread not found")
 
-        add_message(thread_id, "user", request.query)
+        await aadd_message(thread_id, "user", request.query)
 
-        graph = get_graph_with_checkpointer()
-        config = {"configurable": {"thread_id": thread_id}}
+        bypass = wants_bypass(cache_control, x_answer_cache)
+        result = await alookup_answer(request.query, bypass)
+        response.headers["X-Answer-Cache"] = "hit" if result else "bypass" if bypass else "miss"
+        cache_hit = result is not None
+        if result is None:
+            graph = get_graph_with_checkpointer()
+            config = {"configurable": {"thread_id": thread_id}}
 
-        result = graph.invoke(get_initial_state(request.query), config)
+            result = await graph.ainvoke(get_initial_state(request.query), config)
+            await astore_answer(request.query, result)
 
         route = result.get("route")
-        response = result.get("response", "")
+        answer = result.get("response", "")
         confidence = result.get("confidence", {})
 
-        add_message(thread_id, "assistant", response, route)
+        message = await aadd_message(thread_id, "assistant", answer, route)
+        await persist_usage(usage, "threads/query", CACHE_NODE if cache_hit else route, thread_id, message["id"])
 
-        if thread["title"] == "New Chat" and response:
+        if thread["title"] == "New Chat" and answer:
             new_title = request.query[:50] + ("..." if len(request.query) > 50 else "")
-            update_thread_title(thread_id, new_title)
+            await aupdate_thread_title(thread_id, new_title)
 
         logger.info(f"Query processed: route={route}, confidence={confidence.get('overall', 0):.2f}")
 
+        response.headers["Server-Timing"] = timings.server_timing()
         return QueryResponse(
             route=route,
-            response=response,
+            response=answer,
             tools_results=result.get("tools_results", []),
             orgs_results=result.get("orgs_results", []),
             confidence=ConfidenceScore(**confidence),
+            timings=timings.as_dict(),
+            usage=usage.as_dict(),
         )
     except HTTPException:
         raise
@@ -187,51 +221,70 @@ def query_thread(thread_id: str, request: QueryRequest):
 
 
 @router.post("/threads/{thread_id}/query/stream")
-def query_thread_stream(thread_id: str, request: QueryRequest):
+async def query_thread_stream(
+    thread_id: str,
+    request: QueryRequest,
+    cache_control: Optional[str] = Header(default=None),
+    x_answer_cache: Optional[str] = Header(default=None),
+):
     """
     Streaming query with thread context.
     
     NOTE: This endpoint is stateful. It uses LangGraph checkpoints (PostgreSQL)
     to persist conversation history and agent state for the given thread_id.
+    LLM output is streamed as `token` events; a cache hit is sent as a
+    single `answer_cache` node event. A `usage` event (tokens and estimated
+    cost) and a `timings` event with the per-phase latency breakdown
+    precede `[DONE]`.
     """
     logger.info(f"Stream query in thread {thread_id}: '{request.query[:50]}...'")
+    bypass = wants_bypass(cache_control, x_answer_cache)
 
-    def generate():
+    async def generate():
+        timings = start_request_timings()
+        usage = start_request_usage()
         try:
-            thread = get_thread(thread_id)
+            thread = await aget_thread(thread_id)
             if not thread:
                 yield {"event": "error", "data": json.dumps({"error": "Thread not found"})}
                 return
 
-            add_message(thread_id, "user", request.query)
-
-            graph = get_graph_with_checkpointer()
-            config = {"configurable": {"thread_id": thread_id}}
-
-            final_response = ""
-            final_route = ""
-
-            for event in graph.stream(get_initial_state(request.query), config):
-                node_name = list(event.keys())[0]
-                node_output = event[node_name]
-
-                logger.info(f"Stream event: {node_name}")
-
-                if node_output.get("route"):
-                    final_route = node_output["route"]
-                if node_output.get("response"):
-                    final_response = node_output["response"]
-
-                yield {"event": "message", "data": json.dumps({"node": node_name, "data": node_output})}
-
+            await aadd_message(thread_id, "user", request.query)
+
+            cached = await alookup_answer(request.query, bypass)
+            if cached:
+                final_response = cached.get("response", "")
+                final_route = cached.get("route") or ""
+                usage_route = CACHE_NODE
+                yield {"event": "message", "data": json.dumps({"node": CACHE_NODE, "data": cached})}
+            else:
+                graph = get_graph_with_checkpointer()
+                config = {"configurable": {"thread_id": thread_id}}
+                final_state = get_initial_state(request.query)
+
+                async for event in agraph_sse_events(
+                    graph, get_initial_state(request.query), final_state, config
+                ):
+                    yield event
+
+                await astore_answer(request.query, final_state)
+                final_response = final_state.get("response") or ""
+                final_route = final_state.get("route") or ""
+                usage_route = final_route or None
+
+            message_id = None
             if final_response:
-                add_message(thread_id, "assistant", final_response, final_route)
+                message = await aadd_message(thread_id, "assistant", final_response, final_route)
+                message_id = message["id"]
+            await persist_usage(usage, "threads/query/stream", usage_route, thread_id, message_id)
 
             if thread["title"] == "New Chat" and request.query:
                 new_title = request.query[:50] + ("..." if len(request.query) > 50 else "")
-                update_thread_title(thread_id, new_title)
+                await aupdate_thread_title(thread_id, new_title)
 
             logger.info("Stream completed")
+            yield usage_event(usage)
+            yield timings_event(timings)
             yield {"event": "message", "data": "[DONE]"}
 
         except Exception as e:
@@ -0,0 +1,49 @@
+from datetime import datetime
+from typing import Optional
+
+from fastapi import APIRouter, HTTPException, Query
+
+from src.config import USAGE_TRACKING_ENABLED
+from src.db.usage import aadd_usage, ausage_summary
+from src.usage import RequestUsage
+from src.logger import get_logger
+
+logger = get_logger(__name__)
+
+router = APIRouter()
+
+
+async def persist_usage(
+    usage: RequestUsage,
+    endpoint: str,
+    route: Optional[str] = None,
+    thread_id: Optional[str] = None,
+    message_id: Optional[str] = None,
+) -> None:
+    """Store a request's usage; failures are logged and never fail the request."""
+    if not USAGE_TRACKING_ENABLED:
+        return
+    try:
+        await aadd_usage(usage.as_dict(), endpoint, route, thread_id, message_id)
+    except Exception as e:
+        logger.warning(f"Failed to persist usage for {endpoint}: {e}")
+
+
+@router.get("/usage/summary")
+async def usage_summary(
+    since: Optional[datetime] = None,
+    thread_id: Optional[str] = None,
+    limit: int = Query(default=20, ge=1, le=500),
+):
+    """
+    Token usage and estimated cost: overall, per route and for the most expensive threads.
+
+    `since` (ISO 8601) restricts the summary to recent requests, `thread_id`
+    to one thread; `limit` caps the per-thread list.
+    """
+    logger.info(f"Usage summary requested: since={since}, thread_id={thread_id}")
+    try:
+        return await ausage_summary(since, thread_id, limit)
+    except Exception as e:
+        logger.exception(f"Failed to summarize usage: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
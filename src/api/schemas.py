@@ -6,6 +6,8 @@ from uuid import UUID
 
 from pydantic import BaseModel, Field
 
+from src.config import BATCH_MAX_CONCURRENCY, BATCH_MAX_QUERIES
+
 
 class QueryRequest(BaseModel):
     """Request body for query endpoints."""
@@ -42,6 +44,33 @@ class QueryResponse(BaseModel):
     tools_results: list[dict]
     orgs_results: list[dict]
     confidence: ConfidenceScore
+    timings: dict[str, float] | None = None
+    usage: dict | None = None
+
+
+class BatchQueryRequest(BaseModel):
+    """Request body for batch query endpoints."""
+
+    queries: list[str] = Field(..., min_length=1, max_length=BATCH_MAX_QUERIES)
+    max_concurrency: int | None = Field(default=None, ge=1, le=BATCH_MAX_CONCURRENCY)
+
+
+class BatchQueryItem(BaseModel):
+    """Outcome of one query in a batch: a result or an error."""
+
+    index: int
+    query: str
+    result: QueryResponse | None = None
+    error: str | None = None
+
+
+class BatchQueryResponse(BaseModel):
+    """Response from the batch query endpoint, in request order."""
+
+    results: list[BatchQueryItem]
+    succeeded: int
+    failed: int
+    usage: dict | None = None
 
 
 class MessageResponse(BaseModel):
@@ -0,0 +1,128 @@
+"""SSE event generation for streamed graph runs, including token-level LLM output."""
+
+import json
+import re
+import time
+from typing import AsyncIterator, Iterator, Optional
+
+from src.metrics import RequestTimings, sse_stream_seconds
+from src.usage import RequestUsage
+from src.logger import get_logger
+
+logger = get_logger(__name__)
+
+TOKEN_NODES = ("tool_finder", "org_matcher", "workflow_advisor")
+CONFIDENCE_KEY = '"response_confidence"'
+CONFIDENCE_JSON = re.compile(r'\{\s*"response_confidence"\s*:[^}]*\}')
+MAX_HELD_CHARS = 200
+
+
+class ConfidenceTailFilter:
+    """
+    Pass LLM tokens through while holding back the trailing confidence JSON.
+
+    Specialist agents end their answer with `{"response_confidence": 0.8}`.
+    Text from a `{` onwards is held until it is either recognized as that
+    object (and dropped) or ruled out, in which case it is released.
+    The parsed confidence still comes from the node's final update.
+    """
+
+    def __init__(self):
+        self._held = ""
+
+    def feed(self, token: str) -> str:
+        """Return the part of token (plus released held text) that is safe to show."""
+        self._held += token
+        emitted = []
+        while self._held:
+            start = self._held.find("{")
+            if start == -1:
+                emitted.append(self._held)
+                self._held = ""
+                break
+            if start > 0:
+                emitted.append(self._held[:start])
+                self._held = self._held[start:]
+
+            match = CONFIDENCE_JSON.match(self._held)
+            if match:
+                self._held = self._held[match.end():]
+                continue
+            if self._could_be_confidence(self._held):
+                break
+            emitted.append("{")
+            self._held = self._held[1:]
+        return "".join(emitted)
+
+    def flush(self) -> str:
+        """Release whatever is still held once the stream ends, unless it is the confidence JSON."""
+        held, self._held = self._held, ""
+        return "" if CONFIDENCE_KEY in held else held
+
+    @staticmethod
+    def _could_be_confidence(held: str) -> bool:
+        """True while held (starting at `{`) may still turn into the confidence object."""
+        if "}" in held or len(held) > MAX_HELD_CHARS:
+            return False
+        body = held[1:].lstrip()
+        prefix = body[:len(CONFIDENCE_KEY)]
+        return CONFIDENCE_KEY.startswith(prefix)
+
+
+def timings_event(timings: RequestTimings) -> dict:
+    """Final `timings` SSE event with the request's phase breakdown (ms)."""
+    return {"event": "timings", "data": json.dumps({"timings": timings.as_dict()})}
+
+
+def usage_event(usage: RequestUsage) -> dict:
+    """Final `usage` SSE event with the request's tokens and estimated cost."""
+    return {"event": "usage", "data": json.dumps({"usage": usage.as_dict()})}
+
+
+def graph_sse_events(graph, initial_state: dict, final_state: dict, config: Optional[dict] = None) -> Iterator[dict]:
+    """
+    Stream a graph run as SSE events.
+
+    Emits `token` events ({"node", "token"}) as specialist agents generate
+    text and one `message` event ({"node", "data"}) per node update, as
+    before. Node updates are merged into final_state for the caller.
+    """
+    filters: dict[str, ConfidenceTailFilter] = {}
+    with sse_stream_seconds.time():
+        for mode, payload in graph.stream(initial_state, config, stream_mode=["updates", "messages"]):
+            yield from _sse_events(mode, payload, filters, final_state)
+
+
+async def agraph_sse_events(
+    graph, initial_state: dict, final_state: dict, config: Optional[dict] = None
+) -> AsyncIterator[dict]:
+    """Async graph_sse_events, driven by graph.astream."""
+    filters: dict[str, ConfidenceTailFilter] = {}
+    with sse_stream_seconds.time():
+        async for mode, payload in graph.astream(initial_state, config, stream_mode=["updates", "messages"]):
+            for event in _sse_events(mode, payload, filters, final_state):
+                yield event
+
+
+def _sse_events(mode: str, payload, filters: dict[str, ConfidenceTailFilter], final_state: dict) -> Iterator[dict]:
+    """SSE events for one (mode, payload) item of a multi-mode graph stream."""
+    if mode == "messages":
+        chunk, metadata = payload
+        node_name = metadata.get("langgraph_node")
+        if node_name not in TOKEN_NODES or not isinstance(chunk.content, str):
+            return
+        token = filters.setdefault(node_name, ConfidenceTailFilter()).feed(chunk.content)
+        if token:
+            yield {"event": "token", "data": json.dumps({"node": node_name, "token": token})}
+        return
+
+    for node_name, node_output in payload.items():
+        tail_filter = filters.pop(node_name, None)
+        if tail_filter:
+            token = tail_filter.flush()
+            if token:
+                yield {"event": "token", "data": json.dumps({"node": node_name, "token": token})}
+
+        logger.info(f"Stream event: {node_name}")
+        final_state.update(node_output or {})
+        yield {"event": "message", "data": json.dumps({"node": node_name, "data": node_output})}
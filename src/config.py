@@ -10,4 +10,92 @@ DATABASE_URL = os.getenv(
 )
 
 EMBEDDING_MODEL = "text-embedding-3-small"
-EMBEDDING_DIMENSIONS = 1536
+EMBEDDING_DIMENSIONS = int(os.getenv("EMBEDDING_DIMENSIONS", "1536"))
+EMBEDDING_STORAGE = os.getenv("EMBEDDING_STORAGE", "vector").lower()
+
+EMBEDDING_CACHE_SIZE = int(os.getenv("EMBEDDING_CACHE_SIZE", "10000"))
+EMBEDDING_CACHE_TTL_SECONDS = int(os.getenv("EMBEDDING_CACHE_TTL_SECONDS", "86400"))
+EMBEDDING_CACHE_PERSISTENT = os.getenv("EMBEDDING_CACHE_PERSISTENT", "true").lower() == "true"
+
+EMBEDDING_BATCHING = os.getenv("EMBEDDING_BATCHING", "true").lower() == "true"
+EMBEDDING_BATCH_WINDOW_MS = float(os.getenv("EMBEDDING_BATCH_WINDOW_MS", "5"))
+EMBEDDING_BATCH_MAX_SIZE = int(os.getenv("EMBEDDING_BATCH_MAX_SIZE", "64"))
+EMBEDDING_BATCH_MAX_IN_FLIGHT = int(os.getenv("EMBEDDING_BATCH_MAX_IN_FLIGHT", "4"))
+
+EMBEDDING_BULK_CHUNK_SIZE = int(os.getenv("EMBEDDING_BULK_CHUNK_SIZE", "512"))
+EMBEDDING_BULK_MAX_TOKENS = int(os.getenv("EMBEDDING_BULK_MAX_TOKENS", "100000"))
+EMBEDDING_BULK_CONCURRENCY = int(os.getenv("EMBEDDING_BULK_CONCURRENCY", "4"))
+EMBEDDING_BULK_MAX_RETRIES = int(os.getenv("EMBEDDING_BULK_MAX_RETRIES", "5"))
+
+VECTOR_SEARCH_MODE = os.getenv("VECTOR_SEARCH_MODE", "full").lower()
+BINARY_RERANK_OVERFETCH = int(os.getenv("BINARY_RERANK_OVERFETCH", "10"))
+HNSW_ITERATIVE_SCAN = os.getenv("HNSW_ITERATIVE_SCAN", "relaxed_order").lower()
+
+VECTOR_INDEX_TYPE = os.getenv("VECTOR_INDEX_TYPE", "hnsw").lower()
+HNSW_M = int(os.getenv("HNSW_M", "16"))
+HNSW_EF_CONSTRUCTION = int(os.getenv("HNSW_EF_CONSTRUCTION", "64"))
+HNSW_EF_SEARCH = int(os.getenv("HNSW_EF_SEARCH", "40"))
+IVFFLAT_LISTS = int(os.getenv("IVFFLAT_LISTS", "100"))
+IVFFLAT_PROBES = int(os.getenv("IVFFLAT_PROBES", "10"))
+
+ROUTER_FAST_PATH = os.getenv("ROUTER_FAST_PATH", "false").lower() == "true"
+ROUTER_MARGIN_THRESHOLD = float(os.getenv("ROUTER_MARGIN_THRESHOLD", "0.05"))
+ROUTER_SHADOW_RATE = float(os.getenv("ROUTER_SHADOW_RATE", "0.05"))
+
+SPECULATIVE_RETRIEVAL = os.getenv("SPECULATIVE_RETRIEVAL", "false").lower() == "true"
+
+LLM_TIMEOUT_SECONDS = float(os.getenv("LLM_TIMEOUT_SECONDS", "30"))
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "1"))
+LLM_HEDGING = os.getenv("LLM_HEDGING", "false").lower() == "true"
+LLM_HEDGE_QUANTILE = float(os.getenv("LLM_HEDGE_QUANTILE", "0.95"))
+LLM_HEDGE_MIN_SAMPLES = int(os.getenv("LLM_HEDGE_MIN_SAMPLES", "20"))
+
+# Per-agent overrides, e.g. SUPERVISOR_LLM_TIMEOUT_SECONDS or WORKFLOW_ADVISOR_LLM_HEDGING
+LLM_AGENTS = ("supervisor", "tool_finder", "org_matcher", "workflow_advisor")
+LLM_POLICIES = {
+    agent: {
+        "timeout_seconds": float(os.getenv(f"{agent.upper()}_LLM_TIMEOUT_SECONDS", LLM_TIMEOUT_SECONDS)),
+        "max_retries": int(os.getenv(f"{agent.upper()}_LLM_MAX_RETRIES", LLM_MAX_RETRIES)),
+        "hedging": os.getenv(f"{agent.upper()}_LLM_HEDGING", str(LLM_HEDGING)).lower() == "true",
+    }
+    for agent in LLM_AGENTS
+}
+
+DB_PREPARE_THRESHOLD = int(os.getenv("DB_PREPARE_THRESHOLD", "1"))
+
+RETRIEVER_BACKEND = os.getenv("RETRIEVER_BACKEND", "pgvector").lower()
+IN_MEMORY_MAX_ROWS = int(os.getenv("IN_MEMORY_MAX_ROWS", "100000"))
+IN_MEMORY_RETRY_SECONDS = float(os.getenv("IN_MEMORY_RETRY_SECONDS", "30"))
+
+RETRIEVAL_CACHE_ENABLED = os.getenv("RETRIEVAL_CACHE_ENABLED", "true").lower() == "true"
+RETRIEVAL_CACHE_MAX_MB = float(os.getenv("RETRIEVAL_CACHE_MAX_MB", "64"))
+CATALOG_VERSION_CHECK_SECONDS = float(os.getenv("CATALOG_VERSION_CHECK_SECONDS", "1"))
+CATALOG_VERSION_LISTEN = os.getenv("CATALOG_VERSION_LISTEN", "true").lower() == "true"
+
+ANSWER_CACHE_ENABLED = os.getenv("ANSWER_CACHE_ENABLED", "true").lower() == "true"
+ANSWER_CACHE_THRESHOLD = float(os.getenv("ANSWER_CACHE_THRESHOLD", "0.95"))
+ANSWER_CACHE_TTL_SECONDS = float(os.getenv("ANSWER_CACHE_TTL_SECONDS", "3600"))
+ANSWER_CACHE_SIZE = int(os.getenv("ANSWER_CACHE_SIZE", "1000"))
+
+BATCH_MAX_CONCURRENCY = int(os.getenv("BATCH_MAX_CONCURRENCY", "8"))
+BATCH_MAX_QUERIES = int(os.getenv("BATCH_MAX_QUERIES", "1000"))
+
+TRACING_ENABLED = os.getenv("TRACING_ENABLED", "false").lower() == "true"
+TRACE_SAMPLE_RATE = float(os.getenv("TRACE_SAMPLE_RATE", "0.01"))
+TRACE_EXPORTER = os.getenv("TRACE_EXPORTER", "jsonl").lower()
+TRACE_JSONL_PATH = os.getenv("TRACE_JSONL_PATH", "logs/traces.jsonl")
+TRACE_OTLP_ENDPOINT = os.getenv("TRACE_OTLP_ENDPOINT", "http://localhost:4318/v1/traces")
+TRACE_SERVICE_NAME = os.getenv("TRACE_SERVICE_NAME", "clinical-ai-agent")
+
+USAGE_TRACKING_ENABLED = os.getenv("USAGE_TRACKING_ENABLED", "true").lower() == "true"
+# OpenAI list prices in USD per million tokens: (input, output)
+MODEL_PRICES = {
+    "gpt-4o-mini": (0.15, 0.60),
+    "text-embedding-3-small": (0.02, 0.0),
+    "text-embedding-3-large": (0.13, 0.0),
+}
+
+CHECKPOINT_WRITE_BEHIND = os.getenv("CHECKPOINT_WRITE_BEHIND", "false").lower() == "true"
+CHECKPOINT_DURABILITY = os.getenv("CHECKPOINT_DURABILITY", "async").lower()
+CHECKPOINT_FLUSH_INTERVAL_MS = float(os.getenv("CHECKPOINT_FLUSH_INTERVAL_MS", "50"))
+CHECKPOINT_FLUSH_MAX_ROWS = int(os.getenv("CHECKPOINT_FLUSH_MAX_ROWS", "500"))
@@ -0,0 +1,233 @@
+"""Catalog version tracking for cache invalidation."""
+
+import select
+import threading
+import time
+
+import psycopg
+from sqlalchemy import event, text
+
+from src.config import DATABASE_URL, CATALOG_VERSION_CHECK_SECONDS, CATALOG_VERSION_LISTEN
+from src.db.models.base import engine, async_engine, SessionLocal
+from src.db.models.organization import ClinicalOrganization
+from src.db.models.tool import ClinicalTool
+from src.logger import get_logger
+
+logger = get_logger(__name__)
+
+CATALOG_MODELS = (ClinicalTool, ClinicalOrganization)
+CATALOG_TABLES = tuple(model.__tablename__ for model in CATALOG_MODELS)
+
+NOTIFY_CHANNEL = "catalog_versions"
+LISTEN_POLL_SECONDS = 5
+LISTEN_MAX_BACKOFF_SECONDS = 30
+
+
+def catalog_trigger_sql(tables: tuple[str, ...]) -> list[str]:
+    """
+    DDL for the trigger that bumps catalog_versions on every write statement
+    and notifies listeners when the writing transaction commits. Shared by
+    migration 005 and init_schema.
+    """
+    statements = [f"""
+        CREATE OR REPLACE FUNCTION bump_catalog_version() RETURNS trigger AS $$
+        BEGIN
+            INSERT INTO catalog_versions (table_name, version, updated_at)
+            VALUES (TG_TABLE_NAME, 1, now())
+            ON CONFLICT (table_name)
+            DO UPDATE SET version = catalog_versions.version + 1, updated_at = now();
+            PERFORM pg_notify('{NOTIFY_CHANNEL}', TG_TABLE_NAME);
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+    """]
+    for table in tables:
+        statements.append(f"DROP TRIGGER IF EXISTS {table}_catalog_version ON {table}")
+        statements.append(f"""
+            CREATE TRIGGER {table}_catalog_version
+            AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON {table}
+            FOR EACH STATEMENT EXECUTE FUNCTION bump_catalog_version()
+        """)
+    return statements
+
+
+class CatalogVersionTracker:
+    """
+    Monotonic version number for the catalog tables.
+
+    Combines the shared `catalog_versions` counters (bumped by a trigger on
+    every write statement, from any process) with a local counter bumped by
+    `bump()` after in-process catalog commits and seeding. Local bumps are
+    visible immediately. With `listen`, a background thread LISTENs for the
+    trigger's NOTIFY, so the counters are re-read as soon as another process
+    commits a catalog write and not otherwise; while that connection is down
+    they are re-read every `check_seconds` instead. Async callers use
+    `acurrent()`, which re-reads the counters on the async engine so the
+    event loop never waits on the sync pool.
+    """
+
+    def __init__(
+        self,
+        check_seconds: float = CATALOG_VERSION_CHECK_SECONDS,
+        listen: bool = CATALOG_VERSION_LISTEN,
+    ):
+        self.check_seconds = check_seconds
+        self.listen = listen
+        self._db_version = 0
+        self._local_version = 0
+        self._checked_at: float | None = None
+        self._notifications = 0
+        self._listening = False
+        self._listener: threading.Thread | None = None
+        self._closed = threading.Event()
+        self._arefreshing = False
+        self._lock = threading.Lock()
+
+    def current(self) -> int:
+        """Return the catalog version, re-reading the shared counters when due."""
+        self._ensure_listener()
+        if self._due():
+            self._refresh()
+        return self._db_version + self._local_version
+
+    async def acurrent(self) -> int:
+        """Async current(); concurrent callers share one in-flight re-read."""
+        self._ensure_listener()
+        if self._due():
+            with self._lock:
+                refresh, self._arefreshing = not self._arefreshing, True
+            if refresh:
+                try:
+                    await self._arefresh()
+                finally:
+                    self._arefreshing = False
+        return self._db_version + self._local_version
+
+    def bump(self) -> int:
+        """Invalidate everything tagged with the current version."""
+        with self._lock:
+            self._local_version += 1
+            self._checked_at = None
+        logger.info("Catalog version bumped")
+        return self.current()
+
+    def close(self) -> None:
+        """Stop the listener thread."""
+        self._closed.set()
+        if self._listener is not None:
+            self._listener.join(timeout=LISTEN_POLL_SECONDS + 1)
+
+    def _due(self) -> bool:
+        checked_at = self._checked_at
+        if checked_at is None:
+            return True
+        return not self._listening and time.monotonic() - checked_at >= self.check_seconds
+
+    def _ensure_listener(self) -> None:
+        """Start the NOTIFY listener on first use."""
+        if not self.listen or self._listener is not None:
+            return
+        with self._lock:
+            if self._listener is None and not self._closed.is_set():
+                self._listener = threading.Thread(target=self._listen, name="catalog-listener", daemon=True)
+                self._listener.start()
+
+    def _listen(self) -> None:
+        """LISTEN for catalog writes, reconnecting with backoff."""
+        backoff = 1
+        while not self._closed.is_set():
+            try:
+                with psycopg.connect(DATABASE_URL, autocommit=True) as conn:
+                    conn.add_notify_handler(self._on_notify)
+                    conn.execute(f"LISTEN {NOTIFY_CHANNEL}")
+                    # Writes committed while disconnected were never notified.
+                    self._set_listening(True)
+                    backoff = 1
+                    while not self._closed.is_set():
+                        if select.select([conn.fileno()], [], [], LISTEN_POLL_SECONDS)[0]:
+                            conn.execute("SELECT 1")
+            except Exception as e:
+                logger.warning(
+                    f"Catalog version listener disconnected, polling every {self.check_seconds}s: {e}"
+                )
+            finally:
+                self._set_listening(False)
+            self._closed.wait(backoff)
+            backoff = min(backoff * 2, LISTEN_MAX_BACKOFF_SECONDS)
+
+    def _set_listening(self, listening: bool) -> None:
+        with self._lock:
+            self._listening = listening
+            self._notifications += 1
+            self._checked_at = None
+
+    def _on_notify(self, notify=None) -> None:
+        """Another transaction committed a catalog write: re-read on next use."""
+        with self._lock:
+            self._notifications += 1
+            self._checked_at = None
+
+    def _refresh(self) -> None:
+        """Read the shared counters; on failure keep the previous value."""
+        notifications = self._notifications
+        try:
+            db_version = self._read_db_version()
+        except Exception as e:
+            logger.warning(f"Catalog version check failed, keeping previous version: {e}")
+            db_version = self._db_version
+        self._store(db_version, notifications)
+
+    async def _arefresh(self) -> None:
+        """Async _refresh."""
+        notifications = self._notifications
+        try:
+            db_version = await self._aread_db_version()
+        except Exception as e:
+            logger.warning(f"Catalog version check failed, keeping previous version: {e}")
+            db_version = self._db_version
+        self._store(db_version, notifications)
+
+    def _store(self, db_version: int, notifications: int) -> None:
+        """Keep the newest version; stay due if a notification arrived during the read."""
+        with self._lock:
+            self._db_version = max(self._db_version, db_version)
+            if self._notifications == notifications:
+                self._checked_at = time.monotonic()
+
+    def _read_db_version(self) -> int:
+        """Sum of the per-table write counters."""
+        with engine.connect() as conn:
+            return int(conn.execute(
+                text("SELECT COALESCE(SUM(version), 0) FROM catalog_versions")
+            ).scalar_one())
+
+    async def _aread_db_version(self) -> int:
+        """Async _read_db_version."""
+        async with async_engine.connect() as conn:
+            return int((await conn.execute(
+                text("SELECT COALESCE(SUM(version), 0) FROM catalog_versions")
+            )).scalar_one())
+
+
+catalog_version = CatalogVersionTracker()
+
+
+@event.listens_for(SessionLocal, "after_flush")
+def _track_catalog_writes(session, flush_context):
+    """Remember that this transaction touched a catalog table."""
+    touched = (*session.new, *session.dirty, *session.deleted)
+    if any(isinstance(obj, CATALOG_MODELS) for obj in touched):
+        session.info["catalog_changed"] = True
+
+
+@event.listens_for(SessionLocal, "after_commit")
+def _bump_after_catalog_commit(session):
+    """Bump after commit so pre-commit rows are never cached under the new version."""
+    if session.info.pop("catalog_changed", False):
+        catalog_version.bump()
+
+
+@event.listens_for(SessionLocal, "after_rollback")
+def _clear_catalog_flag(session):
+    """Forget catalog writes from a rolled-back transaction."""
+    session.info.pop("catalog_changed", None)
@@ -0,0 +1,201 @@
+"""Write-behind buffer that batches checkpoint rows into periodic transactions."""
+
+import atexit
+import threading
+import time
+from collections import Counter
+from concurrent.futures import Future
+from typing import Callable, Optional
+
+from src.config import CHECKPOINT_FLUSH_INTERVAL_MS, CHECKPOINT_FLUSH_MAX_ROWS
+from src.metrics import checkpoint_seconds
+from src.logger import get_logger
+
+logger = get_logger(__name__)
+
+MAX_ATTEMPTS = 3
+
+FlushFunction = Callable[[dict[str, list[dict]]], None]
+
+
+class WriteBehindBuffer:
+    """
+    Hold rows in memory and write them from a background thread.
+    
+    Rows added within `flush_interval_ms` of the first pending row (or until
+    `max_rows` are pending) are passed to `flush_fn` together, grouped by
+    kind, so many graph steps share one transaction. Each row belongs to a
+    key (the thread ID); `pending(key)` says whether any of the key's rows
+    are not committed yet, and `flush()` writes everything in the calling
+    thread, e.g. before reading that thread back or at shutdown.
+    
+    `add(..., wait=True)` returns a future resolved when the row is committed
+    (or failed). A failed batch is retried thread by thread right away; rows
+    that still fail are failed for their waiters, and rows nobody waits on
+    are retried on the next flush, up to MAX_ATTEMPTS times, before being
+    dropped with an error log. `flush()` returns the error of each key whose
+    rows it could not write.
+    """
+    
+    def __init__(
+        self,
+        flush_fn: FlushFunction,
+        flush_interval_ms: float = CHECKPOINT_FLUSH_INTERVAL_MS,
+        max_rows: int = CHECKPOINT_FLUSH_MAX_ROWS,
+    ):
+        self.flush_fn = flush_fn
+        self.flush_interval_ms = flush_interval_ms
+        self.max_rows = max_rows
+        
+        self._rows: list[tuple[str, dict, str, Optional[Future], int]] = []
+        self._unflushed: Counter[str] = Counter()
+        self._cond = threading.Condition()
+        self._flush_lock = threading.Lock()
+        self._worker: Optional[threading.Thread] = None
+        self._closed = False
+        self._counts = {"flushes": 0, "rows_written": 0, "failed_flushes": 0, "rows_dropped": 0}
+    
+    def add(self, kind: str, row: dict, key: str, wait: bool = False) -> Optional[Future]:
+        """Buffer a row; with wait, return a future resolved once it is committed."""
+        future: Optional[Future] = Future() if wait else None
+        with self._cond:
+            self._rows.append((kind, row, key, future, 0))
+            self._unflushed[key] += 1
+            closed = self._closed
+            self._cond.notify()
+        if closed:
+            self.flush()
+        else:
+            self._ensure_worker()
+        return future
+    
+    def pending(self, key: str) -> bool:
+        """True while rows for key are buffered or being written."""
+        with self._cond:
+            return self._unflushed[key] > 0
+    
+    def flush(self) -> dict[str, Exception]:
+        """Write all buffered rows now, in the calling thread; errors by key of the rows that failed."""
+        with self._flush_lock:
+            with self._cond:
+                batch, self._rows = self._rows, []
+            if batch:
+                return self._write(batch)
+            return {}
+    
+    def close(self) -> None:
+        """Stop the background thread and write whatever is still buffered."""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        if self._worker is not None:
+            self._worker.join(timeout=10)
+        self.flush()
+    
+    def stats(self) -> dict:
+        with self._cond:
+            return {**self._counts, "buffered_rows": len(self._rows)}
+    
+    def _ensure_worker(self) -> None:
+        """Start the background flush thread on first use."""
+        if self._worker is not None:
+            return
+        with self._cond:
+            if self._worker is None:
+                self._worker = threading.Thread(target=self._run, name="checkpoint-writer", daemon=True)
+                self._worker.start()
+                atexit.register(self.close)
+    
+    def _run(self) -> None:
+        """Wait for a row, give others flush_interval_ms to join it, then flush."""
+        while True:
+            with self._cond:
+                while not self._rows and not self._closed:
+                    self._cond.wait()
+                if self._closed:
+                    return
+                deadline = time.monotonic() + self.flush_interval_ms / 1000
+                while len(self._rows) < self.max_rows and not self._closed:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._cond.wait(remaining)
+            self.flush()
+    
+    def _write(self, batch: list[tuple[str, dict, str, Optional[Future], int]]) -> dict[str, Exception]:
+        """
+        Write one batch and settle its rows; returns errors by key of the failed rows.
+        
+        If the batch's transaction fails, each thread's rows are retried in a
+        transaction of their own, so one bad row (e.g. a checkpoint of a thread
+        deleted mid-stream) only fails the rows of its own thread.
+        """
+        try:
+            self._flush_rows(batch)
+        except Exception as e:
+            keys = list(dict.fromkeys(key for _, _, key, _, _ in batch))
+            if len(keys) == 1:
+                self._failed(batch, e)
+                return {keys[0]: e}
+            logger.warning(f"Checkpoint flush of {len(batch)} rows failed ({e}), retrying per thread")
+            errors: dict[str, Exception] = {}
+            for key in keys:
+                group = [item for item in batch if item[2] == key]
+                try:
+                    self._flush_rows(group)
+                except Exception as group_error:
+                    self._failed(group, group_error)
+                    errors[key] = group_error
+                else:
+                    self._succeeded(group)
+            return errors
+        self._succeeded(batch)
+        return {}
+    
+    def _flush_rows(self, batch: list[tuple[str, dict, str, Optional[Future], int]]) -> None:
+        """Hand rows to flush_fn, grouped by kind."""
+        rows_by_kind: dict[str, list[dict]] = {}
+        for kind, row, _, _, _ in batch:
+            rows_by_kind.setdefault(kind, []).append(row)
+        with checkpoint_seconds.time(op="flush"):
+            self.flush_fn(rows_by_kind)
+    
+    def _succeeded(self, batch: list[tuple[str, dict, str, Optional[Future], int]]) -> None:
+        """Count committed rows and resolve their futures."""
+        with self._cond:
+            self._counts["flushes"] += 1
+            self._counts["rows_written"] += len(batch)
+            self._settle(batch)
+        for _, _, _, future, _ in batch:
+            if future is not None:
+                future.set_result(None)
+    
+    def _failed(self, batch: list[tuple[str, dict, str, Optional[Future], int]], error: Exception) -> None:
+        """Fail waiting rows, requeue the others (up to MAX_ATTEMPTS)."""
+        retry, done = [], []
+        for kind, row, key, future, attempts in batch:
+            if future is None and attempts + 1 < MAX_ATTEMPTS:
+                retry.append((kind, row, key, None, attempts + 1))
+            else:
+                done.append((kind, row, key, future, attempts))
+        
+        dropped = sum(1 for item in done if item[3] is None)
+        logger.exception(
+            f"Checkpoint flush of {len(batch)} rows failed ({error}); "
+            f"{len(retry)} requeued, {dropped} dropped"
+        )
+        with self._cond:
+            self._counts["failed_flushes"] += 1
+            self._counts["rows_dropped"] += dropped
+            self._rows[:0] = retry
+            self._settle(done)
+        for _, _, _, future, _ in done:
+            if future is not None:
+                future.set_exception(error)
+    
+    def _settle(self, items: list) -> None:
+        """Stop counting items as unflushed (caller holds the lock)."""
+        for _, _, key, _, _ in items:
+            self._unflushed[key] -= 1
+            if self._unflushed[key] <= 0:
+                del self._unflushed[key]
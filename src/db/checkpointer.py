@@ -1,20 +1,153 @@
 """PostgreSQL checkpointer for LangGraph state persistence using SQLAlchemy."""
 
+import asyncio
 import json
-from typing import Optional, Iterator
+from datetime import datetime
+from typing import Optional, Iterator, AsyncIterator, Sequence
 
 from langgraph.checkpoint.base import BaseCheckpointSaver, Checkpoint, CheckpointMetadata
-from langgraph.checkpoint.base import CheckpointTuple
+from langgraph.checkpoint.base import CheckpointTuple, WRITES_IDX_MAP
 from sqlalchemy import text
 
-from src.db.models.base import engine
+from src.config import (
+    CHECKPOINT_WRITE_BEHIND, CHECKPOINT_DURABILITY, CHECKPOINT_FLUSH_INTERVAL_MS, CHECKPOINT_FLUSH_MAX_ROWS
+)
+from src.db.checkpoint_buffer import WriteBehindBuffer
+from src.db.models.base import engine, async_engine
+from src.metrics import checkpoint_seconds
+from src.tracing import span
 from src.logger import get_logger
 
 logger = get_logger(__name__)
 
+DURABILITY_MODES = ("sync", "async")
+
+# Rows to insert, keyed by INSERTS kind.
+RowsByKind = dict[str, list[dict]]
+
+# Parameters per row bound by the multi-row INSERTs; psycopg allows 65535 per statement.
+MAX_STATEMENT_PARAMS = 30000
+
+# kind: (INSERT prefix, bind parameter names in column order, conflict clause, key parameters)
+INSERTS = {
+    "checkpoint": (
+        "INSERT INTO langgraph_checkpoints"
+        " (thread_id, checkpoint_id, parent_checkpoint_id, state, metadata, created_at)",
+        ("thread_id", "checkpoint_id", "parent_id", "state", "metadata", "created_at"),
+        "ON CONFLICT (thread_id, checkpoint_id)"
+        " DO UPDATE SET state = EXCLUDED.state, metadata = EXCLUDED.metadata",
+        ("thread_id", "checkpoint_id"),
+    ),
+    # Regular writes are idempotent per (task, idx): the first one wins.
+    "write": (
+        "INSERT INTO langgraph_checkpoint_writes"
+        " (thread_id, checkpoint_id, task_id, idx, channel, type, value, task_path, created_at)",
+        ("thread_id", "checkpoint_id", "task_id", "idx", "channel", "type", "value", "task_path", "created_at"),
+        "ON CONFLICT (thread_id, checkpoint_id, task_id, idx) DO NOTHING",
+        ("thread_id", "checkpoint_id", "task_id", "idx"),
+    ),
+    # Special channels (errors, interrupts, resumes) keep their latest value.
+    "write_upsert": (
+        "INSERT INTO langgraph_checkpoint_writes"
+        " (thread_id, checkpoint_id, task_id, idx, channel, type, value, task_path, created_at)",
+        ("thread_id", "checkpoint_id", "task_id", "idx", "channel", "type", "value", "task_path", "created_at"),
+        "ON CONFLICT (thread_id, checkpoint_id, task_id, idx)"
+        " DO UPDATE SET channel = EXCLUDED.channel, type = EXCLUDED.type, value = EXCLUDED.value",
+        ("thread_id", "checkpoint_id", "task_id", "idx"),
+    ),
+}
+
+GET_SQL = """
+    SELECT checkpoint_id, parent_checkpoint_id, state, metadata
+    FROM langgraph_checkpoints
+    WHERE thread_id = :thread_id AND checkpoint_id = :checkpoint_id
+"""
+
+LATEST_SQL = """
+    SELECT checkpoint_id, parent_checkpoint_id, state, metadata
+    FROM langgraph_checkpoints
+    WHERE thread_id = :thread_id
+    ORDER BY created_at DESC
+    LIMIT 1
+"""
+
+LIST_SQL = """
+    SELECT checkpoint_id, parent_checkpoint_id, state, metadata
+    FROM langgraph_checkpoints
+    WHERE thread_id = :thread_id
+    ORDER BY created_at DESC
+"""
+
+WRITES_SQL = """
+    SELECT task_id, channel, type, value
+    FROM langgraph_checkpoint_writes
+    WHERE thread_id = :thread_id AND checkpoint_id = :checkpoint_id
+    ORDER BY task_id, idx
+"""
+
+
+def dedupe_rows(kind: str, rows: list[dict]) -> list[dict]:
+    """Rows with one entry per primary key; an upsert keeps the last, DO NOTHING the first."""
+    key_params = INSERTS[kind][3]
+    unique: dict[tuple, dict] = {}
+    for row in rows:
+        key = tuple(row[name] for name in key_params)
+        if kind == "write" and key in unique:
+            continue
+        unique[key] = row
+    return list(unique.values())
+
+
+def insert_statements(rows_by_kind: RowsByKind) -> list[tuple[str, dict]]:
+    """
+    Multi-row INSERTs writing rows_by_kind, as (SQL, params) pairs.
+    
+    Checkpoints come before writes, and each statement holds as many rows as
+    fit in MAX_STATEMENT_PARAMS bind parameters.
+    """
+    statements = []
+    for kind in INSERTS:
+        rows = dedupe_rows(kind, rows_by_kind.get(kind, []))
+        prefix, param_names, conflict, _ = INSERTS[kind]
+        chunk_size = MAX_STATEMENT_PARAMS // len(param_names)
+        for start in range(0, len(rows), chunk_size):
+            values, params = [], {}
+            for i, row in enumerate(rows[start:start + chunk_size]):
+                values.append("(" + ", ".join(f":{name}_{i}" for name in param_names) + ")")
+                params.update({f"{name}_{i}": row[name] for name in param_names})
+            statements.append((f"{prefix} VALUES {', '.join(values)} {conflict}", params))
+    return statements
+
 
 class PostgresCheckpointer(BaseCheckpointSaver):
-    """Persist LangGraph checkpoints to PostgreSQL using SQLAlchemy."""
+    """
+    Persist LangGraph checkpoints and pending writes to PostgreSQL using SQLAlchemy.
+    
+    The sync methods (put, put_writes, get_tuple, list) use the sync engine;
+    the async ones (aput, aput_writes, aget_tuple, alist) run the same
+    statements on the async engine's connection pool, so graphs driven by
+    ainvoke/astream never block the event loop.
+    
+    With write_behind, put and put_writes only buffer their rows; a
+    background thread writes them in batched multi-row INSERTs (see
+    WriteBehindBuffer). durability "async" returns right away, "sync" waits
+    until the batch holding the row is committed. Reads flush a thread's
+    buffered rows first and raise the flush error if that fails, and
+    close() flushes everything at shutdown.
+    """
+    
+    def __init__(
+        self,
+        write_behind: bool = CHECKPOINT_WRITE_BEHIND,
+        durability: str = CHECKPOINT_DURABILITY,
+        flush_interval_ms: float = CHECKPOINT_FLUSH_INTERVAL_MS,
+        max_rows: int = CHECKPOINT_FLUSH_MAX_ROWS,
+    ):
+        super().__init__()
+        if durability not in DURABILITY_MODES:
+            raise ValueError(f"durability must be one of {DURABILITY_MODES}, got '{durability}'")
+        self.durability = durability
+        self.buffer = WriteBehindBuffer(self._flush, flush_interval_ms, max_rows) if write_behind else None
     
     def put(
         self,
@@ -24,38 +157,34 @@ class PostgresCheckpointer(BaseCheckpointSaver):
         new_versions: dict
     ) -> dict:
         """Save a checkpoint to the database."""
-        thread_id = config.get("configurable", {}).get("thread_id")
-        checkpoint_id = checkpoint.get("id")
-        parent_id = config.get("configurable", {}).get("checkpoint_id")
-        
-        if not thread_id:
-            raise ValueError("thread_id is required in config")
+        params = self._put_params(config, checkpoint, metadata)
+        logger.info(f"Saving checkpoint {params['checkpoint_id']} for thread {params['thread_id']}")
         
-        logger.info(f"Saving checkpoint {checkpoint_id} for thread {thread_id}")
+        try:
+            with span("checkpoint.put"), checkpoint_seconds.time(op="put"):
+                self._save({"checkpoint": [params]}, params["thread_id"])
+            
+            return self._checkpoint_config(params["thread_id"], params["checkpoint_id"])
+        except Exception as e:
+            logger.exception(f"Failed to save checkpoint: {e}")
+            raise
+    
+    async def aput(
+        self,
+        config: dict,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: dict
+    ) -> dict:
+        """Async put."""
+        params = self._put_params(config, checkpoint, metadata)
+        logger.info(f"Saving checkpoint {params['checkpoint_id']} for thread {params['thread_id']}")
         
         try:
-            with engine.connect() as conn:
-                conn.execute(text("""
-                    INSERT INTO langgraph_checkpoints 
-                    (thread_id, checkpoint_id, parent_checkpoint_id, state, metadata)
-                    VALUES (:thread_id, :checkpoint_id, :parent_id, :state, :metadata)
-                    ON CONFLICT (thread_id, checkpoint_id) 
-                    DO UPDATE SET state = EXCLUDED.state, metadata = EXCLUDED.metadata
-                """), {
-                    "thread_id": thread_id,
-                    "checkpoint_id": checkpoint_id,
-                    "parent_id": parent_id,
-                    "state": json.dumps(checkpoint),
-                    "metadata": json.dumps(metadata) if metadata else None
-                })
-                conn.commit()
+            with span("checkpoint.put"), checkpoint_seconds.time(op="put"):
+                await self._asave({"checkpoint": [params]}, params["thread_id"])
             
-            return {
-                "configurable": {
-                    "thread_id": thread_id,
-                    "checkpoint_id": checkpoint_id
-                }
-            }
+            return self._checkpoint_config(params["thread_id"], params["checkpoint_id"])
         except Exception as e:
             logger.exception(f"Failed to save checkpoint: {e}")
             raise
@@ -64,64 +193,73 @@ class PostgresCheckpointer(BaseCheckpointSaver):
         self,
         config: dict,
         writes: list,
-        task_id: str
+        task_id: str,
+        task_path: str = ""
     ) -> None:
-        """Save intermediate writes (no-op for simple implementation)."""
-        pass
+        """Save a task's channel writes for the checkpoint in config."""
+        rows_by_kind = self._writes_rows(config, writes, task_id, task_path)
+        if not rows_by_kind:
+            return
+        thread_id = config["configurable"]["thread_id"]
+        
+        try:
+            with span("checkpoint.put_writes", writes=len(writes)), checkpoint_seconds.time(op="put_writes"):
+                self._save(rows_by_kind, thread_id)
+        except Exception as e:
+            logger.exception(f"Failed to save checkpoint writes: {e}")
+            raise
+    
+    async def aput_writes(
+        self,
+        config: dict,
+        writes: list,
+        task_id: str,
+        task_path: str = ""
+    ) -> None:
+        """Async put_writes."""
+        rows_by_kind = self._writes_rows(config, writes, task_id, task_path)
+        if not rows_by_kind:
+            return
+        thread_id = config["configurable"]["thread_id"]
+        
+        try:
+            with span("checkpoint.put_writes", writes=len(writes)), checkpoint_seconds.time(op="put_writes"):
+                await self._asave(rows_by_kind, thread_id)
+        except Exception as e:
+            logger.exception(f"Failed to save checkpoint writes: {e}")
+            raise
     
     def get_tuple(self, config: dict) -> Optional[CheckpointTuple]:
-        """Get the latest checkpoint for a thread."""
-        thread_id = config.get("configurable", {}).get("thread_id")
-        checkpoint_id = config.get("configurable", {}).get("checkpoint_id")
+        """Get the latest checkpoint for a thread, with its pending writes."""
+        thread_id, query, params = self._get_query(config)
+        if not thread_id:
+            return None
         
+        self._flush_thread(thread_id)
+        try:
+            with span("checkpoint.get_tuple"), checkpoint_seconds.time(op="get_tuple"), engine.connect() as conn:
+                row = conn.execute(text(query), params).fetchone()
+                writes = conn.execute(text(WRITES_SQL), self._writes_params(thread_id, row)).fetchall() if row else []
+            return self._found(thread_id, row, writes)
+        except Exception as e:
+            logger.exception(f"Failed to get checkpoint: {e}")
+            return None
+    
+    async def aget_tuple(self, config: dict) -> Optional[CheckpointTuple]:
+        """Async get_tuple."""
+        thread_id, query, params = self._get_query(config)
         if not thread_id:
             return None
         
+        await self._aflush_thread(thread_id)
         try:
-            with engine.connect() as conn:
-                if checkpoint_id:
-                    result = conn.execute(text("""
-                        SELECT checkpoint_id, parent_checkpoint_id, state, metadata
-                        FROM langgraph_checkpoints
-                        WHERE thread_id = :thread_id AND checkpoint_id = :checkpoint_id
-                    """), {"thread_id": thread_id, "checkpoint_id": checkpoint_id})
-                else:
-                    result = conn.execute(text("""
-                        SELECT checkpoint_id, parent_checkpoint_id, state, metadata
-                        FROM langgraph_checkpoints
-                        WHERE thread_id = :thread_id
-                        ORDER BY created_at DESC
-                        LIMIT 1
-                    """), {"thread_id": thread_id})
-                
-                row = result.fetchone()
-                
-                if not row:
-                    logger.debug(f"No checkpoint found for thread {thread_id}")
-                    return None
-                
-                row_dict = row._mapping
-                checkpoint_data = row_dict["state"]
-                metadata_data = row_dict["metadata"] or {}
-                
-                logger.debug(f"Retrieved checkpoint {row_dict['checkpoint_id']} for thread {thread_id}")
-                
-                return CheckpointTuple(
-                    config={
-                        "configurable": {
-                            "thread_id": thread_id,
-                            "checkpoint_id": row_dict["checkpoint_id"]
-                        }
-                    },
-                    checkpoint=checkpoint_data,
-                    metadata=metadata_data,
-                    parent_config={
-                        "configurable": {
-                            "thread_id": thread_id,
-                            "checkpoint_id": row_dict["parent_checkpoint_id"]
-                        }
-                    } if row_dict["parent_checkpoint_id"] else None
-                )
+            with span("checkpoint.get_tuple"), checkpoint_seconds.time(op="get_tuple"):
+                async with async_engine.connect() as conn:
+                    row = (await conn.execute(text(query), params)).fetchone()
+                    writes = (
+                        await conn.execute(text(WRITES_SQL), self._writes_params(thread_id, row))
+                    ).fetchall() if row else []
+            return self._found(thread_id, row, writes)
         except Exception as e:
             logger.exception(f"Failed to get checkpoint: {e}")
             return None
@@ -135,47 +273,211 @@ class PostgresCheckpointer(BaseCheckpointSaver):
         limit: Optional[int] = None
     ) -> Iterator[CheckpointTuple]:
         """List checkpoints for a thread."""
-        if not config:
-            return
-        
-        thread_id = config.get("configurable", {}).get("thread_id")
+        thread_id, query, params = self._list_query(config, limit)
         if not thread_id:
             return
         
+        self._flush_thread(thread_id)
         try:
             with engine.connect() as conn:
-                query = """
-                    SELECT checkpoint_id, parent_checkpoint_id, state, metadata
-                    FROM langgraph_checkpoints
-                    WHERE thread_id = :thread_id
-                    ORDER BY created_at DESC
-                """
-                params = {"thread_id": thread_id}
-                
-                if limit:
-                    query += " LIMIT :limit"
-                    params["limit"] = limit
-                
                 result = conn.execute(text(query), params)
-                
                 for row in result:
-                    row_dict = row._mapping
-                    yield CheckpointTuple(
-                        config={
-                            "configurable": {
-                                "thread_id": thread_id,
-                                "checkpoint_id": row_dict["checkpoint_id"]
-                            }
-                        },
-                        checkpoint=row_dict["state"],
-                        metadata=row_dict["metadata"] or {},
-                        parent_config={
-                            "configurable": {
-                                "thread_id": thread_id,
-                                "checkpoint_id": row_dict["parent_checkpoint_id"]
-                            }
-                        } if row_dict["parent_checkpoint_id"] else None
-                    )
+                    yield self._to_tuple(thread_id, row)
         except Exception as e:
             logger.exception(f"Failed to list checkpoints: {e}")
             return
+    
+    async def alist(
+        self,
+        config: Optional[dict],
+        *,
+        filter: Optional[dict] = None,
+        before: Optional[dict] = None,
+        limit: Optional[int] = None
+    ) -> AsyncIterator[CheckpointTuple]:
+        """Async list, streaming rows from a server-side cursor."""
+        thread_id, query, params = self._list_query(config, limit)
+        if not thread_id:
+            return
+        
+        await self._aflush_thread(thread_id)
+        try:
+            async with async_engine.connect() as conn:
+                result = await conn.stream(text(query), params)
+                async for row in result:
+                    yield self._to_tuple(thread_id, row)
+        except Exception as e:
+            logger.exception(f"Failed to list checkpoints: {e}")
+            return
+    
+    def close(self) -> None:
+        """Write any buffered rows and stop the write-behind thread."""
+        if self.buffer is not None:
+            self.buffer.close()
+    
+    def _save(self, rows_by_kind: RowsByKind, thread_id: str) -> None:
+        """Write rows now, or buffer them (waiting for the flush when durability is sync)."""
+        if self.buffer is None:
+            self._flush(rows_by_kind)
+            return
+        for future in self._buffer_rows(rows_by_kind, thread_id):
+            future.result()
+    
+    async def _asave(self, rows_by_kind: RowsByKind, thread_id: str) -> None:
+        """Async _save."""
+        if self.buffer is None:
+            async with async_engine.connect() as conn:
+                for statement, params in insert_statements(rows_by_kind):
+                    await conn.execute(text(statement), params)
+                await conn.commit()
+            return
+        for future in self._buffer_rows(rows_by_kind, thread_id):
+            await asyncio.wrap_future(future)
+    
+    def _buffer_rows(self, rows_by_kind: RowsByKind, thread_id: str) -> tuple:
+        """Add rows to the write-behind buffer; futures to wait on when durability is sync."""
+        wait = self.durability == "sync"
+        futures = tuple(
+            self.buffer.add(kind, row, thread_id, wait=wait)
+            for kind, rows in rows_by_kind.items()
+            for row in rows
+        )
+        return tuple(future for future in futures if future is not None)
+    
+    @staticmethod
+    def _flush(rows_by_kind: RowsByKind) -> None:
+        """Write rows in one transaction of multi-row INSERTs."""
+        with engine.begin() as conn:
+            for statement, params in insert_statements(rows_by_kind):
+                conn.execute(text(statement), params)
+    
+    def _flush_thread(self, thread_id: str) -> None:
+        """
+        Make buffered rows of thread_id visible to the read that follows.
+        
+        If they cannot be written, the flush error is raised: reading without
+        them would return an older checkpoint (or none) as the latest one.
+        Rows requeued by a concurrent background flush are flushed again.
+        """
+        while self.buffer is not None and self.buffer.pending(thread_id):
+            error = self.buffer.flush().get(thread_id)
+            if error is not None:
+                raise error
+    
+    async def _aflush_thread(self, thread_id: str) -> None:
+        """Async _flush_thread; the flush runs in a worker thread."""
+        while self.buffer is not None and self.buffer.pending(thread_id):
+            error = (await asyncio.to_thread(self.buffer.flush)).get(thread_id)
+            if error is not None:
+                raise error
+    
+    @staticmethod
+    def _put_params(config: dict, checkpoint: Checkpoint, metadata: CheckpointMetadata) -> dict:
+        """
+        Bind parameters for a checkpoint row; thread_id is required.
+        
+        created_at is set here rather than by the database, so checkpoints
+        written in the same batched transaction still order correctly.
+        """
+        thread_id = config.get("configurable", {}).get("thread_id")
+        if not thread_id:
+            raise ValueError("thread_id is required in config")
+        
+        return {
+            "thread_id": thread_id,
+            "checkpoint_id": checkpoint.get("id"),
+            "parent_id": config.get("configurable", {}).get("checkpoint_id"),
+            "state": json.dumps(checkpoint),
+            "metadata": json.dumps(metadata) if metadata else None,
+            "created_at": datetime.utcnow(),
+        }
+    
+    def _writes_rows(self, config: dict, writes: list, task_id: str, task_path: str) -> RowsByKind:
+        """
+        Rows for put_writes, keyed by INSERTS kind.
+        
+        Special channels (WRITES_IDX_MAP) get fixed negative indexes and
+        replace earlier values, like the reference savers.
+        """
+        configurable = config.get("configurable", {})
+        thread_id = configurable.get("thread_id")
+        if not thread_id:
+            raise ValueError("thread_id is required in config")
+        if not writes:
+            return {}
+        
+        kind = "write_upsert" if all(channel in WRITES_IDX_MAP for channel, _ in writes) else "write"
+        created_at = datetime.utcnow()
+        rows = []
+        for idx, (channel, value) in enumerate(writes):
+            type_, data = self.serde.dumps_typed(value)
+            rows.append({
+                "thread_id": thread_id,
+                "checkpoint_id": configurable.get("checkpoint_id"),
+                "task_id": task_id,
+                "idx": WRITES_IDX_MAP.get(channel, idx),
+                "channel": channel,
+                "type": type_,
+                "value": data,
+                "task_path": task_path,
+                "created_at": created_at,
+            })
+        return {kind: rows}
+    
+    @staticmethod
+    def _writes_params(thread_id: str, row) -> dict:
+        """Bind parameters for WRITES_SQL of a checkpoint row."""
+        return {"thread_id": thread_id, "checkpoint_id": row._mapping["checkpoint_id"]}
+    
+    @staticmethod
+    def _get_query(config: dict) -> tuple[Optional[str], str, dict]:
+        """(thread_id, SQL, params) for a specific checkpoint, or the thread's latest."""
+        thread_id = config.get("configurable", {}).get("thread_id")
+        checkpoint_id = config.get("configurable", {}).get("checkpoint_id")
+        if checkpoint_id:
+            return thread_id, GET_SQL, {"thread_id": thread_id, "checkpoint_id": checkpoint_id}
+        return thread_id, LATEST_SQL, {"thread_id": thread_id}
+    
+    @staticmethod
+    def _list_query(config: Optional[dict], limit: Optional[int]) -> tuple[Optional[str], str, dict]:
+        """(thread_id, SQL, params) listing a thread's checkpoints, newest first."""
+        thread_id = (config or {}).get("configurable", {}).get("thread_id")
+        query, params = LIST_SQL, {"thread_id": thread_id}
+        if limit:
+            query += " LIMIT :limit"
+            params["limit"] = limit
+        return thread_id, query, params
+    
+    @staticmethod
+    def _checkpoint_config(thread_id: str, checkpoint_id: Optional[str]) -> dict:
+        """RunnableConfig addressing one checkpoint of a thread."""
+        return {
+            "configurable": {
+                "thread_id": thread_id,
+                "checkpoint_id": checkpoint_id
+            }
+        }
+    
+    def _found(self, thread_id: str, row, writes: Sequence = ()) -> Optional[CheckpointTuple]:
+        """CheckpointTuple for a get_tuple row, or None when nothing matched."""
+        if not row:
+            logger.debug(f"No checkpoint found for thread {thread_id}")
+            return None
+        logger.debug(f"Retrieved checkpoint {row._mapping['checkpoint_id']} for thread {thread_id}")
+        return self._to_tuple(thread_id, row, writes)
+    
+    def _to_tuple(self, thread_id: str, row, writes: Sequence = ()) -> CheckpointTuple:
+        """Build a CheckpointTuple from a langgraph_checkpoints row and its writes rows."""
+        row_dict = row._mapping
+        return CheckpointTuple(
+            config=self._checkpoint_config(thread_id, row_dict["checkpoint_id"]),
+            checkpoint=row_dict["state"],
+            metadata=row_dict["metadata"] or {},
+            parent_config=self._checkpoint_config(
+                thread_id, row_dict["parent_checkpoint_id"]
+            ) if row_dict["parent_checkpoint_id"] else None,
+            pending_writes=[
+                (task_id, channel, self.serde.loads_typed((type_, bytes(value))))
+                for task_id, channel, type_, value in writes
+            ],
+        )
@@ -5,7 +5,10 @@ from src.db.models.organization import ClinicalOrganization
 from src.db.models.tool import ClinicalTool
 from src.db.models.thread import ChatThread
 from src.db.models.message import ChatMessage
-from src.db.models.checkpoint import LangGraphCheckpoint
+from src.db.models.checkpoint import LangGraphCheckpoint, LangGraphCheckpointWrite
+from src.db.models.embedding_cache import EmbeddingCacheEntry
+from src.db.models.catalog_version import CatalogVersion
+from src.db.models.usage import UsageRecord
 
 __all__ = [
     "Base",
@@ -16,4 +19,8 @@ __all__ = [
     "ChatThread",
     "ChatMessage",
     "LangGraphCheckpoint",
+    "LangGraphCheckpointWrite",
+    "EmbeddingCacheEntry",
+    "CatalogVersion",
+    "UsageRecord",
 ]
@@ -1,30 +1,124 @@
 """SQLAlchemy base configuration and engine setup."""
 
-from contextlib import contextmanager
+from contextlib import asynccontextmanager, contextmanager
 
-from sqlalchemy import create_engine, text
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
 from sqlalchemy.orm import declarative_base, sessionmaker, scoped_session
+from sqlalchemy.pool import QueuePool, AsyncAdaptedQueuePool
+from pgvector.psycopg import register_vector, register_vector_async
+from pgvector.sqlalchemy import Vector, HALFVEC
 
-from src.config import DATABASE_URL
+from src.config import DATABASE_URL, EMBEDDING_DIMENSIONS, EMBEDDING_STORAGE, DB_PREPARE_THRESHOLD
+from src.metrics import registry, db_pool_wait_seconds
 from src.logger import get_logger
 
 logger = get_logger(__name__)
 
 db_url = DATABASE_URL.replace("postgresql://", "postgresql+psycopg://")
 
+
+class TimedQueuePool(QueuePool):
+    """QueuePool recording how long each checkout waits for a connection."""
+
+    def _do_get(self):
+        with db_pool_wait_seconds.time(engine="sync"):
+            return super()._do_get()
+
+
+class TimedAsyncQueuePool(AsyncAdaptedQueuePool):
+    """AsyncAdaptedQueuePool recording how long each checkout waits for a connection."""
+
+    def _do_get(self):
+        with db_pool_wait_seconds.time(engine="async"):
+            return super()._do_get()
+
+
 engine = create_engine(
     db_url,
+    poolclass=TimedQueuePool,
     pool_size=5,
     max_overflow=10,
     pool_pre_ping=True,
-    echo=False
+    echo=False,
+    connect_args={"prepare_threshold": DB_PREPARE_THRESHOLD},
+)
+
+
+@event.listens_for(engine, "connect")
+def register_vector_types(dbapi_connection, connection_record):
+    """Register pgvector adapters so query vectors are sent in binary format."""
+    try:
+        register_vector(dbapi_connection)
+    except Exception as e:
+        logger.debug(f"pgvector types not registered on new connection: {e}")
+    finally:
+        dbapi_connection.rollback()
+
+
+# Async engine for the async request path (graph.ainvoke/astream). Connections
+# are only held for the duration of a query, so a small pool serves many
+# concurrent requests that spend most of their time waiting on the LLM.
+async_engine = create_async_engine(
+    db_url,
+    poolclass=TimedAsyncQueuePool,
+    pool_size=10,
+    max_overflow=20,
+    pool_pre_ping=True,
+    echo=False,
+    connect_args={"prepare_threshold": DB_PREPARE_THRESHOLD},
 )
 
+
+@event.listens_for(async_engine.sync_engine, "connect")
+def register_async_vector_types(dbapi_connection, connection_record):
+    """Register pgvector adapters on new async connections."""
+    try:
+        dbapi_connection.run_async(register_vector_async)
+    except Exception as e:
+        logger.debug(f"pgvector types not registered on new async connection: {e}")
+    finally:
+        dbapi_connection.rollback()
+
+
+def pool_gauges() -> list[tuple[str, str, list[tuple[dict, float]]]]:
+    """Connection pool size, checked-out and overflow connections for the /metrics endpoint."""
+    pools = {"sync": engine.pool, "async": async_engine.sync_engine.pool}
+    return [
+        ("cds_db_pool_size", "Configured pool size",
+         [({"engine": name}, pool.size()) for name, pool in pools.items()]),
+        ("cds_db_pool_checked_out", "Connections currently checked out",
+         [({"engine": name}, pool.checkedout()) for name, pool in pools.items()]),
+        ("cds_db_pool_checked_in", "Idle connections in the pool",
+         [({"engine": name}, pool.checkedin()) for name, pool in pools.items()]),
+        ("cds_db_pool_overflow", "Connections opened beyond pool_size (negative while the pool is not full)",
+         [({"engine": name}, pool.overflow()) for name, pool in pools.items()]),
+    ]
+
+
+registry.add_gauges(pool_gauges)
+
+
 SessionLocal = sessionmaker(bind=engine, autocommit=False, autoflush=False)
 ScopedSession = scoped_session(SessionLocal)
+AsyncSessionLocal = async_sessionmaker(bind=async_engine, autoflush=False, expire_on_commit=False)
 
 Base = declarative_base()
 
+if EMBEDDING_STORAGE not in ("vector", "halfvec"):
+    raise ValueError(f"EMBEDDING_STORAGE must be 'vector' or 'halfvec', got '{EMBEDDING_STORAGE}'")
+
+EMBEDDING_SQL_TYPE = f"{EMBEDDING_STORAGE}({EMBEDDING_DIMENSIONS})"
+EMBEDDING_OPS = f"{EMBEDDING_STORAGE}_cosine_ops"
+EMBEDDING_BIT_TYPE = f"bit({EMBEDDING_DIMENSIONS})"
+
+
+def embedding_column_type():
+    """Column type for catalog embeddings (full-precision vector or 16-bit halfvec)."""
+    if EMBEDDING_STORAGE == "halfvec":
+        return HALFVEC(EMBEDDING_DIMENSIONS)
+    return Vector(EMBEDDING_DIMENSIONS)
+
 
 @contextmanager
 def get_session():
@@ -40,10 +134,25 @@ def get_session():
         session.close()
 
 
+@asynccontextmanager
+async def get_async_session():
+    """Async counterpart of get_session."""
+    async with AsyncSessionLocal() as session:
+        try:
+            yield session
+            await session.commit()
+        except Exception:
+            await session.rollback()
+            raise
+
+
 def init_extensions():
     """Initialize PostgreSQL extensions."""
     logger.info("Initializing pgvector extension...")
     with engine.connect() as conn:
         conn.execute(text("CREATE EXTENSION IF NOT EXISTS vector"))
         conn.commit()
+    # Connections opened before the extension existed have no vector adapters.
+    engine.dispose()
+    async_engine.sync_engine.dispose()
     logger.info("pgvector extension ready")
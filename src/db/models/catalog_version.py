@@ -0,0 +1,17 @@
+"""CatalogVersion model."""
+
+from datetime import datetime
+
+from sqlalchemy import Column, BigInteger, String, DateTime
+
+from src.db.models.base import Base
+
+
+class CatalogVersion(Base):
+    """Write counter per catalog table, bumped by a statement-level trigger."""
+    
+    __tablename__ = "catalog_versions"
+    
+    table_name = Column(String(100), primary_key=True)
+    version = Column(BigInteger, nullable=False, default=0)
+    updated_at = Column(DateTime, default=datetime.utcnow)
@@ -1,8 +1,8 @@
-"""LangGraphCheckpoint model."""
+"""LangGraphCheckpoint and LangGraphCheckpointWrite models."""
 
 from datetime import datetime
 
-from sqlalchemy import Column, String, DateTime, ForeignKey, JSON
+from sqlalchemy import Column, Integer, LargeBinary, String, DateTime, ForeignKey, JSON
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 
@@ -26,3 +26,23 @@ class LangGraphCheckpoint(Base):
     created_at = Column(DateTime, default=datetime.utcnow)
     
     thread = relationship("ChatThread", back_populates="checkpoints")
+
+
+class LangGraphCheckpointWrite(Base):
+    """Pending channel write of a task, saved before its checkpoint completes."""
+    
+    __tablename__ = "langgraph_checkpoint_writes"
+    
+    thread_id = Column(
+        UUID(as_uuid=True),
+        ForeignKey("chat_threads.id", ondelete="CASCADE"),
+        primary_key=True
+    )
+    checkpoint_id = Column(String(255), primary_key=True)
+    task_id = Column(String(255), primary_key=True)
+    idx = Column(Integer, primary_key=True)
+    channel = Column(String(255), nullable=False)
+    type = Column(String(50))
+    value = Column(LargeBinary)
+    task_path = Column(String(1024), nullable=False, default="")
+    created_at = Column(DateTime, default=datetime.utcnow)
@@ -0,0 +1,20 @@
+"""EmbeddingCacheEntry model."""
+
+from datetime import datetime
+
+from sqlalchemy import Column, Integer, String, DateTime
+from pgvector.sqlalchemy import Vector
+
+from src.db.models.base import Base
+
+
+class EmbeddingCacheEntry(Base):
+    """Persisted query embedding shared by all API workers."""
+    
+    __tablename__ = "embedding_cache"
+    
+    model = Column(String(100), primary_key=True)
+    dimensions = Column(Integer, primary_key=True)
+    text_hash = Column(String(64), primary_key=True)
+    embedding = Column(Vector(), nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow)
@@ -2,11 +2,10 @@
 
 from datetime import datetime
 
-from sqlalchemy import Column, Integer, String, Text, DateTime, JSON
-from sqlalchemy.dialects.postgresql import ARRAY
-from pgvector.sqlalchemy import Vector
+from sqlalchemy import Column, Integer, String, Text, DateTime
+from sqlalchemy.dialects.postgresql import ARRAY, JSONB
 
-from src.db.models.base import Base
+from src.db.models.base import Base, embedding_column_type
 
 
 class ClinicalOrganization(Base):
@@ -21,9 +20,9 @@ class ClinicalOrganization(Base):
     description = Column(Text, nullable=False)
     city = Column(String(100))
     state = Column(String(50))
-    services = Column(JSON, default={})
+    services = Column(JSONB, default={})
     ai_use_cases = Column(ARRAY(Text))
-    embedding = Column(Vector(1536))
+    embedding = Column(embedding_column_type())
     created_at = Column(DateTime, default=datetime.utcnow)
     
     def to_dict(self) -> dict:
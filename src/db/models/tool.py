@@ -4,9 +4,8 @@ from datetime import datetime
 
 from sqlalchemy import Column, Integer, String, Text, DateTime
 from sqlalchemy.dialects.postgresql import ARRAY
-from pgvector.sqlalchemy import Vector
 
-from src.db.models.base import Base
+from src.db.models.base import Base, embedding_column_type
 
 
 class ClinicalTool(Base):
@@ -20,7 +19,7 @@ class ClinicalTool(Base):
     description = Column(Text, nullable=False)
     target_users = Column(ARRAY(Text))
     problem_solved = Column(Text)
-    embedding = Column(Vector(1536))
+    embedding = Column(embedding_column_type())
     created_at = Column(DateTime, default=datetime.utcnow)
     
     def to_dict(self) -> dict:
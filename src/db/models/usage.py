@@ -0,0 +1,43 @@
+"""UsageRecord model."""
+
+from datetime import datetime
+import uuid
+
+from sqlalchemy import Column, Float, Integer, String, DateTime, ForeignKey
+from sqlalchemy.dialects.postgresql import JSONB, UUID
+
+from src.db.models.base import Base
+
+
+class UsageRecord(Base):
+    """Token usage and estimated cost of one API request."""
+    
+    __tablename__ = "usage_records"
+    
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    thread_id = Column(UUID(as_uuid=True), ForeignKey("chat_threads.id", ondelete="CASCADE"))
+    message_id = Column(UUID(as_uuid=True), ForeignKey("chat_messages.id", ondelete="CASCADE"))
+    endpoint = Column(String(50), nullable=False)
+    route = Column(String(50))
+    prompt_tokens = Column(Integer, nullable=False, default=0)
+    completion_tokens = Column(Integer, nullable=False, default=0)
+    embedding_tokens = Column(Integer, nullable=False, default=0)
+    cost_usd = Column(Float, nullable=False, default=0.0)
+    models = Column(JSONB, nullable=False, default=dict)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    
+    def to_dict(self) -> dict:
+        """Convert to dictionary."""
+        return {
+            "id": str(self.id),
+            "thread_id": str(self.thread_id) if self.thread_id else None,
+            "message_id": str(self.message_id) if self.message_id else None,
+            "endpoint": self.endpoint,
+            "route": self.route,
+            "prompt_tokens": self.prompt_tokens,
+            "completion_tokens": self.completion_tokens,
+            "embedding_tokens": self.embedding_tokens,
+            "cost_usd": self.cost_usd,
+            "models": self.models,
+            "created_at": self.created_at.isoformat(),
+        }
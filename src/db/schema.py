@@ -2,6 +2,7 @@
 
 from sqlalchemy import text
 
+from src.config import VECTOR_INDEX_TYPE
 from src.db.models.base import Base, engine, init_extensions
 from src.db.models import (
     ClinicalOrganization,
@@ -9,11 +10,27 @@ from src.db.models import (
     ChatThread,
     ChatMessage,
     LangGraphCheckpoint,
+    LangGraphCheckpointWrite,
+    EmbeddingCacheEntry,
+    CatalogVersion,
+    UsageRecord,
 )
+from src.db.catalog_version import CATALOG_TABLES, catalog_trigger_sql
+from src.db.vector_index import create_vector_indexes
 from src.logger import get_logger
 
 logger = get_logger(__name__)
 
+FILTER_INDEXES = [
+    "CREATE INDEX IF NOT EXISTS idx_tool_category ON clinical_tools (category)",
+    "CREATE INDEX IF NOT EXISTS idx_tool_target_users ON clinical_tools USING gin (target_users)",
+    "CREATE INDEX IF NOT EXISTS idx_org_org_type ON clinical_organizations (org_type)",
+    "CREATE INDEX IF NOT EXISTS idx_org_state ON clinical_organizations (state)",
+    "CREATE INDEX IF NOT EXISTS idx_org_specialty ON clinical_organizations (specialty)",
+    "CREATE INDEX IF NOT EXISTS idx_org_ai_use_cases ON clinical_organizations USING gin (ai_use_cases)",
+    "CREATE INDEX IF NOT EXISTS idx_org_services ON clinical_organizations USING gin (services jsonb_path_ops)",
+]
+
 
 def init_schema():
     """Initialize database schema with pgvector extension."""
@@ -25,22 +42,30 @@ def init_schema():
         logger.info("Creating tables from SQLAlchemy models...")
         Base.metadata.create_all(bind=engine)
         
-        logger.info("Creating HNSW indexes for vector search...")
+        logger.info(f"Creating {VECTOR_INDEX_TYPE} indexes for vector search...")
         with engine.connect() as conn:
+            create_vector_indexes(conn)
+            
+            logger.info("Creating metadata filter indexes...")
+            for statement in FILTER_INDEXES:
+                conn.execute(text(statement))
+            
             conn.execute(text("""
-                CREATE INDEX IF NOT EXISTS idx_org_embedding 
-                ON clinical_organizations 
-                USING hnsw (embedding vector_cosine_ops)
+                CREATE INDEX IF NOT EXISTS idx_messages_thread 
+                ON chat_messages(thread_id, created_at)
             """))
             conn.execute(text("""
-                CREATE INDEX IF NOT EXISTS idx_tool_embedding 
-                ON clinical_tools 
-                USING hnsw (embedding vector_cosine_ops)
+                CREATE INDEX IF NOT EXISTS idx_usage_route 
+                ON usage_records(route, created_at)
             """))
             conn.execute(text("""
-                CREATE INDEX IF NOT EXISTS idx_messages_thread 
-                ON chat_messages(thread_id, created_at)
+                CREATE INDEX IF NOT EXISTS idx_usage_thread 
+                ON usage_records(thread_id)
             """))
+            
+            logger.info("Creating catalog version triggers...")
+            for statement in catalog_trigger_sql(CATALOG_TABLES):
+                conn.execute(text(statement))
             conn.commit()
         
         logger.info("Schema initialized successfully.")
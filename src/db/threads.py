@@ -3,9 +3,12 @@
 from datetime import datetime
 from typing import Optional
 
-from src.db.models.base import get_session
+from sqlalchemy import delete, select, update
+
+from src.db.models.base import get_session, get_async_session
 from src.db.models.thread import ChatThread
 from src.db.models.message import ChatMessage
+from src.metrics import message_seconds
 from src.logger import get_logger
 
 logger = get_logger(__name__)
@@ -76,7 +79,7 @@ def add_message(
     """Add a message to a thread."""
     logger.debug(f"Adding {role} message to thread {thread_id}")
     
-    with get_session() as session:
+    with message_seconds.time(op="add_message"), get_session() as session:
         message = ChatMessage(
             thread_id=thread_id,
             role=role,
@@ -104,3 +107,90 @@ def get_messages(thread_id: str, limit: int = 100) -> list[dict]:
             .all()
         )
         return [m.to_dict() for m in messages]
+
+
+async def acreate_thread(title: str = "New Chat") -> dict:
+    """Async create_thread."""
+    logger.info(f"Creating new thread: {title}")
+    
+    async with get_async_session() as session:
+        thread = ChatThread(title=title)
+        session.add(thread)
+        await session.flush()
+        return thread.to_dict()
+
+
+async def aget_thread(thread_id: str) -> Optional[dict]:
+    """Async get_thread."""
+    async with get_async_session() as session:
+        thread = await session.scalar(select(ChatThread).where(ChatThread.id == thread_id))
+        return thread.to_dict() if thread else None
+
+
+async def alist_threads(limit: int = 50) -> list[dict]:
+    """Async list_threads."""
+    async with get_async_session() as session:
+        result = await session.execute(
+            select(ChatThread).order_by(ChatThread.updated_at.desc()).limit(limit)
+        )
+        return [t.to_dict() for t in result.scalars()]
+
+
+async def aupdate_thread_title(thread_id: str, title: str) -> Optional[dict]:
+    """Async update_thread_title."""
+    logger.info(f"Updating thread {thread_id} title to: {title}")
+    
+    async with get_async_session() as session:
+        thread = await session.scalar(select(ChatThread).where(ChatThread.id == thread_id))
+        if not thread:
+            return None
+        thread.title = title
+        thread.updated_at = datetime.utcnow()
+        await session.flush()
+        return thread.to_dict()
+
+
+async def adelete_thread(thread_id: str) -> bool:
+    """Async delete_thread; messages and checkpoints go with it via ON DELETE CASCADE."""
+    logger.info(f"Deleting thread {thread_id}")
+    
+    async with get_async_session() as session:
+        result = await session.execute(delete(ChatThread).where(ChatThread.id == thread_id))
+        return result.rowcount > 0
+
+
+async def aadd_message(
+    thread_id: str,
+    role: str,
+    content: str,
+    route: Optional[str] = None
+) -> dict:
+    """Async add_message."""
+    logger.debug(f"Adding {role} message to thread {thread_id}")
+    
+    with message_seconds.time(op="add_message"):
+        async with get_async_session() as session:
+            message = ChatMessage(
+                thread_id=thread_id,
+                role=role,
+                content=content,
+                route=route
+            )
+            session.add(message)
+            await session.execute(
+                update(ChatThread).where(ChatThread.id == thread_id).values(updated_at=datetime.utcnow())
+            )
+            await session.flush()
+            return message.to_dict()
+
+
+async def aget_messages(thread_id: str, limit: int = 100) -> list[dict]:
+    """Async get_messages."""
+    async with get_async_session() as session:
+        result = await session.execute(
+            select(ChatMessage)
+            .where(ChatMessage.thread_id == thread_id)
+            .order_by(ChatMessage.created_at.asc())
+            .limit(limit)
+        )
+        return [m.to_dict() for m in result.scalars()]
@@ -0,0 +1,135 @@
+"""Persisted per-request token usage and cost, with per-route and per-thread summaries."""
+
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import func, select
+
+from src.db.models.base import get_session, get_async_session
+from src.db.models.usage import UsageRecord
+from src.logger import get_logger
+
+logger = get_logger(__name__)
+
+SUMMARY_COLUMNS = (
+    func.count().label("requests"),
+    func.coalesce(func.sum(UsageRecord.prompt_tokens), 0).label("prompt_tokens"),
+    func.coalesce(func.sum(UsageRecord.completion_tokens), 0).label("completion_tokens"),
+    func.coalesce(func.sum(UsageRecord.embedding_tokens), 0).label("embedding_tokens"),
+    func.coalesce(func.sum(UsageRecord.cost_usd), 0.0).label("cost_usd"),
+)
+
+
+def usage_record(
+    usage: dict,
+    endpoint: str,
+    route: Optional[str] = None,
+    thread_id: Optional[str] = None,
+    message_id: Optional[str] = None,
+) -> UsageRecord:
+    """UsageRecord for a RequestUsage.as_dict() payload."""
+    return UsageRecord(
+        thread_id=thread_id,
+        message_id=message_id,
+        endpoint=endpoint,
+        route=route,
+        prompt_tokens=usage["prompt_tokens"],
+        completion_tokens=usage["completion_tokens"],
+        embedding_tokens=usage["embedding_tokens"],
+        cost_usd=usage["cost_usd"],
+        models=usage["models"],
+    )
+
+
+def add_usage(
+    usage: dict,
+    endpoint: str,
+    route: Optional[str] = None,
+    thread_id: Optional[str] = None,
+    message_id: Optional[str] = None,
+) -> dict:
+    """Persist one request's usage."""
+    with get_session() as session:
+        record = usage_record(usage, endpoint, route, thread_id, message_id)
+        session.add(record)
+        session.flush()
+        return record.to_dict()
+
+
+async def aadd_usage(
+    usage: dict,
+    endpoint: str,
+    route: Optional[str] = None,
+    thread_id: Optional[str] = None,
+    message_id: Optional[str] = None,
+) -> dict:
+    """Async add_usage."""
+    async with get_async_session() as session:
+        record = usage_record(usage, endpoint, route, thread_id, message_id)
+        session.add(record)
+        await session.flush()
+        return record.to_dict()
+
+
+def summary_statements(since: Optional[datetime], thread_id: Optional[str], limit: int) -> tuple:
+    """(total, per-route, per-thread) aggregate statements over the matching records."""
+    conditions = []
+    if since is not None:
+        conditions.append(UsageRecord.created_at >= since)
+    if thread_id is not None:
+        conditions.append(UsageRecord.thread_id == thread_id)
+    
+    total = select(*SUMMARY_COLUMNS).where(*conditions)
+    by_route = (
+        select(UsageRecord.route, *SUMMARY_COLUMNS)
+        .where(*conditions)
+        .group_by(UsageRecord.route)
+        .order_by(func.sum(UsageRecord.cost_usd).desc())
+    )
+    by_thread = (
+        select(UsageRecord.thread_id, *SUMMARY_COLUMNS)
+        .where(UsageRecord.thread_id.is_not(None), *conditions)
+        .group_by(UsageRecord.thread_id)
+        .order_by(func.sum(UsageRecord.cost_usd).desc())
+        .limit(limit)
+    )
+    return total, by_route, by_thread
+
+
+def summary_row(row) -> dict:
+    data = dict(row._mapping)
+    data["cost_usd"] = round(float(data["cost_usd"]), 6)
+    data["avg_cost_usd"] = round(data["cost_usd"] / data["requests"], 6) if data["requests"] else 0.0
+    if data.get("thread_id") is not None:
+        data["thread_id"] = str(data["thread_id"])
+    return data
+
+
+def build_summary(total, by_route, by_thread) -> dict:
+    return {
+        "total": summary_row(total),
+        "by_route": [summary_row(row) for row in by_route],
+        "by_thread": [summary_row(row) for row in by_thread],
+    }
+
+
+def usage_summary(since: Optional[datetime] = None, thread_id: Optional[str] = None, limit: int = 20) -> dict:
+    """Request count, tokens and cost: overall, per route, and for the `limit` most expensive threads."""
+    total, by_route, by_thread = summary_statements(since, thread_id, limit)
+    with get_session() as session:
+        return build_summary(
+            session.execute(total).one(),
+            session.execute(by_route).all(),
+            session.execute(by_thread).all(),
+        )
+
+
+async def ausage_summary(since: Optional[datetime] = None, thread_id: Optional[str] = None, limit: int = 20) -> dict:
+    """Async usage_summary."""
+    total, by_route, by_thread = summary_statements(since, thread_id, limit)
+    async with get_async_session() as session:
+        return build_summary(
+            (await session.execute(total)).one(),
+            (await session.execute(by_route)).all(),
+            (await session.execute(by_thread)).all(),
+        )
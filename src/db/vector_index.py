@@ -0,0 +1,211 @@
+"""
+Catalog vector layout: embedding column type and vector indexes.
+
+Migrations create the baseline vector(1536) columns with HNSW indexes; the
+layout selected by configuration (EMBEDDING_STORAGE, EMBEDDING_DIMENSIONS,
+VECTOR_INDEX_TYPE, ...) is applied at runtime by `sync_vector_layout()`
+(`make sync-vectors`), so a revision means the same schema on every host.
+"""
+
+import re
+from typing import Optional
+
+from sqlalchemy import text
+
+from src.config import (
+    EMBEDDING_DIMENSIONS,
+    EMBEDDING_STORAGE,
+    VECTOR_INDEX_TYPE,
+    VECTOR_SEARCH_MODE,
+    HNSW_M,
+    HNSW_EF_CONSTRUCTION,
+    IVFFLAT_LISTS,
+)
+from src.db.models.base import engine, EMBEDDING_OPS, EMBEDDING_BIT_TYPE
+from src.logger import get_logger
+
+logger = get_logger(__name__)
+
+INDEX_TYPES = ("hnsw", "ivfflat", "none")
+
+# pgvector's built-in per-query defaults; settings equal to these are not re-sent.
+PGVECTOR_DEFAULTS = {"hnsw.ef_search": 40, "ivfflat.probes": 1}
+
+CATALOG_VECTOR_INDEXES = {
+    "clinical_organizations": "idx_org_embedding",
+    "clinical_tools": "idx_tool_embedding",
+}
+
+COLUMN_TYPE_SQL = """
+    SELECT format_type(atttypid, atttypmod) FROM pg_attribute
+    WHERE attrelid = CAST(:table AS regclass) AND attname = 'embedding'
+"""
+
+INDEX_OPTIONS_SQL = """
+    SELECT am.amname, c.reloptions FROM pg_class c JOIN pg_am am ON am.oid = c.relam
+    WHERE c.relname = :index AND c.relkind = 'i'
+"""
+
+# pgvector's build defaults, which apply when an index has no WITH options.
+BUILD_DEFAULTS = {"hnsw": {"m": "16", "ef_construction": "64"}, "ivfflat": {"lists": "100"}}
+
+
+def validate_index_type(index_type: str) -> str:
+    """Return index_type if it is supported, otherwise raise ValueError."""
+    if index_type not in INDEX_TYPES:
+        raise ValueError(f"Unknown vector index type '{index_type}', expected one of {INDEX_TYPES}")
+    return index_type
+
+
+def vector_index_sql(
+    index_name: str,
+    table: str,
+    index_type: str = VECTOR_INDEX_TYPE,
+    m: int = HNSW_M,
+    ef_construction: int = HNSW_EF_CONSTRUCTION,
+    lists: int = IVFFLAT_LISTS,
+    ops: str = EMBEDDING_OPS,
+) -> Optional[str]:
+    """
+    CREATE INDEX statement for an embedding column, or None for exact search.
+
+    - hnsw: graph index; `m` links per node, `ef_construction` build-time
+      candidate list. Better recall/latency, slower build, larger index.
+    - ivfflat: `lists` k-means partitions; fast build, needs data present
+      at build time (rows / 1000 is a common starting point).
+    - none: no ANN index; every search is an exact sequential scan.
+    """
+    validate_index_type(index_type)
+    if index_type == "hnsw":
+        return (
+            f"CREATE INDEX IF NOT EXISTS {index_name} ON {table} "
+            f"USING hnsw (embedding {ops}) WITH (m = {m}, ef_construction = {ef_construction})"
+        )
+    if index_type == "ivfflat":
+        return (
+            f"CREATE INDEX IF NOT EXISTS {index_name} ON {table} "
+            f"USING ivfflat (embedding {ops}) WITH (lists = {lists})"
+        )
+    return None
+
+
+def bq_index_sql(index_name: str, table: str, bit_type: str = EMBEDDING_BIT_TYPE) -> str:
+    """CREATE INDEX statement for the binary-quantized (Hamming) expression index."""
+    return (
+        f"CREATE INDEX IF NOT EXISTS {index_name}_bq ON {table} "
+        f"USING hnsw ((binary_quantize(embedding)::{bit_type}) bit_hamming_ops)"
+    )
+
+
+def parse_embedding_type(column_type: str) -> tuple[str, int]:
+    """Split a column type such as 'halfvec(512)' into ('halfvec', 512)."""
+    match = re.fullmatch(r"(vector|halfvec)\((\d+)\)", column_type)
+    if not match:
+        raise ValueError(f"Unsupported embedding column type '{column_type}'")
+    return match.group(1), int(match.group(2))
+
+
+def storage_conversion_sql(
+    table: str,
+    current_type: str,
+    storage: str = EMBEDDING_STORAGE,
+    dimensions: int = EMBEDDING_DIMENSIONS,
+) -> Optional[str]:
+    """
+    ALTER statement converting an embedding column to storage(dimensions),
+    or None if it already has that type.
+
+    text-embedding-3 vectors can be shortened by truncating and re-normalizing,
+    so rows are converted in place with subvector() + l2_normalize() (pgvector
+    >= 0.7) instead of re-embedding the catalog. Dimensions cannot be added
+    back that way; growing the column needs a re-seed.
+    """
+    current_storage, current_dimensions = parse_embedding_type(current_type)
+    if (current_storage, current_dimensions) == (storage, dimensions):
+        return None
+    if dimensions > current_dimensions:
+        raise ValueError(
+            f"Cannot convert {table}.embedding from {current_type} to {storage}({dimensions}); "
+            f"re-seed the catalog to get longer vectors"
+        )
+    target_type = f"{storage}({dimensions})"
+    source = "embedding::vector"
+    if dimensions < current_dimensions:
+        source = f"l2_normalize(subvector(embedding::vector, 1, {dimensions}))"
+    return f"ALTER TABLE {table} ALTER COLUMN embedding TYPE {target_type} USING {source}::{target_type}"
+
+
+def index_matches(
+    access_method: Optional[str],
+    reloptions: Optional[list[str]],
+    index_type: str = VECTOR_INDEX_TYPE,
+    m: int = HNSW_M,
+    ef_construction: int = HNSW_EF_CONSTRUCTION,
+    lists: int = IVFFLAT_LISTS,
+) -> bool:
+    """
+    Whether an existing index (access method and reloptions from pg_class,
+    None if there is no index) was built as index_type with these parameters.
+    """
+    validate_index_type(index_type)
+    if access_method is None or index_type == "none":
+        return access_method is None and index_type == "none"
+    if access_method != index_type:
+        return False
+    options = dict(BUILD_DEFAULTS[index_type])
+    options.update(option.split("=", 1) for option in reloptions or [])
+    if index_type == "hnsw":
+        return options == {"m": str(m), "ef_construction": str(ef_construction)}
+    return options == {"lists": str(lists)}
+
+
+def create_vector_indexes(conn, search_mode: str = VECTOR_SEARCH_MODE) -> None:
+    """
+    Create the configured ANN indexes that are missing, plus the
+    binary-quantized ones if search_mode is 'binary' (the only mode that
+    queries them; elsewhere they would only slow down writes).
+    """
+    for table, index_name in CATALOG_VECTOR_INDEXES.items():
+        index_sql = vector_index_sql(index_name, table)
+        if index_sql:
+            conn.execute(text(index_sql))
+        if search_mode == "binary":
+            conn.execute(text(bq_index_sql(index_name, table)))
+
+
+def sync_vector_layout() -> list[str]:
+    """
+    Bring the catalog tables in line with the configuration: convert embedding
+    columns to the configured storage type, rebuild ANN indexes whose type or
+    build parameters differ from VECTOR_INDEX_TYPE / HNSW_* / IVFFLAT_LISTS
+    (dropping them for 'none'), and create missing indexes; binary-quantized
+    indexes are dropped unless VECTOR_SEARCH_MODE is 'binary'.
+    Returns a description of each change made.
+    """
+    changes = []
+    with engine.begin() as conn:
+        for table, index_name in CATALOG_VECTOR_INDEXES.items():
+            current_type = conn.execute(text(COLUMN_TYPE_SQL), {"table": table}).scalar_one()
+            alter_sql = storage_conversion_sql(table, current_type)
+            if alter_sql is not None:
+                target_type = f"{EMBEDDING_STORAGE}({EMBEDDING_DIMENSIONS})"
+                logger.info(f"Converting {table}.embedding from {current_type} to {target_type}")
+                conn.execute(text(f"DROP INDEX IF EXISTS {index_name}"))
+                conn.execute(text(f"DROP INDEX IF EXISTS {index_name}_bq"))
+                conn.execute(text(alter_sql))
+                changes.append(f"{table}.embedding: {current_type} -> {target_type}")
+                continue
+
+            index = conn.execute(text(INDEX_OPTIONS_SQL), {"index": index_name}).fetchone()
+            access_method, reloptions = index if index else (None, None)
+            if access_method is not None and not index_matches(access_method, reloptions):
+                logger.info(f"Dropping {index_name} ({access_method} {reloptions or ''}) for {VECTOR_INDEX_TYPE}")
+                conn.execute(text(f"DROP INDEX {index_name}"))
+                changes.append(f"{index_name}: {access_method} -> {VECTOR_INDEX_TYPE}")
+            elif access_method is None and VECTOR_INDEX_TYPE != "none":
+                changes.append(f"{index_name}: created {VECTOR_INDEX_TYPE}")
+        if VECTOR_SEARCH_MODE != "binary":
+            for index_name in CATALOG_VECTOR_INDEXES.values():
+                conn.execute(text(f"DROP INDEX IF EXISTS {index_name}_bq"))
+        create_vector_indexes(conn)
+    return changes
@@ -0,0 +1,163 @@
+"""Micro-batching coalescer for concurrent single-text embedding calls."""
+
+import asyncio
+import queue
+import threading
+import time
+from collections import Counter
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable
+
+from src.config import EMBEDDING_BATCH_WINDOW_MS, EMBEDDING_BATCH_MAX_SIZE, EMBEDDING_BATCH_MAX_IN_FLIGHT
+from src.embeddings.bulk import estimate_tokens
+from src.embeddings.openai_embed import get_embeddings_batch
+from src.usage import RequestUsage, collect_usage, current_request_usage
+from src.logger import get_logger
+
+logger = get_logger(__name__)
+
+BatchEmbeddingFunction = Callable[[list[str]], list[list[float]]]
+
+
+class EmbeddingBatcher:
+    """
+    Coalesce concurrent embedding requests into batched API calls.
+
+    The first request to arrive opens a window of `window_ms`; every request
+    submitted before the window closes (or until `max_batch_size` texts are
+    pending) is sent in one `batch_fn` call. Identical texts in a window share
+    a single input. The tokens of a batched call are split between the
+    requests in it by their (estimated) share of the input, so each request's
+    RequestUsage still reflects the embeddings it asked for.
+
+    Closed windows are sent from a pool of `max_in_flight` threads, so a slow
+    API call does not hold up the windows behind it; while every slot is
+    busy, new requests keep queueing and go out together in the next window.
+    Instances are callable, so they satisfy the EmbeddingFunction protocol;
+    `aembed` is the asyncio equivalent.
+    """
+
+    def __init__(
+        self,
+        batch_fn: BatchEmbeddingFunction = get_embeddings_batch,
+        window_ms: float = EMBEDDING_BATCH_WINDOW_MS,
+        max_batch_size: int = EMBEDDING_BATCH_MAX_SIZE,
+        max_in_flight: int = EMBEDDING_BATCH_MAX_IN_FLIGHT,
+    ):
+        self.batch_fn = batch_fn
+        self.window_ms = window_ms
+        self.max_batch_size = max_batch_size
+        self.max_in_flight = max_in_flight
+
+        self._queue: queue.Queue[tuple[str, Future, RequestUsage | None]] = queue.Queue()
+        self._worker: threading.Thread | None = None
+        self._executor: ThreadPoolExecutor | None = None
+        self._slots = threading.BoundedSemaphore(max_in_flight)
+        self._start_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self._batch_sizes: Counter[int] = Counter()
+        self._requests = 0
+
+    def __call__(self, text: str) -> list[float]:
+        """Embed a single text, blocking until its batch completes."""
+        return self.submit(text).result()
+
+    async def aembed(self, text: str) -> list[float]:
+        """Embed a single text without blocking the event loop."""
+        return await asyncio.wrap_future(self.submit(text))
+
+    def submit(self, text: str) -> Future:
+        """Queue a text for the next batch and return a future for its vector."""
+        self._ensure_worker()
+        future: Future = Future()
+        self._queue.put((text, future, current_request_usage()))
+        return future
+
+    def stats(self) -> dict:
+        """Request/batch counters and the batch-size distribution."""
+        with self._stats_lock:
+            batches = sum(self._batch_sizes.values())
+            return {
+                "requests": self._requests,
+                "batches": batches,
+                "avg_batch_size": round(self._requests / batches, 2) if batches else 0.0,
+                "batch_size_distribution": dict(sorted(self._batch_sizes.items())),
+            }
+
+    def _ensure_worker(self) -> None:
+        """Start the background dispatch thread on first use."""
+        if self._worker is not None and self._worker.is_alive():
+            return
+        with self._start_lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_in_flight, thread_name_prefix="embedding-batch"
+                )
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(
+                    target=self._run, name="embedding-batcher", daemon=True
+                )
+                self._worker.start()
+
+    def _run(self) -> None:
+        """Collect requests into windows and hand them to the executor forever."""
+        while True:
+            self._slots.acquire()
+            pending = [self._queue.get()]
+            deadline = time.monotonic() + self.window_ms / 1000
+            while len(pending) < self.max_batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    pending.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            try:
+                self._executor.submit(self._dispatch, pending)
+            except Exception as e:
+                self._slots.release()
+                self._fail(pending, e)
+
+    def _dispatch(self, pending: list[tuple[str, Future, RequestUsage | None]]) -> None:
+        """Send one deduplicated batch and resolve every caller's future, whatever fails."""
+        try:
+            unique_texts = list(dict.fromkeys(text for text, _, _ in pending))
+            with self._stats_lock:
+                self._requests += len(pending)
+                self._batch_sizes[len(pending)] += 1
+
+            with collect_usage() as batch_usage:
+                vectors = self.batch_fn(unique_texts)
+            if len(vectors) != len(unique_texts):
+                raise ValueError(f"Expected {len(unique_texts)} embeddings, got {len(vectors)}")
+
+            self._charge(pending, batch_usage)
+            by_text = dict(zip(unique_texts, vectors))
+            for text, future, _ in pending:
+                future.set_result(by_text[text])
+        except Exception as e:
+            logger.exception(f"Batched embedding call failed for {len(pending)} requests: {e}")
+            self._fail(pending, e)
+        finally:
+            self._slots.release()
+
+    @staticmethod
+    def _fail(pending: list[tuple[str, Future, RequestUsage | None]], error: Exception) -> None:
+        """Fail every future of the batch that is not resolved yet."""
+        for _, future, _ in pending:
+            if not future.done():
+                future.set_exception(error)
+
+    @staticmethod
+    def _charge(pending: list[tuple[str, Future, RequestUsage | None]], batch_usage: RequestUsage) -> None:
+        """Split the batch's embedding tokens between its requests' usage."""
+        requesters: dict[str, int] = Counter(text for text, _, _ in pending)
+        weight = sum(estimate_tokens(text) for text in requesters)
+        for model, entry in batch_usage.models().items():
+            for text, _, usage in pending:
+                if usage is not None:
+                    share = entry["embedding_tokens"] * estimate_tokens(text) / weight / requesters[text]
+                    usage.add(model, embedding_tokens=round(share))
+
+embedding_batcher = EmbeddingBatcher()
@@ -0,0 +1,155 @@
+"""Chunked, concurrent, retrying bulk embedding for large catalogs."""
+
+import contextvars
+import random
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Iterator
+
+import openai
+
+from src.config import (
+    EMBEDDING_BULK_CHUNK_SIZE,
+    EMBEDDING_BULK_MAX_TOKENS,
+    EMBEDDING_BULK_CONCURRENCY,
+    EMBEDDING_BULK_MAX_RETRIES,
+)
+from src.embeddings.openai_embed import get_embeddings_batch
+from src.logger import get_logger
+
+logger = get_logger(__name__)
+
+BatchEmbeddingFunction = Callable[[list[str]], list[list[float]]]
+
+RETRYABLE_ERRORS = (
+    openai.RateLimitError,
+    openai.APIConnectionError,
+    openai.APITimeoutError,
+    openai.InternalServerError,
+)
+
+
+def estimate_tokens(text: str) -> int:
+    """Cheap token estimate (~4 characters per token for English text)."""
+    return max(1, len(text) // 4)
+
+
+def chunk_texts(
+    texts: list[str],
+    max_items: int = EMBEDDING_BULK_CHUNK_SIZE,
+    max_tokens: int = EMBEDDING_BULK_MAX_TOKENS,
+) -> list[list[str]]:
+    """Split texts into chunks bounded by item count and approximate token budget."""
+    chunks: list[list[str]] = []
+    current: list[str] = []
+    current_tokens = 0
+
+    for text in texts:
+        tokens = estimate_tokens(text)
+        if current and (len(current) >= max_items or current_tokens + tokens > max_tokens):
+            chunks.append(current)
+            current, current_tokens = [], 0
+        current.append(text)
+        current_tokens += tokens
+
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def embed_with_retry(
+    texts: list[str],
+    batch_fn: BatchEmbeddingFunction = get_embeddings_batch,
+    max_retries: int = EMBEDDING_BULK_MAX_RETRIES,
+    backoff_base: float = 1.0,
+    retry_on: tuple[type[Exception], ...] = RETRYABLE_ERRORS,
+) -> list[list[float]]:
+    """Call batch_fn, retrying transient failures with exponential backoff and jitter."""
+    attempt = 0
+    while True:
+        try:
+            return batch_fn(texts)
+        except retry_on as e:
+            if attempt >= max_retries:
+                logger.error(f"Giving up on chunk of {len(texts)} texts after {attempt + 1} attempts")
+                raise
+            delay = backoff_base * (2 ** attempt) * (1 + random.random())
+            logger.warning(f"Embedding chunk failed ({e}), retrying in {delay:.1f}s")
+            time.sleep(delay)
+            attempt += 1
+
+
+def iter_embeddings_bulk(
+    texts: list[str],
+    batch_fn: BatchEmbeddingFunction = get_embeddings_batch,
+    max_items: int = EMBEDDING_BULK_CHUNK_SIZE,
+    max_tokens: int = EMBEDDING_BULK_MAX_TOKENS,
+    concurrency: int = EMBEDDING_BULK_CONCURRENCY,
+    max_retries: int = EMBEDDING_BULK_MAX_RETRIES,
+    backoff_base: float = 1.0,
+) -> Iterator[list[float]]:
+    """
+    Embed texts in input order, yielding each vector as soon as it is ready.
+
+    Identical texts are embedded once. At most `concurrency` chunks are in
+    flight, and only vectors still needed by a later duplicate are retained,
+    so memory stays bounded for very large inputs.
+    """
+    unique_index: dict[str, int] = {}
+    positions: list[int] = []
+    for text in texts:
+        positions.append(unique_index.setdefault(text, len(unique_index)))
+    unique_texts = list(unique_index)
+
+    last_use: dict[int, int] = {u: i for i, u in enumerate(positions)}
+    chunks = chunk_texts(unique_texts, max_items=max_items, max_tokens=max_tokens)
+    logger.info(
+        f"Bulk embedding {len(texts)} texts ({len(unique_texts)} unique) "
+        f"in {len(chunks)} chunks, concurrency={concurrency}"
+    )
+
+    ready: dict[int, list[float]] = {}
+    embedded = 0
+    emitted = 0
+
+    def drain() -> Iterator[list[float]]:
+        nonlocal emitted
+        while emitted < len(positions) and positions[emitted] < embedded:
+            u = positions[emitted]
+            vector = ready[u]
+            if last_use[u] == emitted:
+                del ready[u]
+            emitted += 1
+            yield vector
+
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        in_flight: deque[Future] = deque()
+        chunk_iter = iter(chunks)
+
+        def submit_next() -> None:
+            chunk = next(chunk_iter, None)
+            if chunk is not None:
+                # Run in the caller's context so usage, timings and spans land on its request
+                in_flight.append(executor.submit(
+                    contextvars.copy_context().run,
+                    embed_with_retry, chunk, batch_fn, max_retries, backoff_base
+                ))
+
+        for _ in range(concurrency):
+            submit_next()
+
+        while in_flight:
+            vectors = in_flight.popleft().result()
+            submit_next()
+            for vector in vectors:
+                ready[embedded] = vector
+                embedded += 1
+            yield from drain()
+
+    logger.info(f"Bulk embedding complete: {emitted} vectors")
+
+
+def get_embeddings_bulk(texts: list[str], **kwargs) -> list[list[float]]:
+    """Embed any number of texts; see iter_embeddings_bulk for options."""
+    return list(iter_embeddings_bulk(texts, **kwargs))
@@ -0,0 +1,280 @@
+"""Two-tier query embedding cache (in-process LRU + PostgreSQL)."""
+
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Optional
+
+from sqlalchemy import text
+
+from src.config import (
+    EMBEDDING_MODEL,
+    EMBEDDING_DIMENSIONS,
+    EMBEDDING_CACHE_SIZE,
+    EMBEDDING_CACHE_TTL_SECONDS,
+    EMBEDDING_CACHE_PERSISTENT,
+    EMBEDDING_BATCHING,
+)
+from src.db.models.base import engine
+from src.embeddings.batcher import embedding_batcher
+from src.embeddings.bulk import get_embeddings_bulk
+from src.embeddings.openai_embed import get_embedding
+from src.metrics import embedding_seconds
+from src.retrievers.base import EmbeddingFunction
+from src.tracing import current_span, span
+from src.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+def normalize_text(text_value: str) -> str:
+    """Normalize query text so trivially different inputs share a cache entry."""
+    return " ".join(text_value.split()).lower()
+
+
+def hash_text(text_value: str) -> str:
+    """SHA-256 hex digest of the normalized text."""
+    return hashlib.sha256(normalize_text(text_value).encode("utf-8")).hexdigest()
+
+
+class EmbeddingCache:
+    """
+    Cache in front of an embedding function.
+
+    Lookups hit an in-process LRU first, then the shared `embedding_cache`
+    table, and only call the wrapped function on a miss in both tiers.
+    Instances are callable, so they satisfy the EmbeddingFunction protocol.
+    `embed_batch` does the same for many texts, sending all misses to
+    `batch_fn` in one call (falling back to `embed_fn` per text).
+    """
+
+    def __init__(
+        self,
+        embed_fn: EmbeddingFunction,
+        model: str = EMBEDDING_MODEL,
+        dimensions: int = EMBEDDING_DIMENSIONS,
+        max_size: int = EMBEDDING_CACHE_SIZE,
+        ttl_seconds: float = EMBEDDING_CACHE_TTL_SECONDS,
+        persistent: bool = EMBEDDING_CACHE_PERSISTENT,
+        batch_fn: Optional[Callable[[list[str]], list[list[float]]]] = None,
+    ):
+        self.embed_fn = embed_fn
+        self.batch_fn = batch_fn
+        self.model = model
+        self.dimensions = dimensions
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self.persistent = persistent
+
+        self._entries: OrderedDict[tuple, tuple[float, list[float]]] = OrderedDict()
+        self._lock = threading.Lock()
+        self._memory_hits = 0
+        self._persistent_hits = 0
+        self._misses = 0
+
+    def __call__(self, text_value: str) -> list[float]:
+        """Return the embedding for text, using the cache when possible."""
+        with span("embedding", model=self.model), embedding_seconds.time(op="embed"):
+            return self._embed(text_value)
+
+    def _embed(self, text_value: str) -> list[float]:
+        """Memory, then persistent cache, then the embedding API."""
+        key = (self.model, self.dimensions, hash_text(text_value))
+
+        embedding = self._memory_get(key)
+        if embedding is not None:
+            with self._lock:
+                self._memory_hits += 1
+            current_span().set_attribute("cache", "memory")
+            return embedding
+
+        if self.persistent:
+            embedding = self._persistent_get(key)
+            if embedding is not None:
+                with self._lock:
+                    self._persistent_hits += 1
+                current_span().set_attribute("cache", "persistent")
+                self._memory_put(key, embedding)
+                return embedding
+
+        with self._lock:
+            self._misses += 1
+        current_span().set_attribute("cache", "miss")
+        with embedding_seconds.time(op="api_embed"):
+            embedding = self.embed_fn(text_value)
+        self._memory_put(key, embedding)
+        if self.persistent:
+            self._persistent_put(key, embedding)
+        return embedding
+
+    def embed_batch(self, texts: list[str]) -> list[list[float]]:
+        """Return embeddings for many texts with one lookup per tier and one batch call."""
+        with span("embedding_batch", model=self.model, texts=len(texts)), embedding_seconds.time(op="embed_batch"):
+            return self._embed_batch(texts)
+
+    def _embed_batch(self, texts: list[str]) -> list[list[float]]:
+        """Batched _embed: one lookup per tier and one API call for the misses."""
+        keys = [(self.model, self.dimensions, hash_text(t)) for t in texts]
+        found: dict[tuple, list[float]] = {}
+        memory_hits = persistent_hits = 0
+
+        for key in dict.fromkeys(keys):
+            embedding = self._memory_get(key)
+            if embedding is not None:
+                found[key] = embedding
+                memory_hits += 1
+
+        if self.persistent:
+            pending = [key for key in dict.fromkeys(keys) if key not in found]
+            for key, embedding in self._persistent_get_many(pending).items():
+                found[key] = embedding
+                self._memory_put(key, embedding)
+                persistent_hits += 1
+
+        missing: dict[tuple, str] = {}
+        for key, text_value in zip(keys, texts):
+            if key not in found:
+                missing.setdefault(key, text_value)
+
+        if missing:
+            with embedding_seconds.time(op="api_embed_batch"):
+                if self.batch_fn is not None:
+                    vectors = self.batch_fn(list(missing.values()))
+                else:
+                    vectors = [self.embed_fn(t) for t in missing.values()]
+            new_entries = dict(zip(missing, vectors))
+            for key, embedding in new_entries.items():
+                self._memory_put(key, embedding)
+            if self.persistent:
+                self._persistent_put_many(new_entries)
+            found.update(new_entries)
+
+        with self._lock:
+            self._memory_hits += memory_hits
+            self._persistent_hits += persistent_hits
+            self._misses += len(missing)
+        current_span().set_attributes(memory_hits=memory_hits, persistent_hits=persistent_hits, misses=len(missing))
+        return [found[key] for key in keys]
+
+    def stats(self) -> dict:
+        """Hit/miss counters and current in-process size."""
+        with self._lock:
+            lookups = self._memory_hits + self._persistent_hits + self._misses
+            hits = self._memory_hits + self._persistent_hits
+            return {
+                "memory_hits": self._memory_hits,
+                "persistent_hits": self._persistent_hits,
+                "misses": self._misses,
+                "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+                "size": len(self._entries),
+                "max_size": self.max_size,
+            }
+
+    def clear(self) -> None:
+        """Drop in-process entries and reset counters (persistent rows are kept)."""
+        with self._lock:
+            self._entries.clear()
+            self._memory_hits = 0
+            self._persistent_hits = 0
+            self._misses = 0
+
+    def _memory_get(self, key: tuple) -> Optional[list[float]]:
+        """Look up an unexpired in-process entry and mark it recently used."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            stored_at, embedding = entry
+            if time.monotonic() - stored_at > self.ttl_seconds:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return embedding
+
+    def _memory_put(self, key: tuple, embedding: list[float]) -> None:
+        """Store an in-process entry, evicting the least recently used ones."""
+        if self.max_size <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (time.monotonic(), embedding)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def _persistent_get(self, key: tuple) -> Optional[list[float]]:
+        """Read a cached embedding from PostgreSQL; failures count as a miss."""
+        model, dimensions, text_hash = key
+        try:
+            with engine.connect() as conn:
+                row = conn.execute(text("""
+                    SELECT embedding::text AS embedding
+                    FROM embedding_cache
+                    WHERE model = :model AND dimensions = :dimensions AND text_hash = :text_hash
+                """), {"model": model, "dimensions": dimensions, "text_hash": text_hash}).fetchone()
+        except Exception as e:
+            logger.warning(f"Embedding cache read failed, falling back to API: {e}")
+            return None
+
+        if not row:
+            return None
+        return [float(v) for v in row.embedding[1:-1].split(",")]
+
+    def _persistent_get_many(self, keys: list[tuple]) -> dict[tuple, list[float]]:
+        """Read several cached embeddings in one query; failures count as misses."""
+        if not keys:
+            return {}
+        model, dimensions = self.model, self.dimensions
+        try:
+            with engine.connect() as conn:
+                rows = conn.execute(text("""
+                    SELECT text_hash, embedding::text AS embedding
+                    FROM embedding_cache
+                    WHERE model = :model AND dimensions = :dimensions
+                      AND text_hash = ANY(:text_hashes)
+                """), {
+                    "model": model,
+                    "dimensions": dimensions,
+                    "text_hashes": [key[2] for key in keys],
+                }).fetchall()
+        except Exception as e:
+            logger.warning(f"Embedding cache read failed, falling back to API: {e}")
+            return {}
+
+        return {
+            (model, dimensions, row.text_hash): [float(v) for v in row.embedding[1:-1].split(",")]
+            for row in rows
+        }
+
+    def _persistent_put(self, key: tuple, embedding: list[float]) -> None:
+        """Write an embedding to PostgreSQL; failures are logged and ignored."""
+        self._persistent_put_many({key: embedding})
+
+    def _persistent_put_many(self, entries: dict[tuple, list[float]]) -> None:
+        """Write embeddings to PostgreSQL in one executemany; failures are logged and ignored."""
+        if not entries:
+            return
+        try:
+            with engine.connect() as conn:
+                conn.execute(text("""
+                    INSERT INTO embedding_cache (model, dimensions, text_hash, embedding)
+                    VALUES (:model, :dimensions, :text_hash, CAST(:vec AS vector))
+                    ON CONFLICT (model, dimensions, text_hash) DO NOTHING
+                """), [
+                    {
+                        "model": model,
+                        "dimensions": dimensions,
+                        "text_hash": text_hash,
+                        "vec": list(embedding),
+                    }
+                    for (model, dimensions, text_hash), embedding in entries.items()
+                ])
+                conn.commit()
+        except Exception as e:
+            logger.warning(f"Embedding cache write failed: {e}")
+
+
+embedding_cache = EmbeddingCache(
+    embedding_batcher if EMBEDDING_BATCHING else get_embedding,
+    batch_fn=get_embeddings_bulk,
+)
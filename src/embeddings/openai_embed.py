@@ -1,5 +1,6 @@
 from openai import OpenAI
-from src.config import OPENAI_API_KEY, EMBEDDING_MODEL
+from src.config import OPENAI_API_KEY, EMBEDDING_MODEL, EMBEDDING_DIMENSIONS
+from src.usage import record_embedding_usage
 from src.logger import get_logger
 
 logger = get_logger(__name__)
@@ -13,8 +14,10 @@ def get_embedding(text: str) -> list[float]:
     try:
         response = client.embeddings.create(
             model=EMBEDDING_MODEL,
-            input=text
+            input=text,
+            dimensions=EMBEDDING_DIMENSIONS
         )
+        record_embedding_usage(EMBEDDING_MODEL, response.usage.prompt_tokens)
         logger.debug(f"Embedding received: {len(response.data[0].embedding)} dimensions")
         return response.data[0].embedding
     except Exception as e:
@@ -28,8 +31,10 @@ def get_embeddings_batch(texts: list[str]) -> list[list[float]]:
     try:
         response = client.embeddings.create(
             model=EMBEDDING_MODEL,
-            input=texts
+            input=texts,
+            dimensions=EMBEDDING_DIMENSIONS
         )
+        record_embedding_usage(EMBEDDING_MODEL, response.usage.prompt_tokens)
         logger.info(f"Batch embeddings received: {len(response.data)} vectors")
         return [item.embedding for item in response.data]
     except Exception as e:
@@ -1,12 +1,27 @@
 import logging
 import os
 import sys
+from contextvars import ContextVar
 from datetime import datetime
 from pathlib import Path
 
 LOGS_DIR = Path(__file__).parent.parent / "logs"
 _app_logger_initialized = False
 
+# Trace ID of the request being handled (set by src.tracing), "-" outside one
+current_trace_id: ContextVar[str] = ContextVar("current_trace_id", default="-")
+_base_record_factory = logging.getLogRecordFactory()
+
+
+def _record_with_trace_id(*args, **kwargs) -> logging.LogRecord:
+    """Log record factory adding `trace_id`, so every record can be tied to its request trace."""
+    record = _base_record_factory(*args, **kwargs)
+    record.trace_id = current_trace_id.get()
+    return record
+
+
+logging.setLogRecordFactory(_record_with_trace_id)
+
 
 def setup_app_logger(
     name: str = "clinical_ai",
@@ -32,7 +47,7 @@ def setup_app_logger(
     root_logger.setLevel(level)
     
     formatter = logging.Formatter(
-        '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+        '%(asctime)s - %(name)s - %(levelname)s - [%(trace_id)s] - %(message)s'
     )
     
     file_handler = logging.FileHandler(log_file, mode='w')
@@ -0,0 +1,262 @@
+"""In-process latency histograms and counters, rendered in the Prometheus text format."""
+
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, Iterator, Optional
+
+DEFAULT_BUCKETS = (
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0
+)
+
+
+def escape_label(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def format_labels(labels: dict) -> str:
+    """`{a="1",b="2"}` for a label dict, or an empty string."""
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{escape_label(value)}"' for key, value in labels.items()) + "}"
+
+
+class RequestTimings:
+    """
+    Time one request spent in each phase (routing, embedding, retrieval, ...).
+
+    Started by an API endpoint with start_request_timings(); histograms
+    that map their labels to a phase add every observation made in the
+    request's context. Phases that overlap (e.g. parallel retrieval) or
+    nest (LLM calls inside routing) are each reported in full.
+    """
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        self._phases: dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def add(self, phase: str, seconds: float) -> None:
+        with self._lock:
+            self._phases[phase] = self._phases.get(phase, 0.0) + seconds
+
+    @contextmanager
+    def time(self, phase: str) -> Iterator[None]:
+        """Add the duration of the with-block to phase."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(phase, time.perf_counter() - start)
+
+    def as_dict(self) -> dict[str, float]:
+        """Milliseconds per phase, in first-seen order, plus `total` so far."""
+        with self._lock:
+            phases = {phase: round(seconds * 1000, 1) for phase, seconds in self._phases.items()}
+        phases["total"] = round((time.perf_counter() - self.start) * 1000, 1)
+        return phases
+
+    def server_timing(self) -> str:
+        """Server-Timing header value, e.g. `routing;dur=412.3, total;dur=1830.0`."""
+        return ", ".join(f"{phase};dur={ms}" for phase, ms in self.as_dict().items())
+
+
+_request_timings: ContextVar[Optional[RequestTimings]] = ContextVar("request_timings", default=None)
+
+
+def start_request_timings() -> RequestTimings:
+    """Start collecting phase timings for the current request (context)."""
+    timings = RequestTimings()
+    _request_timings.set(timings)
+    return timings
+
+
+def current_request_timings() -> Optional[RequestTimings]:
+    return _request_timings.get()
+
+
+class Histogram:
+    """
+    Fixed-bucket latency histogram, one series per label combination.
+
+    An observation is a bisect over the bucket bounds and three additions
+    under a lock; cumulative bucket counts are only computed when rendered.
+    With `phase`, a function from labels to a phase name (or None), each
+    observation is also added to the current request's RequestTimings.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: tuple = (),
+        buckets: tuple = DEFAULT_BUCKETS,
+        phase: Optional[Callable[[dict], Optional[str]]] = None,
+    ):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self.buckets = tuple(sorted(buckets))
+        self.phase = phase
+        self._series: dict[tuple, list] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, seconds: float, **labels) -> None:
+        """Record one observation."""
+        if self.phase is not None:
+            timings = _request_timings.get()
+            phase = self.phase(labels) if timings is not None else None
+            if phase:
+                timings.add(phase, seconds)
+        key = tuple(str(labels.get(name, "")) for name in self.labelnames)
+        index = bisect_left(self.buckets, seconds)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][index] += 1
+            series[1] += seconds
+            series[2] += 1
+
+    @contextmanager
+    def time(self, **labels) -> Iterator[None]:
+        """Observe the duration of the with-block (also when it raises)."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def snapshot(self) -> dict[tuple, tuple[list[int], float, int]]:
+        """Per-series (bucket counts, sum, count) copies."""
+        with self._lock:
+            return {key: (list(counts), total, count) for key, (counts, total, count) in self._series.items()}
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        for key, (counts, total, count) in sorted(self.snapshot().items()):
+            labels = dict(zip(self.labelnames, key))
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                lines.append(f"{self.name}_bucket{format_labels({**labels, 'le': bound})} {cumulative}")
+            lines.append(f"{self.name}_bucket{format_labels({**labels, 'le': '+Inf'})} {count}")
+            lines.append(f"{self.name}_sum{format_labels(labels)} {total}")
+            lines.append(f"{self.name}_count{format_labels(labels)} {count}")
+        return lines
+
+
+class Counter:
+    """Monotonic counter, one series per label combination."""
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self._values: dict[tuple, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        key = tuple(str(labels.get(name, "")) for name in self.labelnames)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels) -> float:
+        key = tuple(str(labels.get(name, "")) for name in self.labelnames)
+        with self._lock:
+            return self._values.get(key, 0)
+
+    def render(self) -> list[str]:
+        with self._lock:
+            values = dict(self._values)
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} counter"]
+        for key, value in sorted(values.items()):
+            lines.append(f"{self.name}{format_labels(dict(zip(self.labelnames, key)))} {value}")
+        return lines
+
+
+class MetricsRegistry:
+    """
+    Metrics exposed at /metrics.
+
+    Gauges are not stored: `add_gauges` registers a callback returning
+    (name, documentation, [(labels, value), ...]) tuples, read on each scrape.
+    """
+
+    def __init__(self):
+        self._metrics: list = []
+        self._gauge_callbacks: list[Callable[[], list[tuple[str, str, list[tuple[dict, float]]]]]] = []
+
+    def histogram(self, name: str, documentation: str, labelnames: tuple = (), **kwargs) -> Histogram:
+        metric = Histogram(name, documentation, labelnames, **kwargs)
+        self._metrics.append(metric)
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: tuple = ()) -> Counter:
+        metric = Counter(name, documentation, labelnames)
+        self._metrics.append(metric)
+        return metric
+
+    def add_gauges(self, callback: Callable[[], list[tuple[str, str, list[tuple[dict, float]]]]]) -> None:
+        self._gauge_callbacks.append(callback)
+
+    def render(self) -> str:
+        """All metrics in the Prometheus text exposition format (0.0.4)."""
+        lines: list[str] = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        for callback in self._gauge_callbacks:
+            for name, documentation, samples in callback():
+                lines.extend([f"# HELP {name} {documentation}", f"# TYPE {name} gauge"])
+                lines.extend(f"{name}{format_labels(labels)} {value}" for labels, value in samples)
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+
+graph_node_seconds = registry.histogram(
+    "cds_graph_node_seconds", "Graph node duration", ("node",),
+    phase=lambda labels: "routing" if labels["node"] == "supervisor" else None,
+)
+graph_node_errors = registry.counter(
+    "cds_graph_node_errors_total", "Graph node runs that raised", ("node",)
+)
+embedding_seconds = registry.histogram(
+    "cds_embedding_seconds",
+    "Embedding call duration; op is embed/embed_batch (including cache) or api_embed/api_embed_batch",
+    ("op",),
+    phase=lambda labels: "embedding" if labels["op"] in ("embed", "embed_batch") else None,
+)
+llm_seconds = registry.histogram(
+    "cds_llm_seconds", "Chat model call duration per agent, including retries and hedges", ("agent",),
+    phase=lambda labels: "llm_routing" if labels["agent"] == "supervisor" else "llm_synthesis",
+)
+retriever_sql_seconds = registry.histogram(
+    "cds_retriever_sql_seconds",
+    "Retriever SQL statement duration, including connection checkout",
+    ("table", "op"),
+    phase=lambda labels: f"retrieval_{labels['table']}",
+)
+checkpoint_seconds = registry.histogram(
+    "cds_checkpoint_seconds", "PostgresCheckpointer operation duration", ("op",),
+    phase=lambda labels: "checkpoint",
+)
+message_seconds = registry.histogram(
+    "cds_message_persist_seconds", "Chat message writes", ("op",),
+    phase=lambda labels: "messages",
+)
+db_pool_wait_seconds = registry.histogram(
+    "cds_db_pool_wait_seconds", "Time spent waiting for a pooled database connection", ("engine",)
+)
+sse_stream_seconds = registry.histogram(
+    "cds_sse_stream_seconds", "Duration of streamed (SSE) graph runs",
+    buckets=(0.5, 1.0, 2.5, 5.0, 10.0, 20.0, 30.0, 60.0, 120.0),
+)
+tokens_total = registry.counter(
+    "cds_tokens_total", "Tokens used per model; kind is prompt, completion or embedding", ("model", "kind")
+)
+cost_usd_total = registry.counter(
+    "cds_cost_usd_total", "Estimated spend per model (USD) at MODEL_PRICES", ("model",)
+)
@@ -1,5 +1,18 @@
 from src.retrievers.base import BaseRetriever
+from src.retrievers.pgvector_retriever import PgVectorRetriever
 from src.retrievers.tools_retriever import ToolsRetriever
 from src.retrievers.orgs_retriever import OrgsRetriever
+from src.retrievers.memory_retriever import InMemoryRetriever
+from src.retrievers.catalog_search import CatalogSearch
+from src.retrievers.result_cache import RetrievalCache, retrieval_cache
 
-__all__ = ["BaseRetriever", "ToolsRetriever", "OrgsRetriever"]
+__all__ = [
+    "BaseRetriever",
+    "PgVectorRetriever",
+    "ToolsRetriever",
+    "OrgsRetriever",
+    "InMemoryRetriever",
+    "CatalogSearch",
+    "RetrievalCache",
+    "retrieval_cache",
+]
@@ -1,5 +1,6 @@
+import asyncio
 from abc import ABC, abstractmethod
-from typing import Protocol
+from typing import Optional, Protocol
 
 
 class EmbeddingFunction(Protocol):
@@ -10,10 +11,52 @@ class EmbeddingFunction(Protocol):
 class BaseRetriever(ABC):
     """Abstract base class for pgvector retrievers."""
     
+    filter_columns: dict[str, str] = {}
+    
     def __init__(self, embed_fn: EmbeddingFunction):
         self.embed_fn = embed_fn
     
     @abstractmethod
-    def search(self, query: str, limit: int = 5) -> list[dict]:
-        """Search for similar items using semantic search."""
+    def search(self, query: str, limit: int = 5, filters: Optional[dict] = None) -> list[dict]:
+        """Search for similar items using semantic search, optionally filtered by metadata."""
         pass
+    
+    @abstractmethod
+    def search_by_vector(
+        self, query_embedding: list[float], limit: int = 5, filters: Optional[dict] = None
+    ) -> list[dict]:
+        """Search with a precomputed query embedding."""
+        pass
+    
+    async def asearch(self, query: str, limit: int = 5, filters: Optional[dict] = None) -> list[dict]:
+        """Async search; runs the sync search in a worker thread unless overridden."""
+        return await asyncio.to_thread(self.search, query, limit, filters)
+    
+    async def asearch_by_vector(
+        self, query_embedding: list[float], limit: int = 5, filters: Optional[dict] = None
+    ) -> list[dict]:
+        """Async search_by_vector; runs the sync version in a worker thread unless overridden."""
+        return await asyncio.to_thread(self.search_by_vector, query_embedding, limit, filters)
+    
+    async def aembed(self, text: str) -> list[float]:
+        """Embed text without blocking the event loop."""
+        return await asyncio.to_thread(self.embed_fn, text)
+    
+    def search_batch(
+        self, queries: list[str], limit: int = 5, filters: Optional[dict] = None
+    ) -> list[list[dict]]:
+        """Search many queries at once; results are returned in query order."""
+        return self.search_batch_by_vectors(self.embed_batch(queries), limit=limit, filters=filters)
+    
+    def search_batch_by_vectors(
+        self, query_embeddings: list[list[float]], limit: int = 5, filters: Optional[dict] = None
+    ) -> list[list[dict]]:
+        """Search many precomputed query embeddings; override for a set-based query."""
+        return [self.search_by_vector(vec, limit=limit, filters=filters) for vec in query_embeddings]
+    
+    def embed_batch(self, texts: list[str]) -> list[list[float]]:
+        """Embed texts in one call when embed_fn supports it (e.g. EmbeddingCache)."""
+        embed_batch = getattr(self.embed_fn, "embed_batch", None)
+        if embed_batch is not None:
+            return embed_batch(texts)
+        return [self.embed_fn(text) for text in texts]
@@ -0,0 +1,237 @@
+import asyncio
+import contextvars
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+
+from sqlalchemy import text
+
+from src.retrievers.base import BaseRetriever, EmbeddingFunction
+from src.retrievers.pgvector_retriever import PgVectorRetriever
+from src.retrievers.sql import similarity_search_sql, combined_search_sql, to_query_vector
+from src.db.models.base import engine, async_engine
+from src.metrics import retriever_sql_seconds
+from src.tracing import span
+from src.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Shared by every CatalogSearch (the search_clinical_workflow tool builds one
+# per call) for running the two sync searches side by side.
+_executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix="catalog-search")
+
+
+class CatalogSearch:
+    """
+    Embed a query once and search both catalog tables.
+
+    When both retrievers are pgvector-backed with the same search mode, the
+    two searches run as one SQL statement (one round trip). Otherwise each
+    retriever's search_by_vector runs concurrently with the shared vector.
+    """
+    
+    def __init__(
+        self,
+        tools_retriever: BaseRetriever,
+        orgs_retriever: BaseRetriever,
+        embed_fn: EmbeddingFunction | None = None,
+    ):
+        self.tools_retriever = tools_retriever
+        self.orgs_retriever = orgs_retriever
+        self.embed_fn = embed_fn or tools_retriever.embed_fn
+    
+    def search(
+        self,
+        query: str,
+        tools_limit: int = 3,
+        orgs_limit: int = 3,
+        tools_filters: Optional[dict] = None,
+        orgs_filters: Optional[dict] = None,
+    ) -> tuple[list[dict], list[dict]]:
+        """Return (tools_results, orgs_results) for a query."""
+        logger.info(f"Searching tools and orgs: query='{query[:50]}...'")
+        query_embedding = self.embed_fn(query)
+        return self.search_by_vector(
+            query_embedding, tools_limit, orgs_limit, tools_filters, orgs_filters
+        )
+    
+    def search_by_vector(
+        self,
+        query_embedding: list[float],
+        tools_limit: int = 3,
+        orgs_limit: int = 3,
+        tools_filters: Optional[dict] = None,
+        orgs_filters: Optional[dict] = None,
+    ) -> tuple[list[dict], list[dict]]:
+        """Return (tools_results, orgs_results) for a precomputed query embedding."""
+        if self._single_statement():
+            return self._search_single_statement(
+                query_embedding, tools_limit, orgs_limit, tools_filters, orgs_filters
+            )
+        
+        orgs_future = _executor.submit(
+            contextvars.copy_context().run,
+            self.orgs_retriever.search_by_vector, query_embedding, orgs_limit, orgs_filters,
+        )
+        tools_results = self.tools_retriever.search_by_vector(query_embedding, tools_limit, tools_filters)
+        return tools_results, orgs_future.result()
+    
+    async def asearch(
+        self,
+        query: str,
+        tools_limit: int = 3,
+        orgs_limit: int = 3,
+        tools_filters: Optional[dict] = None,
+        orgs_filters: Optional[dict] = None,
+    ) -> tuple[list[dict], list[dict]]:
+        """Async search: one embedding, then both tables without blocking the event loop."""
+        logger.info(f"Searching tools and orgs: query='{query[:50]}...'")
+        query_embedding = await self.tools_retriever.aembed(query)
+        return await self.asearch_by_vector(
+            query_embedding, tools_limit, orgs_limit, tools_filters, orgs_filters
+        )
+    
+    async def asearch_by_vector(
+        self,
+        query_embedding: list[float],
+        tools_limit: int = 3,
+        orgs_limit: int = 3,
+        tools_filters: Optional[dict] = None,
+        orgs_filters: Optional[dict] = None,
+    ) -> tuple[list[dict], list[dict]]:
+        """Async search_by_vector: one statement when possible, otherwise both searches concurrently."""
+        if self._single_statement():
+            return await self._asearch_single_statement(
+                query_embedding, tools_limit, orgs_limit, tools_filters, orgs_filters
+            )
+        
+        tools_results, orgs_results = await asyncio.gather(
+            self.tools_retriever.asearch_by_vector(query_embedding, tools_limit, tools_filters),
+            self.orgs_retriever.asearch_by_vector(query_embedding, orgs_limit, orgs_filters),
+        )
+        return tools_results, orgs_results
+    
+    def _single_statement(self) -> bool:
+        """Both tables can share one statement only if both are pgvector with one mode."""
+        return (
+            isinstance(self.tools_retriever, PgVectorRetriever)
+            and isinstance(self.orgs_retriever, PgVectorRetriever)
+            and self.tools_retriever.mode == self.orgs_retriever.mode
+        )
+    
+    def _search_single_statement(
+        self,
+        query_embedding: list[float],
+        tools_limit: int,
+        orgs_limit: int,
+        tools_filters: Optional[dict] = None,
+        orgs_filters: Optional[dict] = None,
+    ) -> tuple[list[dict], list[dict]]:
+        """Run both similarity searches in a single SQL round trip (skipping cached ones)."""
+        tools, orgs = self.tools_retriever, self.orgs_retriever
+        tools_cached, store_tools = tools.cache_lookup(query_embedding, tools_limit, tools_filters)
+        orgs_cached, store_orgs = orgs.cache_lookup(query_embedding, orgs_limit, orgs_filters)
+        if tools_cached is None and orgs_cached is None:
+            sql, params, filtered = self._combined_statement(
+                query_embedding, tools_limit, orgs_limit, tools_filters, orgs_filters
+            )
+            with self._combined_span() as sql_span, engine.connect() as conn:
+                tools.prepare_connection(conn, max(tools_limit, orgs_limit), filtered=filtered)
+                tools_results, orgs_results = self._combined_rows(conn.execute(text(sql), params), sql_span)
+        else:
+            tools_results = tools_cached
+            if tools_results is None:
+                tools_results = tools.query_by_vector(query_embedding, tools_limit, tools_filters)
+            orgs_results = orgs_cached
+            if orgs_results is None:
+                orgs_results = orgs.query_by_vector(query_embedding, orgs_limit, orgs_filters)
+        return self._finish(
+            (tools_results, tools_cached, store_tools), (orgs_results, orgs_cached, store_orgs)
+        )
+    
+    async def _asearch_single_statement(
+        self,
+        query_embedding: list[float],
+        tools_limit: int,
+        orgs_limit: int,
+        tools_filters: Optional[dict] = None,
+        orgs_filters: Optional[dict] = None,
+    ) -> tuple[list[dict], list[dict]]:
+        """Async counterpart of _search_single_statement."""
+        tools, orgs = self.tools_retriever, self.orgs_retriever
+        tools_cached, store_tools = await tools.acache_lookup(query_embedding, tools_limit, tools_filters)
+        orgs_cached, store_orgs = await orgs.acache_lookup(query_embedding, orgs_limit, orgs_filters)
+        if tools_cached is None and orgs_cached is None:
+            sql, params, filtered = self._combined_statement(
+                query_embedding, tools_limit, orgs_limit, tools_filters, orgs_filters
+            )
+            with self._combined_span() as sql_span:
+                async with async_engine.connect() as conn:
+                    await tools.aprepare_connection(conn, max(tools_limit, orgs_limit), filtered=filtered)
+                    tools_results, orgs_results = self._combined_rows(
+                        await conn.execute(text(sql), params), sql_span
+                    )
+        else:
+            tools_results = tools_cached
+            if tools_results is None:
+                tools_results = await tools.aquery_by_vector(query_embedding, tools_limit, tools_filters)
+            orgs_results = orgs_cached
+            if orgs_results is None:
+                orgs_results = await orgs.aquery_by_vector(query_embedding, orgs_limit, orgs_filters)
+        return self._finish(
+            (tools_results, tools_cached, store_tools), (orgs_results, orgs_cached, store_orgs)
+        )
+    
+    @contextmanager
+    def _combined_span(self):
+        """Tracing span and latency metric around the combined statement."""
+        with span("sql.combined_search", table="catalog") as sql_span, \
+                retriever_sql_seconds.time(table="catalog", op="combined_search"):
+            yield sql_span
+    
+    @staticmethod
+    def _combined_rows(result, sql_span) -> tuple[list[dict], list[dict]]:
+        """(tools, orgs) from the combined statement's single row."""
+        row = result.fetchone()
+        sql_span.set_attributes(tools_rows=len(row.tools), orgs_rows=len(row.orgs))
+        return row.tools, row.orgs
+    
+    def _finish(self, tools_outcome: tuple, orgs_outcome: tuple) -> tuple[list[dict], list[dict]]:
+        """Log, cache what was queried and return (tools_results, orgs_results)."""
+        labels = (self.tools_retriever.label, self.orgs_retriever.label)
+        found = []
+        for (results, cached, store), label in zip((tools_outcome, orgs_outcome), labels):
+            if cached is None:
+                store(results)
+            found.append(f"{len(results)} {label}{' (cached)' if cached is not None else ''}")
+        logger.info(f"Found {', '.join(found)}")
+        return tools_outcome[0], orgs_outcome[0]
+    
+    def _combined_statement(
+        self,
+        query_embedding: list[float],
+        tools_limit: int,
+        orgs_limit: int,
+        tools_filters: Optional[dict] = None,
+        orgs_filters: Optional[dict] = None,
+    ) -> tuple[str, dict, bool]:
+        """SQL, bind parameters and whether any filter applies, for searching both tables at once."""
+        tools, orgs = self.tools_retriever, self.orgs_retriever
+        tools_where, tools_filter_params = tools.filter_params(tools_filters, suffix="_tools")
+        orgs_where, orgs_filter_params = orgs.filter_params(orgs_filters, suffix="_orgs")
+        sql = combined_search_sql({
+            "tools": similarity_search_sql(
+                tools.table, tools.columns, tools.mode, suffix="_tools", where=tools_where
+            ),
+            "orgs": similarity_search_sql(
+                orgs.table, orgs.columns, orgs.mode, suffix="_orgs", where=orgs_where
+            ),
+        })
+        params = {
+            "vec": to_query_vector(query_embedding),
+            **tools.limit_params(tools_limit, suffix="_tools"),
+            **orgs.limit_params(orgs_limit, suffix="_orgs"),
+            **tools_filter_params,
+            **orgs_filter_params,
+        }
+        return sql, params, bool(tools_where or orgs_where)
@@ -0,0 +1,223 @@
+import threading
+import time
+from typing import Callable, Optional
+
+import numpy as np
+from sqlalchemy import text
+
+from src.config import IN_MEMORY_MAX_ROWS, IN_MEMORY_RETRY_SECONDS
+from src.retrievers.base import BaseRetriever
+from src.db.models.base import engine
+from src.db.catalog_version import catalog_version
+from src.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class InMemoryRetriever(BaseRetriever):
+    """
+    Exact top-k search over an in-process copy of a catalog table.
+
+    Wraps a pgvector retriever (ToolsRetriever / OrgsRetriever) and mirrors
+    its table into an L2-normalized float32 matrix plus column-oriented
+    metadata, so a search is one matrix-vector product and an argpartition.
+    Metadata filters are applied as a boolean mask before ranking, so they
+    never reduce the number of matching rows returned.
+    The mirror is keyed on the catalog version (`version_fn`, by default the
+    shared catalog_version tracker that also keys the retrieval cache) and
+    reloaded when it changes; a failed reload is retried after
+    `retry_seconds`. Catalogs larger than `max_rows` are never loaded;
+    searches go to the wrapped retriever.
+    """
+
+    def __init__(
+        self,
+        fallback: BaseRetriever,
+        max_rows: int = IN_MEMORY_MAX_ROWS,
+        retry_seconds: float = IN_MEMORY_RETRY_SECONDS,
+        version_fn: Optional[Callable[[], int]] = None,
+    ):
+        super().__init__(fallback.embed_fn)
+        self.fallback = fallback
+        self.table = fallback.table
+        self.columns = fallback.columns
+        self.filter_columns = fallback.filter_columns
+        self.max_rows = max_rows
+        self.retry_seconds = retry_seconds
+        self.version_fn = version_fn or catalog_version.current
+
+        self._snapshot: tuple[np.ndarray, dict[str, list]] | None = None
+        self._version: int | None = None
+        self._failed_at: float | None = None
+        self._refresh_lock = threading.Lock()
+
+    def search(self, query: str, limit: int = 5, filters: Optional[dict] = None) -> list[dict]:
+        """Search the in-memory mirror by semantic similarity."""
+        logger.info(f"Searching {self.table} (in-memory): query='{query[:50]}...', limit={limit}")
+        return self.search_by_vector(self.embed_fn(query), limit=limit, filters=filters)
+
+    def search_by_vector(
+        self, query_embedding: list[float], limit: int = 5, filters: Optional[dict] = None
+    ) -> list[dict]:
+        """Exact cosine top-k with a precomputed query embedding."""
+        self._maybe_refresh()
+        snapshot = self._snapshot
+        if snapshot is None:
+            return self.fallback.search_by_vector(query_embedding, limit=limit, filters=filters)
+
+        matrix, metadata = snapshot
+        mask = self._filter_mask(metadata, matrix.shape[0], filters)
+        k = min(limit, matrix.shape[0] if mask is None else int(mask.sum()))
+        if k <= 0:
+            return []
+
+        query = np.asarray(query_embedding, dtype=np.float32)
+        norm = np.linalg.norm(query)
+        if norm > 0:
+            query = query / norm
+
+        scores = matrix @ query
+        if mask is not None:
+            scores = np.where(mask, scores, -np.inf)
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+
+        results = [
+            {**{col: metadata[col][i] for col in self.columns}, "similarity": float(scores[i])}
+            for i in top
+        ]
+        logger.info(f"Found {len(results)} rows in {self.table} (in-memory)")
+        return results
+
+    def search_batch_by_vectors(
+        self, query_embeddings: list[list[float]], limit: int = 5, filters: Optional[dict] = None
+    ) -> list[list[dict]]:
+        """Exact cosine top-k for many queries with one matrix-matrix product."""
+        self._maybe_refresh()
+        snapshot = self._snapshot
+        if snapshot is None:
+            return self.fallback.search_batch_by_vectors(query_embeddings, limit=limit, filters=filters)
+
+        matrix, metadata = snapshot
+        mask = self._filter_mask(metadata, matrix.shape[0], filters)
+        k = min(limit, matrix.shape[0] if mask is None else int(mask.sum()))
+        if k <= 0 or not query_embeddings:
+            return [[] for _ in query_embeddings]
+
+        queries = np.asarray(query_embeddings, dtype=np.float32)
+        norms = np.linalg.norm(queries, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        scores = (queries / norms) @ matrix.T
+        if mask is not None:
+            scores = np.where(mask, scores, -np.inf)
+
+        top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        top_scores = np.take_along_axis(scores, top, axis=1)
+        top = np.take_along_axis(top, np.argsort(-top_scores, axis=1), axis=1)
+
+        return [
+            [
+                {**{col: metadata[col][i] for col in self.columns}, "similarity": float(scores[q, i])}
+                for i in row
+            ]
+            for q, row in enumerate(top)
+        ]
+
+    def _filter_mask(
+        self, metadata: dict[str, list], row_count: int, filters: Optional[dict]
+    ) -> Optional[np.ndarray]:
+        """Boolean mask of rows matching filters, with the same semantics as filter_sql."""
+        mask = None
+        for name, value in (filters or {}).items():
+            if value is None or value == [] or value == "":
+                continue
+            kind = self.filter_columns.get(name)
+            if kind is None:
+                raise ValueError(f"Unknown filter '{name}', expected one of {sorted(self.filter_columns)}")
+
+            values = {value} if isinstance(value, str) else set(value)
+            column = metadata[name]
+            if kind == "scalar":
+                matches = [v in values for v in column]
+            elif kind == "array":
+                matches = [bool(values.intersection(v or [])) for v in column]
+            else:
+                matches = [all((v or {}).get(f) is True for f in values) for v in column]
+
+            column_mask = np.fromiter(matches, dtype=bool, count=row_count)
+            mask = column_mask if mask is None else mask & column_mask
+        return mask
+
+    def refresh(self, force: bool = False) -> None:
+        """Reload the mirror if the catalog version changed (or unconditionally with force)."""
+        with self._refresh_lock:
+            version = self.version_fn()
+            if not force and version == self._version:
+                return
+
+            row_count = self._row_count()
+            if row_count > self.max_rows:
+                logger.info(
+                    f"{self.table} has {row_count} rows (> {self.max_rows}), "
+                    f"using pgvector instead of in-memory search"
+                )
+                self._snapshot = None
+            else:
+                self._snapshot = self._build_snapshot(self._fetch_rows())
+                logger.info(f"Loaded {row_count} rows from {self.table} into memory")
+            self._version = version
+
+    def _maybe_refresh(self) -> None:
+        """Refresh when the catalog version moved; back off after a failed reload."""
+        if self.version_fn() == self._version:
+            return
+        if self._version is not None and self._refresh_lock.locked():
+            return
+        failed_at = self._failed_at
+        if failed_at is not None and time.monotonic() - failed_at < self.retry_seconds:
+            return
+        try:
+            self.refresh()
+            self._failed_at = None
+        except Exception as e:
+            self._failed_at = time.monotonic()
+            logger.warning(f"In-memory refresh of {self.table} failed, keeping previous state: {e}")
+
+    def _build_snapshot(self, rows: list[dict]) -> tuple[np.ndarray, dict[str, list]]:
+        """Stack embeddings into a normalized float32 matrix and columnize metadata."""
+        if rows:
+            matrix = np.vstack([np.asarray(r["embedding"], dtype=np.float32) for r in rows])
+        else:
+            matrix = np.zeros((0, 0), dtype=np.float32)
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        matrix = np.ascontiguousarray(matrix / norms, dtype=np.float32)
+        metadata = {col: [r[col] for r in rows] for col in self._metadata_columns()}
+        return matrix, metadata
+
+    def _metadata_columns(self) -> list[str]:
+        """Result columns plus any filter-only columns (e.g. services)."""
+        return self.columns + [c for c in self.filter_columns if c not in self.columns]
+
+    def _row_count(self) -> int:
+        """Rows with an embedding, i.e. the size the mirror would have."""
+        with engine.connect() as conn:
+            return conn.execute(text(
+                f"SELECT count(*) FROM {self.table} WHERE embedding IS NOT NULL"
+            )).scalar_one()
+
+    def _fetch_rows(self) -> list[dict]:
+        """Load every row's metadata and embedding."""
+        with engine.connect() as conn:
+            result = conn.execute(text(f"""
+                SELECT {", ".join(self._metadata_columns())}, embedding::text AS embedding
+                FROM {self.table}
+                WHERE embedding IS NOT NULL
+                ORDER BY id
+            """))
+            rows = []
+            for row in result:
+                data = dict(row._mapping)
+                data["embedding"] = np.array(data["embedding"][1:-1].split(","), dtype=np.float32)
+                rows.append(data)
+            return rows
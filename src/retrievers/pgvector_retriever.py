@@ -0,0 +1,252 @@
+from typing import Callable, Optional
+
+from sqlalchemy import text
+
+from src.config import (
+    VECTOR_SEARCH_MODE,
+    BINARY_RERANK_OVERFETCH,
+    HNSW_ITERATIVE_SCAN,
+    VECTOR_INDEX_TYPE,
+    HNSW_EF_SEARCH,
+    IVFFLAT_PROBES,
+)
+from src.retrievers.base import BaseRetriever, EmbeddingFunction
+from src.retrievers.sql import similarity_search_sql, batch_search_sql, filter_sql, to_query_vector
+from src.retrievers.result_cache import RetrievalCache
+from src.db.models.base import engine, async_engine
+from src.db.vector_index import PGVECTOR_DEFAULTS, validate_index_type
+from src.metrics import retriever_sql_seconds
+from src.tracing import span
+from src.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class PgVectorRetriever(BaseRetriever):
+    """Shared pgvector search over a catalog table; subclasses set table/columns/filters."""
+    
+    table: str
+    columns: list[str]
+    label: str
+    batch_chunk_size: int = 500
+    max_ef_search: int = 1000
+    
+    def __init__(
+        self,
+        embed_fn: EmbeddingFunction,
+        mode: str = VECTOR_SEARCH_MODE,
+        result_cache: Optional[RetrievalCache] = None,
+        index_type: str = VECTOR_INDEX_TYPE,
+        ef_search: int = HNSW_EF_SEARCH,
+        probes: int = IVFFLAT_PROBES,
+    ):
+        super().__init__(embed_fn)
+        self.mode = mode
+        self.result_cache = result_cache
+        self.index_type = validate_index_type(index_type)
+        self.ef_search = ef_search
+        self.probes = probes
+    
+    def search(self, query: str, limit: int = 5, filters: Optional[dict] = None) -> list[dict]:
+        """Search the table by semantic similarity, optionally filtered by metadata."""
+        logger.info(f"Searching {self.table}: query='{query[:50]}...', limit={limit}, filters={filters}")
+        query_embedding = self.embed_fn(query)
+        return self.search_by_vector(query_embedding, limit=limit, filters=filters)
+    
+    def search_by_vector(
+        self, query_embedding: list[float], limit: int = 5, filters: Optional[dict] = None
+    ) -> list[dict]:
+        """Search the table with a precomputed query embedding."""
+        cached, store = self.cache_lookup(query_embedding, limit, filters)
+        if cached is not None:
+            logger.info(f"Found {len(cached)} {self.label} (cached)")
+            return cached
+        
+        results = self.query_by_vector(query_embedding, limit, filters)
+        store(results)
+        return results
+    
+    def query_by_vector(
+        self, query_embedding: list[float], limit: int = 5, filters: Optional[dict] = None
+    ) -> list[dict]:
+        """Run the similarity query, bypassing the result cache."""
+        where, filter_params = self.filter_params(filters)
+        with span("sql.search", table=self.table, limit=limit) as sql_span, \
+                retriever_sql_seconds.time(table=self.table, op="search"), engine.connect() as conn:
+            self.prepare_connection(conn, limit, filtered=bool(where))
+            result = conn.execute(
+                text(similarity_search_sql(self.table, self.columns, self.mode, where=where)),
+                {"vec": to_query_vector(query_embedding), **self.limit_params(limit), **filter_params}
+            )
+            
+            results = [dict(row._mapping) for row in result]
+            sql_span.set_attribute("rows", len(results))
+        logger.info(f"Found {len(results)} {self.label}")
+        return results
+    
+    async def asearch(self, query: str, limit: int = 5, filters: Optional[dict] = None) -> list[dict]:
+        """Async search over the async engine."""
+        logger.info(f"Searching {self.table}: query='{query[:50]}...', limit={limit}, filters={filters}")
+        query_embedding = await self.aembed(query)
+        return await self.asearch_by_vector(query_embedding, limit=limit, filters=filters)
+    
+    async def asearch_by_vector(
+        self, query_embedding: list[float], limit: int = 5, filters: Optional[dict] = None
+    ) -> list[dict]:
+        """Async search_by_vector, sharing the result cache with the sync path."""
+        cached, store = await self.acache_lookup(query_embedding, limit, filters)
+        if cached is not None:
+            logger.info(f"Found {len(cached)} {self.label} (cached)")
+            return cached
+        
+        results = await self.aquery_by_vector(query_embedding, limit, filters)
+        store(results)
+        return results
+    
+    async def aquery_by_vector(
+        self, query_embedding: list[float], limit: int = 5, filters: Optional[dict] = None
+    ) -> list[dict]:
+        """Async similarity query, bypassing the result cache."""
+        where, filter_params = self.filter_params(filters)
+        with span("sql.search", table=self.table, limit=limit) as sql_span, \
+                retriever_sql_seconds.time(table=self.table, op="search"):
+            async with async_engine.connect() as conn:
+                await self.aprepare_connection(conn, limit, filtered=bool(where))
+                result = await conn.execute(
+                    text(similarity_search_sql(self.table, self.columns, self.mode, where=where)),
+                    {"vec": to_query_vector(query_embedding), **self.limit_params(limit), **filter_params}
+                )
+                
+                results = [dict(row._mapping) for row in result]
+            sql_span.set_attribute("rows", len(results))
+        logger.info(f"Found {len(results)} {self.label}")
+        return results
+    
+    def search_batch_by_vectors(
+        self, query_embeddings: list[list[float]], limit: int = 5, filters: Optional[dict] = None
+    ) -> list[list[dict]]:
+        """Top-k for many query vectors with one LATERAL statement per chunk."""
+        logger.info(f"Batch searching {self.table}: {len(query_embeddings)} queries, limit={limit}")
+        where, filter_params = self.filter_params(filters)
+        results: list[list[dict]] = [[] for _ in query_embeddings]
+        pending: list[tuple[int, Callable[[list[dict]], None]]] = []
+        for i, vec in enumerate(query_embeddings):
+            cached, store = self.cache_lookup(vec, limit, filters)
+            if cached is None:
+                pending.append((i, store))
+            else:
+                results[i] = cached
+        
+        if pending:
+            with span("sql.batch_search", table=self.table, limit=limit, queries=len(pending)) as sql_span, \
+                    retriever_sql_seconds.time(table=self.table, op="batch_search"), engine.connect() as conn:
+                self.prepare_connection(conn, limit, filtered=bool(where))
+                sql = text(batch_search_sql(self.table, self.columns, self.mode, where=where))
+                for offset in range(0, len(pending), self.batch_chunk_size):
+                    chunk = pending[offset:offset + self.batch_chunk_size]
+                    rows = conn.execute(sql, {
+                        "vecs": [to_query_vector(query_embeddings[i]) for i, _ in chunk],
+                        **self.limit_params(limit),
+                        **filter_params,
+                    })
+                    for row in rows:
+                        data = dict(row._mapping)
+                        query_index = data.pop("query_index")
+                        results[chunk[query_index - 1][0]].append(data)
+                sql_span.set_attribute("rows", sum(len(results[i]) for i, _ in pending))
+            for i, store in pending:
+                store(results[i])
+        
+        logger.info(
+            f"Batch search returned {sum(len(r) for r in results)} {self.label} "
+            f"({len(query_embeddings) - len(pending)} cached queries)"
+        )
+        return results
+    
+    def cache_lookup(
+        self, query_embedding: list[float], limit: int, filters: Optional[dict] = None
+    ) -> tuple[Optional[list[dict]], Callable[[list[dict]], None]]:
+        """
+        Return (cached results or None, store) for a search.
+        
+        `store(results)` saves freshly queried results under the catalog
+        version read here, so a write that lands mid-query is never cached.
+        """
+        cache = self.result_cache
+        if cache is None:
+            return None, lambda results: None
+        key = cache.make_key(self.table, query_embedding, limit, filters)
+        version = cache.version()
+        return cache.get(key, version), lambda results: cache.put(key, results, version)
+    
+    async def acache_lookup(
+        self, query_embedding: list[float], limit: int, filters: Optional[dict] = None
+    ) -> tuple[Optional[list[dict]], Callable[[list[dict]], None]]:
+        """cache_lookup for the async path; the catalog version is read without blocking."""
+        cache = self.result_cache
+        if cache is None:
+            return None, lambda results: None
+        key = cache.make_key(self.table, query_embedding, limit, filters)
+        version = await cache.aversion()
+        return cache.get(key, version), lambda results: cache.put(key, results, version)
+    
+    def filter_params(self, filters: Optional[dict], suffix: str = "") -> tuple[str, dict]:
+        """WHERE clause and bind parameters for this table's metadata filters."""
+        return filter_sql(filters, self.filter_columns, suffix)
+    
+    def limit_params(self, limit: int, suffix: str = "") -> dict:
+        """Bind parameters for the LIMIT clauses of similarity_search_sql."""
+        return {
+            f"limit{suffix}": limit,
+            f"candidates{suffix}": limit * BINARY_RERANK_OVERFETCH,
+        }
+    
+    def search_settings(self, limit: int, filtered: bool = False) -> dict[str, str]:
+        """
+        Per-query index settings for a search.
+        
+        HNSW (also used by binary mode's quantized index) gets ef_search of at
+        least the number of rows the scan must produce. IVFFlat gets `probes`.
+        Filtered searches enable pgvector's iterative index scan, so the scan
+        keeps going until enough rows pass the filter instead of returning
+        fewer than `limit`. Values equal to pgvector's defaults are omitted.
+        """
+        settings: dict[str, str] = {}
+        iterative = filtered and HNSW_ITERATIVE_SCAN != "off"
+        
+        if self.index_type == "hnsw" or self.mode == "binary":
+            needed = limit * BINARY_RERANK_OVERFETCH if self.mode == "binary" else limit
+            ef_search = min(max(self.ef_search, needed), self.max_ef_search)
+            if ef_search != PGVECTOR_DEFAULTS["hnsw.ef_search"]:
+                settings["hnsw.ef_search"] = str(ef_search)
+            if iterative:
+                settings["hnsw.iterative_scan"] = HNSW_ITERATIVE_SCAN
+        
+        if self.index_type == "ivfflat" and self.mode != "binary":
+            if self.probes != PGVECTOR_DEFAULTS["ivfflat.probes"]:
+                settings["ivfflat.probes"] = str(self.probes)
+            if iterative:
+                # IVFFlat only supports relaxed ordering.
+                settings["ivfflat.iterative_scan"] = "relaxed_order"
+        
+        return settings
+    
+    def settings_statement(self, limit: int, filtered: bool = False) -> Optional[tuple[str, dict]]:
+        """Single `SELECT set_config(...)` statement and params for search_settings, or None."""
+        settings = self.search_settings(limit, filtered)
+        if not settings:
+            return None
+        calls = ", ".join(f"set_config('{name}', :s{i}, true)" for i, name in enumerate(settings))
+        return f"SELECT {calls}", {f"s{i}": value for i, value in enumerate(settings.values())}
+    
+    def prepare_connection(self, conn, limit: int, filtered: bool = False) -> None:
+        """Apply search_settings for this transaction in a single statement."""
+        statement = self.settings_statement(limit, filtered)
+        if statement:
+            conn.execute(text(statement[0]), statement[1])
+    
+    async def aprepare_connection(self, conn, limit: int, filtered: bool = False) -> None:
+        """prepare_connection for an AsyncConnection."""
+        statement = self.settings_statement(limit, filtered)
+        if statement:
+            await conn.execute(text(statement[0]), statement[1])
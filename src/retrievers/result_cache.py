@@ -0,0 +1,154 @@
+"""In-process cache of retrieval results, invalidated by catalog version."""
+
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from typing import Awaitable, Callable, Optional
+
+import numpy as np
+
+from src.config import RETRIEVAL_CACHE_MAX_MB
+from src.db.catalog_version import catalog_version
+from src.logger import get_logger
+
+logger = get_logger(__name__)
+
+ENTRY_OVERHEAD_BYTES = 200
+
+
+def embedding_hash(embedding: list[float]) -> str:
+    """Stable digest of a query embedding (float32 bytes)."""
+    data = np.asarray(embedding, dtype=np.float32).tobytes()
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+
+def estimate_size(results: list[dict]) -> int:
+    """Approximate memory used by a result list (its JSON size plus overhead)."""
+    return len(json.dumps(results, default=str)) + ENTRY_OVERHEAD_BYTES
+
+
+class RetrievalCache:
+    """
+    LRU of search results keyed by (table, embedding hash, limit, filters).
+
+    Entries are tagged with the catalog version they were read under; when
+    the version changes every entry is dropped, so results from before a
+    catalog write are never served. The cache is bounded by the estimated
+    size of the stored results rather than by entry count.
+
+    The version comes from the shared catalog_version tracker by default
+    (`aversion()` reads it without blocking the event loop). A custom
+    `version_fn` without `aversion_fn` is called inline on both paths.
+    """
+
+    def __init__(
+        self,
+        max_bytes: int = int(RETRIEVAL_CACHE_MAX_MB * 1024 * 1024),
+        version_fn: Optional[Callable[[], int]] = None,
+        aversion_fn: Optional[Callable[[], Awaitable[int]]] = None,
+    ):
+        if version_fn is None:
+            version_fn, aversion_fn = catalog_version.current, catalog_version.acurrent
+        self.max_bytes = max_bytes
+        self.version_fn = version_fn
+        self.aversion_fn = aversion_fn
+
+        self._entries: OrderedDict[tuple, tuple[int, list[dict]]] = OrderedDict()
+        self._version: Optional[int] = None
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._invalidations = 0
+
+    @staticmethod
+    def make_key(
+        table: str, embedding: list[float], limit: int, filters: Optional[dict] = None
+    ) -> tuple:
+        """Cache key for one search."""
+        filters_key = json.dumps(filters, sort_keys=True, default=str) if filters else ""
+        return (table, embedding_hash(embedding), limit, filters_key)
+
+    def version(self) -> int:
+        """Current catalog version; read it before querying and pass it to put()."""
+        return self._use_version(self.version_fn())
+
+    async def aversion(self) -> int:
+        """Async version(), for lookups made on the event loop."""
+        if self.aversion_fn is None:
+            return self._use_version(self.version_fn())
+        return self._use_version(await self.aversion_fn())
+
+    def _use_version(self, version: int) -> int:
+        """Drop every entry when version differs from the cached one."""
+        with self._lock:
+            if version != self._version:
+                if self._entries:
+                    logger.info(
+                        f"Catalog version {self._version} -> {version}, "
+                        f"dropping {len(self._entries)} cached results"
+                    )
+                    self._invalidations += 1
+                self._entries.clear()
+                self._bytes = 0
+                self._version = version
+        return version
+
+    def get(self, key: tuple, version: int) -> Optional[list[dict]]:
+        """Return cached results for key if they were stored under version."""
+        with self._lock:
+            if version != self._version or key not in self._entries:
+                self._misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self._hits += 1
+            _, results = self._entries[key]
+            return [dict(row) for row in results]
+
+    def put(self, key: tuple, results: list[dict], version: int) -> None:
+        """Store results read under version; ignored if the catalog moved on meanwhile."""
+        size = estimate_size(results)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            if version != self._version:
+                return
+            if key in self._entries:
+                self._bytes -= self._entries.pop(key)[0]
+            self._entries[key] = (size, [dict(row) for row in results])
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                _, (evicted_size, _) = self._entries.popitem(last=False)
+                self._bytes -= evicted_size
+                self._evictions += 1
+
+    def stats(self) -> dict:
+        """Hit/miss counters and memory use, for tuning RETRIEVAL_CACHE_MAX_MB."""
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_rate": round(self._hits / lookups, 4) if lookups else 0.0,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "evictions": self._evictions,
+                "invalidations": self._invalidations,
+                "catalog_version": self._version,
+            }
+
+    def clear(self) -> None:
+        """Drop all entries and reset counters."""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+            self._hits = 0
+            self._misses = 0
+            self._evictions = 0
+            self._invalidations = 0
+
+
+retrieval_cache = RetrievalCache()
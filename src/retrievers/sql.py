@@ -0,0 +1,157 @@
+"""SQL builders shared by the pgvector retrievers."""
+
+import json
+from typing import Optional
+
+import numpy as np
+
+from src.config import VECTOR_SEARCH_MODE
+from src.db.models.base import EMBEDDING_SQL_TYPE, EMBEDDING_BIT_TYPE
+
+SEARCH_MODES = ("full", "binary")
+FILTER_KINDS = ("scalar", "array", "flags")
+
+
+def to_query_vector(embedding: list[float]) -> np.ndarray:
+    """Convert an embedding to float32 so psycopg sends it as a binary vector."""
+    return np.asarray(embedding, dtype=np.float32)
+
+
+def filter_sql(
+    filters: Optional[dict],
+    filter_columns: dict[str, str],
+    suffix: str = "",
+) -> tuple[str, dict]:
+    """
+    Translate metadata filters into a WHERE clause and its bind parameters.
+
+    `filter_columns` maps each filterable column to its kind:
+    - scalar: value or list of values, matched with `= ANY` (B-tree index)
+    - array: text[] column overlapping any of the values, `&&` (GIN index)
+    - flags: JSONB object with every given key set to true, `@>` (GIN index)
+
+    Filters with a None or empty value are ignored.
+    """
+    predicates: list[str] = []
+    params: dict = {}
+    for name, value in (filters or {}).items():
+        if value is None or value == [] or value == "":
+            continue
+        kind = filter_columns.get(name)
+        if kind is None:
+            raise ValueError(f"Unknown filter '{name}', expected one of {sorted(filter_columns)}")
+
+        values = [value] if isinstance(value, str) else list(value)
+        param = f"f_{name}{suffix}"
+        if kind == "scalar":
+            predicates.append(f"{name} = ANY(:{param})")
+            params[param] = values
+        elif kind == "array":
+            predicates.append(f"{name} && CAST(:{param} AS text[])")
+            params[param] = values
+        elif kind == "flags":
+            predicates.append(f"{name} @> CAST(:{param} AS jsonb)")
+            params[param] = json.dumps({v: True for v in values})
+        else:
+            raise ValueError(f"Unknown filter kind '{kind}', expected one of {FILTER_KINDS}")
+
+    if not predicates:
+        return "", {}
+    return "WHERE " + " AND ".join(predicates), params
+
+
+def _nearest_sql(
+    table: str, columns: list[str], mode: str, query_vec: str, suffix: str, where: str = ""
+) -> str:
+    """Top-k rows matching `where` with their cosine distance to `query_vec` (a SQL expression)."""
+    if mode not in SEARCH_MODES:
+        raise ValueError(f"Unknown vector search mode '{mode}', expected one of {SEARCH_MODES}")
+
+    select_columns = ", ".join(columns)
+    source = table
+    if mode == "binary":
+        source = f"""(
+                SELECT {select_columns}, embedding
+                FROM {table}
+                {where}
+                ORDER BY binary_quantize(embedding)::{EMBEDDING_BIT_TYPE}
+                    <~> binary_quantize({query_vec})
+                LIMIT :candidates{suffix}
+            ) AS candidates"""
+        where = ""
+
+    return f"""
+            SELECT {select_columns}, embedding <=> {query_vec} AS distance
+            FROM {source}
+            {where}
+            ORDER BY distance
+            LIMIT :limit{suffix}"""
+
+
+def similarity_search_sql(
+    table: str,
+    columns: list[str],
+    mode: str = VECTOR_SEARCH_MODE,
+    suffix: str = "",
+    where: str = "",
+) -> str:
+    """
+    Build a top-k cosine similarity query over `table`.
+
+    - full: HNSW scan over the stored embeddings.
+    - binary: Hamming-distance scan over the binary-quantized expression
+      index gathers `:candidates` rows, which are re-ranked by exact cosine
+      distance before the top `:limit` are returned.
+
+    The cosine distance is computed once per row and ordered by alias, so the
+    HNSW index still drives the scan. `suffix` renames the `:limit` and
+    `:candidates` parameters so several searches can share one statement.
+    `where` (from filter_sql) restricts the scan; the outer ORDER BY keeps
+    results exact when an iterative index scan returns them in relaxed order.
+    """
+    query_vec = f"CAST(:vec AS {EMBEDDING_SQL_TYPE})"
+    nearest = _nearest_sql(table, columns, mode, query_vec, suffix, where)
+
+    return f"""
+        SELECT {", ".join(columns)}, 1 - distance AS similarity
+        FROM ({nearest}
+        ) AS nearest
+        ORDER BY distance
+    """
+
+
+def batch_search_sql(
+    table: str, columns: list[str], mode: str = VECTOR_SEARCH_MODE, where: str = ""
+) -> str:
+    """
+    Build a top-k query for many query vectors at once.
+
+    `:vecs` is an array of vectors; each element is searched independently
+    via a LATERAL join, and rows are tagged with its 1-based `query_index`.
+    """
+    query_vec = f"CAST(q.vec AS {EMBEDDING_SQL_TYPE})"
+    nearest = _nearest_sql(table, columns, mode, query_vec, suffix="", where=where)
+    nearest_columns = ", ".join(f"nearest.{col}" for col in columns)
+
+    return f"""
+        SELECT q.query_index, {nearest_columns}, 1 - nearest.distance AS similarity
+        FROM unnest(CAST(:vecs AS vector[])) WITH ORDINALITY AS q(vec, query_index)
+        CROSS JOIN LATERAL ({nearest}
+        ) AS nearest
+        ORDER BY q.query_index, nearest.distance
+    """
+
+
+def combined_search_sql(searches: dict[str, str]) -> str:
+    """
+    Run several similarity searches in one statement.
+
+    Each entry maps an output column name to a similarity_search_sql query;
+    its rows come back as a JSON array in that column of a single result row.
+    """
+    parts = [
+        f"(SELECT COALESCE(json_agg(r ORDER BY r.similarity DESC), '[]'::json) "
+        f"FROM ({sql}) AS r) AS {name}"
+        for name, sql in searches.items()
+    ]
+    return "SELECT " + ",\n       ".join(parts)
@@ -1,9 +1,10 @@
 """Seed database with clinical data using SQLAlchemy ORM."""
 
+from src.db.catalog_version import catalog_version
 from src.db.models.base import get_session
 from src.db.models.organization import ClinicalOrganization
 from src.db.models.tool import ClinicalTool
-from src.embeddings.openai_embed import get_embeddings_batch
+from src.embeddings.bulk import get_embeddings_bulk
 from src.seed.clinical_data import CLINICAL_ORGANIZATIONS, CLINICAL_TOOLS
 from src.logger import get_logger
 
@@ -26,7 +27,7 @@ def seed_organizations():
     texts = [create_embedding_text_org(org) for org in CLINICAL_ORGANIZATIONS]
     
     try:
-        embeddings = get_embeddings_batch(texts)
+        embeddings = get_embeddings_bulk(texts)
     except Exception as e:
         logger.exception(f"Failed to generate organization embeddings: {e}")
         raise
@@ -59,7 +60,7 @@ def seed_tools():
     texts = [create_embedding_text_tool(tool) for tool in CLINICAL_TOOLS]
     
     try:
-        embeddings = get_embeddings_batch(texts)
+        embeddings = get_embeddings_bulk(texts)
     except Exception as e:
         logger.exception(f"Failed to generate tool embeddings: {e}")
         raise
@@ -88,6 +89,7 @@ def run_seed():
     logger.info("Starting seed process...")
     seed_organizations()
     seed_tools()
+    catalog_version.bump()
     logger.info("Seeding complete!")
 
 
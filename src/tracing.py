@@ -0,0 +1,308 @@
+"""Per-request span trees with head-based sampling, exported to JSONL or an OTLP/HTTP collector."""
+
+import json
+import os
+import queue
+import random
+import threading
+import time
+import urllib.request
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Iterator, Optional
+
+from src.config import (
+    TRACING_ENABLED,
+    TRACE_SAMPLE_RATE,
+    TRACE_EXPORTER,
+    TRACE_JSONL_PATH,
+    TRACE_OTLP_ENDPOINT,
+    TRACE_SERVICE_NAME,
+)
+from src.logger import get_logger, current_trace_id
+
+logger = get_logger(__name__)
+
+EXPORT_BATCH_SIZE = 512
+EXPORT_INTERVAL_SECONDS = 1.0
+EXPORT_QUEUE_SIZE = 10000
+
+
+class Span:
+    """
+    One timed operation in a trace.
+
+    Unsampled spans are never exported and ignore attributes; an unsampled
+    request uses a single span object for its whole tree, so tracing costs
+    one random draw per request when it is not recorded.
+    """
+
+    __slots__ = ("trace_id", "span_id", "parent_id", "name", "sampled",
+                 "attributes", "start_ns", "end_ns", "error")
+
+    def __init__(self, name: str, trace_id: str, parent_id: Optional[str], sampled: bool, attributes: dict):
+        self.trace_id = trace_id
+        self.span_id = os.urandom(8).hex()
+        self.parent_id = parent_id
+        self.name = name
+        self.sampled = sampled
+        self.attributes = attributes if sampled else {}
+        self.start_ns = time.time_ns()
+        self.end_ns: Optional[int] = None
+        self.error: Optional[str] = None
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        if self.sampled and value is not None:
+            self.attributes[key] = value
+
+    def set_attributes(self, **attributes) -> None:
+        for key, value in attributes.items():
+            self.set_attribute(key, value)
+
+    def record_error(self, error: BaseException) -> None:
+        if self.sampled:
+            self.error = f"{type(error).__name__}: {error}"
+
+    def to_dict(self) -> dict:
+        """JSONL representation."""
+        return {
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "name": self.name,
+            "start": self.start_ns / 1e9,
+            "duration_ms": round(((self.end_ns or self.start_ns) - self.start_ns) / 1e6, 3),
+            "attributes": self.attributes,
+            "error": self.error,
+        }
+
+
+NOOP_SPAN = Span("noop", "0" * 32, None, False, {})
+
+_current_span: ContextVar[Optional[Span]] = ContextVar("current_span", default=None)
+
+
+def current_span() -> Span:
+    """The active span, or a no-op span outside a trace."""
+    return _current_span.get() or NOOP_SPAN
+
+
+@contextmanager
+def start_trace(name: str, sample_rate: Optional[float] = None, **attributes) -> Iterator[Span]:
+    """
+    Root span for one request; the sampling decision is made here for the whole tree.
+
+    The trace ID is also set for log records (src.logger) whether or not
+    the trace is sampled.
+    """
+    rate = TRACE_SAMPLE_RATE if sample_rate is None else sample_rate
+    sampled = TRACING_ENABLED and random.random() < rate
+    root = Span(name, os.urandom(16).hex(), None, sampled, attributes)
+    span_token = _current_span.set(root)
+    log_token = current_trace_id.set(root.trace_id)
+    try:
+        yield root
+    except BaseException as e:
+        root.record_error(e)
+        raise
+    finally:
+        root.end_ns = time.time_ns()
+        current_trace_id.reset(log_token)
+        _current_span.reset(span_token)
+        if sampled:
+            tracer.export(root)
+
+
+@contextmanager
+def span(name: str, **attributes) -> Iterator[Span]:
+    """Child span of the active span; a no-op outside a sampled trace."""
+    parent = _current_span.get()
+    if parent is None or not parent.sampled:
+        yield parent or NOOP_SPAN
+        return
+
+    child = Span(name, parent.trace_id, parent.span_id, True, attributes)
+    token = _current_span.set(child)
+    try:
+        yield child
+    except BaseException as e:
+        child.record_error(e)
+        raise
+    finally:
+        child.end_ns = time.time_ns()
+        _current_span.reset(token)
+        tracer.export(child)
+
+
+def jsonl_exporter(path: str) -> Callable[[list[Span]], None]:
+    """Append each span as one JSON line to path."""
+    def export(spans: list[Span]) -> None:
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, "a", encoding="utf-8") as f:
+            for s in spans:
+                f.write(json.dumps(s.to_dict(), default=str) + "\n")
+    return export
+
+
+def otlp_value(value: Any) -> dict:
+    """OTLP AnyValue for an attribute value."""
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+def otlp_payload(spans: list[Span], service_name: str = TRACE_SERVICE_NAME) -> dict:
+    """OTLP/HTTP JSON ExportTraceServiceRequest for spans."""
+    return {
+        "resourceSpans": [{
+            "resource": {"attributes": [{"key": "service.name", "value": {"stringValue": service_name}}]},
+            "scopeSpans": [{
+                "scope": {"name": "src.tracing"},
+                "spans": [{
+                    "traceId": s.trace_id,
+                    "spanId": s.span_id,
+                    **({"parentSpanId": s.parent_id} if s.parent_id else {}),
+                    "name": s.name,
+                    "kind": 2 if s.parent_id is None else 1,
+                    "startTimeUnixNano": str(s.start_ns),
+                    "endTimeUnixNano": str(s.end_ns or s.start_ns),
+                    "attributes": [{"key": k, "value": otlp_value(v)} for k, v in s.attributes.items()],
+                    "status": {"code": 2, "message": s.error} if s.error else {"code": 1},
+                } for s in spans],
+            }],
+        }]
+    }
+
+
+def otlp_exporter(endpoint: str, timeout: float = 5.0) -> Callable[[list[Span]], None]:
+    """POST spans to an OTLP/HTTP collector using the JSON encoding."""
+    def export(spans: list[Span]) -> None:
+        request = urllib.request.Request(
+            endpoint,
+            data=json.dumps(otlp_payload(spans)).encode(),
+            headers={"Content-Type": "application/json"},
+            method="POST",
+        )
+        with urllib.request.urlopen(request, timeout=timeout) as response:
+            response.read()
+    return export
+
+
+class Tracer:
+    """
+    Batch finished spans and export them from a background thread.
+
+    Spans are queued without blocking the request; when the queue is full
+    they are dropped and counted. The thread starts with the first span and
+    `shutdown` flushes whatever is still queued.
+    """
+
+    def __init__(self, export_fn: Callable[[list[Span]], None], max_queue: int = EXPORT_QUEUE_SIZE):
+        self.export_fn = export_fn
+        self._queue: queue.Queue[Span] = queue.Queue(maxsize=max_queue)
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self.exported = 0
+        self.dropped = 0
+        self.failed = 0
+
+    def export(self, finished: Span) -> None:
+        """Queue a finished span for export."""
+        if self._thread is None:
+            self._start()
+        try:
+            self._queue.put_nowait(finished)
+        except queue.Full:
+            self.dropped += 1
+
+    def flush(self) -> None:
+        """Export everything queued so far, in the calling thread."""
+        while True:
+            batch = self._drain(EXPORT_BATCH_SIZE)
+            if not batch:
+                return
+            self._export_batch(batch)
+
+    def shutdown(self) -> None:
+        """Stop the background thread and flush remaining spans."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+        self.flush()
+
+    def _start(self) -> None:
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="trace-exporter", daemon=True)
+                self._thread.start()
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            try:
+                first = self._queue.get(timeout=EXPORT_INTERVAL_SECONDS)
+            except queue.Empty:
+                continue
+            self._export_batch([first] + self._drain(EXPORT_BATCH_SIZE - 1))
+
+    def _drain(self, limit: int) -> list[Span]:
+        batch = []
+        while len(batch) < limit:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _export_batch(self, batch: list[Span]) -> None:
+        try:
+            self.export_fn(batch)
+            self.exported += len(batch)
+        except Exception as e:
+            self.failed += len(batch)
+            logger.warning(f"Trace export of {len(batch)} spans failed: {e}")
+
+
+def create_exporter(kind: str = TRACE_EXPORTER) -> Callable[[list[Span]], None]:
+    """Exporter for TRACE_EXPORTER: `jsonl` or `otlp`."""
+    if kind == "otlp":
+        return otlp_exporter(TRACE_OTLP_ENDPOINT)
+    if kind != "jsonl":
+        raise ValueError(f"TRACE_EXPORTER must be 'jsonl' or 'otlp', got '{kind}'")
+    return jsonl_exporter(TRACE_JSONL_PATH)
+
+
+tracer = Tracer(create_exporter())
+
+
+class TracingMiddleware:
+    """
+    ASGI middleware making every HTTP request a root span.
+
+    Wraps the whole response, including streamed bodies, and returns the
+    trace ID in an `X-Trace-Id` header.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        with start_trace(
+            f"{scope['method']} {scope['path']}",
+            **{"http.method": scope["method"], "http.target": scope["path"]},
+        ) as root:
+            async def send_with_trace(message):
+                if message["type"] == "http.response.start":
+                    root.set_attribute("http.status_code", message["status"])
+                    message["headers"] = [*message.get("headers", []), (b"x-trace-id", root.trace_id.encode())]
+                await send(message)
+
+            await self.app(scope, receive, send_with_trace)
@@ -0,0 +1,139 @@
+"""Per-request token usage and estimated cost of LLM and embedding calls."""
+
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator, Optional
+
+from src.config import MODEL_PRICES
+from src.metrics import tokens_total, cost_usd_total
+from src.logger import get_logger
+
+logger = get_logger(__name__)
+
+USAGE_FIELDS = ("prompt_tokens", "completion_tokens", "embedding_tokens")
+
+_unpriced_models: set[str] = set()
+
+
+def model_price(model: str) -> Optional[tuple[float, float]]:
+    """
+    (input, output) USD per million tokens for model, or None if unknown.
+
+    Dated snapshots (`gpt-4o-mini-2024-07-18`) use the price of the longest
+    MODEL_PRICES name they start with.
+    """
+    names = [name for name in MODEL_PRICES if model == name or model.startswith(f"{name}-")]
+    if not names:
+        if model not in _unpriced_models:
+            _unpriced_models.add(model)
+            logger.warning(f"No price for model '{model}', its cost is counted as 0")
+        return None
+    return MODEL_PRICES[max(names, key=len)]
+
+
+def estimate_cost(model: str, input_tokens: int, output_tokens: int = 0) -> float:
+    """Estimated USD cost of a call."""
+    price = model_price(model)
+    if price is None:
+        return 0.0
+    return (input_tokens * price[0] + output_tokens * price[1]) / 1_000_000
+
+
+class RequestUsage:
+    """
+    Tokens and estimated cost of the LLM and embedding calls made by one request.
+
+    Started by an API endpoint with start_request_usage(); record_llm_usage
+    and record_embedding_usage add to it from the request's context.
+    """
+
+    def __init__(self):
+        self._models: dict[str, dict] = {}
+        self._lock = threading.Lock()
+
+    def add(self, model: str, prompt_tokens: int = 0, completion_tokens: int = 0, embedding_tokens: int = 0) -> None:
+        cost = estimate_cost(model, prompt_tokens + embedding_tokens, completion_tokens)
+        with self._lock:
+            entry = self._models.setdefault(model, {"calls": 0, **dict.fromkeys(USAGE_FIELDS, 0), "cost_usd": 0.0})
+            entry["calls"] += 1
+            entry["prompt_tokens"] += prompt_tokens
+            entry["completion_tokens"] += completion_tokens
+            entry["embedding_tokens"] += embedding_tokens
+            entry["cost_usd"] += cost
+
+    def models(self) -> dict[str, dict]:
+        """Per-model calls, tokens and cost."""
+        with self._lock:
+            return {
+                model: {**entry, "cost_usd": round(entry["cost_usd"], 8)}
+                for model, entry in self._models.items()
+            }
+
+    def as_dict(self) -> dict:
+        """Token totals and cost over all models, plus the per-model breakdown."""
+        models = self.models()
+        totals = {field: sum(entry[field] for entry in models.values()) for field in USAGE_FIELDS}
+        return {
+            **totals,
+            "cost_usd": round(sum(entry["cost_usd"] for entry in models.values()), 8),
+            "models": models,
+        }
+
+
+_request_usage: ContextVar[Optional[RequestUsage]] = ContextVar("request_usage", default=None)
+
+
+def start_request_usage() -> RequestUsage:
+    """Start collecting token usage for the current request (context)."""
+    usage = RequestUsage()
+    _request_usage.set(usage)
+    return usage
+
+
+def current_request_usage() -> Optional[RequestUsage]:
+    return _request_usage.get()
+
+
+@contextmanager
+def collect_usage() -> Iterator[RequestUsage]:
+    """Collect the usage of the with-block separately, e.g. for a call shared by several requests."""
+    usage = RequestUsage()
+    token = _request_usage.set(usage)
+    try:
+        yield usage
+    finally:
+        _request_usage.reset(token)
+
+
+def record_llm_usage(result, default_model: Optional[str] = None) -> Optional[tuple[str, int, int]]:
+    """
+    Count the tokens of a chat model response, from its `usage_metadata`.
+
+    Returns (model, input tokens, output tokens), or None if the response
+    does not report usage (e.g. fakes, or streaming without stream_usage).
+    """
+    usage_metadata = getattr(result, "usage_metadata", None)
+    if not usage_metadata:
+        return None
+    response_metadata = getattr(result, "response_metadata", None) or {}
+    model = response_metadata.get("model_name") or default_model or "unknown"
+    input_tokens = usage_metadata.get("input_tokens", 0)
+    output_tokens = usage_metadata.get("output_tokens", 0)
+
+    tokens_total.inc(input_tokens, model=model, kind="prompt")
+    tokens_total.inc(output_tokens, model=model, kind="completion")
+    cost_usd_total.inc(estimate_cost(model, input_tokens, output_tokens), model=model)
+    usage = _request_usage.get()
+    if usage is not None:
+        usage.add(model, prompt_tokens=input_tokens, completion_tokens=output_tokens)
+    return model, input_tokens, output_tokens
+
+
+def record_embedding_usage(model: str, tokens: int) -> None:
+    """Count the tokens of an embedding API call."""
+    tokens_total.inc(tokens, model=model, kind="embedding")
+    cost_usd_total.inc(estimate_cost(model, tokens), model=model)
+    usage = _request_usage.get()
+    if usage is not None:
+        usage.add(model, embedding_tokens=tokens)
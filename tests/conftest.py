@@ -15,6 +15,25 @@ class FakeLLM:
     def invoke(self, messages):
         self.calls.append(messages)
         return AIMessage(content=self.response)
+    
+    async def ainvoke(self, messages):
+        return self.invoke(messages)
+
+
+class FakeCatalogVersion:
+    """Controllable stand-in for the catalog version tracker (set `value` to bump it)."""
+    
+    def __init__(self):
+        self.value = 1
+    
+    def __call__(self) -> int:
+        return self.value
+
+
+@pytest.fixture
+def version():
+    """Provide a catalog version source the test can bump."""
+    return FakeCatalogVersion()
 
 
 @pytest.fixture
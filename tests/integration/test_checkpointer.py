@@ -0,0 +1,178 @@
+"""
+Integration tests for PostgresCheckpointer (sync and async methods).
+
+These tests require:
+- Running Docker database (make dev) with migrations applied
+
+Run: RUN_INTEGRATION_TESTS=1 pytest tests/integration/test_checkpointer.py -v
+"""
+
+import asyncio
+import os
+import uuid
+
+import pytest
+
+pytestmark = pytest.mark.skipif(
+    os.getenv("RUN_INTEGRATION_TESTS") != "1",
+    reason="Integration tests disabled. Set RUN_INTEGRATION_TESTS=1 to run."
+)
+
+
+def make_checkpoint(step: int) -> dict:
+    return {
+        "v": 1,
+        "id": str(uuid.uuid4()),
+        "ts": f"2024-01-01T00:00:0{step}+00:00",
+        "channel_values": {"query": f"query {step}", "response": f"response {step}"},
+        "channel_versions": {},
+        "versions_seen": {},
+    }
+
+
+@pytest.fixture
+def checkpointer():
+    from src.db.checkpointer import PostgresCheckpointer
+    return PostgresCheckpointer()
+
+
+@pytest.fixture
+def thread_id():
+    from src.db.threads import create_thread, delete_thread
+    thread = create_thread("checkpointer test")
+    yield thread["id"]
+    delete_thread(thread["id"])
+
+
+def config_for(thread_id: str, checkpoint_id: str | None = None) -> dict:
+    configurable = {"thread_id": thread_id}
+    if checkpoint_id:
+        configurable["checkpoint_id"] = checkpoint_id
+    return {"configurable": configurable}
+
+
+def run(coro):
+    """Run a coroutine, then close the async pool's connections before its event loop ends."""
+    from src.db.models.base import async_engine
+    
+    async def main():
+        try:
+            return await coro
+        finally:
+            await async_engine.dispose()
+    return asyncio.run(main())
+
+
+async def collect(iterator) -> list:
+    return [item async for item in iterator]
+
+
+class TestAsyncCheckpointer:
+    """aput/aget_tuple/alist behave exactly like put/get_tuple/list."""
+    
+    def test_aput_then_get_tuple(self, checkpointer, thread_id):
+        checkpoint = make_checkpoint(1)
+        
+        saved = run(checkpointer.aput(config_for(thread_id), checkpoint, {"step": 1}, {}))
+        
+        assert saved == config_for(thread_id, checkpoint["id"])
+        sync_tuple = checkpointer.get_tuple(config_for(thread_id))
+        async_tuple = run(checkpointer.aget_tuple(config_for(thread_id)))
+        assert async_tuple == sync_tuple
+        assert async_tuple.checkpoint["channel_values"]["query"] == "query 1"
+        assert async_tuple.metadata == {"step": 1}
+        assert async_tuple.parent_config is None
+    
+    def test_put_then_aget_tuple_with_parent(self, checkpointer, thread_id):
+        first, second = make_checkpoint(1), make_checkpoint(2)
+        parent = checkpointer.put(config_for(thread_id), first, {}, {})
+        checkpointer.put(parent, second, {}, {})
+        
+        latest = run(checkpointer.aget_tuple(config_for(thread_id)))
+        specific = run(checkpointer.aget_tuple(config_for(thread_id, first["id"])))
+        
+        assert latest.checkpoint["id"] == second["id"]
+        assert latest.parent_config == config_for(thread_id, first["id"])
+        assert specific.checkpoint["id"] == first["id"]
+    
+    def test_aput_overwrites_same_checkpoint(self, checkpointer, thread_id):
+        checkpoint = make_checkpoint(1)
+        run(checkpointer.aput(config_for(thread_id), checkpoint, {"step": 1}, {}))
+        run(checkpointer.aput(config_for(thread_id), checkpoint, {"step": 2}, {}))
+        
+        assert len(list(checkpointer.list(config_for(thread_id)))) == 1
+        assert checkpointer.get_tuple(config_for(thread_id)).metadata == {"step": 2}
+    
+    def test_alist_matches_list(self, checkpointer, thread_id):
+        config = config_for(thread_id)
+        for step in range(3):
+            config = checkpointer.put(config, make_checkpoint(step), {"step": step}, {})
+        
+        assert run(collect(checkpointer.alist(config_for(thread_id)))) == list(
+            checkpointer.list(config_for(thread_id))
+        )
+        limited = run(collect(checkpointer.alist(config_for(thread_id), limit=2)))
+        assert [t.metadata["step"] for t in limited] == [2, 1]
+    
+    def test_missing_thread(self, checkpointer):
+        missing = str(uuid.uuid4())
+        
+        assert run(checkpointer.aget_tuple(config_for(missing))) is None
+        assert run(collect(checkpointer.alist(config_for(missing)))) == []
+        assert run(collect(checkpointer.alist(None))) == []
+    
+    def test_aput_requires_thread_id(self, checkpointer):
+        with pytest.raises(ValueError):
+            run(checkpointer.aput({"configurable": {}}, make_checkpoint(1), {}, {}))
+    
+    def test_async_graph_resumes_thread(self, checkpointer, thread_id, fake_llm, mock_tools_retriever, mock_orgs_retriever):
+        from src.agents.graph import create_clinical_graph
+        
+        graph = create_clinical_graph(
+            llm=fake_llm,
+            checkpointer=checkpointer,
+            tools_retriever=mock_tools_retriever,
+            orgs_retriever=mock_orgs_retriever,
+        )
+        config = config_for(thread_id)
+        
+        run(graph.ainvoke({"query": "first question"}, config))
+        state = run(graph.aget_state(config))
+        
+        assert state.values["query"] == "first question"
+        assert checkpointer.get_tuple(config) is not None
+
+
+class TestCheckpointWrites:
+    """put_writes rows come back as the checkpoint's pending_writes."""
+    
+    def test_put_writes_then_get_tuple(self, checkpointer, thread_id):
+        checkpoint = make_checkpoint(1)
+        config = checkpointer.put(config_for(thread_id), checkpoint, {}, {})
+        
+        checkpointer.put_writes(config, [("query", "q"), ("response", {"text": "r"})], "task-1")
+        run(checkpointer.aput_writes(config, [("__error__", "first")], "task-2"))
+        run(checkpointer.aput_writes(config, [("__error__", "second")], "task-2"))
+        
+        expected = [
+            ("task-1", "query", "q"),
+            ("task-1", "response", {"text": "r"}),
+            ("task-2", "__error__", "second"),
+        ]
+        assert checkpointer.get_tuple(config).pending_writes == expected
+        assert run(checkpointer.aget_tuple(config)).pending_writes == expected
+    
+    def test_write_behind_reads_its_own_writes(self, thread_id):
+        from src.db.checkpointer import PostgresCheckpointer
+        checkpointer = PostgresCheckpointer(write_behind=True, durability="async", flush_interval_ms=10_000)
+        first, second = make_checkpoint(1), make_checkpoint(2)
+        
+        parent = checkpointer.put(config_for(thread_id), first, {"step": 1}, {})
+        config = checkpointer.put(parent, second, {"step": 2}, {})
+        checkpointer.put_writes(config, [("query", "q")], "task-1")
+        
+        latest = checkpointer.get_tuple(config_for(thread_id))
+        assert latest.checkpoint["id"] == second["id"]
+        assert latest.parent_config == config_for(thread_id, first["id"])
+        assert latest.pending_writes == [("task-1", "query", "q")]
+        checkpointer.close()
@@ -1,4 +1,7 @@
+from typing import Optional
+
 from src.retrievers.base import BaseRetriever
+from tests.mocks.mock_embeddings import fake_embedding
 
 
 MOCK_TOOLS = [
@@ -68,21 +71,61 @@ MOCK_ORGS = [
 ]
 
 
+def apply_filters(data: list[dict], filters: Optional[dict]) -> list[dict]:
+    """Filter fixture rows: scalar fields must match, list fields must overlap."""
+    rows = data
+    for name, value in (filters or {}).items():
+        if value is None or value == [] or value == "":
+            continue
+        values = {value} if isinstance(value, str) else set(value)
+        rows = [
+            r for r in rows
+            if (values.intersection(r.get(name) or []) if isinstance(r.get(name), list) else r.get(name) in values)
+        ]
+    return rows
+
+
 class MockToolsRetriever(BaseRetriever):
     """Mock retriever for clinical_tools - no DB connection needed."""
     
+    filter_columns = {"category": "scalar", "target_users": "array"}
+    
     def __init__(self, fixture_data: list[dict] = None):
+        super().__init__(fake_embedding)
         self.data = fixture_data if fixture_data is not None else MOCK_TOOLS
     
-    def search(self, query: str, limit: int = 5) -> list[dict]:
-        return self.data[:limit]
+    def search(self, query: str, limit: int = 5, filters: Optional[dict] = None) -> list[dict]:
+        return apply_filters(self.data, filters)[:limit]
+    
+    def search_by_vector(
+        self, query_embedding: list[float], limit: int = 5, filters: Optional[dict] = None
+    ) -> list[dict]:
+        return apply_filters(self.data, filters)[:limit]
+    
+    def search_batch(
+        self, queries: list[str], limit: int = 5, filters: Optional[dict] = None
+    ) -> list[list[dict]]:
+        return [apply_filters(self.data, filters)[:limit] for _ in queries]
 
 
 class MockOrgsRetriever(BaseRetriever):
     """Mock retriever for clinical_organizations - no DB connection needed."""
     
+    filter_columns = {"org_type": "scalar", "state": "scalar", "specialty": "scalar", "ai_use_cases": "array"}
+    
     def __init__(self, fixture_data: list[dict] = None):
+        super().__init__(fake_embedding)
         self.data = fixture_data if fixture_data is not None else MOCK_ORGS
     
-    def search(self, query: str, limit: int = 5) -> list[dict]:
-        return self.data[:limit]
+    def search(self, query: str, limit: int = 5, filters: Optional[dict] = None) -> list[dict]:
+        return apply_filters(self.data, filters)[:limit]
+    
+    def search_by_vector(
+        self, query_embedding: list[float], limit: int = 5, filters: Optional[dict] = None
+    ) -> list[dict]:
+        return apply_filters(self.data, filters)[:limit]
+    
+    def search_batch(
+        self, queries: list[str], limit: int = 5, filters: Optional[dict] = None
+    ) -> list[list[dict]]:
+        return [apply_filters(self.data, filters)[:limit] for _ in queries]
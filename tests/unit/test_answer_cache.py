@@ -0,0 +1,84 @@
+import pytest
+
+from src.api.answer_cache import SemanticAnswerCache, wants_bypass
+
+
+EMBEDDINGS = {
+    "What tools help with documentation?": [1.0, 0.0, 0.0],
+    "Which tools help with documentation?": [0.99, 0.05, 0.0],
+    "Which hospitals use AI for sepsis?": [0.0, 1.0, 0.0],
+}
+
+ANSWER = {
+    "route": "tool_finder",
+    "response": "Try an ambient scribe.",
+    "tools_results": [{"name": "Scribe"}],
+    "orgs_results": [],
+    "confidence": {"routing": 0.9, "retrieval": 0.8, "response": 0.85, "overall": 0.85},
+}
+
+
+@pytest.fixture
+def cache(version):
+    return SemanticAnswerCache(EMBEDDINGS.__getitem__, threshold=0.95, ttl_seconds=60, max_entries=10, version_fn=version)
+
+
+class TestSemanticAnswerCache:
+    
+    def test_similar_query_hits(self, cache):
+        cache.put("What tools help with documentation?", ANSWER)
+        
+        assert cache.get("Which tools help with documentation?") == ANSWER
+        assert cache.stats()["hits"] == 1
+    
+    def test_lookup_by_precomputed_vector(self, cache):
+        cache.put("What tools help with documentation?", ANSWER)
+        
+        assert cache.get_by_vector("unembedded query", [2.0, 0.05, 0.0]) == ANSWER
+        assert cache.get_by_vector("unembedded query", [0.0, 0.0, 1.0]) is None
+    
+    def test_dissimilar_query_misses(self, cache):
+        cache.put("What tools help with documentation?", ANSWER)
+        
+        assert cache.get("Which hospitals use AI for sepsis?") is None
+        assert cache.stats()["misses"] == 1
+    
+    def test_expired_entries_are_dropped(self, cache):
+        cache.ttl_seconds = -1
+        cache.put("What tools help with documentation?", ANSWER)
+        
+        assert cache.get("What tools help with documentation?") is None
+        assert cache.stats()["entries"] == 0
+    
+    def test_catalog_change_invalidates(self, cache, version):
+        cache.put("What tools help with documentation?", ANSWER)
+        version.value = 2
+        
+        assert cache.get("What tools help with documentation?") is None
+        assert cache.stats()["invalidations"] == 1
+    
+    def test_least_recently_used_is_evicted(self, cache):
+        cache.max_entries = 1
+        cache.put("What tools help with documentation?", ANSWER)
+        cache.put("Which hospitals use AI for sepsis?", ANSWER)
+        
+        assert cache.get("What tools help with documentation?") is None
+        assert cache.get("Which hospitals use AI for sepsis?") == ANSWER
+    
+    def test_returned_payload_is_a_copy(self, cache):
+        cache.put("What tools help with documentation?", ANSWER)
+        cache.get("What tools help with documentation?")["response"] = "changed"
+        
+        assert cache.get("What tools help with documentation?")["response"] == ANSWER["response"]
+
+
+class TestWantsBypass:
+    
+    def test_no_cache_header(self):
+        assert wants_bypass("no-cache", None)
+        assert wants_bypass("max-age=0, no-cache", None)
+    
+    def test_answer_cache_header(self):
+        assert wants_bypass(None, "bypass")
+        assert not wants_bypass(None, "use")
+        assert not wants_bypass(None, None)
@@ -0,0 +1,201 @@
+import asyncio
+
+import pytest
+
+from src.api import answer_cache
+from src.api.routes import batch
+from src.api.routes.batch import run_batch, stream_batch
+from src.agents.graph import create_clinical_graph, prefetch_batch
+from tests.conftest import FakeLLM
+from tests.mocks.mock_db import MockToolsRetriever, MOCK_TOOLS, MOCK_ORGS
+
+
+class CountingRetriever(MockToolsRetriever):
+    """Mock retriever that counts per-query and batched searches."""
+    
+    def __init__(self, data):
+        super().__init__(data)
+        self.searches = 0
+        self.batches = 0
+        self.batched_queries = 0
+        self.embed_batches = []
+    
+    def embed_batch(self, texts):
+        self.embed_batches.append(list(texts))
+        return super().embed_batch(texts)
+    
+    def search(self, query, limit=5, filters=None):
+        self.searches += 1
+        return super().search(query, limit, filters)
+    
+    def search_batch_by_vectors(self, query_embeddings, limit=5, filters=None):
+        self.batches += 1
+        self.batched_queries += len(query_embeddings)
+        return [self.data[:limit] for _ in query_embeddings]
+
+
+class FailingLLM(FakeLLM):
+    """Routes normally but fails for queries containing 'boom'."""
+    
+    def _check(self, messages):
+        if "boom" in str(messages[-1].content):
+            raise RuntimeError("LLM unavailable")
+    
+    def invoke(self, messages):
+        self._check(messages)
+        return super().invoke(messages)
+    
+    async def ainvoke(self, messages):
+        self._check(messages)
+        return await super().ainvoke(messages)
+
+
+@pytest.fixture(autouse=True)
+def no_answer_cache(monkeypatch):
+    """Keep the module answer cache (real embeddings) out of these tests."""
+    monkeypatch.setattr(answer_cache, "answer_cache", None)
+
+
+def build(llm=None):
+    tools = CountingRetriever(MOCK_TOOLS)
+    orgs = CountingRetriever(MOCK_ORGS)
+    graph = create_clinical_graph(
+        llm=llm or FakeLLM(response='{"route": "tool_finder", "confidence": 0.9}'),
+        tools_retriever=tools,
+        orgs_retriever=orgs,
+        speculative_retrieval=False,
+    )
+    return graph, (tools, orgs)
+
+
+class TestPrefetchBatch:
+    
+    def test_one_search_per_table(self):
+        tools, orgs = CountingRetriever(MOCK_TOOLS), CountingRetriever(MOCK_ORGS)
+        
+        prefetched = prefetch_batch(["a", "b", "c"], tools, orgs)
+        
+        assert len(prefetched) == 3
+        assert tools.batches == 1 and orgs.batches == 1
+        assert prefetched[0]["tools"] == MOCK_TOOLS[:5]
+    
+    def test_supplied_prefetched_skips_specialist_search(self):
+        graph, (tools, orgs) = build()
+        prefetched = prefetch_batch(["sepsis"], tools, orgs)[0]
+        
+        result = graph.invoke({"query": "sepsis", "prefetched": prefetched})
+        
+        assert tools.searches == 0
+        assert result["tools_results"] == MOCK_TOOLS[:5]
+
+
+class TestRunBatch:
+    
+    def test_results_in_request_order(self):
+        graph, retrievers = build()
+        queries = [f"query {i}" for i in range(6)]
+        
+        items = asyncio.run(run_batch(graph, queries, max_concurrency=2, bypass=True, retrievers=retrievers))
+        
+        assert [item.index for item in items] == list(range(6))
+        assert [item.query for item in items] == queries
+        assert all(item.result.route == "tool_finder" for item in items)
+        assert retrievers[0].batches == 1
+        assert retrievers[0].searches == 0
+    
+    def test_item_errors_do_not_fail_batch(self):
+        graph, retrievers = build(FailingLLM(response='{"route": "tool_finder", "confidence": 0.9}'))
+        queries = ["fine", "boom", ""]
+        
+        items = asyncio.run(run_batch(graph, queries, max_concurrency=2, bypass=True, retrievers=retrievers))
+        
+        assert items[0].result is not None and items[0].error is None
+        assert items[1].result is None and "LLM unavailable" in items[1].error
+        assert items[2].result is None and items[2].error
+    
+    def test_answer_cache_hits_are_not_prefetched(self, monkeypatch):
+        graph, retrievers = build()
+        cached_answer = {
+            "route": "tool_finder",
+            "response": "cached",
+            "tools_results": [],
+            "orgs_results": [],
+            "confidence": {"routing": 0.9, "retrieval": 0.9, "response": 0.9, "overall": 0.9},
+        }
+        
+        looked_up = []
+        
+        async def fake_lookup(queries, embeddings, bypass=False):
+            looked_up.append(len(embeddings))
+            return [cached_answer if query.startswith("cached") else None for query in queries]
+        
+        monkeypatch.setattr(batch, "alookup_answers", fake_lookup)
+        queries = ["cached 1", "fresh", "cached 2"]
+        
+        items = asyncio.run(run_batch(graph, queries, max_concurrency=2, retrievers=retrievers))
+        
+        assert [item.result.response == "cached" for item in items] == [True, False, True]
+        assert retrievers[0].batched_queries == 1
+        assert looked_up == [3]
+        assert retrievers[0].embed_batches == [queries]
+    
+    def test_queries_are_embedded_once_for_cache_and_retrieval(self, monkeypatch, version):
+        graph, retrievers = build()
+        embedded = []
+        cache = answer_cache.SemanticAnswerCache(
+            lambda query: embedded.append(query) or [1.0, 0.0], threshold=1.1, version_fn=version
+        )
+        monkeypatch.setattr(answer_cache, "answer_cache", cache)
+        
+        items = asyncio.run(run_batch(graph, ["a", "b", ""], max_concurrency=2, retrievers=retrievers))
+        
+        assert retrievers[0].embed_batches == [["a", "b"]]
+        assert retrievers[0].batched_queries == 2
+        assert cache.stats()["misses"] == 2
+        # only storing the finished answers embeds through the cache itself
+        assert len(embedded) == cache.stats()["entries"]
+        assert items[0].result is not None and items[1].result is not None
+    
+    def test_embedding_failure_falls_back_per_query(self):
+        graph, retrievers = build()
+        
+        def fail(texts):
+            raise RuntimeError("embeddings unavailable")
+        
+        retrievers[0].embed_batch = fail
+        items = asyncio.run(run_batch(graph, ["a", "b"], max_concurrency=2, bypass=True, retrievers=retrievers))
+        
+        assert all(item.result is not None for item in items)
+        assert retrievers[0].batches == 0
+        assert retrievers[0].searches == 2
+    
+    def test_retrieval_failure_falls_back_per_query(self):
+        graph, retrievers = build()
+        
+        def fail(*args, **kwargs):
+            raise RuntimeError("db down")
+        
+        retrievers[0].search_batch_by_vectors = fail
+        items = asyncio.run(run_batch(graph, ["a", "b"], max_concurrency=2, bypass=True, retrievers=retrievers))
+        
+        assert all(item.result is not None for item in items)
+        assert retrievers[0].searches == 2
+
+
+class TestStreamBatch:
+    
+    @pytest.mark.parametrize("max_concurrency", [1, 4])
+    def test_yields_every_item_once(self, max_concurrency):
+        graph, retrievers = build(FailingLLM(response='{"route": "tool_finder", "confidence": 0.9}'))
+        queries = ["a", "boom", "", "b"]
+        
+        async def collect():
+            return [item async for item in stream_batch(
+                graph, queries, max_concurrency, bypass=True, retrievers=retrievers
+            )]
+        
+        items = asyncio.run(collect())
+        
+        assert sorted(item.index for item in items) == [0, 1, 2, 3]
+        errors = {item.index for item in items if item.error}
+        assert errors == {1, 2}
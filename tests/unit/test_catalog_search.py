@@ -0,0 +1,81 @@
+import pytest
+
+from src.retrievers import CatalogSearch, ToolsRetriever, OrgsRetriever
+from src.retrievers.sql import combined_search_sql, similarity_search_sql
+from src.agents.state import AgentState
+from src.agents.workflow_advisor import WorkflowAdvisorAgent
+from tests.conftest import FakeLLM
+from tests.mocks.mock_db import MockToolsRetriever, MockOrgsRetriever, MOCK_TOOLS, MOCK_ORGS
+from tests.mocks.mock_embeddings import fake_embedding
+
+
+class CountingEmbedding:
+    
+    def __init__(self):
+        self.calls = 0
+    
+    def __call__(self, text: str) -> list[float]:
+        self.calls += 1
+        return fake_embedding(text)
+
+
+class TestCatalogSearch:
+    
+    def test_embeds_once_and_returns_both_result_sets(self):
+        embed_fn = CountingEmbedding()
+        search = CatalogSearch(MockToolsRetriever(), MockOrgsRetriever(), embed_fn=embed_fn)
+        
+        tools, orgs = search.search("burnout", tools_limit=2, orgs_limit=1)
+        
+        assert embed_fn.calls == 1
+        assert tools == MOCK_TOOLS[:2]
+        assert orgs == MOCK_ORGS[:1]
+    
+    def test_pgvector_retrievers_share_one_statement(self):
+        search = CatalogSearch(ToolsRetriever(fake_embedding), OrgsRetriever(fake_embedding))
+        assert search._single_statement()
+    
+    def test_mixed_modes_do_not_share_statement(self):
+        search = CatalogSearch(
+            ToolsRetriever(fake_embedding, mode="full"),
+            OrgsRetriever(fake_embedding, mode="binary")
+        )
+        assert not search._single_statement()
+    
+    def test_only_uncached_table_is_queried_and_stored(self, monkeypatch):
+        tools, orgs = ToolsRetriever(fake_embedding), OrgsRetriever(fake_embedding)
+        stored = []
+        monkeypatch.setattr(tools, "cache_lookup", lambda *args: (MOCK_TOOLS[:1], stored.append))
+        monkeypatch.setattr(orgs, "cache_lookup", lambda *args: (None, stored.append))
+        monkeypatch.setattr(orgs, "query_by_vector", lambda *args: MOCK_ORGS[:2])
+        monkeypatch.setattr(tools, "query_by_vector", lambda *args: pytest.fail("tools were cached"))
+        
+        results = CatalogSearch(tools, orgs).search_by_vector(fake_embedding("burnout"), 1, 2)
+        
+        assert results == (MOCK_TOOLS[:1], MOCK_ORGS[:2])
+        assert stored == [MOCK_ORGS[:2]]
+    
+    def test_combined_sql_uses_distinct_limit_params(self):
+        sql = combined_search_sql({
+            "tools": similarity_search_sql("clinical_tools", ["id"], "full", suffix="_tools"),
+            "orgs": similarity_search_sql("clinical_organizations", ["id"], "full", suffix="_orgs"),
+        })
+        
+        assert ":limit_tools" in sql
+        assert ":limit_orgs" in sql
+        assert sql.count(":vec") == 2
+        assert "AS tools" in sql and "AS orgs" in sql
+
+
+class TestWorkflowAdvisorAgent:
+    
+    def test_embeds_query_once(self):
+        tools_retriever = MockToolsRetriever()
+        tools_retriever.embed_fn = CountingEmbedding()
+        agent = WorkflowAdvisorAgent(tools_retriever, MockOrgsRetriever(), FakeLLM())
+        
+        result = agent.run(AgentState(query="reduce burnout"))
+        
+        assert tools_retriever.embed_fn.calls == 1
+        assert len(result.tools_results) == 3
+        assert len(result.orgs_results) == 3
@@ -0,0 +1,284 @@
+import asyncio
+import threading
+import time
+import uuid
+from types import SimpleNamespace
+
+import pytest
+
+from src.db.checkpoint_buffer import WriteBehindBuffer
+from src.db.checkpointer import PostgresCheckpointer, insert_statements
+
+
+class RecordingFlush:
+    """flush_fn recording each batch, optionally failing the first calls."""
+    
+    def __init__(self, failures: int = 0):
+        self.batches = []
+        self.failures = failures
+        self.threads = set()
+    
+    def __call__(self, rows_by_kind):
+        self.threads.add(threading.current_thread().name)
+        if self.failures:
+            self.failures -= 1
+            raise ConnectionError("database unavailable")
+        self.batches.append(rows_by_kind)
+
+
+def make_checkpoint() -> dict:
+    return {"v": 1, "id": str(uuid.uuid4()), "channel_values": {}, "channel_versions": {}, "versions_seen": {}}
+
+
+class TestWriteBehindBuffer:
+    
+    def test_rows_added_together_are_written_in_one_batch(self):
+        flush = RecordingFlush()
+        buffer = WriteBehindBuffer(flush, flush_interval_ms=50, max_rows=100)
+        
+        futures = [buffer.add("checkpoint", {"n": n}, "t1", wait=True) for n in range(5)]
+        for future in futures:
+            future.result(timeout=2)
+        
+        assert flush.batches == [{"checkpoint": [{"n": n} for n in range(5)]}]
+        assert flush.threads == {"checkpoint-writer"}
+        assert not buffer.pending("t1")
+        buffer.close()
+    
+    def test_full_batch_is_flushed_before_the_interval(self):
+        flush = RecordingFlush()
+        buffer = WriteBehindBuffer(flush, flush_interval_ms=10_000, max_rows=3)
+        
+        futures = [buffer.add("write", {"n": n}, "t1", wait=True) for n in range(3)]
+        
+        futures[-1].result(timeout=2)
+        assert len(flush.batches[0]["write"]) == 3
+        buffer.close()
+    
+    def test_pending_until_flush(self):
+        flush = RecordingFlush()
+        buffer = WriteBehindBuffer(flush, flush_interval_ms=10_000, max_rows=100)
+        
+        buffer.add("checkpoint", {"n": 1}, "t1")
+        
+        assert buffer.pending("t1")
+        assert not buffer.pending("t2")
+        buffer.flush()
+        assert not buffer.pending("t1")
+        assert flush.batches == [{"checkpoint": [{"n": 1}]}]
+        buffer.close()
+    
+    def test_close_flushes_remaining_rows(self):
+        flush = RecordingFlush()
+        buffer = WriteBehindBuffer(flush, flush_interval_ms=10_000, max_rows=100)
+        buffer.add("checkpoint", {"n": 1}, "t1")
+        
+        buffer.close()
+        
+        assert flush.batches == [{"checkpoint": [{"n": 1}]}]
+        buffer.add("checkpoint", {"n": 2}, "t1")
+        assert flush.batches[-1] == {"checkpoint": [{"n": 2}]}
+    
+    def test_failed_flush_fails_waiters_and_retries_the_rest(self):
+        flush = RecordingFlush(failures=3)
+        buffer = WriteBehindBuffer(flush, flush_interval_ms=10_000, max_rows=100)
+        waited = buffer.add("checkpoint", {"n": 1}, "t1", wait=True)
+        buffer.add("checkpoint", {"n": 2}, "t2")
+        
+        buffer.flush()
+        
+        with pytest.raises(ConnectionError):
+            waited.result(timeout=1)
+        assert not buffer.pending("t1")
+        assert buffer.pending("t2")
+        buffer.flush()
+        assert flush.batches == [{"checkpoint": [{"n": 2}]}]
+        assert buffer.stats()["failed_flushes"] == 2
+        buffer.close()
+    
+    def test_poison_row_only_fails_its_own_thread(self):
+        batches = []
+        
+        def flush(rows_by_kind):
+            rows = [row for kind_rows in rows_by_kind.values() for row in kind_rows]
+            if any(row.get("poison") for row in rows):
+                raise ValueError("violates foreign key constraint")
+            batches.append(rows)
+        
+        buffer = WriteBehindBuffer(flush, flush_interval_ms=10_000, max_rows=100)
+        healthy = buffer.add("checkpoint", {"n": 1}, "t1", wait=True)
+        buffer.add("write", {"n": 2}, "t2")
+        poisoned = buffer.add("checkpoint", {"n": 3, "poison": True}, "deleted", wait=True)
+        buffer.add("write", {"n": 4, "poison": True}, "deleted")
+        
+        buffer.flush()
+        
+        assert healthy.result(timeout=1) is None
+        with pytest.raises(ValueError):
+            poisoned.result(timeout=1)
+        assert batches == [[{"n": 1}], [{"n": 2}]]
+        assert not buffer.pending("t1") and not buffer.pending("t2")
+        for _ in range(2):
+            buffer.flush()
+        assert not buffer.pending("deleted")
+        assert buffer.stats()["rows_dropped"] == 1
+        assert buffer.stats()["rows_written"] == 2
+        buffer.close()
+    
+    def test_flush_returns_errors_of_failed_keys(self):
+        flush = RecordingFlush(failures=1)
+        buffer = WriteBehindBuffer(flush, flush_interval_ms=10_000, max_rows=100)
+        buffer.add("checkpoint", {"n": 1}, "t1")
+        
+        errors = buffer.flush()
+        
+        assert list(errors) == ["t1"] and isinstance(errors["t1"], ConnectionError)
+        assert buffer.flush() == {}
+        buffer.close()
+    
+    def test_rows_are_dropped_after_max_attempts(self):
+        flush = RecordingFlush(failures=10)
+        buffer = WriteBehindBuffer(flush, flush_interval_ms=10_000, max_rows=100)
+        buffer.add("checkpoint", {"n": 1}, "t1")
+        
+        for _ in range(3):
+            buffer.flush()
+        
+        assert not buffer.pending("t1")
+        assert buffer.stats()["rows_dropped"] == 1
+        buffer.close()
+
+
+class TestInsertStatements:
+    
+    def test_rows_share_one_multi_row_insert(self):
+        rows = [
+            {"thread_id": "t1", "checkpoint_id": f"c{n}", "parent_id": None,
+             "state": "{}", "metadata": None, "created_at": None}
+            for n in range(3)
+        ]
+        
+        [(sql, params)] = insert_statements({"checkpoint": rows})
+        
+        assert sql.count("(:thread_id_") == 3
+        assert "ON CONFLICT (thread_id, checkpoint_id)" in sql
+        assert params["checkpoint_id_2"] == "c2"
+    
+    def test_checkpoints_come_first_and_duplicates_collapse(self):
+        def write(idx, value):
+            return {"thread_id": "t1", "checkpoint_id": "c1", "task_id": "task", "idx": idx,
+                    "channel": "ch", "type": "msgpack", "value": value, "task_path": "", "created_at": None}
+        checkpoint = {"thread_id": "t1", "checkpoint_id": "c1", "parent_id": None,
+                      "state": "{}", "metadata": None, "created_at": None}
+        
+        statements = insert_statements({
+            "write": [write(0, b"first"), write(0, b"second")],
+            "write_upsert": [write(-1, b"old"), write(-1, b"new")],
+            "checkpoint": [checkpoint],
+        })
+        
+        assert [sql.split(" (")[0] for sql, _ in statements] == [
+            "INSERT INTO langgraph_checkpoints",
+            "INSERT INTO langgraph_checkpoint_writes",
+            "INSERT INTO langgraph_checkpoint_writes",
+        ]
+        assert statements[1][1]["value_0"] == b"first" and "value_1" not in statements[1][1]
+        assert statements[2][1]["value_0"] == b"new"
+        assert "DO UPDATE" in statements[2][0]
+    
+    def test_large_batches_are_split(self, monkeypatch):
+        from src.db import checkpointer
+        monkeypatch.setattr(checkpointer, "MAX_STATEMENT_PARAMS", 12)
+        rows = [{"thread_id": "t1", "checkpoint_id": f"c{n}", "parent_id": None,
+                 "state": "{}", "metadata": None, "created_at": None} for n in range(5)]
+        
+        statements = insert_statements({"checkpoint": rows})
+        
+        assert [sql.count("(:thread_id_") for sql, _ in statements] == [2, 2, 1]
+
+
+class TestPostgresCheckpointer:
+    
+    @pytest.fixture
+    def flushed(self, monkeypatch):
+        batches = []
+        monkeypatch.setattr(PostgresCheckpointer, "_flush", staticmethod(batches.append))
+        return batches
+    
+    def test_writes_round_trip_through_serde(self):
+        checkpointer = PostgresCheckpointer()
+        config = {"configurable": {"thread_id": "t1", "checkpoint_id": "c1"}}
+        
+        [(kind, rows)] = checkpointer._writes_rows(
+            config, [("messages", {"a": [1, 2]}), ("__error__", "boom")], "task-1", ""
+        ).items()
+        row = SimpleNamespace(_mapping={
+            "checkpoint_id": "c1", "parent_checkpoint_id": None, "state": {}, "metadata": None,
+        })
+        writes = [(r["task_id"], r["channel"], r["type"], r["value"]) for r in rows]
+        
+        assert kind == "write"
+        assert [r["idx"] for r in rows] == [0, -1]
+        assert checkpointer._to_tuple("t1", row, writes).pending_writes == [
+            ("task-1", "messages", {"a": [1, 2]}),
+            ("task-1", "__error__", "boom"),
+        ]
+    
+    def test_special_channel_writes_are_upserted(self):
+        config = {"configurable": {"thread_id": "t1", "checkpoint_id": "c1"}}
+        
+        rows_by_kind = PostgresCheckpointer()._writes_rows(config, [("__interrupt__", "x")], "task-1", "")
+        
+        assert list(rows_by_kind) == ["write_upsert"]
+        assert rows_by_kind["write_upsert"][0]["idx"] == -3
+    
+    def test_async_durability_returns_before_the_flush(self, flushed):
+        checkpointer = PostgresCheckpointer(write_behind=True, durability="async", flush_interval_ms=10_000)
+        
+        saved = checkpointer.put({"configurable": {"thread_id": "t1"}}, make_checkpoint(), {}, {})
+        
+        assert saved["configurable"]["thread_id"] == "t1"
+        assert flushed == []
+        checkpointer.close()
+        assert len(flushed[0]["checkpoint"]) == 1
+    
+    def test_sync_durability_waits_for_the_flush(self, flushed):
+        checkpointer = PostgresCheckpointer(write_behind=True, durability="sync", flush_interval_ms=20)
+        
+        async def run():
+            await checkpointer.aput({"configurable": {"thread_id": "t1"}}, make_checkpoint(), {}, {})
+            await checkpointer.aput_writes(
+                {"configurable": {"thread_id": "t1", "checkpoint_id": "c1"}}, [("ch", 1)], "task-1"
+            )
+        
+        started = time.monotonic()
+        asyncio.run(run())
+        
+        assert time.monotonic() - started >= 0.02
+        assert [list(batch) for batch in flushed] == [["checkpoint"], ["write"]]
+        checkpointer.close()
+    
+    @pytest.mark.parametrize("mode", ["sync", "async"])
+    def test_read_raises_when_the_flush_fails(self, monkeypatch, mode):
+        def fail(rows_by_kind):
+            raise ConnectionError("database unavailable")
+        
+        monkeypatch.setattr(PostgresCheckpointer, "_flush", staticmethod(fail))
+        checkpointer = PostgresCheckpointer(write_behind=True, durability="async", flush_interval_ms=10_000)
+        config = {"configurable": {"thread_id": "t1"}}
+        checkpointer.put(config, make_checkpoint(), {}, {})
+        
+        with pytest.raises(ConnectionError):
+            if mode == "sync":
+                checkpointer.get_tuple(config)
+            else:
+                asyncio.run(checkpointer.aget_tuple(config))
+        with pytest.raises(ConnectionError):
+            list(checkpointer.list(config))
+        assert checkpointer.buffer.pending("t1")
+        monkeypatch.setattr(checkpointer.buffer, "flush_fn", lambda rows_by_kind: None)
+        checkpointer.close()
+    
+    def test_invalid_durability(self):
+        with pytest.raises(ValueError):
+            PostgresCheckpointer(durability="eventually")
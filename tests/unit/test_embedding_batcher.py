@@ -0,0 +1,108 @@
+import asyncio
+import threading
+
+import pytest
+
+from src.embeddings.batcher import EmbeddingBatcher
+from tests.mocks.mock_embeddings import fake_embedding
+
+
+class RecordingBatch:
+    """Batch embedding function that records each batch it receives."""
+    
+    def __init__(self):
+        self.batches = []
+    
+    def __call__(self, texts: list[str]) -> list[list[float]]:
+        self.batches.append(list(texts))
+        return [fake_embedding(t) for t in texts]
+
+
+class TestEmbeddingBatcher:
+    
+    def test_single_call_returns_vector(self):
+        batch_fn = RecordingBatch()
+        batcher = EmbeddingBatcher(batch_fn, window_ms=1)
+        
+        assert batcher("query") == fake_embedding("query")
+        assert batch_fn.batches == [["query"]]
+    
+    def test_concurrent_calls_are_coalesced(self):
+        batch_fn = RecordingBatch()
+        batcher = EmbeddingBatcher(batch_fn, window_ms=200, max_batch_size=8)
+        texts = [f"query {i}" for i in range(8)]
+        results = {}
+        
+        def worker(t):
+            results[t] = batcher(t)
+        
+        threads = [threading.Thread(target=worker, args=(t,)) for t in texts]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        
+        assert len(batch_fn.batches) == 1
+        assert all(results[t] == fake_embedding(t) for t in texts)
+        assert batcher.stats()["batch_size_distribution"] == {8: 1}
+    
+    def test_duplicate_texts_share_one_input(self):
+        batch_fn = RecordingBatch()
+        batcher = EmbeddingBatcher(batch_fn, window_ms=200, max_batch_size=3)
+        
+        futures = [batcher.submit("same"), batcher.submit("same"), batcher.submit("other")]
+        vectors = [f.result() for f in futures]
+        
+        assert batch_fn.batches == [["same", "other"]]
+        assert vectors[0] == vectors[1] == fake_embedding("same")
+    
+    def test_errors_propagate_to_every_caller(self):
+        def failing(texts):
+            raise RuntimeError("rate limited")
+        
+        batcher = EmbeddingBatcher(failing, window_ms=1)
+        
+        with pytest.raises(RuntimeError, match="rate limited"):
+            batcher("query")
+    
+    def test_async_interface(self):
+        batch_fn = RecordingBatch()
+        batcher = EmbeddingBatcher(batch_fn, window_ms=50, max_batch_size=2)
+        
+        async def run():
+            return await asyncio.gather(batcher.aembed("a"), batcher.aembed("b"))
+        
+        a, b = asyncio.run(run())
+        
+        assert a == fake_embedding("a")
+        assert b == fake_embedding("b")
+        assert len(batch_fn.batches) == 1
+    
+    def test_slow_batch_does_not_block_the_next_window(self):
+        started, release = threading.Event(), threading.Event()
+        
+        def batch_fn(texts):
+            if texts == ["slow"]:
+                started.set()
+                release.wait(timeout=5)
+            return [fake_embedding(t) for t in texts]
+        
+        batcher = EmbeddingBatcher(batch_fn, window_ms=1, max_in_flight=2)
+        slow = batcher.submit("slow")
+        started.wait(timeout=2)
+        
+        assert batcher.submit("fast").result(timeout=2) == fake_embedding("fast")
+        assert not slow.done()
+        release.set()
+        assert slow.result(timeout=2) == fake_embedding("slow")
+    
+    def test_errors_after_the_call_still_resolve_every_future(self, monkeypatch):
+        def broken_charge(pending, usage):
+            raise ZeroDivisionError("bad weight")
+        
+        batcher = EmbeddingBatcher(RecordingBatch(), window_ms=1)
+        monkeypatch.setattr(batcher, "_charge", broken_charge)
+        
+        for _ in range(2):
+            with pytest.raises(ZeroDivisionError):
+                batcher.submit("query").result(timeout=2)
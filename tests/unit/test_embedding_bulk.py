@@ -0,0 +1,90 @@
+import pytest
+
+from src.embeddings.bulk import chunk_texts, embed_with_retry, get_embeddings_bulk, iter_embeddings_bulk
+from src.usage import record_embedding_usage, start_request_usage
+from tests.mocks.mock_embeddings import fake_embedding
+
+
+class RecordingBatch:
+    """Batch embedding function that records each chunk it receives."""
+    
+    def __init__(self):
+        self.batches = []
+    
+    def __call__(self, texts: list[str]) -> list[list[float]]:
+        self.batches.append(list(texts))
+        return [fake_embedding(t) for t in texts]
+
+
+class TransientError(Exception):
+    pass
+
+
+class TestChunkTexts:
+    
+    def test_splits_by_count(self):
+        chunks = chunk_texts([f"t{i}" for i in range(10)], max_items=4, max_tokens=10_000)
+        assert [len(c) for c in chunks] == [4, 4, 2]
+    
+    def test_splits_by_token_budget(self):
+        texts = ["x" * 400] * 5  # ~100 tokens each
+        chunks = chunk_texts(texts, max_items=100, max_tokens=250)
+        assert [len(c) for c in chunks] == [2, 2, 1]
+    
+    def test_oversized_text_gets_own_chunk(self):
+        chunks = chunk_texts(["x" * 4000, "small"], max_items=100, max_tokens=100)
+        assert chunks == [["x" * 4000], ["small"]]
+
+
+class TestBulkEmbedding:
+    
+    def test_preserves_input_order(self):
+        texts = [f"text {i}" for i in range(25)]
+        vectors = get_embeddings_bulk(
+            texts, batch_fn=RecordingBatch(), max_items=4, concurrency=3
+        )
+        assert vectors == [fake_embedding(t) for t in texts]
+    
+    def test_dedupes_identical_texts(self):
+        batch_fn = RecordingBatch()
+        texts = ["a", "b", "a", "c", "b", "a"]
+        
+        vectors = get_embeddings_bulk(texts, batch_fn=batch_fn, max_items=2)
+        
+        assert sorted(t for batch in batch_fn.batches for t in batch) == ["a", "b", "c"]
+        assert vectors == [fake_embedding(t) for t in texts]
+    
+    def test_streams_results(self):
+        stream = iter_embeddings_bulk(["a", "b", "c"], batch_fn=RecordingBatch(), max_items=1)
+        assert next(stream) == fake_embedding("a")
+    
+    def test_retries_transient_failures(self):
+        calls = []
+        
+        def flaky(texts):
+            calls.append(texts)
+            if len(calls) < 3:
+                raise TransientError("503")
+            return [fake_embedding(t) for t in texts]
+        
+        vectors = embed_with_retry(["a"], flaky, max_retries=3, backoff_base=0, retry_on=(TransientError,))
+        
+        assert vectors == [fake_embedding("a")]
+        assert len(calls) == 3
+    
+    def test_gives_up_after_max_retries(self):
+        def always_fails(texts):
+            raise TransientError("503")
+        
+        with pytest.raises(TransientError):
+            embed_with_retry(["a"], always_fails, max_retries=2, backoff_base=0, retry_on=(TransientError,))
+    
+    def test_chunk_usage_is_charged_to_the_request(self):
+        def batch_fn(texts):
+            record_embedding_usage("text-embedding-3-small", 10 * len(texts))
+            return [fake_embedding(t) for t in texts]
+        
+        usage = start_request_usage()
+        get_embeddings_bulk([f"text {i}" for i in range(6)], batch_fn=batch_fn, max_items=2, concurrency=3)
+        
+        assert usage.as_dict()["embedding_tokens"] == 60
@@ -0,0 +1,101 @@
+import pytest
+
+from src.embeddings.cache import EmbeddingCache, hash_text
+from tests.mocks.mock_embeddings import fake_embedding
+
+
+class CountingEmbedding:
+    """Wraps fake_embedding and records every call."""
+    
+    def __init__(self):
+        self.calls = []
+    
+    def __call__(self, text: str) -> list[float]:
+        self.calls.append(text)
+        return fake_embedding(text)
+
+
+class TestEmbeddingCache:
+    
+    def test_second_lookup_is_memory_hit(self):
+        embed_fn = CountingEmbedding()
+        cache = EmbeddingCache(embed_fn, persistent=False)
+        
+        first = cache("reduce documentation burden")
+        second = cache("reduce documentation burden")
+        
+        assert first == second
+        assert len(embed_fn.calls) == 1
+        assert cache.stats()["memory_hits"] == 1
+        assert cache.stats()["misses"] == 1
+    
+    def test_normalizes_whitespace_and_case(self):
+        embed_fn = CountingEmbedding()
+        cache = EmbeddingCache(embed_fn, persistent=False)
+        
+        cache("Reduce  documentation burden ")
+        cache("reduce documentation burden")
+        
+        assert len(embed_fn.calls) == 1
+        assert hash_text("A  b") == hash_text("a b")
+    
+    def test_evicts_least_recently_used(self):
+        embed_fn = CountingEmbedding()
+        cache = EmbeddingCache(embed_fn, max_size=2, persistent=False)
+        
+        cache("one")
+        cache("two")
+        cache("one")
+        cache("three")
+        cache("one")
+        cache("two")
+        
+        assert embed_fn.calls == ["one", "two", "three", "two"]
+        assert cache.stats()["size"] == 2
+    
+    def test_expired_entries_are_refetched(self):
+        embed_fn = CountingEmbedding()
+        cache = EmbeddingCache(embed_fn, ttl_seconds=0, persistent=False)
+        
+        cache("query")
+        cache("query")
+        
+        assert len(embed_fn.calls) == 2
+    
+    def test_key_includes_model_and_dimensions(self):
+        embed_fn = CountingEmbedding()
+        small = EmbeddingCache(embed_fn, dimensions=1536, persistent=False)
+        reduced = EmbeddingCache(embed_fn, dimensions=512, persistent=False)
+        
+        small("query")
+        reduced("query")
+        
+        assert len(embed_fn.calls) == 2
+    
+    def test_hit_rate(self):
+        cache = EmbeddingCache(CountingEmbedding(), persistent=False)
+        
+        cache("a")
+        cache("a")
+        cache("a")
+        cache("b")
+        
+        assert cache.stats()["hit_rate"] == pytest.approx(0.5)
+    
+    def test_embed_batch_calls_batch_fn_once_for_misses(self):
+        embed_fn = CountingEmbedding()
+        batches = []
+        
+        def batch_fn(texts):
+            batches.append(list(texts))
+            return [fake_embedding(t) for t in texts]
+        
+        cache = EmbeddingCache(embed_fn, persistent=False, batch_fn=batch_fn)
+        cache("cached query")
+        
+        vectors = cache.embed_batch(["cached query", "new one", "New  one", "another"])
+        
+        assert batches == [["new one", "another"]]
+        assert vectors[1] == vectors[2] == fake_embedding("new one")
+        assert vectors[0] == fake_embedding("cached query")
+        assert cache.stats()["memory_hits"] == 1
@@ -0,0 +1,99 @@
+import asyncio
+
+import pytest
+
+from src.agents.graph import create_clinical_graph
+from tests.conftest import FakeLLM
+from tests.mocks.mock_db import MockToolsRetriever, MockOrgsRetriever, MOCK_TOOLS, MOCK_ORGS
+
+
+class CountingToolsRetriever(MockToolsRetriever):
+    """Mock tools retriever that counts text searches."""
+    
+    def __init__(self):
+        super().__init__(MOCK_TOOLS)
+        self.searches = 0
+    
+    def search(self, query, limit=5, filters=None):
+        self.searches += 1
+        return super().search(query, limit, filters)
+
+
+def build_graph(route: str, speculative: bool, tools_retriever=None):
+    return create_clinical_graph(
+        llm=FakeLLM(response=f'{{"route": "{route}", "confidence": 0.9}}'),
+        tools_retriever=tools_retriever or MockToolsRetriever(MOCK_TOOLS),
+        orgs_retriever=MockOrgsRetriever(MOCK_ORGS),
+        speculative_retrieval=speculative,
+    )
+
+
+class TestSpeculativeRetrieval:
+    
+    def test_specialist_uses_prefetched_results(self):
+        retriever = CountingToolsRetriever()
+        graph = build_graph("tool_finder", speculative=True, tools_retriever=retriever)
+        
+        result = graph.invoke({"query": "documentation tools"})
+        
+        assert retriever.searches == 0
+        assert len(result["tools_results"]) == min(len(MOCK_TOOLS), 5)
+        assert result["orgs_results"] == []
+        assert result["prefetched"] is None
+        assert "speculative_saved_ms" in result["timings"]
+    
+    def test_graphs_share_one_executor_until_shutdown(self):
+        from src.agents.graph import prefetch_executor, shutdown_prefetch_executor
+        build_graph("tool_finder", speculative=True).invoke({"query": "sepsis"})
+        executor = prefetch_executor()
+        
+        build_graph("org_matcher", speculative=True).invoke({"query": "sepsis"})
+        assert prefetch_executor() is executor
+        
+        shutdown_prefetch_executor()
+        assert executor._shutdown
+        result = build_graph("tool_finder", speculative=True).invoke({"query": "sepsis"})
+        assert "speculative_saved_ms" in result["timings"]
+    
+    @pytest.mark.parametrize("route", ["tool_finder", "org_matcher", "workflow_advisor"])
+    def test_results_match_sequential_mode(self, route):
+        sequential = build_graph(route, speculative=False).invoke({"query": "sepsis"})
+        speculative = build_graph(route, speculative=True).invoke({"query": "sepsis"})
+        
+        assert speculative["tools_results"] == sequential["tools_results"]
+        assert speculative["orgs_results"] == sequential["orgs_results"]
+    
+    def test_sequential_mode_searches_in_specialist(self):
+        retriever = CountingToolsRetriever()
+        graph = build_graph("tool_finder", speculative=False, tools_retriever=retriever)
+        
+        result = graph.invoke({"query": "documentation tools"})
+        
+        assert retriever.searches == 1
+        assert "tool_finder_ms" in result["timings"]
+        assert "speculative_saved_ms" not in result["timings"]
+
+
+class TestAsyncGraph:
+    
+    @pytest.mark.parametrize("speculative", [False, True])
+    @pytest.mark.parametrize("route", ["tool_finder", "org_matcher", "workflow_advisor"])
+    def test_ainvoke_matches_invoke(self, route, speculative):
+        graph = build_graph(route, speculative=speculative)
+        
+        sync_result = graph.invoke({"query": "sepsis"})
+        async_result = asyncio.run(graph.ainvoke({"query": "sepsis"}))
+        
+        for key in ("route", "response", "tools_results", "orgs_results", "confidence"):
+            assert async_result[key] == sync_result[key]
+    
+    def test_concurrent_requests(self):
+        graph = build_graph("tool_finder", speculative=True)
+        
+        async def run_many():
+            return await asyncio.gather(*(graph.ainvoke({"query": f"query {i}"}) for i in range(20)))
+        
+        results = asyncio.run(run_many())
+        
+        assert [r["query"] for r in results] == [f"query {i}" for i in range(20)]
+        assert all(r["route"] == "tool_finder" for r in results)
@@ -0,0 +1,268 @@
+import asyncio
+import contextvars
+import time
+
+import pytest
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.language_models import BaseChatModel
+from langchain_core.language_models.chat_models import generate_from_stream
+from langchain_core.messages import AIMessageChunk
+from langchain_core.outputs import ChatGenerationChunk
+from langchain_core.runnables.config import var_child_runnable_config
+
+from src.agents.hedged_llm import HedgedLLM
+
+REQUEST_ID = contextvars.ContextVar("request_id", default=None)
+
+
+class ScriptedLLM:
+    """Fake chat model whose n-th call sleeps or fails as scripted."""
+    
+    def __init__(self, script):
+        self.script = list(script)
+        self.calls = 0
+        self.request_ids = []
+    
+    def _next(self):
+        step = self.script[min(self.calls, len(self.script) - 1)]
+        self.calls += 1
+        self.request_ids.append(REQUEST_ID.get())
+        return step
+    
+    def invoke(self, messages):
+        step = self._next()
+        if isinstance(step, Exception):
+            raise step
+        time.sleep(step)
+        return f"slept {step}"
+    
+    async def ainvoke(self, messages):
+        step = self._next()
+        if isinstance(step, Exception):
+            raise step
+        await asyncio.sleep(step)
+        return f"slept {step}"
+
+
+class StreamingChatModel(BaseChatModel):
+    """Chat model whose n-th call streams tokens, pauses, then optionally fails."""
+    
+    script: list = []
+    calls: int = 0
+    
+    @property
+    def _llm_type(self) -> str:
+        return "scripted-streaming"
+    
+    def _stream(self, messages, stop=None, run_manager=None, **kwargs):
+        tokens, pause, error = self.script[min(self.calls, len(self.script) - 1)]
+        self.calls += 1
+        for token in tokens:
+            yield ChatGenerationChunk(message=AIMessageChunk(content=token))
+        time.sleep(pause)
+        if error is not None:
+            raise error
+    
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+        return generate_from_stream(self._stream(messages, stop, run_manager, **kwargs))
+
+
+class StatusError(Exception):
+    """API error carrying an HTTP status code, like openai.APIStatusError."""
+    
+    def __init__(self, status_code: int):
+        super().__init__(f"HTTP {status_code}")
+        self.status_code = status_code
+
+
+def warmed(llm, **kwargs) -> HedgedLLM:
+    """HedgedLLM whose latency window says calls take about 10ms."""
+    wrapped = HedgedLLM(llm, "test", hedge_min_samples=5, **kwargs)
+    for _ in range(5):
+        wrapped._record(0.01)
+    return wrapped
+
+
+class StreamingHandler(BaseCallbackHandler):
+    """Looks like LangGraph's stream_mode="messages" handler to is_streaming(); records tokens."""
+    
+    def __init__(self):
+        self.tokens = []
+    
+    def on_llm_new_token(self, token, **kwargs):
+        if token:
+            self.tokens.append(token)
+    
+    def tap_output_aiter(self, run_id, output):
+        return output
+    
+    def tap_output_iter(self, run_id, output):
+        return output
+
+
+def call(wrapped: HedgedLLM, mode: str):
+    if mode == "sync":
+        return wrapped.invoke([])
+    return asyncio.run(wrapped.ainvoke([]))
+
+
+def call_in_context(
+    wrapped: HedgedLLM, mode: str, request_id: str = "r1", streaming: bool = False, handler=None
+):
+    """call() with REQUEST_ID set and, if streaming, a streaming callback in the run config."""
+    def run():
+        REQUEST_ID.set(request_id)
+        if streaming:
+            var_child_runnable_config.set({"callbacks": [handler or StreamingHandler()]})
+        return call(wrapped, mode)
+    return contextvars.copy_context().run(run)
+
+
+@pytest.mark.parametrize("mode", ["sync", "async"])
+class TestHedgedLLM:
+    
+    def test_passes_result_through(self, mode):
+        wrapped = HedgedLLM(ScriptedLLM([0]), "test", timeout_seconds=1, max_retries=0)
+        
+        assert call(wrapped, mode) == "slept 0"
+        assert wrapped.stats()["calls"] == 1
+    
+    def test_hedge_wins_over_slow_request(self, mode):
+        wrapped = warmed(ScriptedLLM([1.0, 0]), timeout_seconds=2, max_retries=0, hedging=True)
+        
+        start = time.monotonic()
+        result = call(wrapped, mode)
+        
+        assert result == "slept 0"
+        assert time.monotonic() - start < 0.5
+        stats = wrapped.stats()
+        assert stats["hedges_fired"] == 1
+        assert stats["hedges_won"] == 1
+    
+    def test_hedge_runs_in_callers_context(self, mode):
+        llm = ScriptedLLM([0.3, 0])
+        wrapped = warmed(llm, timeout_seconds=2, max_retries=0, hedging=True)
+        
+        assert call_in_context(wrapped, mode) == "slept 0"
+        assert llm.request_ids == ["r1", "r1"]
+    
+    def test_streaming_calls_are_not_hedged(self, mode):
+        wrapped = warmed(ScriptedLLM([0.1, 0]), timeout_seconds=2, max_retries=0, hedging=True)
+        
+        assert call_in_context(wrapped, mode, streaming=True) == "slept 0.1"
+        assert wrapped.stats()["hedges_fired"] == 0
+    
+    def test_streamed_attempt_is_not_retried(self, mode):
+        llm = StreamingChatModel(script=[(["Par", "tial"], 0, ConnectionError("reset")), (["Whole"], 0, None)])
+        wrapped = HedgedLLM(llm, "test", timeout_seconds=1, max_retries=2)
+        handler = StreamingHandler()
+        
+        with pytest.raises(ConnectionError, match="reset"):
+            call_in_context(wrapped, mode, streaming=True, handler=handler)
+        assert llm.calls == 1
+        assert handler.tokens == ["Par", "tial"]
+        assert wrapped.stats()["retries"] == 0
+    
+    def test_streaming_failure_before_first_token_is_retried(self, mode):
+        llm = StreamingChatModel(script=[([], 0, ConnectionError("reset")), (["Whole"], 0, None)])
+        wrapped = HedgedLLM(llm, "test", timeout_seconds=1, max_retries=2)
+        handler = StreamingHandler()
+        
+        assert call_in_context(wrapped, mode, streaming=True, handler=handler).content == "Whole"
+        assert llm.calls == 2
+        assert handler.tokens == ["Whole"]
+    
+    def test_streamed_attempt_is_not_timed_out(self, mode):
+        llm = StreamingChatModel(script=[(["Slow"], 0.2, None), (["Again"], 0, None)])
+        wrapped = HedgedLLM(llm, "test", timeout_seconds=0.05, max_retries=1)
+        handler = StreamingHandler()
+        
+        assert call_in_context(wrapped, mode, streaming=True, handler=handler).content == "Slow"
+        assert llm.calls == 1
+        assert handler.tokens == ["Slow"]
+        assert wrapped.stats()["timeouts"] == 0
+    
+    def test_no_hedge_before_warm_up(self, mode):
+        wrapped = HedgedLLM(ScriptedLLM([0.05, 0]), "test", timeout_seconds=1, hedging=True)
+        
+        assert call(wrapped, mode) == "slept 0.05"
+        assert wrapped.stats()["hedges_fired"] == 0
+    
+    def test_timeout_is_retried(self, mode):
+        llm = ScriptedLLM([1.0, 0])
+        wrapped = HedgedLLM(llm, "test", timeout_seconds=0.05, max_retries=1)
+        
+        assert call(wrapped, mode) == "slept 0"
+        stats = wrapped.stats()
+        assert stats["timeouts"] == 1
+        assert stats["retries"] == 1
+        assert stats["failed"] == 0
+    
+    def test_error_after_retries_is_raised(self, mode):
+        llm = ScriptedLLM([ConnectionError("boom")])
+        wrapped = HedgedLLM(llm, "test", timeout_seconds=1, max_retries=2)
+        
+        with pytest.raises(ConnectionError, match="boom"):
+            call(wrapped, mode)
+        assert llm.calls == 3
+        assert wrapped.stats()["failed"] == 1
+    
+    def test_request_errors_are_not_retried(self, mode):
+        llm = ScriptedLLM([StatusError(400), 0])
+        wrapped = HedgedLLM(llm, "test", timeout_seconds=1, max_retries=2)
+        
+        with pytest.raises(StatusError):
+            call(wrapped, mode)
+        assert llm.calls == 1
+    
+    def test_server_errors_are_retried(self, mode):
+        llm = ScriptedLLM([StatusError(503), StatusError(429), 0])
+        wrapped = HedgedLLM(llm, "test", timeout_seconds=1, max_retries=2)
+        
+        assert call(wrapped, mode) == "slept 0"
+        assert wrapped.stats()["retries"] == 2
+    
+    def test_timeout_raises_when_out_of_retries(self, mode):
+        wrapped = HedgedLLM(ScriptedLLM([1.0]), "test", timeout_seconds=0.05, max_retries=0)
+        
+        with pytest.raises(TimeoutError):
+            call(wrapped, mode)
+
+
+class TestSyncQueueing:
+    
+    def test_time_waiting_for_a_worker_does_not_count(self, monkeypatch):
+        from concurrent.futures import ThreadPoolExecutor
+        from src.agents import hedged_llm
+        
+        monkeypatch.setattr(hedged_llm, "_executor", ThreadPoolExecutor(max_workers=1))
+        blocker = hedged_llm._executor.submit(time.sleep, 0.2)
+        wrapped = HedgedLLM(ScriptedLLM([0.05]), "test", timeout_seconds=0.15, max_retries=0)
+        
+        assert wrapped.invoke([]) == "slept 0.05"
+        assert blocker.done()
+        assert wrapped.stats()["timeouts"] == 0
+    
+    def test_abandoned_attempts_are_counted_until_they_finish(self):
+        from src.agents.hedged_llm import abandoned_workers
+        wrapped = HedgedLLM(ScriptedLLM([0.3]), "test", timeout_seconds=0.05, max_retries=0)
+        deadline = time.monotonic() + 2
+        while abandoned_workers() and time.monotonic() < deadline:
+            time.sleep(0.05)  # attempts abandoned by earlier tests
+        
+        with pytest.raises(TimeoutError):
+            wrapped.invoke([])
+        
+        assert abandoned_workers() == 1
+        time.sleep(0.4)
+        assert abandoned_workers() == 0
+    
+    def test_no_hedges_while_too_many_workers_are_abandoned(self, monkeypatch):
+        from src.agents import hedged_llm
+        monkeypatch.setattr(hedged_llm, "_abandoned", hedged_llm.MAX_ABANDONED)
+        wrapped = warmed(ScriptedLLM([0.1, 0]), timeout_seconds=2, max_retries=0, hedging=True)
+        
+        assert wrapped.invoke([]) == "slept 0.1"
+        assert wrapped.stats()["hedges_fired"] == 0
+        assert wrapped.stats()["hedges_skipped"] == 1
+
@@ -0,0 +1,108 @@
+import pytest
+
+from src.retrievers.memory_retriever import InMemoryRetriever
+from tests.mocks.mock_db import MockToolsRetriever, MOCK_TOOLS
+
+
+class StubToolsRetriever(MockToolsRetriever):
+    """Mock pgvector retriever exposing table metadata for the mirror."""
+    
+    table = "clinical_tools"
+    columns = ["id", "name", "category"]
+    filter_columns = {"category": "scalar"}
+    
+    def __init__(self):
+        super().__init__(MOCK_TOOLS)
+        self.embed_fn = lambda text: [1.0, 0.0, 0.0]
+        self.vector_calls = 0
+    
+    def search_by_vector(self, query_embedding, limit=5, filters=None):
+        self.vector_calls += 1
+        return self.data[:limit]
+
+
+def make_rows():
+    return [
+        {"id": 1, "name": "Scribe", "category": "Documentation", "embedding": [1.0, 0.0, 0.0]},
+        {"id": 2, "name": "Lexicomp", "category": "Drug Reference", "embedding": [0.0, 1.0, 0.0]},
+        {"id": 3, "name": "Trials", "category": "Research", "embedding": [0.7, 0.7, 0.0]},
+    ]
+
+
+@pytest.fixture
+def memory_retriever(monkeypatch, version):
+    retriever = InMemoryRetriever(StubToolsRetriever(), max_rows=10, retry_seconds=3600, version_fn=version)
+    state = {"rows": make_rows(), "row_count": 3}
+    monkeypatch.setattr(retriever, "_fetch_rows", lambda: state["rows"])
+    monkeypatch.setattr(retriever, "_row_count", lambda: state["row_count"])
+    retriever.state = state
+    retriever.version = version
+    return retriever
+
+
+class TestInMemoryRetriever:
+    
+    def test_returns_top_k_by_cosine(self, memory_retriever):
+        results = memory_retriever.search_by_vector([1.0, 0.1, 0.0], limit=2)
+        
+        assert [r["id"] for r in results] == [1, 3]
+        assert results[0]["similarity"] > results[1]["similarity"]
+        assert set(results[0]) == {"id", "name", "category", "similarity"}
+    
+    def test_search_uses_embed_fn(self, memory_retriever):
+        results = memory_retriever.search("documentation", limit=1)
+        assert results[0]["name"] == "Scribe"
+    
+    def test_limit_larger_than_catalog(self, memory_retriever):
+        results = memory_retriever.search_by_vector([0.0, 1.0, 0.0], limit=10)
+        assert len(results) == 3
+    
+    def test_reloads_when_catalog_version_changes(self, memory_retriever):
+        memory_retriever.search_by_vector([1.0, 0.0, 0.0])
+        memory_retriever.state["rows"] = make_rows()[:1]
+        
+        assert len(memory_retriever.search_by_vector([1.0, 0.0, 0.0])) == 3
+        
+        memory_retriever.version.value += 1
+        assert len(memory_retriever.search_by_vector([1.0, 0.0, 0.0])) == 1
+    
+    def test_failed_reload_keeps_mirror_until_retry(self, memory_retriever, monkeypatch):
+        memory_retriever.search_by_vector([1.0, 0.0, 0.0])
+        attempts = []
+        
+        def failing_fetch():
+            attempts.append(1)
+            raise ConnectionError("database unavailable")
+        
+        monkeypatch.setattr(memory_retriever, "_fetch_rows", failing_fetch)
+        memory_retriever.version.value += 1
+        
+        for _ in range(2):
+            assert len(memory_retriever.search_by_vector([1.0, 0.0, 0.0])) == 3
+        assert len(attempts) == 1
+    
+    def test_falls_back_to_pgvector_when_catalog_too_large(self, memory_retriever):
+        memory_retriever.state["row_count"] = 11
+        
+        results = memory_retriever.search_by_vector([1.0, 0.0, 0.0], limit=2)
+        
+        assert memory_retriever.fallback.vector_calls == 1
+        assert results == MOCK_TOOLS[:2]
+    
+    def test_batch_matches_single_searches(self, memory_retriever):
+        queries = [[1.0, 0.1, 0.0], [0.0, 1.0, 0.0], [0.5, 0.5, 0.0]]
+        
+        batch = memory_retriever.search_batch_by_vectors(queries, limit=2)
+        
+        assert batch == [memory_retriever.search_by_vector(q, limit=2) for q in queries]
+    
+    def test_filter_mask_keeps_limit_rows_from_matching_subset(self, memory_retriever):
+        results = memory_retriever.search_by_vector(
+            [1.0, 0.0, 0.0], limit=2, filters={"category": ["Research", "Drug Reference"]}
+        )
+        
+        assert [r["id"] for r in results] == [3, 2]
+    
+    def test_unknown_filter_rejected(self, memory_retriever):
+        with pytest.raises(ValueError):
+            memory_retriever.search_by_vector([1.0, 0.0, 0.0], filters={"color": "red"})
@@ -0,0 +1,146 @@
+import asyncio
+
+import pytest
+from fastapi.testclient import TestClient
+
+from src.agents.graph import create_clinical_graph
+from src.api import answer_cache
+from src.api.app import app
+from src.api.routes import agent
+from src.metrics import (
+    Histogram, MetricsRegistry, RequestTimings, graph_node_seconds, graph_node_errors, start_request_timings
+)
+from tests.conftest import FakeLLM
+from tests.mocks.mock_db import MockToolsRetriever, MockOrgsRetriever, MOCK_TOOLS, MOCK_ORGS
+
+
+class FailingLLM(FakeLLM):
+    """Fake LLM whose every call fails."""
+    
+    def invoke(self, messages):
+        raise RuntimeError("LLM unavailable")
+
+
+def build_graph():
+    return create_clinical_graph(
+        llm=FakeLLM(response='{"route": "tool_finder", "confidence": 0.9}'),
+        tools_retriever=MockToolsRetriever(MOCK_TOOLS),
+        orgs_retriever=MockOrgsRetriever(MOCK_ORGS),
+    )
+
+
+def node_count(node: str) -> int:
+    series = graph_node_seconds.snapshot().get((node,))
+    return series[2] if series else 0
+
+
+class TestHistogram:
+    
+    def test_observations_land_in_cumulative_buckets(self):
+        histogram = Histogram("test_seconds", "Test", ("op",), buckets=(0.1, 1.0))
+        
+        histogram.observe(0.05, op="a")
+        histogram.observe(0.5, op="a")
+        histogram.observe(5.0, op="a")
+        lines = histogram.render()
+        
+        assert 'test_seconds_bucket{op="a",le="0.1"} 1' in lines
+        assert 'test_seconds_bucket{op="a",le="1.0"} 2' in lines
+        assert 'test_seconds_bucket{op="a",le="+Inf"} 3' in lines
+        assert 'test_seconds_count{op="a"} 3' in lines
+        assert 'test_seconds_sum{op="a"} 5.55' in lines
+    
+    def test_time_records_when_block_raises(self):
+        histogram = Histogram("test_seconds", "Test")
+        
+        with pytest.raises(ValueError):
+            with histogram.time():
+                raise ValueError("boom")
+        
+        assert histogram.snapshot()[()][2] == 1
+    
+    def test_label_values_are_escaped(self):
+        histogram = Histogram("test_seconds", "Test", ("op",), buckets=(1.0,))
+        
+        histogram.observe(0.1, op='say "hi"')
+        
+        assert 'test_seconds_count{op="say \\"hi\\""} 1' in histogram.render()
+
+
+class TestRegistry:
+    
+    def test_renders_metrics_and_gauges(self):
+        registry = MetricsRegistry()
+        counter = registry.counter("test_total", "Test", ("kind",))
+        counter.inc(kind="x")
+        counter.inc(2, kind="x")
+        registry.add_gauges(lambda: [("test_gauge", "Gauge", [({"engine": "sync"}, 3)])])
+        
+        text = registry.render()
+        
+        assert "# TYPE test_total counter" in text
+        assert 'test_total{kind="x"} 3' in text
+        assert "# TYPE test_gauge gauge" in text
+        assert 'test_gauge{engine="sync"} 3' in text
+        assert counter.value(kind="x") == 3
+
+
+class TestNodeMetrics:
+    
+    def test_graph_nodes_are_timed(self):
+        graph = build_graph()
+        before = node_count("supervisor"), node_count("tool_finder")
+        
+        graph.invoke({"query": "documentation tools"})
+        
+        assert (node_count("supervisor"), node_count("tool_finder")) == (before[0] + 1, before[1] + 1)
+    
+    def test_node_errors_are_counted(self):
+        graph = create_clinical_graph(
+            llm=FailingLLM(),
+            tools_retriever=MockToolsRetriever(MOCK_TOOLS),
+            orgs_retriever=MockOrgsRetriever(MOCK_ORGS),
+            llm_policies={"supervisor": {"timeout_seconds": 0, "max_retries": 0}},
+        )
+        before = graph_node_errors.value(node="supervisor")
+        
+        with pytest.raises(RuntimeError):
+            graph.invoke({"query": "documentation tools"})
+        
+        assert graph_node_errors.value(node="supervisor") == before + 1
+
+
+class TestRequestTimings:
+    
+    def test_phases_from_a_graph_run(self):
+        graph = build_graph()
+        
+        async def run():
+            timings = start_request_timings()
+            await graph.ainvoke({"query": "documentation tools"})
+            return timings.as_dict()
+        
+        phases = asyncio.run(run())
+        
+        assert {"routing", "llm_routing", "llm_synthesis", "total"} <= set(phases)
+        assert phases["llm_routing"] <= phases["routing"] <= phases["total"]
+    
+    def test_server_timing_header(self):
+        timings = RequestTimings()
+        timings.add("routing", 0.25)
+        timings.add("routing", 0.05)
+        
+        header = timings.server_timing()
+        
+        assert header.startswith("routing;dur=300.0, total;dur=")
+    
+    def test_query_endpoint_reports_timings(self, monkeypatch):
+        monkeypatch.setattr(answer_cache, "answer_cache", None)
+        monkeypatch.setattr(agent, "_graph", build_graph())
+        client = TestClient(app)
+        
+        response = client.post("/api/query", json={"query": "documentation tools"})
+        
+        assert response.status_code == 200
+        assert "llm_synthesis;dur=" in response.headers["Server-Timing"]
+        assert response.json()["timings"]["total"] > 0
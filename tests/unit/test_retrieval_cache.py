@@ -0,0 +1,207 @@
+import asyncio
+
+import pytest
+
+from src.db.catalog_version import CatalogVersionTracker
+from src.retrievers import ToolsRetriever
+from src.retrievers.result_cache import RetrievalCache, estimate_size
+
+
+ROWS = [{"id": 1, "name": "Scribe", "similarity": 0.9}]
+
+
+class CountingToolsRetriever(ToolsRetriever):
+    """ToolsRetriever whose SQL query is replaced by a counter."""
+    
+    def __init__(self, cache):
+        super().__init__(embed_fn=lambda text: [0.1, 0.2, 0.3], mode="full", result_cache=cache)
+        self.queries = 0
+    
+    def query_by_vector(self, query_embedding, limit=5, filters=None):
+        self.queries += 1
+        return ROWS[:limit]
+
+
+@pytest.fixture
+def cache(version):
+    return RetrievalCache(max_bytes=10_000, version_fn=version)
+
+
+class TestRetrievalCache:
+    
+    def test_hit_after_put(self, cache):
+        key = cache.make_key("clinical_tools", [0.1, 0.2], 5)
+        v = cache.version()
+        
+        assert cache.get(key, v) is None
+        cache.put(key, ROWS, v)
+        
+        assert cache.get(key, v) == ROWS
+        assert cache.stats()["hits"] == 1
+        assert cache.stats()["misses"] == 1
+    
+    def test_key_includes_limit_and_filters(self, cache):
+        base = cache.make_key("clinical_tools", [0.1, 0.2], 5)
+        
+        assert base != cache.make_key("clinical_tools", [0.1, 0.2], 3)
+        assert base != cache.make_key("clinical_orgs", [0.1, 0.2], 5)
+        assert base != cache.make_key("clinical_tools", [0.1, 0.2], 5, {"category": "Research"})
+        assert base == cache.make_key("clinical_tools", [0.1, 0.2], 5)
+    
+    def test_version_change_drops_entries(self, cache, version):
+        key = cache.make_key("clinical_tools", [0.1], 5)
+        cache.put(key, ROWS, cache.version())
+        
+        version.value = 2
+        
+        assert cache.get(key, cache.version()) is None
+        assert cache.stats()["entries"] == 0
+        assert cache.stats()["invalidations"] == 1
+    
+    def test_results_read_under_old_version_are_not_stored(self, cache, version):
+        key = cache.make_key("clinical_tools", [0.1], 5)
+        stale_version = cache.version()
+        
+        version.value = 2
+        current = cache.version()
+        cache.put(key, ROWS, stale_version)
+        
+        assert cache.get(key, current) is None
+    
+    def test_evicts_least_recently_used_by_size(self, version):
+        size = estimate_size(ROWS)
+        cache = RetrievalCache(max_bytes=size * 2, version_fn=version)
+        v = cache.version()
+        keys = [cache.make_key("clinical_tools", [float(i)], 5) for i in range(3)]
+        
+        cache.put(keys[0], ROWS, v)
+        cache.put(keys[1], ROWS, v)
+        cache.get(keys[0], v)
+        cache.put(keys[2], ROWS, v)
+        
+        assert cache.get(keys[1], v) is None
+        assert cache.get(keys[0], v) == ROWS
+        assert cache.stats()["evictions"] == 1
+        assert cache.stats()["bytes"] <= size * 2
+
+
+class TestCachedRetriever:
+    
+    def test_repeat_search_skips_query(self, cache):
+        retriever = CountingToolsRetriever(cache)
+        
+        first = retriever.search("documentation", limit=1)
+        second = retriever.search("documentation", limit=1)
+        
+        assert first == second == ROWS
+        assert retriever.queries == 1
+    
+    def test_catalog_write_forces_requery(self, cache, version):
+        retriever = CountingToolsRetriever(cache)
+        retriever.search("documentation", limit=1)
+        
+        version.value = 2
+        retriever.search("documentation", limit=1)
+        
+        assert retriever.queries == 2
+    
+    def test_async_search_reads_version_without_the_sync_path(self):
+        def blocking_version():
+            raise AssertionError("sync version read on the event loop")
+        
+        async def async_version():
+            return 1
+        
+        async def aquery_by_vector(query_embedding, limit=5, filters=None):
+            retriever.queries += 1
+            return ROWS[:limit]
+        
+        cache = RetrievalCache(max_bytes=10_000, version_fn=blocking_version, aversion_fn=async_version)
+        retriever = CountingToolsRetriever(cache)
+        retriever.aquery_by_vector = aquery_by_vector
+        
+        async def run():
+            await retriever.asearch_by_vector([0.1, 0.2, 0.3], limit=1)
+            return await retriever.asearch_by_vector([0.1, 0.2, 0.3], limit=1)
+        
+        assert asyncio.run(run()) == ROWS
+        assert retriever.queries == 1
+
+
+class TestCatalogVersionTracker:
+    
+    def test_bump_changes_version(self, monkeypatch):
+        tracker = CatalogVersionTracker(check_seconds=3600, listen=False)
+        monkeypatch.setattr(tracker, "_read_db_version", lambda: 7)
+        
+        before = tracker.current()
+        after = tracker.bump()
+        
+        assert before == 7
+        assert after == 8
+    
+    def test_picks_up_writes_from_other_processes(self, monkeypatch):
+        tracker = CatalogVersionTracker(check_seconds=0, listen=False)
+        db = {"version": 1}
+        monkeypatch.setattr(tracker, "_read_db_version", lambda: db["version"])
+        
+        assert tracker.current() == 1
+        db["version"] = 2
+        assert tracker.current() == 2
+    
+    def test_async_reads_use_the_async_engine(self, monkeypatch):
+        tracker = CatalogVersionTracker(check_seconds=3600, listen=False)
+        reads = []
+        
+        async def aread():
+            reads.append("async")
+            return 3
+        
+        def read():
+            raise AssertionError("sync read from acurrent")
+        
+        monkeypatch.setattr(tracker, "_aread_db_version", aread)
+        monkeypatch.setattr(tracker, "_read_db_version", read)
+        
+        async def run():
+            return await asyncio.gather(*(tracker.acurrent() for _ in range(5)))
+        
+        assert asyncio.run(run()) == [3] * 5
+        assert reads == ["async"]
+        assert tracker.current() == 3
+    
+    def test_notification_forces_a_reread_while_listening(self, monkeypatch):
+        tracker = CatalogVersionTracker(check_seconds=0, listen=False)
+        db = {"version": 1}
+        monkeypatch.setattr(tracker, "_read_db_version", lambda: db["version"])
+        tracker._set_listening(True)
+        
+        assert tracker.current() == 1
+        db["version"] = 2
+        assert tracker.current() == 1
+        tracker._on_notify()
+        assert tracker.current() == 2
+    
+    def test_notification_during_a_read_keeps_the_version_due(self, monkeypatch):
+        tracker = CatalogVersionTracker(check_seconds=3600, listen=False)
+        tracker._set_listening(True)
+        db = {"version": 1}
+        
+        def read():
+            version = db["version"]
+            db["version"] = 2
+            tracker._on_notify()
+            return version
+        
+        monkeypatch.setattr(tracker, "_read_db_version", read)
+        
+        assert tracker.current() == 1
+        monkeypatch.setattr(tracker, "_read_db_version", lambda: db["version"])
+        assert tracker.current() == 2
+    
+    def test_trigger_notifies_listeners(self):
+        from src.db.catalog_version import catalog_trigger_sql
+        
+        function_sql = catalog_trigger_sql(("clinical_tools",))[0]
+        
+        assert "pg_notify('catalog_versions', TG_TABLE_NAME)" in function_sql
@@ -1,6 +1,7 @@
 import pytest
 
 from tests.mocks.mock_embeddings import fake_embedding
+from src.retrievers.base import BaseRetriever
 from tests.mocks.mock_db import MockToolsRetriever, MockOrgsRetriever, MOCK_TOOLS, MOCK_ORGS
 
 
@@ -74,3 +75,206 @@ class TestMockOrgsRetriever:
         assert "specialty" in result
         assert "ai_use_cases" in result
         assert "similarity" in result
+
+
+class TestSimilaritySearchSql:
+    
+    def test_full_mode_orders_by_cosine_distance(self):
+        from src.retrievers.sql import similarity_search_sql
+        sql = similarity_search_sql("clinical_tools", ["id", "name"], "full")
+        
+        assert "FROM clinical_tools" in sql
+        assert sql.count("<=>") == 1
+        assert "ORDER BY distance" in sql
+        assert "binary_quantize" not in sql
+    
+    def test_binary_mode_reranks_hamming_candidates(self):
+        from src.retrievers.sql import similarity_search_sql
+        sql = similarity_search_sql("clinical_tools", ["id", "name"], "binary")
+        
+        assert "<~> binary_quantize(" in sql
+        assert "LIMIT :candidates" in sql
+        assert "LIMIT :limit" in sql
+        assert sql.count("<=>") == 1
+    
+    def test_query_vector_is_float32(self):
+        import numpy as np
+        from src.retrievers.sql import to_query_vector
+        vec = to_query_vector([0.1, 0.2, 0.3])
+        
+        assert vec.dtype == np.float32
+        assert vec.shape == (3,)
+    
+    def test_rejects_unknown_mode(self):
+        from src.retrievers.sql import similarity_search_sql
+        with pytest.raises(ValueError):
+            similarity_search_sql("clinical_tools", ["id"], "ivf")
+    
+    def test_batch_sql_uses_lateral_join_per_query(self):
+        from src.retrievers.sql import batch_search_sql
+        sql = batch_search_sql("clinical_tools", ["id", "name"], "full")
+        
+        assert "unnest(CAST(:vecs AS vector[])) WITH ORDINALITY" in sql
+        assert "CROSS JOIN LATERAL" in sql
+        assert "ORDER BY q.query_index, nearest.distance" in sql
+        assert sql.count("<=>") == 1
+
+
+class TestSearchBatch:
+    
+    def test_results_in_query_order(self):
+        retriever = MockToolsRetriever()
+        results = retriever.search_batch(["a", "b", "c"], limit=2)
+        
+        assert len(results) == 3
+        assert all(r == MOCK_TOOLS[:2] for r in results)
+    
+    def test_uses_embed_batch_when_available(self):
+        calls = []
+        
+        class BatchEmbedding:
+            def __call__(self, text):
+                raise AssertionError("should embed in one batch")
+            
+            def embed_batch(self, texts):
+                calls.append(list(texts))
+                return [[0.0] * 3 for _ in texts]
+        
+        retriever = MockOrgsRetriever()
+        retriever.embed_fn = BatchEmbedding()
+        BaseRetriever.search_batch(retriever, ["x", "y"], limit=1)
+        
+        assert calls == [["x", "y"]]
+
+
+class TestFilterSql:
+    
+    def test_no_filters_means_no_where(self):
+        from src.retrievers.sql import filter_sql
+        assert filter_sql(None, {"category": "scalar"}) == ("", {})
+        assert filter_sql({"category": None}, {"category": "scalar"}) == ("", {})
+    
+    def test_scalar_array_and_flags_predicates(self):
+        from src.retrievers.sql import filter_sql
+        columns = {"state": "scalar", "ai_use_cases": "array", "services": "flags"}
+        where, params = filter_sql(
+            {"state": "Ohio", "ai_use_cases": ["ecg_analysis"], "services": ["telehealth"]},
+            columns,
+            suffix="_orgs",
+        )
+        
+        assert where.startswith("WHERE ")
+        assert "state = ANY(:f_state_orgs)" in where
+        assert "ai_use_cases && CAST(:f_ai_use_cases_orgs AS text[])" in where
+        assert "services @> CAST(:f_services_orgs AS jsonb)" in where
+        assert params["f_state_orgs"] == ["Ohio"]
+        assert params["f_services_orgs"] == '{"telehealth": true}'
+    
+    def test_unknown_filter_rejected(self):
+        from src.retrievers.sql import filter_sql
+        with pytest.raises(ValueError):
+            filter_sql({"color": "red"}, {"category": "scalar"})
+    
+    def test_filtered_search_reorders_exactly(self):
+        from src.retrievers.sql import similarity_search_sql
+        for mode in ("full", "binary"):
+            sql = similarity_search_sql(
+                "clinical_tools", ["id"], mode, where="WHERE category = ANY(:f_category)"
+            )
+            assert sql.count("WHERE category = ANY(:f_category)") == 1
+            assert sql.rstrip().endswith("ORDER BY distance")
+
+
+class TestMockFilters:
+    
+    def test_tools_category_filter(self):
+        retriever = MockToolsRetriever()
+        results = retriever.search("anything", filters={"category": "Research"})
+        assert [r["id"] for r in results] == [3]
+    
+    def test_orgs_use_case_overlap(self):
+        retriever = MockOrgsRetriever()
+        results = retriever.search("anything", filters={"ai_use_cases": ["ecg_analysis", "tumor_detection"]})
+        assert [r["id"] for r in results] == [2, 3]
+
+
+class TestSearchSettings:
+    
+    def test_default_hnsw_needs_no_settings(self):
+        from src.retrievers import ToolsRetriever
+        retriever = ToolsRetriever(embed_fn=None, mode="full", index_type="hnsw", ef_search=40)
+        assert retriever.search_settings(limit=5) == {}
+    
+    def test_ef_search_covers_limit(self):
+        from src.retrievers import ToolsRetriever
+        retriever = ToolsRetriever(embed_fn=None, mode="full", index_type="hnsw", ef_search=40)
+        assert retriever.search_settings(limit=100) == {"hnsw.ef_search": "100"}
+    
+    def test_binary_mode_ef_search_covers_candidates(self):
+        from src.retrievers import ToolsRetriever
+        retriever = ToolsRetriever(embed_fn=None, mode="binary", index_type="hnsw", ef_search=40)
+        settings = retriever.search_settings(limit=5)
+        assert int(settings["hnsw.ef_search"]) >= 5
+    
+    def test_ivfflat_probes_and_iterative_scan(self):
+        from src.retrievers import OrgsRetriever
+        retriever = OrgsRetriever(embed_fn=None, mode="full", index_type="ivfflat", probes=10)
+        settings = retriever.search_settings(limit=5, filtered=True)
+        assert settings["ivfflat.probes"] == "10"
+        assert settings["ivfflat.iterative_scan"] == "relaxed_order"
+        assert "hnsw.ef_search" not in settings
+    
+    def test_exact_scan_has_no_index_settings(self):
+        from src.retrievers import OrgsRetriever
+        retriever = OrgsRetriever(embed_fn=None, mode="full", index_type="none")
+        assert retriever.search_settings(limit=5, filtered=True) == {}
+    
+    def test_index_ddl_variants(self):
+        from src.db.vector_index import vector_index_sql
+        hnsw = vector_index_sql("idx", "clinical_tools", "hnsw", m=32, ef_construction=128)
+        ivf = vector_index_sql("idx", "clinical_tools", "ivfflat", lists=50)
+        
+        assert "USING hnsw" in hnsw and "m = 32" in hnsw and "ef_construction = 128" in hnsw
+        assert "USING ivfflat" in ivf and "lists = 50" in ivf
+        assert vector_index_sql("idx", "clinical_tools", "none") is None
+        with pytest.raises(ValueError):
+            vector_index_sql("idx", "clinical_tools", "annoy")
+    
+    def test_storage_conversion_sql(self):
+        from src.db.vector_index import storage_conversion_sql
+        shorten = storage_conversion_sql("clinical_tools", "vector(1536)", "halfvec", 512)
+        
+        assert "TYPE halfvec(512)" in shorten
+        assert "l2_normalize(subvector(embedding::vector, 1, 512))" in shorten
+        assert "subvector" not in storage_conversion_sql("clinical_tools", "vector(512)", "halfvec", 512)
+        assert storage_conversion_sql("clinical_tools", "halfvec(512)", "halfvec", 512) is None
+        with pytest.raises(ValueError):
+            storage_conversion_sql("clinical_tools", "vector(256)", "vector", 1536)
+    
+    def test_index_matches_type_and_build_parameters(self):
+        from src.db.vector_index import index_matches
+        
+        assert index_matches("hnsw", None, "hnsw", m=16, ef_construction=64)
+        assert index_matches("hnsw", ["m=32", "ef_construction=128"], "hnsw", m=32, ef_construction=128)
+        assert not index_matches("hnsw", None, "hnsw", m=32, ef_construction=64)
+        assert not index_matches("hnsw", None, "ivfflat", lists=100)
+        assert index_matches("ivfflat", ["lists=50"], "ivfflat", lists=50)
+        assert not index_matches("ivfflat", ["lists=50"], "none")
+        assert index_matches(None, None, "none")
+    
+    def test_bq_indexes_only_in_binary_mode(self):
+        from src.db.vector_index import create_vector_indexes
+        
+        class Recorder:
+            def __init__(self):
+                self.statements = []
+            
+            def execute(self, statement):
+                self.statements.append(str(statement))
+        
+        full, binary = Recorder(), Recorder()
+        create_vector_indexes(full, search_mode="full")
+        create_vector_indexes(binary, search_mode="binary")
+        
+        assert not any("binary_quantize" in sql for sql in full.statements)
+        assert sum("binary_quantize" in sql for sql in binary.statements) == 2
@@ -0,0 +1,73 @@
+import asyncio
+import json
+
+import pytest
+from langchain_core.language_models.fake_chat_models import GenericFakeChatModel
+from langchain_core.messages import AIMessage
+
+from src.agents.graph import create_clinical_graph
+from src.api.streaming import ConfidenceTailFilter, graph_sse_events, agraph_sse_events
+from tests.mocks.mock_db import MockToolsRetriever, MockOrgsRetriever, MOCK_TOOLS, MOCK_ORGS
+
+
+def run_filter(tokens: list[str]) -> str:
+    tail_filter = ConfidenceTailFilter()
+    return "".join(tail_filter.feed(token) for token in tokens) + tail_filter.flush()
+
+
+class TestConfidenceTailFilter:
+    
+    def test_drops_trailing_confidence_json(self):
+        tokens = ["Use ", "Scribe.", "\n", '{"response_', 'confidence": ', "0.8}"]
+        
+        assert run_filter(tokens) == "Use Scribe.\n"
+    
+    def test_holds_back_partial_json(self):
+        tail_filter = ConfidenceTailFilter()
+        
+        assert tail_filter.feed("Done. {") == "Done. "
+        assert tail_filter.feed('"response_conf') == ""
+    
+    def test_releases_other_braces(self):
+        assert run_filter(["Use {", "name} as ", "a placeholder"]) == "Use {name} as a placeholder"
+    
+    def test_unterminated_confidence_is_dropped_on_flush(self):
+        assert run_filter(["Answer ", '{"response_confidence": 0.']) == "Answer "
+
+
+def build_graph():
+    llm = GenericFakeChatModel(messages=iter([
+        AIMessage(content="tool_finder"),
+        AIMessage(content='Try the scribe tool {"response_confidence": 0.9}'),
+    ]))
+    return create_clinical_graph(
+        llm=llm,
+        tools_retriever=MockToolsRetriever(MOCK_TOOLS),
+        orgs_retriever=MockOrgsRetriever(MOCK_ORGS),
+    )
+
+
+async def collect(events):
+    return [event async for event in events]
+
+
+class TestGraphSseEvents:
+    
+    @pytest.mark.parametrize("use_async", [False, True])
+    def test_streams_tokens_then_node_updates(self, use_async):
+        graph = build_graph()
+        final_state = {}
+        initial_state = {"query": "scribe", "confidence": {}}
+        
+        if use_async:
+            events = asyncio.run(collect(agraph_sse_events(graph, initial_state, final_state)))
+        else:
+            events = list(graph_sse_events(graph, initial_state, final_state))
+        tokens = [json.loads(e["data"])["token"] for e in events if e["event"] == "token"]
+        nodes = [json.loads(e["data"])["node"] for e in events if e["event"] == "message"]
+        
+        assert nodes == ["supervisor", "tool_finder"]
+        assert len(tokens) > 1
+        assert "".join(tokens).strip() == "Try the scribe tool"
+        assert final_state["response"] == "Try the scribe tool"
+        assert final_state["confidence"]["response"] == 0.9
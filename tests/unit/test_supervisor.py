@@ -53,3 +53,61 @@ class TestSupervisorAgent:
         result = supervisor.route(state)
         
         assert result.route == "tool_finder"
+
+
+AXES = {"tool": 0, "hospital": 1, "workflow": 2}
+
+
+def axis_embedding(text: str) -> list[float]:
+    """Embed by keyword: one axis per route keyword, plus a small shared component."""
+    vec = [0.1, 0.1, 0.1]
+    for word, axis in AXES.items():
+        if word in text.lower():
+            vec[axis] += 1.0
+    return vec
+
+
+EXEMPLARS = {
+    "tool_finder": ["tool for notes", "a tool for drugs"],
+    "org_matcher": ["which hospital", "hospital using AI"],
+    "workflow_advisor": ["workflow redesign", "improve our workflow"],
+}
+
+
+class TestEmbeddingRouter:
+    
+    def test_confident_query_skips_llm(self):
+        from src.agents.router import EmbeddingRouter
+        llm = FakeLLM(response="org_matcher")
+        router = EmbeddingRouter(axis_embedding, EXEMPLARS, margin_threshold=0.1, shadow_rate=0)
+        supervisor = SupervisorAgent(llm=llm, router=router)
+        
+        result = supervisor.route(AgentState(query="Best tool for documentation?"))
+        
+        assert result.route == "tool_finder"
+        assert result.confidence["routing"] > 0.5
+        assert len(llm.calls) == 0
+        assert router.stats()["hit_rate"] == 1.0
+    
+    def test_ambiguous_query_falls_back_to_llm(self):
+        from src.agents.router import EmbeddingRouter
+        llm = FakeLLM(response="workflow_advisor")
+        router = EmbeddingRouter(axis_embedding, EXEMPLARS, margin_threshold=0.1, shadow_rate=0)
+        supervisor = SupervisorAgent(llm=llm, router=router)
+        
+        result = supervisor.route(AgentState(query="Which tool does each hospital use?"))
+        
+        assert result.route == "workflow_advisor"
+        assert len(llm.calls) == 1
+        stats = router.stats()
+        assert stats["fallbacks"] == 1
+        assert stats["fallback_checks"] == 1
+    
+    def test_agreement_tracking(self):
+        from src.agents.router import EmbeddingRouter
+        router = EmbeddingRouter(axis_embedding, EXEMPLARS)
+        
+        router.record_comparison("tool_finder", "tool_finder", "shadow")
+        router.record_comparison("tool_finder", "org_matcher", "shadow")
+        
+        assert router.stats()["shadow_agreement"] == 0.5
@@ -0,0 +1,140 @@
+import asyncio
+import logging
+
+import pytest
+from fastapi.testclient import TestClient
+
+from src import tracing
+from src.agents.graph import create_clinical_graph
+from src.api import answer_cache
+from src.api.app import app
+from src.api.routes import agent
+from src.logger import current_trace_id
+from src.tracing import Span, Tracer, otlp_payload, span, start_trace
+from tests.conftest import FakeLLM
+from tests.mocks.mock_db import MockToolsRetriever, MockOrgsRetriever, MOCK_TOOLS, MOCK_ORGS
+
+
+def build_graph():
+    return create_clinical_graph(
+        llm=FakeLLM(response='{"route": "tool_finder", "confidence": 0.9}'),
+        tools_retriever=MockToolsRetriever(MOCK_TOOLS),
+        orgs_retriever=MockOrgsRetriever(MOCK_ORGS),
+        speculative_retrieval=False,
+    )
+
+
+@pytest.fixture
+def exported(monkeypatch):
+    """Enable tracing and collect exported spans in a list (after tracer.flush())."""
+    spans = []
+    monkeypatch.setattr(tracing, "TRACING_ENABLED", True)
+    monkeypatch.setattr(tracing, "tracer", Tracer(spans.extend))
+    return spans
+
+
+class TestSpans:
+    
+    def test_sampled_graph_run_builds_span_tree(self, exported):
+        graph = build_graph()
+        
+        async def run():
+            with start_trace("request", sample_rate=1.0) as root:
+                await graph.ainvoke({"query": "documentation tools"})
+            return root
+        
+        root = asyncio.run(run())
+        tracing.tracer.flush()
+        by_name = {s.name: s for s in exported}
+        
+        assert {"request", "node.supervisor", "node.tool_finder", "llm.supervisor", "llm.tool_finder"} <= set(by_name)
+        assert all(s.trace_id == root.trace_id for s in exported)
+        assert by_name["node.supervisor"].parent_id == root.span_id
+        assert by_name["llm.supervisor"].parent_id == by_name["node.supervisor"].span_id
+        assert by_name["node.supervisor"].attributes["route"] == "tool_finder"
+        assert by_name["node.tool_finder"].attributes["tools_results"] > 0
+    
+    def test_unsampled_trace_exports_nothing(self, exported):
+        with start_trace("request", sample_rate=0.0) as root:
+            with span("child") as child:
+                child.set_attribute("rows", 3)
+        tracing.tracer.flush()
+        
+        assert exported == []
+        assert child is root
+        assert root.attributes == {}
+    
+    def test_errors_are_recorded(self, exported):
+        with pytest.raises(ValueError):
+            with start_trace("request", sample_rate=1.0):
+                with span("child"):
+                    raise ValueError("boom")
+        tracing.tracer.flush()
+        
+        assert {s.name: s.error for s in exported} == {"child": "ValueError: boom", "request": "ValueError: boom"}
+    
+    def test_trace_id_is_set_for_log_records(self):
+        with start_trace("request", sample_rate=0.0) as root:
+            record = logging.getLogger("test").makeRecord("test", logging.INFO, __file__, 1, "msg", (), None)
+        
+        assert record.trace_id == root.trace_id
+        assert current_trace_id.get() == "-"
+
+
+class TestExport:
+    
+    def test_otlp_payload(self):
+        root = Span("request", "a" * 32, None, True, {"rows": 3, "hit": True, "route": "tool_finder"})
+        root.end_ns = root.start_ns + 1000
+        
+        payload = otlp_payload([root], service_name="svc")
+        resource_spans = payload["resourceSpans"][0]
+        exported = resource_spans["scopeSpans"][0]["spans"][0]
+        
+        assert resource_spans["resource"]["attributes"][0]["value"] == {"stringValue": "svc"}
+        assert exported["traceId"] == "a" * 32
+        assert "parentSpanId" not in exported
+        assert exported["endTimeUnixNano"] == str(root.start_ns + 1000)
+        assert exported["attributes"] == [
+            {"key": "rows", "value": {"intValue": "3"}},
+            {"key": "hit", "value": {"boolValue": True}},
+            {"key": "route", "value": {"stringValue": "tool_finder"}},
+        ]
+    
+    def test_full_queue_drops_spans(self):
+        exporter = Tracer(lambda spans: None, max_queue=1)
+        exporter._thread = object()
+        
+        exporter.export(Span("a", "a" * 32, None, True, {}))
+        exporter.export(Span("b", "a" * 32, None, True, {}))
+        
+        assert exporter.dropped == 1
+    
+    def test_failed_export_is_counted(self):
+        def fail(spans):
+            raise OSError("collector down")
+        exporter = Tracer(fail)
+        exporter._thread = object()
+        
+        exporter.export(Span("a", "a" * 32, None, True, {}))
+        exporter.flush()
+        
+        assert exporter.failed == 1
+
+
+class TestMiddleware:
+    
+    def test_request_is_a_root_span(self, exported, monkeypatch):
+        monkeypatch.setattr(tracing, "TRACE_SAMPLE_RATE", 1.0)
+        monkeypatch.setattr(answer_cache, "answer_cache", None)
+        monkeypatch.setattr(agent, "_graph", build_graph())
+        client = TestClient(app)
+        
+        response = client.post("/api/query", json={"query": "documentation tools"})
+        tracing.tracer.flush()
+        
+        root = next(s for s in exported if s.parent_id is None)
+        assert response.headers["X-Trace-Id"] == root.trace_id
+        assert root.name == "POST /api/query"
+        assert root.attributes["http.status_code"] == 200
+        assert any(s.name == "node.tool_finder" for s in exported)
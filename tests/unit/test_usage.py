@@ -0,0 +1,144 @@
+import asyncio
+import threading
+
+import pytest
+from fastapi.testclient import TestClient
+from langchain_core.messages import AIMessage
+from sqlalchemy.dialects import postgresql
+
+from src.agents.graph import create_clinical_graph
+from src.agents.hedged_llm import HedgedLLM
+from src.api import answer_cache
+from src.api.app import app
+from src.api.routes import agent
+from src.api.routes import usage as usage_routes
+from src.db.usage import summary_statements
+from src.embeddings.batcher import EmbeddingBatcher
+from src.usage import (
+    RequestUsage, estimate_cost, model_price, record_embedding_usage, start_request_usage
+)
+from tests.mocks.mock_db import MockToolsRetriever, MockOrgsRetriever, MOCK_TOOLS, MOCK_ORGS
+
+
+class UsageLLM:
+    """Fake chat model whose responses report token usage like ChatOpenAI's."""
+    
+    def __init__(self, response: str, input_tokens: int = 1000, output_tokens: int = 200):
+        self.response = response
+        self.input_tokens = input_tokens
+        self.output_tokens = output_tokens
+    
+    def invoke(self, messages):
+        return AIMessage(
+            content=self.response,
+            usage_metadata={
+                "input_tokens": self.input_tokens,
+                "output_tokens": self.output_tokens,
+                "total_tokens": self.input_tokens + self.output_tokens,
+            },
+            response_metadata={"model_name": "gpt-4o-mini-2024-07-18"},
+        )
+    
+    async def ainvoke(self, messages):
+        return self.invoke(messages)
+
+
+class TestPricing:
+    
+    def test_dated_snapshot_uses_base_model_price(self):
+        assert model_price("gpt-4o-mini-2024-07-18") == model_price("gpt-4o-mini")
+    
+    def test_unknown_model_costs_nothing(self):
+        assert model_price("some-other-model") is None
+        assert estimate_cost("some-other-model", 1000, 1000) == 0.0
+    
+    def test_request_usage_totals(self):
+        usage = RequestUsage()
+        usage.add("gpt-4o-mini", prompt_tokens=1000, completion_tokens=500)
+        usage.add("gpt-4o-mini", prompt_tokens=1000, completion_tokens=500)
+        usage.add("text-embedding-3-small", embedding_tokens=50_000)
+        
+        totals = usage.as_dict()
+        
+        assert totals["prompt_tokens"] == 2000
+        assert totals["completion_tokens"] == 1000
+        assert totals["embedding_tokens"] == 50_000
+        assert totals["models"]["gpt-4o-mini"]["calls"] == 2
+        assert totals["cost_usd"] == pytest.approx(2 * (0.00015 + 0.0003) + 0.001)
+
+
+class TestRecording:
+    
+    def test_llm_calls_are_counted_for_the_request(self):
+        wrapped = HedgedLLM(UsageLLM("ok"), "test", timeout_seconds=0, max_retries=0)
+        
+        async def run():
+            usage = start_request_usage()
+            await wrapped.ainvoke([])
+            wrapped.invoke([])
+            return usage.as_dict()
+        
+        totals = asyncio.run(run())
+        
+        assert totals["prompt_tokens"] == 2000
+        assert totals["completion_tokens"] == 400
+        assert list(totals["models"]) == ["gpt-4o-mini-2024-07-18"]
+    
+    def test_batched_embedding_tokens_are_split_between_requests(self):
+        def batch_fn(texts):
+            record_embedding_usage("text-embedding-3-small", 30)
+            return [[0.0] for _ in texts]
+        
+        batcher = EmbeddingBatcher(batch_fn=batch_fn, window_ms=200, max_batch_size=2)
+        usages = {}
+        
+        def request(text):
+            usages[text] = start_request_usage()
+            batcher(text)
+        
+        threads = [threading.Thread(target=request, args=(text,)) for text in ("a" * 40, "b" * 80)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        
+        assert usages["a" * 40].as_dict()["embedding_tokens"] == 10
+        assert usages["b" * 80].as_dict()["embedding_tokens"] == 20
+
+
+class TestEndpoints:
+    
+    def test_query_returns_and_persists_usage(self, monkeypatch):
+        stored = []
+        
+        async def fake_add_usage(*args):
+            stored.append(args)
+        
+        monkeypatch.setattr(usage_routes, "aadd_usage", fake_add_usage)
+        monkeypatch.setattr(answer_cache, "answer_cache", None)
+        monkeypatch.setattr(agent, "_graph", create_clinical_graph(
+            llm=UsageLLM('{"route": "tool_finder", "confidence": 0.9}'),
+            tools_retriever=MockToolsRetriever(MOCK_TOOLS),
+            orgs_retriever=MockOrgsRetriever(MOCK_ORGS),
+        ))
+        client = TestClient(app)
+        
+        response = client.post("/api/query", json={"query": "documentation tools"})
+        
+        assert response.status_code == 200
+        usage = response.json()["usage"]
+        assert usage["prompt_tokens"] == 2000
+        assert usage["cost_usd"] > 0
+        [(persisted, endpoint, route, *_)] = stored
+        assert (persisted["prompt_tokens"], endpoint, route) == (2000, "query", "tool_finder")
+    
+    def test_summary_groups_by_route_and_thread(self):
+        total, by_route, by_thread = summary_statements(None, "t1", limit=5)
+        
+        def sql(statement):
+            return str(statement.compile(dialect=postgresql.dialect()))
+        
+        assert "GROUP BY" not in sql(total)
+        assert "GROUP BY usage_records.route" in sql(by_route)
+        assert "GROUP BY usage_records.thread_id" in sql(by_thread)
+        assert "LIMIT" in sql(by_thread)
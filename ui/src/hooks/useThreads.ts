@@ -125,7 +125,17 @@ export function useThreads() {
 
             try {
               const event = JSON.parse(data)
-              if (event.node === 'supervisor' && event.data.route) {
+              if (event.timings || event.usage) continue
+              if (typeof event.token === 'string') {
+                accumulatedContent += event.token
+                setMessages(prev => prev.map(msg =>
+                  msg.id === assistantMessage.id
+                    ? { ...msg, content: accumulatedContent }
+                    : msg
+                ))
+                continue
+              }
+              if ((event.node === 'supervisor' || event.node === 'answer_cache') && event.data.route) {
                 route = event.data.route
               }
               if (event.data.response) {